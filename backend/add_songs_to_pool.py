@@ -4,11 +4,12 @@ Script para añadir más canciones al pool usando iTunes Search API
 Uso: python add_songs_to_pool.py
 """
 
-import requests
 import json
 import time
 from pathlib import Path
 
+from api import http_client
+
 # iTunes Search API endpoint
 ITUNES_API = "https://itunes.apple.com/search"
 
@@ -74,7 +75,7 @@ def search_itunes(term, limit=50, country="US"):
     }
     
     try:
-        response = requests.get(ITUNES_API, params=params, timeout=10)
+        response = http_client.get(ITUNES_API, params=params, timeout=10)
         response.raise_for_status()
         return response.json()
     except Exception as e:
@@ -0,0 +1,224 @@
+"""
+Pub Quiz Answer Matching
+Grades written answers against the correct answer and its alternatives,
+forgiving what a host would let through anyway
+
+Both sides are normalised the same way - case, diacritics, punctuation, a
+leading article ("the", "a", "an") and number words ("twenty-one" -> "21") - so
+"The Beatles!" and "beatles" are the same answer. What still differs is
+compared with a bounded edit distance (typos, swapped letters) and by
+tokens (extra words around the answer, or just a surname), and the best
+match gives a confidence:
+
+    1.0                      same answer once normalised
+    ACCEPT_CONFIDENCE - 1.0  accepted as correct
+    below REVIEW_CONFIDENCE  worth a look from the host (near misses too,
+                             down to REVIEW_MIN_CONFIDENCE)
+
+An answer with every word of the key and more around it is never scored
+below REVIEW_MIN_CONFIDENCE, so a wordy right answer reaches the host.
+
+A one-word answer is only accepted with a single typo in a word of
+SURE_TYPO_MIN_CHARS or more letters; closer calls ("Iran" for "Iraq") are
+left to the host.
+
+The normalised forms of a question's answers ("answer keys") are computed
+once, when the question is saved (QuizQuestion.answer_keys), so grading a
+submission only normalises the team's own text.
+"""
+
+import re
+import unicodedata
+from typing import Iterable, List, NamedTuple, Optional
+
+# Fuzzy matches at or above this count as correct
+ACCEPT_CONFIDENCE = 0.7
+# Matches below this (and near misses from REVIEW_MIN_CONFIDENCE) go to the host
+REVIEW_CONFIDENCE = 0.9
+REVIEW_MIN_CONFIDENCE = 0.5
+
+# A one-word answer that's one letter off a short word is as likely another
+# word ("Iran" / "Iraq", "Mars" / "Mary") as a typo, and two letters off it
+# often is one ("Niger" / "Nigeria"): those fuzzy matches go to the host
+SURE_TYPO_MIN_CHARS = 7
+UNSURE_TYPO_CONFIDENCE = 0.65
+
+ARTICLES = {'the', 'a', 'an'}
+
+UNITS = {
+    'zero': 0, 'one': 1, 'two': 2, 'three': 3, 'four': 4, 'five': 5, 'six': 6, 'seven': 7,
+    'eight': 8, 'nine': 9, 'ten': 10, 'eleven': 11, 'twelve': 12, 'thirteen': 13,
+    'fourteen': 14, 'fifteen': 15, 'sixteen': 16, 'seventeen': 17, 'eighteen': 18, 'nineteen': 19,
+}
+TENS = {
+    'twenty': 20, 'thirty': 30, 'forty': 40, 'fifty': 50,
+    'sixty': 60, 'seventy': 70, 'eighty': 80, 'ninety': 90,
+}
+SCALES = {'thousand': 1000, 'million': 1000000}
+
+
+class AnswerMatch(NamedTuple):
+    is_correct: bool
+    confidence: float  # 0.0 - 1.0, see module docstring
+    matched: str = ''  # answer key it was matched against
+
+    @property
+    def needs_review(self) -> bool:
+        return REVIEW_MIN_CONFIDENCE <= self.confidence < REVIEW_CONFIDENCE
+
+
+# ============================================================================
+# Normalisation
+# ============================================================================
+
+def normalize_answer(text: str) -> str:
+    """Canonical form of an answer: lowercase ASCII words, no articles, numbers as digits"""
+    text = unicodedata.normalize('NFKD', text or '')
+    text = ''.join(c for c in text if not unicodedata.combining(c)).lower()
+    text = text.replace('&', ' and ')
+    text = re.sub(r"(?<=\d),(?=\d{3})", '', text)  # 1,000 -> 1000
+    text = re.sub(r"['’`]", '', text)  # don't -> dont, beatles' -> beatles
+    tokens = re.sub(r'[\W_]+', ' ', text).split()
+
+    if len(tokens) > 1 and tokens[0] in ARTICLES:
+        tokens = tokens[1:]  # "The Beatles", but not "Vitamin A"
+    return ' '.join(_numbers_to_digits(tokens))
+
+
+def _numbers_to_digits(tokens: List[str]) -> List[str]:
+    """Replace runs of number words ("one hundred and five") by their value"""
+    result = []
+    i = 0
+    while i < len(tokens):
+        total, current, last, j = 0, 0, None, i
+        while j < len(tokens):
+            word = tokens[j]
+            if word in UNITS and last in (None, 'tens', 'scale', 'and'):
+                current += UNITS[word]
+                last = 'unit'
+            elif word in TENS and last in (None, 'scale', 'and'):
+                current += TENS[word]
+                last = 'tens'
+            elif word == 'hundred' and last in (None, 'unit'):
+                current = (current or 1) * 100
+                last = 'scale'
+            elif word in SCALES and last in ('unit', 'tens', 'scale'):
+                total += (current or 1) * SCALES[word]
+                current = 0
+                last = 'scale'
+            elif word == 'and' and last == 'scale' and j + 1 < len(tokens) and (
+                    tokens[j + 1] in UNITS or tokens[j + 1] in TENS):
+                last = 'and'
+            else:
+                break
+            j += 1
+        if j == i:
+            result.append(tokens[i])
+            i += 1
+        else:
+            result.append(str(total + current))
+            i = j
+    return result
+
+
+def build_answer_keys(correct_answer: str, alternatives: Optional[Iterable[str]] = None) -> List[str]:
+    """Normalised forms of a question's answers (correct answer first, no duplicates or blanks)"""
+    keys = []
+    for answer in [correct_answer, *(alternatives or [])]:
+        key = normalize_answer(answer) if isinstance(answer, str) else ''
+        if key and key not in keys:
+            keys.append(key)
+    return keys
+
+
+# ============================================================================
+# Matching
+# ============================================================================
+
+def max_typos(key: str) -> int:
+    """Edit distance a key of this length tolerates"""
+    if len(key) <= 3:
+        return 0
+    if len(key) <= 6:
+        return 1
+    if len(key) <= 12:
+        return 2
+    return 3
+
+
+def bounded_edit_distance(a: str, b: str, limit: int) -> Optional[int]:
+    """
+    Edit distance (insert, delete, substitute, swap adjacent letters) between
+    `a` and `b`, or None as soon as it's certain to exceed `limit`
+    """
+    if abs(len(a) - len(b)) > limit:
+        return None
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if previous2 is not None and i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]:
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > limit:
+            return None
+        previous2, previous = previous, current
+    return previous[-1] if previous[-1] <= limit else None
+
+
+def _numbers(tokens: List[str]) -> List[str]:
+    return sorted(token for token in tokens if token.isdigit())
+
+
+def _token_matches(token: str, candidates: List[str]) -> bool:
+    limit = max_typos(token)
+    return any(bounded_edit_distance(token, candidate, limit) is not None for candidate in candidates)
+
+
+def _key_confidence(answer: str, key: str) -> float:
+    if answer == key:
+        return 1.0
+    answer_tokens, key_tokens = answer.split(), key.split()
+    # A wrong year or count is a wrong answer, however close the spelling
+    if _numbers(answer_tokens) != _numbers(key_tokens):
+        return 0.0
+    # So is a wrong initial or letter ("Vitamin B" for "Vitamin A")
+    if len(answer_tokens) == len(key_tokens) and any(
+            max_typos(token) == 0 and token not in answer_tokens for token in key_tokens):
+        return 0.0
+
+    confidence = 0.0
+    distance = bounded_edit_distance(answer, key, max_typos(key))
+    if distance is not None:
+        confidence = 1 - distance / max(len(key), 1)
+        if len(key_tokens) == 1 and (distance > 1 or len(key) < SURE_TYPO_MIN_CHARS):
+            confidence = min(confidence, UNSURE_TYPO_CONFIDENCE)
+
+    key_chars = sum(len(token) for token in key_tokens)
+    answer_chars = sum(len(token) for token in answer_tokens)
+    if len(answer_tokens) > len(key_tokens) and all(_token_matches(token, answer_tokens) for token in key_tokens):
+        # The whole answer, with words around it ("it's the beatles"): the more words
+        # around it the less sure, but always shown to the host
+        confidence = max(confidence, REVIEW_MIN_CONFIDENCE, 0.95 * key_chars / max(answer_chars, key_chars))
+    elif len(answer_tokens) < len(key_tokens) and all(_token_matches(token, key_tokens) for token in answer_tokens):
+        # Part of it - counts if it includes the last word (surname, main title word)
+        coverage = answer_chars / key_chars
+        if _token_matches(key_tokens[-1], answer_tokens):
+            confidence = max(confidence, min(0.85, 0.5 + coverage))
+        else:
+            confidence = max(confidence, 0.6 * coverage)
+    return round(confidence, 2)
+
+
+def match_answer(answer_text: str, answer_keys: List[str]) -> AnswerMatch:
+    """Best match of a team's written answer against a question's answer keys"""
+    answer = normalize_answer(answer_text)
+    if not answer or not answer_keys:
+        return AnswerMatch(False, 0.0)
+    if answer in answer_keys:
+        return AnswerMatch(True, 1.0, answer)
+
+    confidence, matched = max((_key_confidence(answer, key), key) for key in answer_keys)
+    return AnswerMatch(confidence >= ACCEPT_CONFIDENCE, confidence, matched)
@@ -11,7 +11,30 @@ from pydub.effects import normalize
 logger = logging.getLogger(__name__)
 
 
-def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4):
+def fit_to_length(audio, length_ms, crossfade_ms=250):
+    """
+    Trim or loop an audio segment to exactly length_ms
+    
+    Args:
+        audio: AudioSegment (background music)
+        length_ms: Target duration in milliseconds
+        crossfade_ms: Crossfade between repeats when looping, so the seam doesn't click
+    
+    Returns:
+        AudioSegment: length_ms long
+    """
+    if len(audio) == 0:
+        return AudioSegment.silent(duration=length_ms)
+    if len(audio) <= 2 * crossfade_ms:
+        # Too short to crossfade into itself: plain repeats
+        return (audio * (length_ms // len(audio) + 1))[:length_ms]
+    looped = audio
+    while len(looped) < length_ms:
+        looped = looped.append(audio, crossfade=crossfade_ms)
+    return looped[:length_ms]
+
+
+def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4, target_ms=None):
     """
     Mix TTS audio with background music
     
@@ -20,6 +43,8 @@ def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4):
         music_bytes: MP3 bytes of background music
         tts_volume: Volume adjustment for TTS in dB (3 = boosted for clarity)
         music_volume: Volume adjustment for music in dB (-4 = prominent background music)
+        target_ms: Jingle length; the music is trimmed or looped to it (None = keep
+            the music's own length, looping it if it's shorter than the TTS)
     
     Returns:
         bytes: Mixed audio as MP3
@@ -40,6 +65,12 @@ def mix_tts_with_music(tts_bytes, music_bytes, tts_volume=3, music_volume=-4):
         bg_audio = bg_audio + music_volume
         logger.info(f"Volume adjustments applied - TTS: {tts_volume}dB, Music: {music_volume}dB")
         
+        # Music was generated for an estimated length: fit it before fading so the ending fades out
+        if target_ms is not None:
+            target_ms = max(int(target_ms), len(tts_audio))
+            logger.info(f"Fitting music to {target_ms}ms ({'trimming' if len(bg_audio) >= target_ms else 'looping'})")
+            bg_audio = fit_to_length(bg_audio, target_ms)
+        
         # Apply fade in/out to background music
         logger.info("Applying fade effects...")
         bg_audio = bg_audio.fade_in(500).fade_out(500)
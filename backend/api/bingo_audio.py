@@ -0,0 +1,182 @@
+"""
+Music Bingo Announcement Pre-rendering
+Synthesises every line a bingo game can say before the first song is
+called, so calls play instantly and the game survives the pub's connection
+dropping halfway through
+
+The lines of a game are:
+    script  what game.js can say on its own - welcome, halfway and the
+            template announcements (posted by the game when it loads)
+    custom  announcements.json, with [VENUE_NAME] filled in
+    song    the AI trivia line (announcements_ai.json) of each song the
+            game will call
+
+A background task renders them into the TTS cache (tts_cache) with the
+session's voice, BINGO_AUDIO_WORKERS requests in flight and at most
+BINGO_AUDIO_RATE started per second. The game polls the manifest
+(GET /api/bingo/session/<id>/announcement-audio) and downloads each clip
+once it's ready; lines it couldn't preload still go through /api/tts.
+"""
+
+import os
+import json
+import time
+import uuid
+import logging
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.db import connection
+from django.utils import timezone
+
+from .models import TaskStatus
+from .tts_cache import RateLimiter, cache_key, get_cache, render_batch, tts_params
+
+logger = logging.getLogger(__name__)
+
+BINGO_AUDIO_WORKERS = int(os.getenv('BINGO_AUDIO_WORKERS', '4'))
+BINGO_AUDIO_RATE = float(os.getenv('BINGO_AUDIO_RATE', '3'))  # requests started per second
+BINGO_AUDIO_TASK_TYPE = 'bingo_audio'
+
+# Lines a game may post (it's the same text /api/tts would accept one by one)
+MAX_SCRIPT_LINES = 200
+MAX_LINE_CHARS = 1000
+
+DATA_DIR = Path(__file__).resolve().parent.parent / 'data'
+
+
+def _load_json(name: str, default):
+    try:
+        with open(DATA_DIR / name, 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+# ============================================================================
+# Lines
+# ============================================================================
+
+def game_lines(session, script_lines: Iterable[str] = (), song_ids: Iterable = (),
+               announcements: Optional[Dict] = None, ai_announcements: Optional[Dict] = None) -> List[Dict]:
+    """Every line of a game: {text, kind, song_id}, without repeats"""
+    if announcements is None:
+        announcements = _load_json('announcements.json', {})
+    if ai_announcements is None:
+        ai_announcements = _load_json('announcements_ai.json', {})
+
+    lines, seen = [], set()
+
+    def add(text, kind, song_id=None):
+        text = (text or '').strip()
+        if text and text not in seen:
+            seen.add(text)
+            lines.append({'text': text, 'kind': kind, 'song_id': song_id})
+
+    for text in list(script_lines)[:MAX_SCRIPT_LINES]:
+        if isinstance(text, str) and len(text) <= MAX_LINE_CHARS:
+            add(text, 'script')
+    for text in announcements.get('custom_announcements', []):
+        add(text.replace('[VENUE_NAME]', session.venue_name or 'this venue'), 'custom')
+    for song_id in song_ids:
+        # game.js always reads the trivia line of a song's AI announcements
+        add((ai_announcements.get(str(song_id)) or {}).get('trivia'), 'song', str(song_id))
+    return lines
+
+
+def latest_task(session) -> Optional[TaskStatus]:
+    return TaskStatus.objects.filter(
+        task_type=BINGO_AUDIO_TASK_TYPE, metadata__session_id=session.session_id
+    ).order_by('-started_at').first()
+
+
+def _task_inputs(session, task: Optional[TaskStatus]) -> Tuple[str, List[str], List[str]]:
+    """(voice_id, script_lines, song_ids) the game last posted"""
+    metadata = (task.metadata or {}) if task else {}
+    return (metadata.get('voice_id') or session.voice_id, metadata.get('script_lines', []),
+            metadata.get('song_ids', []))
+
+
+def manifest(session) -> Tuple[List[Dict], Optional[TaskStatus]]:
+    """The game's lines with their clip key and URL and whether each is cached yet, and the task rendering them"""
+    task = latest_task(session)
+    voice_id, script_lines, song_ids = _task_inputs(session, task)
+    cache = get_cache()
+    entries = []
+    for line in game_lines(session, script_lines, song_ids):
+        key = cache_key(tts_params(line['text'], voice_id))
+        entries.append({**line, 'voice_id': voice_id, 'key': key, 'url': f'/api/tts/{key}',
+                        'ready': cache.contains(key)})
+    return entries, task
+
+
+# ============================================================================
+# Pre-rendering
+# ============================================================================
+
+def start_prerender(session, voice_id: Optional[str] = None, script_lines: Optional[List[str]] = None,
+                    song_ids: Optional[List] = None, render=None,
+                    rate: float = BINGO_AUDIO_RATE) -> Optional[str]:
+    """
+    Render a game's lines on a background thread (inputs not given are taken
+    from the last time the game posted them)
+
+    Returns:
+        The task id (GET /api/tasks/<id>), or None if ElevenLabs isn't configured
+    """
+    api_key = os.getenv('ELEVENLABS_API_KEY', '')
+    if render is None:
+        if not api_key:
+            return None
+        render = lambda params: get_cache().synthesize(params, api_key)
+
+    previous = latest_task(session)
+    if previous and script_lines is None and song_ids is None and (
+            previous.status in ('pending', 'processing')
+            or (previous.status == 'completed' and not (previous.result or {}).get('failed'))):
+        return previous.task_id  # already rendering (or rendered) what the game asked for
+    last_voice, last_lines, last_songs = _task_inputs(session, previous)
+    metadata = {
+        'session_id': session.session_id,
+        'voice_id': voice_id or last_voice,
+        'script_lines': [str(line) for line in (script_lines if script_lines is not None else last_lines)],
+        'song_ids': [str(song_id) for song_id in (song_ids if song_ids is not None else last_songs)],
+    }
+
+    task_id = str(uuid.uuid4())
+    TaskStatus.objects.create(task_id=task_id, task_type=BINGO_AUDIO_TASK_TYPE, status='pending',
+                              metadata=metadata)
+
+    def report(ready, total):
+        progress = round(100 * ready / total) if total else 100
+        TaskStatus.objects.filter(task_id=task_id).update(progress=progress, current_step=f'{ready}/{total} clips')
+
+    def run():
+        try:
+            started = time.perf_counter()
+            TaskStatus.objects.filter(task_id=task_id).update(status='processing')
+            lines = game_lines(session, metadata['script_lines'], metadata['song_ids'])
+            params = [tts_params(line['text'], metadata['voice_id']) for line in lines]
+            cached = sum(1 for p in params if get_cache().contains(cache_key(p)))
+            failed = render_batch(params, render, workers=BINGO_AUDIO_WORKERS,
+                                  limiter=RateLimiter(rate) if rate else None, on_progress=report)
+            summary = {
+                'clips': len(lines),
+                'rendered': len(lines) - cached - len(failed),
+                'cached': cached,
+                'failed': len(failed),
+                'seconds': round(time.perf_counter() - started, 2),
+            }
+            TaskStatus.objects.filter(task_id=task_id).update(status='completed', progress=100, result=summary,
+                                                              completed_at=timezone.now())
+            logger.info(f"🔊 [BINGO_AUDIO] Session {session.session_id}: {summary}")
+        except Exception as e:
+            logger.error(f"❌ [BINGO_AUDIO] Task {task_id}: {e}", exc_info=True)
+            TaskStatus.objects.filter(task_id=task_id).update(status='failed', error=str(e),
+                                                              completed_at=timezone.now())
+        finally:
+            connection.close()  # this thread's connection
+
+    threading.Thread(target=run, daemon=True).start()
+    return task_id
@@ -0,0 +1,209 @@
+"""
+Bingo Claim Verification
+Checks "4 corners", "first line" and "full house" claims against the printed cards
+
+Each card is held as a 25-bit mask of marked cells (bit = row * 5 + col, the
+FREE centre always set), built from the session's card manifest and
+BingoSession.songs_played. A pattern is a mask too, so checking a card is
+`marked & pattern == pattern` and "one away" is a popcount of the missing
+bits - a handful of integer ops per card, fast enough to re-check every card
+after each song.
+"""
+
+import json
+import logging
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Dict, List, Optional, Iterable
+
+logger = logging.getLogger(__name__)
+
+GRID_SIZE = 5
+FREE_CELL = 12  # centre of the 5x5 grid
+FULL_MASK = (1 << GRID_SIZE * GRID_SIZE) - 1
+
+
+def cells_mask(cells: Iterable[int]) -> int:
+    mask = 0
+    for cell in cells:
+        mask |= 1 << cell
+    return mask
+
+
+ROW_MASKS = [cells_mask(row * GRID_SIZE + col for col in range(GRID_SIZE)) for row in range(GRID_SIZE)]
+COLUMN_MASKS = [cells_mask(row * GRID_SIZE + col for row in range(GRID_SIZE)) for col in range(GRID_SIZE)]
+DIAGONAL_MASKS = [
+    cells_mask(i * GRID_SIZE + i for i in range(GRID_SIZE)),
+    cells_mask(i * GRID_SIZE + (GRID_SIZE - 1 - i) for i in range(GRID_SIZE)),
+]
+
+# Claim type -> masks that satisfy it (any one of them wins)
+PATTERNS: Dict[str, List[int]] = {
+    'four_corners': [cells_mask([0, 4, 20, 24])],
+    'first_line': ROW_MASKS + COLUMN_MASKS + DIAGONAL_MASKS,
+    'full_house': [FULL_MASK],
+}
+
+# Where each pattern's prize lives in BingoSession.prizes (sessions page / card generator keys)
+PRIZE_KEYS = {
+    'four_corners': ('four_corners', 'prize_4corners'),
+    'first_line': ('first_line', 'prize_first_line'),
+    'full_house': ('full_house', 'prize_full_house'),
+}
+
+
+def card_cells(card: List[int]) -> List[Optional[int]]:
+    """Manifest card (24 pool indices) -> 25 grid cells in row-major order, FREE = None"""
+    return card[:FREE_CELL] + [None] + card[FREE_CELL:]
+
+
+def missing_bits(marked: int, pattern: int) -> int:
+    return (pattern & ~marked).bit_count()
+
+
+class ClaimBoard:
+    """Marked-cell bitsets for every card of one printed card set"""
+
+    def __init__(self, manifest: Dict, pool_ids: List[str]):
+        self.manifest = manifest
+        self.num_cards = len(manifest['cards'])
+        self.masks = [1 << FREE_CELL] * self.num_cards
+        self.played: List[str] = []
+
+        # song id -> [(card index, bit), ...] so marking a song only touches its cards
+        self.song_bits: Dict[str, List[tuple]] = {}
+        for card_idx, card in enumerate(manifest['cards']):
+            for cell, pool_idx in enumerate(card_cells(card)):
+                if pool_idx is not None:
+                    self.song_bits.setdefault(pool_ids[pool_idx], []).append((card_idx, 1 << cell))
+
+    def sync(self, songs_played: List[str]):
+        """Bring the marks up to date with BingoSession.songs_played (append-only in play)"""
+        songs_played = [str(song_id) for song_id in songs_played]
+        if songs_played[:len(self.played)] != self.played:
+            # Game was reset / history rewritten - start over
+            self.masks = [1 << FREE_CELL] * self.num_cards
+            self.played = []
+        for song_id in songs_played[len(self.played):]:
+            for card_idx, bit in self.song_bits.get(song_id, ()):
+                self.masks[card_idx] |= bit
+            self.played.append(song_id)
+
+    def verify(self, card_number: int, pattern: str) -> Dict:
+        """
+        Check one claim
+
+        Returns:
+            {'valid', 'card_number', 'pattern', 'winning_cells', 'missing_cells'}
+            where cells are grid positions (row * 5 + col) of the best matching mask
+        """
+        if pattern not in PATTERNS:
+            raise ValueError(f"Unknown pattern '{pattern}', expected one of {list(PATTERNS)}")
+        if not 1 <= card_number <= self.num_cards:
+            raise ValueError(f"Card #{card_number} is not part of this game (1-{self.num_cards})")
+
+        marked = self.masks[card_number - 1]
+        best = min(PATTERNS[pattern], key=lambda mask: missing_bits(marked, mask))
+        cells = [cell for cell in range(GRID_SIZE * GRID_SIZE) if best >> cell & 1]
+        return {
+            'valid': marked & best == best,
+            'card_number': card_number,
+            'pattern': pattern,
+            'winning_cells': cells if marked & best == best else [],
+            'missing_cells': [cell for cell in cells if not marked >> cell & 1],
+        }
+
+    def cell_song(self, card_number: int, cell: int) -> Optional[int]:
+        """Pool index printed in a grid cell (None for FREE)"""
+        return card_cells(self.manifest['cards'][card_number - 1])[cell]
+
+    def stats(self) -> Dict:
+        """Winners and "one away" counts for every pattern, across all cards"""
+        stats = {}
+        for pattern, masks in PATTERNS.items():
+            winners = []
+            one_away = 0
+            for card_idx, marked in enumerate(self.masks):
+                fewest = min(missing_bits(marked, mask) for mask in masks)
+                if fewest == 0:
+                    winners.append(card_idx + 1)
+                elif fewest == 1:
+                    one_away += 1
+            stats[pattern] = {'winners': winners, 'one_away': one_away}
+        return {'called': len(self.played), 'num_cards': self.num_cards, 'patterns': stats}
+
+
+# ============================================================================
+# Per-process board cache (boards are rebuilt only when the cards change)
+# ============================================================================
+
+MAX_CACHED_BOARDS = 32
+
+_boards: 'OrderedDict[tuple, ClaimBoard]' = OrderedDict()
+_boards_lock = threading.Lock()
+_pools: Dict[str, tuple] = {}
+
+
+def load_pool(pool_path: Path) -> Dict:
+    """pool.json, cached until the file changes"""
+    mtime = pool_path.stat().st_mtime
+    cached = _pools.get(str(pool_path))
+    if cached and cached[0] == mtime:
+        return cached[1]
+    with open(pool_path, 'r', encoding='utf-8') as f:
+        pool_data = json.load(f)
+    _pools[str(pool_path)] = (mtime, pool_data)
+    return pool_data
+
+
+def load_pool_songs(pool_path: Path) -> List[Dict]:
+    """pool.json songs, cached until the file changes"""
+    return load_pool(pool_path).get('songs', [])
+
+
+def pool_matches(manifest: Dict, pool_data: Dict) -> bool:
+    """Whether the cards of a manifest were printed from this pool (same version, same size)"""
+    return (pool_data.get('generated_at') == manifest.get('pool_version')
+            and len(pool_data.get('songs', [])) == manifest.get('pool_size'))
+
+
+def board_for_session(session, pool_path: Path) -> Optional[ClaimBoard]:
+    """
+    Claim board of a BingoSession, synced with its songs_played
+
+    Returns:
+        ClaimBoard, or None if no cards were generated for the session
+
+    Raises:
+        ValueError: the song pool changed since the cards were generated
+    """
+    manifest = session.card_manifest
+    if not manifest:
+        return None
+
+    pool_data = load_pool(pool_path)
+    if not pool_matches(manifest, pool_data):
+        raise ValueError('Song pool changed since the cards were generated')
+
+    key = (session.session_id, session.card_seed, len(manifest['cards']), hash(tuple(manifest['songs'])))
+    with _boards_lock:
+        board = _boards.get(key)
+        if board is None:
+            board = ClaimBoard(manifest, [str(song.get('id')) for song in pool_data.get('songs', [])])
+            _boards[key] = board
+            while len(_boards) > MAX_CACHED_BOARDS:
+                _boards.popitem(last=False)
+        else:
+            _boards.move_to_end(key)
+        board.sync(session.songs_played or [])
+        return board
+
+
+def prize_for(prizes: Optional[Dict], pattern: str) -> Optional[str]:
+    """Prize text for a pattern, whichever key style the session used"""
+    prizes = prizes or {}
+    for key in PRIZE_KEYS[pattern]:
+        if prizes.get(key):
+            return prizes[key]
+    return None
@@ -0,0 +1,180 @@
+"""
+Card Set Cache
+Content-addressed cache of generated card PDFs
+
+Venues regenerate the same cards all the time (page reloads, reprints, last
+week's branding). Every input that ends up on the cards - seed, venue, logo
+bytes, QR target, prizes, game number and date - is hashed into a key; a
+repeat request with the same key gets the existing GCS/local PDF back
+immediately instead of a new render + upload.
+
+The card-set seed is derived from the same inputs unless the client passes
+one, so a reprint always produces exactly the same cards.
+"""
+
+import os
+import json
+import base64
+import hashlib
+import logging
+from datetime import timedelta
+from pathlib import Path
+from typing import Optional, Dict, Any
+from urllib.parse import urlparse
+
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# GCS objects are deleted by the bucket lifecycle policy after 7 days, so
+# entries must expire before that
+CARD_CACHE_TTL_HOURS = min(float(os.getenv('CARD_CACHE_TTL_HOURS', '144')), 7 * 24 - 1)
+CARD_CACHE_MAX_ENTRIES = int(os.getenv('CARD_CACHE_MAX_ENTRIES', '500'))
+CARD_CACHE_ENABLED = os.getenv('CARD_CACHE_ENABLED', 'true').lower() == 'true'
+
+# Bump when a change to generate_cards.py alters the PDF for the same inputs
+CARD_LAYOUT_VERSION = 2
+
+LOGO_FETCH_TIMEOUT = 10
+
+
+def logo_digest(pub_logo: Optional[str], base_dir: Optional[Path] = None,
+                own_host: Optional[str] = None) -> str:
+    """
+    sha256 of the logo image bytes (not of its URL)
+
+    Handles data URIs, /data/ paths and http(s) URLs. Uploaded logos served by
+    this backend (http://<own_host>/data/...) are read from disk rather than
+    fetched over HTTP. If the bytes can't be read the reference itself is
+    hashed, which only costs a cache miss.
+    """
+    if not pub_logo:
+        return ''
+    try:
+        url = urlparse(pub_logo)
+        if own_host and url.netloc == own_host and url.path.startswith('/data/'):
+            pub_logo_path = url.path
+        else:
+            pub_logo_path = pub_logo
+
+        if pub_logo.startswith('data:'):
+            content = base64.b64decode(pub_logo.split(',', 1)[1])
+        elif pub_logo_path.startswith('/data/') and base_dir is not None:
+            content = (base_dir / pub_logo_path[1:]).read_bytes()
+        elif pub_logo.startswith('http'):
+            from .http_client import get_client
+            response = get_client().get(pub_logo, timeout=LOGO_FETCH_TIMEOUT)
+            response.raise_for_status()
+            content = response.content
+        else:
+            content = Path(pub_logo).read_bytes()
+    except Exception as e:
+        logger.warning(f"⚠️ Could not read logo for cache key ({e}), hashing its reference")
+        content = pub_logo.encode('utf-8')
+    return hashlib.sha256(content).hexdigest()
+
+
+def card_set_inputs(options: Dict[str, Any], logo_sha256: str) -> Dict[str, Any]:
+    """Everything that changes the rendered PDF, in canonical form"""
+    return {
+        'layout_version': CARD_LAYOUT_VERSION,
+        'venue_name': options.get('venue_name') or '',
+        'num_players': int(options.get('num_players') or 0),
+        'num_cards': int(options.get('num_cards') or 0),
+        'logo_sha256': logo_sha256,
+        'social_media': options.get('social_media') or '',
+        'include_qr': bool(options.get('include_qr')),
+        'game_number': int(options.get('game_number') or 1),
+        'game_date': options.get('game_date') or '',
+        'prize_4corners': options.get('prize_4corners') or '',
+        'prize_first_line': options.get('prize_first_line') or '',
+        'prize_full_house': options.get('prize_full_house') or '',
+        'render_engine': options.get('render_engine') or '',
+        'game_length': options.get('game_length') or {},
+    }
+
+
+def _digest(data: Dict[str, Any]) -> str:
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def default_seed(inputs: Dict[str, Any]) -> int:
+    """Deterministic card-set seed for a set of inputs (32 bits)"""
+    return int(_digest(inputs)[:8], 16)
+
+
+def cache_key(inputs: Dict[str, Any], seed: int) -> str:
+    """Content address of a card set"""
+    return _digest({**inputs, 'seed': int(seed)})
+
+
+def lookup(key: str):
+    """
+    Get a usable cache entry and mark it as recently used
+
+    Returns:
+        CardSetCache or None (expired entries and missing local files are dropped)
+    """
+    from .models import CardSetCache
+
+    entry = CardSetCache.objects.filter(cache_key=key).first()
+    if entry is None:
+        return None
+
+    expired = entry.created_at < timezone.now() - timedelta(hours=CARD_CACHE_TTL_HOURS)
+    missing = bool(entry.local_path) and not Path(entry.local_path).exists()
+    if expired or missing:
+        logger.info(f"🗑️ Card cache entry {key[:12]} dropped ({'expired' if expired else 'file missing'})")
+        entry.delete()
+        return None
+
+    CardSetCache.objects.filter(cache_key=key).update(
+        last_used_at=timezone.now(),
+        hit_count=F('hit_count') + 1
+    )
+    return entry
+
+
+def store(key: str, seed: int, task_id: str, result: Dict[str, Any], local_path: str = '',
+          manifest: Optional[Dict[str, Any]] = None):
+    """Remember a finished card set, then evict expired / least recently used entries"""
+    from .models import CardSetCache
+
+    CardSetCache.objects.update_or_create(
+        cache_key=key,
+        defaults={
+            'seed': seed,
+            'task_id': task_id,
+            'download_url': result['download_url'],
+            'local_path': local_path,
+            'num_cards': result['num_cards'],
+            'manifest': manifest,
+            'file_size_mb': result.get('file_size_mb'),
+            'generation_time': result.get('generation_time'),
+            'created_at': timezone.now(),
+            'last_used_at': timezone.now(),
+        }
+    )
+    evict()
+
+
+def evict() -> int:
+    """Apply the TTL and the CARD_CACHE_MAX_ENTRIES LRU bound; returns entries removed"""
+    from .models import CardSetCache
+
+    with transaction.atomic():
+        cutoff = timezone.now() - timedelta(hours=CARD_CACHE_TTL_HOURS)
+        removed, _ = CardSetCache.objects.filter(created_at__lt=cutoff).delete()
+
+        stale_keys = list(
+            CardSetCache.objects.order_by('-last_used_at')
+            .values_list('cache_key', flat=True)[CARD_CACHE_MAX_ENTRIES:]
+        )
+        if stale_keys:
+            removed += CardSetCache.objects.filter(cache_key__in=stale_keys).delete()[0]
+
+    if removed:
+        logger.info(f"🗑️ Evicted {removed} card cache entries")
+    return removed
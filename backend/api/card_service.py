@@ -0,0 +1,363 @@
+"""
+Card Generation Service
+Long-lived pool of pre-warmed worker processes that run generate_cards() in-process
+
+Replaces spawning `python3 generate_cards.py` per request: the workers are forked
+from a forkserver that has already imported ReportLab/pypdf/qrcode, so a job only
+pays for rendering. Progress comes back as structured dict events instead of
+scraped stdout lines.
+"""
+
+import os
+import sys
+import time
+import atexit
+import logging
+import threading
+import multiprocessing as mp
+from concurrent.futures import ProcessPoolExecutor, Future
+from concurrent.futures.process import BrokenProcessPool
+from pathlib import Path
+from typing import Optional, Callable, Dict, Any
+
+logger = logging.getLogger(__name__)
+
+# generate_cards.py lives next to manage.py (/app in Docker)
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+# Number of concurrent card jobs per Django worker (each job renders sequentially).
+# Unset: sized from the CPUs and the memory available when the pool starts
+CARD_WORKERS = int(os.getenv('CARD_WORKERS', '0')) or None
+
+# Modules the forkserver imports once so every forked worker starts warm
+PRELOAD_MODULES = ['generate_cards']
+
+# Admission control - jobs wait ("queued") until there is room for them
+CARD_MAX_CONCURRENT_JOBS = int(os.getenv('CARD_MAX_CONCURRENT_JOBS', '0')) or None  # default: workers
+CARD_JOB_MEMORY_MB = float(os.getenv('CARD_JOB_MEMORY_MB', '150'))  # initial per-job estimate
+CARD_MEMORY_RESERVE_MB = float(os.getenv('CARD_MEMORY_RESERVE_MB', '150'))  # always left free
+CARD_ADMISSION_TIMEOUT = float(os.getenv('CARD_ADMISSION_TIMEOUT', '300'))
+
+# Per-job output directories older than this are swept
+CARD_OUTPUT_TTL_HOURS = float(os.getenv('CARD_OUTPUT_TTL_HOURS', '24'))
+
+
+class CardServiceBusy(Exception):
+    """Raised when a job could not be admitted within CARD_ADMISSION_TIMEOUT"""
+
+
+def available_memory_mb() -> float:
+    """
+    Memory still available to this container, in MB
+
+    psutil reports the host's memory inside Docker/Cloud Run, so the cgroup
+    limit (v2, then v1) is taken into account when there is one.
+    """
+    import psutil
+
+    available = psutil.virtual_memory().available / 1024 / 1024
+
+    for limit_path, usage_path in (
+        ('/sys/fs/cgroup/memory.max', '/sys/fs/cgroup/memory.current'),
+        ('/sys/fs/cgroup/memory/memory.limit_in_bytes', '/sys/fs/cgroup/memory/memory.usage_in_bytes'),
+    ):
+        try:
+            limit = Path(limit_path).read_text().strip()
+            usage = Path(usage_path).read_text().strip()
+        except OSError:
+            continue
+        if limit.isdigit() and int(limit) < (1 << 60):
+            available = min(available, (int(limit) - int(usage)) / 1024 / 1024)
+        break
+
+    return available
+
+
+def default_worker_count() -> int:
+    """One worker per CPU, as long as the free memory holds a job for each"""
+    by_memory = int((available_memory_mb() - CARD_MEMORY_RESERVE_MB) // CARD_JOB_MEMORY_MB)
+    return max(1, min(os.cpu_count() or 1, by_memory))
+
+
+# ============================================================================
+# WORKER SIDE (runs inside the pool processes)
+# ============================================================================
+
+_worker_events = None
+
+
+def _init_worker(events_queue):
+    """Pool initializer: keep the event queue and warm ReportLab caches"""
+    global _worker_events
+    _worker_events = events_queue
+
+    if str(BACKEND_DIR) not in sys.path:
+        sys.path.insert(0, str(BACKEND_DIR))
+
+    import generate_cards
+    from reportlab.lib.styles import getSampleStyleSheet
+    from reportlab.pdfbase.pdfmetrics import stringWidth
+
+    # Touch the font metrics and stylesheet so the first card doesn't pay for it
+    getSampleStyleSheet()
+    stringWidth('MUSIC BINGO', 'Helvetica-Bold', 18)
+    stringWidth('FREE', 'Helvetica', 8)
+
+
+def _ping() -> int:
+    """No-op task used to force the pool to fork its workers"""
+    return os.getpid()
+
+
+def _run_job(job_id: str, options: Dict[str, Any]) -> Dict[str, Any]:
+    """Run one card generation job inside a pool worker"""
+    import generate_cards
+
+    def progress_callback(event):
+        if _worker_events is not None:
+            _worker_events.put((job_id, event))
+
+    generate_cards.cleanup_stale_outputs(CARD_OUTPUT_TTL_HOURS)
+
+    options = dict(options)
+    # Each job writes to data/cards/<job_id>/ so concurrent jobs never collide
+    options.setdefault('output_file', str(generate_cards.job_output_file(job_id)))
+
+    try:
+        return generate_cards.generate_cards(progress_callback=progress_callback, **options)
+    finally:
+        # End marker: the result travels on another pipe and can overtake the
+        # last progress events, so the caller waits for this before returning
+        if _worker_events is not None:
+            _worker_events.put((job_id, None))
+
+
+# ============================================================================
+# DJANGO SIDE
+# ============================================================================
+
+class CardGenerationService:
+    """Pre-forked process pool for card generation jobs"""
+
+    def __init__(self, max_workers: Optional[int] = CARD_WORKERS,
+                 max_concurrent_jobs: Optional[int] = CARD_MAX_CONCURRENT_JOBS):
+        self.max_workers = max(1, max_workers or default_worker_count())
+        self.max_concurrent_jobs = max(1, max_concurrent_jobs or self.max_workers)
+        self.job_memory_mb = CARD_JOB_MEMORY_MB
+        self._admission = threading.Condition()
+        self._running = 0
+        self._lock = threading.Lock()
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._events = None
+        self._listener: Optional[threading.Thread] = None
+        self._callbacks: Dict[str, Callable[[Dict], None]] = {}
+        self._drained: Dict[str, threading.Event] = {}
+
+    def _get_context(self):
+        """forkserver keeps workers clean of Django threads/sockets and preloads imports"""
+        if 'forkserver' in mp.get_all_start_methods():
+            ctx = mp.get_context('forkserver')
+            ctx.set_forkserver_preload(PRELOAD_MODULES)
+            return ctx
+        return mp.get_context('spawn')
+
+    def _ensure_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self._executor is None:
+                ctx = self._get_context()
+                self._events = ctx.Queue()
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=ctx,
+                    initializer=_init_worker,
+                    initargs=(self._events,)
+                )
+                self._listener = threading.Thread(
+                    target=self._listen, args=(self._events,),
+                    name='card-progress-listener', daemon=True
+                )
+                self._listener.start()
+                logger.info(f"🏭 Card generation pool started ({self.max_workers} workers, "
+                            f"{ctx.get_start_method()})")
+            return self._executor
+
+    def _listen(self, events_queue):
+        """Dispatch progress events from the workers to the registered callbacks"""
+        while True:
+            try:
+                item = events_queue.get()
+            except (EOFError, OSError):
+                return
+            if item is None:
+                return
+            job_id, event = item
+            if event is None:
+                self._finish(job_id)
+                continue
+            callback = self._callbacks.get(job_id)
+            if callback is None:
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.warning(f"Card job {job_id}: progress callback failed: {e}")
+
+    def _finish(self, job_id: str):
+        """All events of a job delivered (or the job is gone): drop its callback"""
+        self._callbacks.pop(job_id, None)
+        drained = self._drained.pop(job_id, None)
+        if drained is not None:
+            drained.set()
+
+    def warm(self):
+        """Fork and initialize every worker now instead of on the first job"""
+        executor = self._ensure_executor()
+        futures = [executor.submit(_ping) for _ in range(self.max_workers)]
+        pids = {f.result() for f in futures}
+        logger.info(f"🔥 Card generation pool warm ({len(pids)} worker processes)")
+
+    def submit(self, job_id: str, options: Dict[str, Any],
+               progress_callback: Optional[Callable[[Dict], None]] = None) -> Future:
+        """
+        Queue a generate_cards() job
+
+        Args:
+            job_id: Unique id (the TaskStatus task_id)
+            options: Keyword arguments for generate_cards()
+            progress_callback: Called from the listener thread with
+                               {'progress', 'stage', 'memory_mb'} dicts
+
+        Returns:
+            Future resolving to the generate_cards() result dict; its
+            `drained` Event is set once every progress event was delivered
+        """
+        executor = self._ensure_executor()
+        if progress_callback is not None:
+            self._callbacks[job_id] = progress_callback
+        drained = self._drained[job_id] = threading.Event()
+
+        try:
+            future = executor.submit(_run_job, job_id, options)
+        except BrokenProcessPool:
+            self.shutdown(executor)
+            executor = self._ensure_executor()
+            future = executor.submit(_run_job, job_id, options)
+
+        def done(f):
+            if f.cancelled() or isinstance(f.exception(), BrokenProcessPool):
+                # No end marker will ever come for this job
+                self._finish(job_id)
+            if not f.cancelled() and isinstance(f.exception(), BrokenProcessPool):
+                logger.error(f"Card job {job_id}: worker died, restarting pool")
+                self.shutdown(executor)
+
+        future.drained = drained
+        future.add_done_callback(done)
+        return future
+
+    def _has_room(self) -> bool:
+        if self._running == 0:
+            return True  # never starve: a lone job always runs
+        if self._running >= self.max_concurrent_jobs:
+            return False
+        # Running jobs may not have reached their peak yet - keep half an estimate for each
+        needed = CARD_MEMORY_RESERVE_MB + self.job_memory_mb * (1 + 0.5 * self._running)
+        return available_memory_mb() >= needed
+
+    def admit(self, job_id: str, on_queued: Optional[Callable[[], None]] = None,
+              timeout: float = CARD_ADMISSION_TIMEOUT):
+        """
+        Block until the job may start (concurrency + memory headroom)
+
+        Args:
+            on_queued: Called once if the job has to wait
+            timeout: Seconds to wait before raising CardServiceBusy
+        """
+        deadline = time.monotonic() + timeout
+        notified = False
+        with self._admission:
+            while not self._has_room():
+                if not notified:
+                    notified = True
+                    logger.info(f"Card job {job_id}: queued ({self._running} running, "
+                                f"~{self.job_memory_mb:.0f} MB per job)")
+                    if on_queued:
+                        on_queued()
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise CardServiceBusy('Card generation is busy, please try again in a few minutes')
+                # Memory frees up without a notify (other processes), so re-check periodically
+                self._admission.wait(timeout=min(remaining, 1.0))
+            self._running += 1
+
+    def release(self, result: Optional[Dict[str, Any]] = None):
+        """Free a slot and refine the per-job memory estimate from the finished job"""
+        with self._admission:
+            self._running = max(0, self._running - 1)
+            if result and 'peak_memory_mb' in result:
+                used = max(result['peak_memory_mb'] - result.get('start_memory_mb', 0), 0)
+                self.job_memory_mb = max(50.0, 0.7 * self.job_memory_mb + 0.3 * used * 1.2)
+            self._admission.notify_all()
+
+    def generate(self, job_id: str, options: Dict[str, Any],
+                 progress_callback: Optional[Callable[[Dict], None]] = None,
+                 on_queued: Optional[Callable[[], None]] = None,
+                 timeout: Optional[float] = None) -> Dict[str, Any]:
+        """Blocking helper: wait for admission, run the job and return its result"""
+        self.admit(job_id, on_queued=on_queued)
+        result = None
+        try:
+            future = self.submit(job_id, options, progress_callback)
+            result = future.result(timeout=timeout)
+            future.drained.wait(timeout=5)
+            return result
+        finally:
+            self.release(result)
+
+    def shutdown(self, only: Optional[ProcessPoolExecutor] = None):
+        """
+        Stop the pool; a broken pool is dropped so the next job gets a fresh one
+
+        Args:
+            only: Only stop if this is still the current executor
+        """
+        with self._lock:
+            if only is not None and only is not self._executor:
+                return
+            executor, events = self._executor, self._events
+            self._executor = None
+            self._events = None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
+        if events is not None:
+            events.put(None)
+
+
+_service: Optional[CardGenerationService] = None
+_service_lock = threading.Lock()
+
+
+def get_card_service() -> CardGenerationService:
+    """
+    Get the process-wide card generation service
+
+    Created lazily so it never starts inside the gunicorn master (--preload);
+    each gunicorn worker owns its own pool.
+    """
+    global _service
+    with _service_lock:
+        if _service is None:
+            _service = CardGenerationService()
+            atexit.register(_service.shutdown)
+        return _service
+
+
+def prewarm_in_background():
+    """Warm the pool from a daemon thread (called after gunicorn forks a worker)"""
+    def warm():
+        try:
+            get_card_service().warm()
+        except Exception as e:
+            logger.warning(f"⚠️ Card generation pool prewarm failed: {e}")
+
+    threading.Thread(target=warm, name='card-pool-prewarm', daemon=True).start()
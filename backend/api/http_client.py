@@ -0,0 +1,310 @@
+"""
+Outbound HTTP Client
+One pooled, keep-alive client for every upstream API (ElevenLabs, Karafun,
+iTunes, logo downloads), so calls stop paying TCP + TLS setup each time
+
+Per upstream host it keeps:
+    connections   up to HTTP_POOL_SIZE kept-alive connections (requests.Session)
+    concurrency   at most HTTP_HOST_CONCURRENCY requests in flight; the rest wait
+    retries       HTTP_RETRIES more attempts on connection errors and 429/502/503/504,
+                  with jittered exponential backoff (Retry-After is honoured).
+                  A POST is only retried on errors from before it was sent
+                  (connect timeout, connection refused); one that timed out or
+                  lost its connection later may have been processed (and billed)
+    circuit       after HTTP_CIRCUIT_FAILURES failures in a row (connection errors,
+                  5xx) calls fail fast with CircuitOpenError for
+                  HTTP_CIRCUIT_RESET_SECONDS, then one trial request decides
+    latency       a histogram of response times (to headers), see stats()
+
+Errors are the usual requests exceptions (CircuitOpenError is a
+requests.ConnectionError), and responses are returned whatever their status,
+so callers keep their own error handling. Nothing here needs Django: scripts
+(generate_cards.py, add_songs_to_pool.py) use it too.
+"""
+
+import os
+import time
+import random
+import logging
+import threading
+from bisect import bisect_left
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.exceptions import NewConnectionError
+
+logger = logging.getLogger(__name__)
+
+HTTP_POOL_SIZE = int(os.getenv('HTTP_POOL_SIZE', '10'))
+HTTP_HOST_CONCURRENCY = int(os.getenv('HTTP_HOST_CONCURRENCY', '8'))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+HTTP_RETRIES = int(os.getenv('HTTP_RETRIES', '2'))
+HTTP_BACKOFF_SECONDS = float(os.getenv('HTTP_BACKOFF_SECONDS', '0.3'))
+HTTP_BACKOFF_CAP_SECONDS = 5.0
+HTTP_CIRCUIT_FAILURES = int(os.getenv('HTTP_CIRCUIT_FAILURES', '5'))
+HTTP_CIRCUIT_RESET_SECONDS = float(os.getenv('HTTP_CIRCUIT_RESET_SECONDS', '30'))
+
+RETRY_STATUSES = (429, 502, 503, 504)
+IDEMPOTENT_METHODS = ('GET', 'HEAD', 'OPTIONS', 'PUT', 'DELETE')
+
+# Upper bounds (ms) of the latency histogram buckets; the last one catches the rest
+LATENCY_BUCKETS_MS = (25, 50, 100, 250, 500, 1000, 2500, 5000, 10000, 30000, float('inf'))
+
+
+class CircuitOpenError(requests.exceptions.ConnectionError):
+    """An upstream failed too often recently; not calling it for a while"""
+
+
+def _nothing_sent(error: requests.RequestException) -> bool:
+    """
+    Whether the request failed before reaching the server (safe to repeat any method)
+
+    A ConnectionError is also raised for "Connection aborted" after the body
+    went out, so only a connect timeout or a failure to open the connection
+    (refused, DNS) counts.
+    """
+    if isinstance(error, requests.exceptions.ConnectTimeout):
+        return True
+    if not isinstance(error, requests.exceptions.ConnectionError) or isinstance(error, CircuitOpenError):
+        return False
+    cause = error.args[0] if error.args else None
+    return isinstance(getattr(cause, 'reason', cause), NewConnectionError)
+
+
+# ============================================================================
+# Per-host state
+# ============================================================================
+
+class CircuitBreaker:
+    """closed -> (N failures in a row) -> open -> (reset time) -> half-open -> closed or open"""
+
+    def __init__(self, failure_threshold: int = HTTP_CIRCUIT_FAILURES,
+                 reset_seconds: float = HTTP_CIRCUIT_RESET_SECONDS):
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self.trial_running = False
+        self.trial_thread: Optional[int] = None
+        self.lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return 'closed'
+        if time.monotonic() - self.opened_at >= self.reset_seconds:
+            return 'half-open'
+        return 'open'
+
+    def allow(self) -> bool:
+        with self.lock:
+            state = self.state
+            if state == 'closed':
+                return True
+            if state == 'half-open' and not self.trial_running:
+                self.trial_running = True  # one request finds out if it's back
+                self.trial_thread = threading.get_ident()
+                return True
+            return False
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def release_trial(self):
+        """End this thread's trial request whatever happened to it (no-op otherwise)"""
+        with self.lock:
+            if self.trial_running and self.trial_thread == threading.get_ident():
+                self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                self.opened_at = time.monotonic()
+            self.trial_running = False
+
+
+class LatencyHistogram:
+    """Response times of one upstream, bucketed"""
+
+    def __init__(self):
+        self.counts = [0] * len(LATENCY_BUCKETS_MS)
+        self.total_ms = 0.0
+        self.errors = 0
+        self.lock = threading.Lock()
+
+    def observe(self, seconds: float, error: bool = False):
+        ms = seconds * 1000
+        with self.lock:
+            self.counts[bisect_left(LATENCY_BUCKETS_MS, ms)] += 1
+            self.total_ms += ms
+            if error:
+                self.errors += 1
+
+    def percentile(self, fraction: float) -> Optional[float]:
+        """Upper bound (ms) of the bucket holding the given fraction of requests"""
+        count = sum(self.counts)
+        if not count:
+            return None
+        seen = 0
+        for bound, bucket in zip(LATENCY_BUCKETS_MS, self.counts):
+            seen += bucket
+            if seen >= fraction * count:
+                return bound
+        return LATENCY_BUCKETS_MS[-1]
+
+    def snapshot(self) -> Dict:
+        with self.lock:
+            count = sum(self.counts)
+            return {
+                'count': count,
+                'errors': self.errors,
+                'mean_ms': round(self.total_ms / count, 1) if count else None,
+                'p50_ms': self.percentile(0.5),
+                'p95_ms': self.percentile(0.95),
+                'buckets': {('inf' if bound == float('inf') else f'le_{bound}'): n
+                            for bound, n in zip(LATENCY_BUCKETS_MS, self.counts)},
+            }
+
+
+class HostState:
+    def __init__(self, concurrency: int, breaker: CircuitBreaker):
+        self.slots = threading.BoundedSemaphore(concurrency)
+        self.breaker = breaker
+        self.latency = LatencyHistogram()
+
+
+# ============================================================================
+# Client
+# ============================================================================
+
+class HTTPClient:
+    """requests.Session with per-host limits, retries, circuit breaking and latency stats"""
+
+    def __init__(self, pool_size: int = HTTP_POOL_SIZE, host_concurrency: int = HTTP_HOST_CONCURRENCY,
+                 timeout=(HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), retries: int = HTTP_RETRIES,
+                 backoff: float = HTTP_BACKOFF_SECONDS, failure_threshold: int = HTTP_CIRCUIT_FAILURES,
+                 reset_seconds: float = HTTP_CIRCUIT_RESET_SECONDS):
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff = backoff
+        self.host_concurrency = host_concurrency
+        self.failure_threshold = failure_threshold
+        self.reset_seconds = reset_seconds
+        self.hosts: Dict[str, HostState] = {}
+        self.lock = threading.Lock()
+
+        self.session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=32, pool_maxsize=pool_size, max_retries=0)
+        self.session.mount('http://', adapter)
+        self.session.mount('https://', adapter)
+
+    def host(self, url: str) -> HostState:
+        netloc = urlparse(url).netloc
+        with self.lock:
+            if netloc not in self.hosts:
+                self.hosts[netloc] = HostState(self.host_concurrency,
+                                               CircuitBreaker(self.failure_threshold, self.reset_seconds))
+            return self.hosts[netloc]
+
+    def _delay(self, attempt: int, response: Optional[requests.Response] = None) -> float:
+        retry_after = response.headers.get('Retry-After') if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(float(retry_after), HTTP_BACKOFF_CAP_SECONDS)
+        # "Full jitter": spreads out retries from callers that failed together
+        return random.uniform(0, min(HTTP_BACKOFF_CAP_SECONDS, self.backoff * 2 ** attempt))
+
+    def request(self, method: str, url: str, retries: Optional[int] = None, **kwargs) -> requests.Response:
+        """
+        Like requests.request, through the pool (default timeout: HTTP_CONNECT_TIMEOUT / HTTP_READ_TIMEOUT)
+
+        Raises:
+            CircuitOpenError: the host is failing, not tried
+            requests.RequestException: the last attempt's error
+        """
+        method = method.upper()
+        kwargs.setdefault('timeout', self.timeout)
+        retries = self.retries if retries is None else retries
+        state = self.host(url)
+
+        for attempt in range(retries + 1):
+            if not state.breaker.allow():
+                raise CircuitOpenError(f'{urlparse(url).netloc} is failing, not calling it for now')
+
+            started = time.perf_counter()
+            try:
+                with state.slots:
+                    response = self.session.request(method, url, **kwargs)
+            except requests.exceptions.RequestException as e:
+                state.latency.observe(time.perf_counter() - started, error=True)
+                state.breaker.record_failure()
+                retryable = _nothing_sent(e) or (method in IDEMPOTENT_METHODS and isinstance(
+                    e, (requests.exceptions.ConnectionError, requests.exceptions.Timeout)))
+                if not retryable or attempt == retries:
+                    raise
+                delay = self._delay(attempt)
+                logger.warning(f"⚠️ [HTTP] {method} {url} failed ({type(e).__name__}), retry in {delay:.2f}s")
+            else:
+                state.latency.observe(time.perf_counter() - started, error=response.status_code >= 500)
+                if response.status_code >= 500:
+                    state.breaker.record_failure()
+                else:
+                    state.breaker.record_success()
+                if response.status_code not in RETRY_STATUSES or attempt == retries:
+                    return response
+                delay = self._delay(attempt, response)
+                logger.warning(f"⚠️ [HTTP] {method} {url} returned {response.status_code}, retry in {delay:.2f}s")
+                response.close()
+            finally:
+                # A half-open trial that died of anything else mustn't leave the circuit stuck
+                state.breaker.release_trial()
+            time.sleep(delay)
+
+    def get(self, url: str, **kwargs) -> requests.Response:
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url: str, **kwargs) -> requests.Response:
+        return self.request('POST', url, **kwargs)
+
+    def stats(self) -> Dict[str, Dict]:
+        """Latency histogram and circuit state of every upstream called so far"""
+        with self.lock:
+            hosts = dict(self.hosts)
+        return {netloc: {**state.latency.snapshot(), 'circuit': state.breaker.state}
+                for netloc, state in hosts.items()}
+
+
+_client: Optional[HTTPClient] = None
+_client_pid: Optional[int] = None
+_client_lock = threading.Lock()
+
+
+def get_client() -> HTTPClient:
+    """The process's shared client (a forked worker gets its own: sockets can't be shared)"""
+    global _client, _client_pid
+    with _client_lock:
+        if _client is None or _client_pid != os.getpid():
+            _client, _client_pid = HTTPClient(), os.getpid()
+        return _client
+
+
+def request(method: str, url: str, **kwargs) -> requests.Response:
+    return get_client().request(method, url, **kwargs)
+
+
+def get(url: str, **kwargs) -> requests.Response:
+    return get_client().get(url, **kwargs)
+
+
+def post(url: str, **kwargs) -> requests.Response:
+    return get_client().post(url, **kwargs)
+
+
+def stats() -> Dict[str, Dict]:
+    return get_client().stats()
@@ -0,0 +1,193 @@
+"""
+Jingle Generation Pipeline
+Voice (TTS) and background music for a jingle are requested from ElevenLabs
+at the same time instead of one after the other
+
+The music has to be requested before the voice exists, so its length is
+estimated from the text: words / words-per-minute of the voice, plus
+JINGLE_PADDING_SECONDS for the intro/outro. Once the voice is back its real
+length is known, and mixing trims or loops the music to fit it. Every
+jingle's real speaking rate refines the voice's words-per-minute, so later
+estimates need less fitting.
+
+    voice  |=========|
+    music  |==================|
+    mix                       |==|
+
+A jingle takes max(voice, music) + mixing instead of voice + music + mixing.
+"""
+
+import io
+import os
+import re
+import time
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
+ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', '')
+
+JINGLE_WORDS_PER_MINUTE = float(os.getenv('JINGLE_WORDS_PER_MINUTE', '150'))
+JINGLE_PADDING_SECONDS = 2
+JINGLE_MIN_SECONDS = 5
+JINGLE_MAX_SECONDS = 30
+JINGLE_TTS_MODEL = 'eleven_multilingual_v2'
+
+# How much one jingle moves a voice's words-per-minute (exponential moving average)
+RATE_SMOOTHING = 0.3
+
+_voice_rates: Dict[str, float] = {}
+_voice_rates_lock = threading.Lock()
+
+
+# ============================================================================
+# Length estimate
+# ============================================================================
+
+def count_words(text: str) -> int:
+    return len(re.findall(r"[\w'’-]+", text))
+
+
+def words_per_minute(voice_id: str) -> float:
+    """The voice's speaking rate, learnt from the jingles it has read so far"""
+    with _voice_rates_lock:
+        return _voice_rates.get(voice_id, JINGLE_WORDS_PER_MINUTE)
+
+
+def record_speech(voice_id: str, text: str, seconds: float):
+    """Fold a real TTS length into the voice's speaking rate"""
+    words = count_words(text)
+    if not words or seconds <= 0:
+        return
+    rate = words / seconds * 60
+    with _voice_rates_lock:
+        previous = _voice_rates.get(voice_id, JINGLE_WORDS_PER_MINUTE)
+        _voice_rates[voice_id] = previous + RATE_SMOOTHING * (rate - previous)
+
+
+def estimate_speech_seconds(text: str, voice_id: str) -> float:
+    return count_words(text) / words_per_minute(voice_id) * 60
+
+
+def jingle_seconds(speech_seconds: float) -> int:
+    """Length of a jingle whose voice-over lasts speech_seconds (between 5 and 30 seconds)"""
+    return min(max(int(speech_seconds) + JINGLE_PADDING_SECONDS, JINGLE_MIN_SECONDS), JINGLE_MAX_SECONDS)
+
+
+# ============================================================================
+# ElevenLabs calls
+# ============================================================================
+
+def synthesize_voice(text: str, voice_id: str, voice_settings: Dict) -> bytes:
+    """TTS of the jingle's text (MP3 bytes)"""
+    response = http_client.post(
+        f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}',
+        json={'text': text, 'model_id': JINGLE_TTS_MODEL, 'voice_settings': voice_settings},
+        headers={'xi-api-key': ELEVENLABS_API_KEY, 'Content-Type': 'application/json'},
+        timeout=30
+    )
+    if response.status_code != 200:
+        raise Exception(f'TTS API error: {response.status_code} - {response.text}')
+    return response.content
+
+
+def generate_music(music_prompt: str, seconds: int) -> bytes:
+    """Background music (MP3 bytes); a quiet tone if the music API fails"""
+    response = http_client.post(
+        'https://api.elevenlabs.io/v1/sound-generation',
+        json={'text': music_prompt, 'duration_seconds': seconds},
+        headers={'xi-api-key': ELEVENLABS_API_KEY, 'Content-Type': 'application/json'},
+        timeout=60
+    )
+    if response.status_code == 200:
+        return response.content
+
+    logger.warning(f"Music API error: {response.status_code}, using fallback")
+    from pydub.generators import Sine
+    music_audio = Sine(440).to_audio_segment(duration=seconds * 1000).apply_gain(-20)
+    music_io = io.BytesIO()
+    music_audio.export(music_io, format='mp3')
+    return music_io.getvalue()
+
+
+def audio_seconds(mp3_bytes: bytes) -> float:
+    from pydub import AudioSegment
+    return len(AudioSegment.from_mp3(io.BytesIO(mp3_bytes))) / 1000
+
+
+# ============================================================================
+# Pipeline
+# ============================================================================
+
+def render_jingle(text: str, voice_id: str, voice_settings: Dict, music_prompt: str,
+                  on_step: Optional[Callable[[int, str], None]] = None,
+                  tts: Callable = synthesize_voice, music: Callable = generate_music,
+                  mix: Optional[Callable] = None, measure: Callable = audio_seconds) -> Dict:
+    """
+    Voice and music in parallel, then the mix
+
+    on_step(progress, step) is called from this thread, so it may write to the DB.
+    tts / music / mix / measure default to ElevenLabs and audio_mixer.
+
+    Returns:
+        {audio (MP3 bytes), speech_seconds, music_seconds (requested), jingle_seconds, timings}
+    """
+    if mix is None:
+        from .audio_mixer import mix_tts_with_music as mix
+    step = on_step or (lambda progress, name: None)
+    started = time.perf_counter()
+    timings = {}
+
+    def timed(name, fn, *args):
+        def run():
+            begin = time.perf_counter()
+            try:
+                return fn(*args)
+            finally:
+                timings[name] = round(time.perf_counter() - begin, 2)
+        return run
+
+    music_seconds = jingle_seconds(estimate_speech_seconds(text, voice_id))
+    logger.info(f"🎵 [JINGLE] Music requested for {music_seconds}s "
+                f"({count_words(text)} words at {words_per_minute(voice_id):.0f} wpm), voice in parallel")
+
+    step(20, 'generating_voice')
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='jingle')
+    try:
+        music_future = pool.submit(timed('music', music, music_prompt, music_seconds))
+        tts_future = pool.submit(timed('voice', tts, text, voice_id, voice_settings))
+
+        tts_bytes = tts_future.result()
+        speech_seconds = measure(tts_bytes)
+        record_speech(voice_id, text, speech_seconds)
+        logger.info(f"🗣️ [JINGLE] Voice ready: {speech_seconds:.2f}s ({len(tts_bytes)} bytes)")
+
+        if not music_future.done():
+            step(50, 'generating_music')
+        music_bytes = music_future.result()
+        logger.info(f"🎵 [JINGLE] Music ready ({len(music_bytes)} bytes)")
+    finally:
+        # A failed voice doesn't wait for the music: its request finishes in the background
+        pool.shutdown(wait=False)
+
+    step(75, 'mixing')
+    target = jingle_seconds(speech_seconds)
+    begin = time.perf_counter()
+    audio = mix(tts_bytes, music_bytes, target_ms=target * 1000)
+    timings['mix'] = round(time.perf_counter() - begin, 2)
+    timings['total'] = round(time.perf_counter() - started, 2)
+    logger.info(f"✅ [JINGLE] {target}s jingle in {timings['total']}s "
+                f"(voice {timings.get('voice')}s, music {timings.get('music')}s, mix {timings['mix']}s)")
+
+    return {
+        'audio': audio,
+        'speech_seconds': round(speech_seconds, 2),
+        'music_seconds': music_seconds,
+        'jingle_seconds': target,
+        'timings': timings,
+    }
@@ -5,6 +5,8 @@ Handles integration with Karafun Business API for device and session management
 
 import logging
 import requests
+
+from . import http_client
 from datetime import datetime, timezone
 from typing import Optional, List, Dict, Any
 
@@ -47,7 +49,7 @@ class KarafunAPIClient:
         url = f"{self.BASE_URL}{endpoint}"
         
         try:
-            response = requests.request(
+            response = http_client.request(
                 method=method,
                 url=url,
                 headers=self.headers,
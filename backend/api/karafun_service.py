@@ -6,6 +6,8 @@ Integrates with Karafun Business API for karaoke device management
 import requests
 from django.conf import settings
 
+from . import http_client
+
 
 class KarafunAPI:
     """Client for Karafun Business API"""
@@ -22,7 +24,7 @@ class KarafunAPI:
         """Make HTTP request to Karafun API"""
         url = f"{self.api_url}{endpoint}"
         try:
-            response = requests.request(
+            response = http_client.request(
                 method=method,
                 url=url,
                 headers=self.headers,
@@ -0,0 +1,49 @@
+"""
+Fill the pub quiz question bank offline
+
+    python manage.py fill_question_bank                    # every active genre up to --target
+    python manage.py fill_question_bank --genre "Pop Music" --target 200
+    python manage.py fill_question_bank --source local     # placeholder questions, no OpenAI
+"""
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db.models import Count
+
+from api import question_bank
+from api.pub_quiz_models import QuizGenre
+
+
+class Command(BaseCommand):
+    help = 'Generate questions into the pub quiz question bank, per genre'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--genre', action='append', default=[],
+                            help='Genre name (repeatable; default: all active genres)')
+        parser.add_argument('--target', type=int, default=100,
+                            help='Bank questions to have per genre (default 100)')
+        parser.add_argument('--batch', type=int, default=question_bank.QUESTION_BANK_REFILL_BATCH,
+                            help='Questions per type per generator call')
+        parser.add_argument('--source', default=question_bank.QUESTION_BANK_SOURCE,
+                            choices=['openai', 'local'])
+
+    def handle(self, *args, **options):
+        genres = QuizGenre.objects.filter(is_active=True)
+        if options['genre']:
+            genres = QuizGenre.objects.filter(name__in=options['genre'])
+            missing = set(options['genre']) - set(genres.values_list('name', flat=True))
+            if missing:
+                raise CommandError(f"Unknown genres: {', '.join(sorted(missing))}")
+
+        total = 0
+        for genre in genres.annotate(banked=Count('bank_questions')):
+            banked = genre.banked
+            while banked < options['target']:
+                added = question_bank.refill(genre, per_type=options['batch'], source=options['source'])
+                if not added:
+                    self.stderr.write(f"⚠️ {genre.name}: generator returned nothing, skipping")
+                    break
+                banked += added
+                total += added
+            self.stdout.write(f"🏦 {genre.name}: {banked} questions")
+
+        self.stdout.write(self.style.SUCCESS(f"✅ Added {total} questions to the bank"))
@@ -0,0 +1,33 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_jingleschedule_session'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='CardSetCache',
+            fields=[
+                ('cache_key', models.CharField(help_text='sha256 of the card-set inputs', max_length=64, primary_key=True, serialize=False)),
+                ('seed', models.BigIntegerField(help_text='Card-set seed the PDF was generated with')),
+                ('download_url', models.CharField(help_text='GCS URL or local /data/ path', max_length=500)),
+                ('local_path', models.CharField(blank=True, help_text='Local PDF path when the upload failed (checked before reuse)', max_length=500)),
+                ('num_cards', models.IntegerField()),
+                ('file_size_mb', models.FloatField(blank=True, null=True)),
+                ('generation_time', models.FloatField(blank=True, null=True)),
+                ('task_id', models.CharField(help_text='Task that generated the PDF', max_length=36)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('last_used_at', models.DateTimeField(auto_now_add=True)),
+                ('hit_count', models.IntegerField(default=0)),
+            ],
+            options={
+                'ordering': ['-last_used_at'],
+                'indexes': [models.Index(fields=['last_used_at'], name='api_cardset_last_us_e0efdd_idx'), models.Index(fields=['created_at'], name='api_cardset_created_dcdf60_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.0.1 on 2026-10-18 19:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_cardsetcache'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bingosession',
+            name='card_manifest',
+            field=models.JSONField(blank=True, help_text='Card number -> song pool indices of the printed cards, plus the call set', null=True),
+        ),
+        migrations.AddField(
+            model_name='bingosession',
+            name='card_seed',
+            field=models.BigIntegerField(blank=True, help_text='Seed of the last generated card set', null=True),
+        ),
+        migrations.AddField(
+            model_name='cardsetcache',
+            name='manifest',
+            field=models.JSONField(blank=True, help_text='Card manifest (see generate_cards.build_card_manifest)', null=True),
+        ),
+    ]
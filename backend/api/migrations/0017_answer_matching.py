@@ -0,0 +1,34 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:03
+
+from django.db import migrations, models
+
+from api.answer_matching import build_answer_keys
+
+
+def fill_answer_keys(apps, schema_editor):
+    QuizQuestion = apps.get_model('api', 'QuizQuestion')
+    questions = list(QuizQuestion.objects.only('id', 'correct_answer', 'alternative_answers'))
+    for question in questions:
+        question.answer_keys = build_answer_keys(question.correct_answer, question.alternative_answers)
+    QuizQuestion.objects.bulk_update(questions, ['answer_keys'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_bingo_card_manifest'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizquestion',
+            name='answer_keys',
+            field=models.JSONField(blank=True, default=list, help_text='Normalised correct/alternative answers for grading (filled on save, see answer_matching)'),
+        ),
+        migrations.AddField(
+            model_name='teamanswer',
+            name='match_confidence',
+            field=models.FloatField(blank=True, help_text='How sure the written-answer grading is (1.0 = exact); borderline ones are for the host to review', null=True),
+        ),
+        migrations.RunPython(fill_answer_keys, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 21:10
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_answer_matching'),
+    ]
+
+    operations = [
+        # Question-generation progress now lives on the generation's TaskStatus
+        migrations.RemoveField(
+            model_name='pubquizsession',
+            name='generation_progress',
+        ),
+    ]
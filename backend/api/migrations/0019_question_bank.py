@@ -0,0 +1,58 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:10
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_remove_pubquizsession_generation_progress'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BankQuestion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('question_type', models.CharField(choices=[('multiple_choice', 'Multiple Choice'), ('written', 'Written Answer'), ('picture', 'Picture Round'), ('music', 'Music/Audio'), ('buzzer', 'Buzzer Question'), ('bonus', 'Bonus')], max_length=20)),
+                ('difficulty', models.CharField(choices=[('easy', 'Easy'), ('medium', 'Medium'), ('hard', 'Hard')], default='medium', max_length=10)),
+                ('question_text', models.TextField()),
+                ('correct_answer', models.CharField(max_length=500)),
+                ('alternative_answers', models.JSONField(blank=True, default=list)),
+                ('options', models.JSONField(blank=True, default=dict)),
+                ('correct_option', models.CharField(blank=True, max_length=1)),
+                ('hints', models.TextField(blank=True)),
+                ('fun_fact', models.TextField(blank=True)),
+                ('source', models.CharField(default='openai', help_text="Who wrote it: 'openai' or 'local'", max_length=20)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('genre', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='bank_questions', to='api.quizgenre')),
+            ],
+            options={
+                'verbose_name': 'Bank Question',
+                'verbose_name_plural': 'Bank Questions',
+            },
+        ),
+        migrations.CreateModel(
+            name='BankQuestionUse',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('venue_key', models.CharField(help_text='Normalised venue name', max_length=200)),
+                ('used_at', models.DateTimeField(auto_now_add=True)),
+                ('question', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='uses', to='api.bankquestion')),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, to='api.pubquizsession')),
+            ],
+        ),
+        migrations.AddIndex(
+            model_name='bankquestion',
+            index=models.Index(fields=['genre', 'question_type', 'difficulty'], name='api_bankque_genre_i_7952f3_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='bankquestionuse',
+            index=models.Index(fields=['venue_key'], name='api_bankque_venue_k_cf2aa9_idx'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='bankquestionuse',
+            unique_together={('question', 'venue_key')},
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:14
+
+from django.db import migrations, models
+
+from api.question_dedup import signature
+
+
+def fill_minhash(apps, schema_editor):
+    for model_name in ('QuizQuestion', 'BankQuestion'):
+        model = apps.get_model('api', model_name)
+        questions = list(model.objects.only('id', 'question_text', 'correct_answer'))
+        for question in questions:
+            question.minhash = signature(question.question_text, question.correct_answer)
+        model.objects.bulk_update(questions, ['minhash'], batch_size=500)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_question_bank'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='bankquestion',
+            name='minhash',
+            field=models.JSONField(blank=True, default=list, help_text='See QuizQuestion.minhash'),
+        ),
+        migrations.AddField(
+            model_name='quizquestion',
+            name='minhash',
+            field=models.JSONField(blank=True, default=list, help_text='MinHash signature of question + answer for near-duplicate checks (filled on save, see question_dedup)'),
+        ),
+        migrations.RunPython(fill_minhash, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.0.1 on 2026-10-18 20:20
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_question_minhash'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='quizquestion',
+            name='audio',
+            field=models.JSONField(blank=True, default=dict, help_text='TTS cache keys of the pre-rendered question / answer / fun_fact clips (see quiz_audio)'),
+        ),
+    ]
@@ -40,6 +40,42 @@ class TaskStatus(models.Model):
     def __str__(self):
         return f"{self.task_type} - {self.task_id[:8]} ({self.status})"
 
+
+class CardSetCache(models.Model):
+    """
+    Generated card PDFs keyed by a hash of everything that goes on the cards
+    (seed, venue, logo bytes, prizes, game number/date...), so repeat requests
+    reuse the existing artifact instead of re-rendering it
+    """
+    cache_key = models.CharField(max_length=64, primary_key=True, help_text="sha256 of the card-set inputs")
+    seed = models.BigIntegerField(help_text="Card-set seed the PDF was generated with")
+    download_url = models.CharField(max_length=500, help_text="GCS URL or local /data/ path")
+    local_path = models.CharField(
+        max_length=500,
+        blank=True,
+        help_text="Local PDF path when the upload failed (checked before reuse)"
+    )
+    num_cards = models.IntegerField()
+    manifest = models.JSONField(null=True, blank=True, help_text="Card manifest (see generate_cards.build_card_manifest)")
+    file_size_mb = models.FloatField(null=True, blank=True)
+    generation_time = models.FloatField(null=True, blank=True)
+    task_id = models.CharField(max_length=36, help_text="Task that generated the PDF")
+
+    # LRU / TTL bookkeeping
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_used_at = models.DateTimeField(auto_now_add=True)
+    hit_count = models.IntegerField(default=0)
+
+    class Meta:
+        ordering = ['-last_used_at']
+        indexes = [
+            models.Index(fields=['last_used_at']),
+            models.Index(fields=['created_at']),
+        ]
+
+    def __str__(self):
+        return f"Card set {self.cache_key[:12]} ({self.num_cards} cards, {self.hit_count} hits)"
+
 class JingleSchedule(models.Model):
     """
     Scheduled jingle with time-based playback rules
@@ -566,6 +602,18 @@ class BingoSession(models.Model):
         help_text="Current position in song pool"
     )
     
+    # Printed cards
+    card_seed = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Seed of the last generated card set"
+    )
+    card_manifest = models.JSONField(
+        null=True,
+        blank=True,
+        help_text="Card number -> song pool indices of the printed cards, plus the call set"
+    )
+    
     # Status
     status = models.CharField(
         max_length=20,
@@ -275,6 +275,18 @@ Generate exactly {num_questions} questions now.
         
         return questions
     
+    def generate_questions(self, genre_name: str, count: int, question_type: str,
+                           difficulty_mix: dict = None, fallback: bool = True) -> List[Dict]:
+        """
+        Questions of one type for one genre, as OpenAI returned them (not numbered)
+        fallback=False: none instead of the sample questions when OpenAI fails
+        """
+        questions = self._generate_openai_questions(genre_name, count, question_type, difficulty_mix)
+        if not fallback:
+            samples = {q['question'] for q in self._get_fallback_questions(genre_name, count, question_type)}
+            questions = [q for q in questions if q.get('question') not in samples]
+        return questions
+    
     def _generate_openai_questions(self, genre_name: str, count: int, question_type: str, difficulty_mix: dict = None) -> List[Dict]:
         """
         Generate questions using OpenAI API
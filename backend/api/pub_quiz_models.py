@@ -8,6 +8,9 @@ from django.utils import timezone
 import json
 import secrets
 
+from .answer_matching import build_answer_keys
+from .question_dedup import signature
+
 
 class QuizGenre(models.Model):
     """Géneros/categorías de preguntas para el quiz"""
@@ -69,13 +72,6 @@ class PubQuizSession(models.Model):
     # Géneros seleccionados (basado en votación)
     selected_genres = models.ManyToManyField(QuizGenre, blank=True)
     
-    # Generation progress (stored as JSON)
-    generation_progress = models.JSONField(
-        null=True, 
-        blank=True,
-        help_text="Progress data for question generation: {progress: int, status: str}"
-    )
-    
     # Metadata
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -171,6 +167,16 @@ class QuizQuestion(models.Model):
     
     # Alternativas para respuestas similares
     alternative_answers = models.JSONField(default=list, blank=True)
+    answer_keys = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="Normalised correct/alternative answers for grading (filled on save, see answer_matching)"
+    )
+    minhash = models.JSONField(
+        default=list,
+        blank=True,
+        help_text="MinHash signature of question + answer for near-duplicate checks (filled on save, see question_dedup)"
+    )
     
     # Dificultad
     DIFFICULTY_CHOICES = [
@@ -188,6 +194,10 @@ class QuizQuestion(models.Model):
             'hard': 15,
         }
         return points_map.get(self.difficulty, 10)
+
+    def get_genre_name(self):
+        """Genre as the host panel shows and announces it"""
+        return self.genre.name if self.genre else 'General Knowledge'
     
     # Para rondas especiales y tipos de respuesta
     QUESTION_TYPE_CHOICES = [
@@ -221,11 +231,35 @@ class QuizQuestion(models.Model):
     # Metadata
     hints = models.TextField(blank=True)
     fun_fact = models.TextField(blank=True, help_text="Dato curioso después de revelar respuesta")
+    audio = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="TTS cache keys of the pre-rendered question / answer / fun_fact clips (see quiz_audio)"
+    )
     
     class Meta:
         ordering = ['round_number', 'question_number']
         unique_together = ['session', 'round_number', 'question_number']
     
+    def refresh_answer_keys(self):
+        self.answer_keys = build_answer_keys(self.correct_answer, self.alternative_answers)
+
+    def refresh_minhash(self):
+        self.minhash = signature(self.question_text, self.correct_answer)
+
+    def save(self, *args, **kwargs):
+        self.refresh_answer_keys()
+        self.refresh_minhash()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            if {'correct_answer', 'alternative_answers'} & update_fields:
+                update_fields.add('answer_keys')
+            if {'question_text', 'correct_answer'} & update_fields:
+                update_fields.add('minhash')
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
     def __str__(self):
         return f"R{self.round_number}Q{self.question_number}: {self.question_text[:50]}"
 
@@ -238,6 +272,11 @@ class TeamAnswer(models.Model):
     
     answer_text = models.CharField(max_length=500)
     is_correct = models.BooleanField(null=True, blank=True)
+    match_confidence = models.FloatField(
+        null=True,
+        blank=True,
+        help_text="How sure the written-answer grading is (1.0 = exact); borderline ones are for the host to review"
+    )
     points_awarded = models.IntegerField(default=0)
     
     # Para buzzers
@@ -302,3 +341,52 @@ class QuizRound(models.Model):
     
     def __str__(self):
         return f"Round {self.round_number}: {self.round_name}"
+
+
+class BankQuestion(models.Model):
+    """Pregunta pre-generada del banco, lista para montar un quiz sin llamar a OpenAI"""
+    
+    genre = models.ForeignKey(QuizGenre, on_delete=models.CASCADE, related_name='bank_questions')
+    question_type = models.CharField(max_length=20, choices=QuizQuestion.QUESTION_TYPE_CHOICES)
+    difficulty = models.CharField(max_length=10, choices=QuizQuestion.DIFFICULTY_CHOICES, default='medium')
+    
+    question_text = models.TextField()
+    correct_answer = models.CharField(max_length=500)
+    alternative_answers = models.JSONField(default=list, blank=True)
+    options = models.JSONField(default=dict, blank=True)
+    correct_option = models.CharField(max_length=1, blank=True)
+    hints = models.TextField(blank=True)
+    fun_fact = models.TextField(blank=True)
+    
+    minhash = models.JSONField(default=list, blank=True, help_text="See QuizQuestion.minhash")
+    
+    source = models.CharField(max_length=20, default='openai', help_text="Who wrote it: 'openai' or 'local'")
+    created_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        indexes = [
+            models.Index(fields=['genre', 'question_type', 'difficulty']),
+        ]
+        verbose_name = "Bank Question"
+        verbose_name_plural = "Bank Questions"
+    
+    def __str__(self):
+        return f"[{self.genre.name} / {self.question_type} / {self.difficulty}] {self.question_text[:50]}"
+
+
+class BankQuestionUse(models.Model):
+    """Una pregunta del banco ya usada en un local (no se repite allí)"""
+    
+    question = models.ForeignKey(BankQuestion, on_delete=models.CASCADE, related_name='uses')
+    venue_key = models.CharField(max_length=200, help_text="Normalised venue name")
+    session = models.ForeignKey(PubQuizSession, on_delete=models.SET_NULL, null=True, blank=True)
+    used_at = models.DateTimeField(auto_now_add=True)
+    
+    class Meta:
+        unique_together = ['question', 'venue_key']
+        indexes = [
+            models.Index(fields=['venue_key']),
+        ]
+    
+    def __str__(self):
+        return f"{self.venue_key}: {self.question_id}"
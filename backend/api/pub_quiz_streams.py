@@ -0,0 +1,519 @@
+"""
+Pub Quiz Live Streams
+Server-Sent Events for the player screens and the host panel
+
+A view that changes a session builds the update ONCE (publish_session_update)
+and quiz_events fans it out; each stream only formats what it receives.
+
+With the in-process event backend a stream only hears what its own worker
+publishes, so it also re-checks the session every STREAM_CATCH_UP_SECONDS for
+changes made on other workers; the Redis backend reaches every worker.
+
+Messages carry the id of the event behind them. A player that reconnects with
+Last-Event-ID (header, or ?last_event_id= for a hand-made EventSource) gets
+only the events it missed from the session's event log; new clients, hosts
+and clients too far behind get a snapshot of the current state instead.
+
+The same stream logic (PlayerStream / HostStream) runs under two drivers:
+    WSGI (gunicorn sync workers) - a generator blocking on its subscription.
+        Works anywhere, but every open stream holds a worker until it ends.
+    ASGI (uvicorn music_bingo.asgi:application) - an async generator awaiting
+        its subscription, so one process holds hundreds of idle streams.
+        Route the /stream and /host-stream URLs there and keep the REST API
+        on gunicorn (see nginx.conf / supervisor.conf). The views publish in
+        gunicorn, so that split needs the Redis event backend
+        (QUIZ_STREAMS_SEPARATE_PROCESS, see quiz_events.require_shared).
+"""
+
+import re
+import json
+from urllib.parse import parse_qs
+import asyncio
+import logging
+from abc import ABC, abstractmethod
+from datetime import timedelta
+from typing import Dict, List, Optional
+
+from asgiref.sync import sync_to_async
+from django.db import close_old_connections
+from django.http import StreamingHttpResponse
+from django.utils import timezone
+
+from .models import TaskStatus
+from .pub_quiz_models import QuizQuestion, QuizTeam
+from .quiz_leaderboard import (
+    QUESTION_STATUSES, HostBoard, answers_event, session_event, session_teams_event,
+    team_row, teams_event
+)
+from . import quiz_events
+
+logger = logging.getLogger(__name__)
+
+# Comment heartbeat after this long without one; how often an idle stream
+# re-reads the session (every heartbeat if events are shared, else every second)
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_CATCH_UP_SECONDS = 1
+STREAM_KEEPALIVE_SECONDS = 30
+
+HEARTBEAT = ": heartbeat\n\n"
+
+# Question generation runs as a TaskStatus task; one that hasn't finished after
+# this long died with its worker and no longer blocks the session
+GENERATION_TASK_TYPE = 'quiz_generation'
+GENERATION_STALE_AFTER = timedelta(minutes=10)
+
+QUIZ_TIMING = {
+    'seconds_per_question': 15,
+    'halftime_duration': 90,
+    'halftime_after_round': 1
+}
+
+
+# ============================================================================
+# EVENTOS (publicados por las vistas)
+# ============================================================================
+
+def player_quiz_payload(session):
+    """'quiz_started' message for players: ALL questions at once"""
+    all_questions = QuizQuestion.objects.filter(session=session).select_related('genre').order_by('round_number', 'question_number')
+
+    questions_data = []
+    for q in all_questions:
+        questions_data.append({
+            'id': q.id,
+            'text': q.question_text,
+            'round': q.round_number,
+            'number': q.question_number,
+            'genre': q.genre.name if q.genre else 'General',
+            'difficulty': q.difficulty,
+            'points': q.get_points_value(),
+            'type': q.question_type,
+            'options': q.options if q.question_type == 'multiple_choice' else None
+        })
+
+    return {
+        'type': 'quiz_started',
+        'all_questions': questions_data,
+        'timing': QUIZ_TIMING,
+        'total_rounds': session.total_rounds,
+        'questions_per_round': session.questions_per_round
+    }
+
+
+def status_event(session, snapshot=False):
+    """
+    Internal 'status' event; carries the questions when the quiz is running
+
+    Args:
+        snapshot: For a client that has nothing yet - the questions come along
+            in every status that plays them (halftime, answer reveal) too
+    """
+    with_quiz = session.status == 'in_progress' or (snapshot and session.status in QUESTION_STATUSES)
+    return {
+        'type': 'status',
+        'status': session.status,
+        'quiz': player_quiz_payload(session) if with_quiz else None
+    }
+
+
+def publish_session_update(session, previous_status=None):
+    """
+    Announce a session change to its streams (built once here, not per client)
+
+    Args:
+        previous_status: Status before the change - a 'status' event goes to
+            the players only when it differs
+    """
+    if previous_status is not None and previous_status != session.status:
+        quiz_events.publish(session.id, status_event(session))
+    quiz_events.publish(session.id, session_event(session))
+
+
+def publish_team_update(team: QuizTeam):
+    """A team joined or its score changed: host leaderboards update that row"""
+    quiz_events.publish(team.session_id, teams_event([team_row(team)]))
+
+
+def publish_all_teams(session):
+    """Every team's row at once (e.g. after scores were reset)"""
+    quiz_events.publish(session.id, session_teams_event(session))
+
+
+def publish_answer_count(question: QuizQuestion):
+    """Answers for a question changed: host panels update 'teams answered'"""
+    quiz_events.publish(question.session_id, answers_event(question))
+
+
+def active_generation_task(session) -> Optional[TaskStatus]:
+    """The session's question-generation task, if one is still running"""
+    return TaskStatus.objects.filter(
+        task_type=GENERATION_TASK_TYPE,
+        status__in=['pending', 'processing'],
+        metadata__session_id=session.pk,
+        started_at__gte=timezone.now() - GENERATION_STALE_AFTER
+    ).first()
+
+
+def generation_progress(session) -> Optional[Dict]:
+    """Progress of the session's running question generation ({progress, status})"""
+    task = active_generation_task(session)
+    if task is None:
+        return None
+    return {'progress': task.progress, 'status': task.current_step}
+
+
+def report_generation_progress(session, task_id, progress, status_msg, **extra):
+    """Store question-generation progress on its task and push it to the host panel"""
+    TaskStatus.objects.filter(task_id=task_id).update(progress=progress, current_step=status_msg[:100])
+    quiz_events.publish(session.id, {'type': 'generation_progress', 'progress': progress,
+                                     'status': status_msg, **extra})
+
+
+def stream_wait_seconds() -> int:
+    """How long a stream waits on its subscription before re-checking the session"""
+    return STREAM_HEARTBEAT_SECONDS if quiz_events.is_shared() else STREAM_CATCH_UP_SECONDS
+
+
+def sse_message(data, event_id=None):
+    if event_id:
+        return f"id: {event_id}\ndata: {json.dumps(data)}\n\n"
+    return f"data: {json.dumps(data)}\n\n"
+
+# ============================================================================
+# STREAMS
+# ============================================================================
+
+class QuizStream(ABC):
+    """What one SSE connection sends; a driver feeds it published events"""
+
+    label = 'SSE'
+
+    def __init__(self, session_id, session, last_event_id=None):
+        self.session_id = session_id  # as given in the URL (code or id)
+        self.session = session
+        self.done = False
+        self.last_keepalive = timezone.now()
+        self.last_heartbeat = self.last_keepalive
+        # Id of the last event applied / last id the client was sent
+        self.event_id = last_event_id
+        self.sent_event_id = last_event_id
+
+    def start(self) -> List[Dict]:
+        """Events that bring the client up to date, once subscribed (DB)"""
+        cursor, missed = quiz_events.replay(self.session.id, self.event_id)
+        if missed is not None:
+            events = self.resume(missed)
+            if events is not None:
+                return events
+        self.event_id = cursor
+        return self.catch_up()
+
+    def resume(self, missed: List[Dict]) -> Optional[List[Dict]]:
+        """Events to replay for a reconnecting client, or None to send it a snapshot"""
+        return None
+
+    def open(self) -> List[str]:
+        return [self.message({'type': 'connected', 'session_id': self.session_id})]
+
+    @abstractmethod
+    def catch_up(self) -> List[Dict]:
+        """Re-read the session and return events for what the client is missing (DB)"""
+
+    def feed(self, event: Dict) -> List[str]:
+        """SSE messages for an event, once (the log and the subscription may both bring it)"""
+        if 'id' in event:
+            if not quiz_events.is_newer(event['id'], self.event_id):
+                return []
+            event = dict(event)
+            self.event_id = event.pop('id')
+        return self.on_event(event)
+
+    @abstractmethod
+    def on_event(self, event: Dict) -> List[str]:
+        """SSE messages for a published event (no DB access)"""
+
+    def message(self, data: Dict) -> str:
+        """SSE message, with the event id when the client doesn't have it yet"""
+        event_id = self.event_id if self.event_id != self.sent_event_id else None
+        self.sent_event_id = self.event_id
+        return sse_message(data, event_id)
+
+    def heartbeat(self) -> str:
+        # Also moves the client's Last-Event-ID past events it had no message for
+        self.last_heartbeat = timezone.now()
+        if self.event_id and self.event_id != self.sent_event_id:
+            self.sent_event_id = self.event_id
+            return f"id: {self.event_id}\n{HEARTBEAT}"
+        return HEARTBEAT
+
+    def idle(self) -> List[str]:
+        """Heartbeat once STREAM_HEARTBEAT_SECONDS have passed since the last one"""
+        if (timezone.now() - self.last_heartbeat).total_seconds() < STREAM_HEARTBEAT_SECONDS:
+            return []
+        return [self.heartbeat()]
+
+    def keepalive(self) -> List[str]:
+        """Data keepalive every 30s, for monitoring/debugging"""
+        now = timezone.now()
+        if (now - self.last_keepalive).total_seconds() < STREAM_KEEPALIVE_SECONDS:
+            return []
+        self.last_keepalive = now
+        logger.debug(f"💓 [SSE] Data keepalive sent for session {self.session_id}")
+        return [self.message({'type': 'keepalive', 'timestamp': now.isoformat()})]
+
+
+class PlayerStream(QuizStream):
+    """Player screen: questions when the quiz starts, then status changes"""
+
+    def __init__(self, session_id, session, last_event_id=None):
+        super().__init__(session_id, session, last_event_id)
+        self.last_status = None  # Status the client is showing (None: it has nothing yet)
+        self.quiz_started_sent = False  # Track if we've sent the quiz_started message
+
+    def open(self) -> List[str]:
+        logger.info(f"📡 [SSE] Player connected to session {self.session_id}")
+        return super().open()
+
+    def resume(self, missed: List[Dict]) -> Optional[List[Dict]]:
+        if not any(event['type'] == 'status' for event in missed):
+            # Nothing a player screen shows changed while it was away
+            self.last_status = self.session.status
+            self.quiz_started_sent = self.session.status in QUESTION_STATUSES
+        logger.info(f"🔁 [SSE] Player resumed session {self.session_id} ({len(missed)} missed events)")
+        return missed
+
+    def catch_up(self) -> List[Dict]:
+        self.session.refresh_from_db()
+        if self.last_status is None:
+            # New client, or too far behind to replay: the current state, questions included
+            return [status_event(self.session, snapshot=True)]
+        if self.session.status != self.last_status or self.session.status == 'completed':
+            return [status_event(self.session)]
+        return []
+
+    def on_event(self, event: Dict) -> List[str]:
+        if event['type'] != 'status':
+            return []
+        new_status = event['status']
+
+        if new_status == 'completed':
+            logger.info(f"🏁 [SSE] Quiz completed for session {self.session_id}")
+            self.done = True
+            return [self.message({'type': 'ended', 'message': 'Quiz completed'})]
+        if new_status == self.last_status:
+            return []
+        self.last_status = new_status
+
+        # When quiz starts (status changes to in_progress), send ALL questions
+        messages = []
+        if not self.quiz_started_sent and event.get('quiz'):
+            self.quiz_started_sent = True
+            messages.append(self.message(event['quiz']))
+            if new_status == 'in_progress':
+                return messages
+        if new_status in ('ready', 'registration'):
+            messages.append(self.message({'type': 'waiting', 'message': 'Waiting for quiz to start', 'status': new_status}))
+        else:
+            messages.append(self.message({'type': 'status_change', 'status': new_status}))
+        return messages
+
+
+class HostStream(QuizStream):
+    """
+    Host panel: generation progress, stats, leaderboard and current question
+
+    The board is loaded once; after that the tab gets 'host_diff' messages
+    built from the published events.
+    """
+
+    label = 'Host SSE'
+
+    def __init__(self, session_id, session, last_event_id=None):
+        super().__init__(session_id, session, last_event_id)
+        self.last_progress = None
+        self.board: Optional[HostBoard] = None
+
+    def catch_up(self) -> List[Dict]:
+        self.session.refresh_from_db()
+        events = []
+        progress = generation_progress(self.session)
+        if progress:
+            events.append({'type': 'generation_progress', **progress})
+        events.append({'type': 'board', 'board': HostBoard.load(self.session)})
+        return events
+
+    def on_event(self, event: Dict) -> List[str]:
+        if event['type'] == 'generation_progress':
+            if event == self.last_progress:
+                return []
+            self.last_progress = event
+            logger.info(f"📤 [SSE] Sending progress update: {event}")
+            return [self.message(event)]
+
+        if event['type'] == 'board':
+            # Loaded from the database: full board first time, then only what differs
+            if self.board is None:
+                self.board = event['board']
+                message = self.board.snapshot()
+            else:
+                message = self.board.replace(event['board'])
+        elif self.board is not None:
+            message = self.board.apply(event)
+        else:
+            message = None
+
+        # Check if session ended
+        if self.board is not None and self.board.status == 'completed':
+            self.done = True
+            return [self.message({'type': 'ended', 'message': 'Session completed'})]
+        return [self.message(message)] if message else []
+
+
+# ============================================================================
+# DRIVERS
+# ============================================================================
+
+def _stream_messages(stream: QuizStream):
+    """WSGI driver: blocks this worker thread between events"""
+    # Subscribe before reading the state so no change slips in between
+    subscription = quiz_events.subscribe(stream.session.id)
+    wait = stream_wait_seconds()
+    try:
+        # 'connected' once subscribed and in sync with the session
+        events = stream.start()
+        yield from stream.open()
+        while True:
+            for event in events:
+                yield from stream.feed(event)
+                if stream.done:
+                    return
+            yield from stream.keepalive()
+
+            event = subscription.get(timeout=wait)
+            if event is None:
+                # Comment-based heartbeat (lightweight, doesn't trigger client events)
+                yield from stream.idle()
+                events = stream.catch_up()
+            else:
+                events = [event]
+    except Exception as e:
+        logger.error(f"{stream.label} error for session {stream.session_id}: {e}")
+        yield sse_message({'type': 'error', 'message': str(e)})
+    finally:
+        subscription.close()
+
+
+def _db_call(fn, *args):
+    close_old_connections()
+    return fn(*args)
+
+
+async def run_db(fn, *args):
+    """ORM work for the async streams, on the loop's shared thread pool"""
+    return await sync_to_async(_db_call, thread_sensitive=False)(fn, *args)
+
+
+async def _astream_messages(stream: QuizStream):
+    """ASGI driver: awaits events, so an idle stream holds no thread"""
+    subscription = await quiz_events.asubscribe(stream.session.id)
+    wait = stream_wait_seconds()
+    try:
+        events = await run_db(stream.start)
+        for message in stream.open():
+            yield message
+        while True:
+            for event in events:
+                for message in stream.feed(event):
+                    yield message
+                if stream.done:
+                    return
+            for message in stream.keepalive():
+                yield message
+
+            event = await subscription.aget(wait)
+            if event is None:
+                for message in stream.idle():
+                    yield message
+                events = await run_db(stream.catch_up)
+            else:
+                events = [event]
+    except Exception as e:
+        logger.error(f"{stream.label} error for session {stream.session_id}: {e}")
+        yield sse_message({'type': 'error', 'message': str(e)})
+    finally:
+        await subscription.aclose()
+
+
+async def _aiterate(messages: List[str]):
+    for message in messages:
+        yield message
+
+
+def last_event_id(header: Optional[str], query) -> Optional[str]:
+    """Id a reconnecting client last saw: EventSource's Last-Event-ID header, or ?last_event_id="""
+    return header or query.get('last_event_id') or None
+
+
+def stream_response(stream: Optional[QuizStream]) -> StreamingHttpResponse:
+    """SSE response for a stream served by a WSGI worker (None = session not found)"""
+    if stream is None:
+        content = iter([sse_message({'type': 'error', 'message': 'Session not found'})])
+    else:
+        content = _stream_messages(stream)
+
+    response = StreamingHttpResponse(content, content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
+    return response
+
+
+# Same URLs as api/urls.py pub-quiz-stream / pub-quiz-host-stream
+STREAM_PATH = re.compile(r'^/api/pub-quiz/(?P<session_id>[^/]+)/(?P<kind>stream|host-stream)/?$')
+
+STREAM_HEADERS = [
+    (b'content-type', b'text/event-stream'),
+    (b'cache-control', b'no-cache'),
+    (b'x-accel-buffering', b'no'),  # Disable nginx buffering
+    (b'access-control-allow-origin', b'*'),  # CORS_ALLOW_ALL_ORIGINS
+]
+
+
+async def asgi_stream(scope, receive, send):
+    """
+    ASGI app for the two SSE URLs (music_bingo.asgi routes them here)
+
+    Bypasses Django's middleware stack: its sync middleware would park an
+    executor thread for as long as each stream stays open.
+    """
+    from .pub_quiz_views import get_session_by_code_or_id
+
+    match = STREAM_PATH.match(scope['path'])
+    session_id = match['session_id']
+    session = await run_db(get_session_by_code_or_id, session_id)
+    if session is None:
+        messages = _aiterate([sse_message({'type': 'error', 'message': 'Session not found'})])
+    else:
+        stream_class = HostStream if match['kind'] == 'host-stream' else PlayerStream
+        header = dict(scope['headers']).get(b'last-event-id', b'').decode('latin-1')
+        query = {key: values[0] for key, values in parse_qs(scope.get('query_string', b'').decode()).items()}
+        messages = _astream_messages(stream_class(session_id, session, last_event_id(header, query)))
+
+    async def pump():
+        await send({'type': 'http.response.start', 'status': 200, 'headers': STREAM_HEADERS})
+        async for message in messages:
+            await send({'type': 'http.response.body', 'body': message.encode(), 'more_body': True})
+        await send({'type': 'http.response.body', 'body': b'', 'more_body': False})
+
+    async def disconnected():
+        while (await receive())['type'] != 'http.disconnect':
+            pass
+
+    tasks = [asyncio.create_task(pump()), asyncio.create_task(disconnected())]
+    try:
+        await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        await messages.aclose()  # closes the subscription
+
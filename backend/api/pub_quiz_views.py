@@ -7,22 +7,34 @@ from django.http import JsonResponse, HttpResponse, StreamingHttpResponse
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
 from django.utils import timezone
+from django.db import connection, transaction
 from django.db.models import Count, Q
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import AllowAny
 from rest_framework.response import Response
 from rest_framework import status
-import json
 import os
 import qrcode
 from io import BytesIO
 import base64
 import time
+import uuid
 import logging
+import threading
 
 from .pub_quiz_models import (
     PubQuizSession, QuizTeam, QuizGenre, QuizQuestion,
-    QuizRound, TeamAnswer, BuzzerDevice, GenreVote
+    QuizRound, TeamAnswer, BuzzerDevice, GenreVote, BankQuestionUse
+)
+from .models import TaskStatus
+from . import question_bank, question_dedup, quiz_audio
+from .question_dedup import question_signature
+from .answer_matching import REVIEW_CONFIDENCE, REVIEW_MIN_CONFIDENCE, build_answer_keys, match_answer
+from .pub_quiz_streams import (
+    PlayerStream, HostStream, last_event_id, stream_response,
+    publish_session_update, publish_team_update, publish_all_teams,
+    publish_answer_count, report_generation_progress, active_generation_task,
+    GENERATION_TASK_TYPE
 )
 
 logger = logging.getLogger(__name__)
@@ -51,6 +63,88 @@ from .pub_quiz_generator import PubQuizGenerator, initialize_genres_in_db
 logger = logging.getLogger(__name__)
 
 
+class QueryTimer:
+    """Adds up the time spent in DB queries on this thread (use with connection.execute_wrapper)"""
+
+    def __init__(self):
+        self.seconds = 0.0
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.seconds += time.perf_counter() - start
+            self.count += 1
+
+
+def save_generated_round(session, round_data, genre, questions):
+    """
+    Write one generated round and its questions in one transaction
+
+    Args:
+        round_data: round of PubQuizGenerator.create_quiz_structure()
+        genre: QuizGenre of the round
+        questions: PubQuizGenerator.generate_sample_questions() result
+
+    Returns:
+        Number of questions saved
+    """
+    quiz_round = QuizRound(
+        session=session,
+        round_number=round_data['round_number'],
+        genre=genre,
+        round_name=round_data['round_name'],
+        is_buzzer_round=round_data['is_buzzer_round'],
+        is_halftime_before=round_data['is_halftime_before'],
+    )
+
+    round_questions = []
+    for q_data in questions:
+        question = QuizQuestion(
+            session=session,
+            genre=genre,
+            round_number=round_data['round_number'],
+            question_number=q_data['question_number'],
+            question_text=q_data['question'],
+            correct_answer=q_data['answer'],
+            alternative_answers=q_data.get('alternative_answers', []),
+            difficulty=q_data.get('difficulty', 'medium'),
+            question_type=q_data.get('question_type', 'written'),
+            options=q_data.get('options', {}),
+            correct_option=q_data.get('correct_option', ''),
+            fun_fact=q_data.get('fun_fact', ''),
+            hints=q_data.get('hints', ''),
+        )
+        # bulk_create skips save()
+        question.refresh_answer_keys()
+        question.minhash = question_signature(q_data)
+        round_questions.append(question)
+
+    with transaction.atomic():
+        quiz_round.save()
+        QuizQuestion.objects.bulk_create(round_questions)
+    return len(round_questions)
+
+
+def grade_answer(question, answer_text, is_multiple_choice=False):
+    """
+    Grade a team's answer: the option letter, or the text against the answer
+    and its alternatives (fuzzy, see answer_matching)
+
+    Returns:
+        (is_correct, confidence) - confidence is None for multiple choice
+    """
+    if is_multiple_choice and question.question_type == 'multiple_choice':
+        return answer_text.upper() == (question.correct_option or '').upper(), None
+
+    # For written answers, match against the keys precomputed when the question was saved
+    answer_keys = question.answer_keys or build_answer_keys(question.correct_answer, question.alternative_answers)
+    match = match_answer(answer_text, answer_keys)
+    return match.is_correct, match.confidence
+
+
 # ============================================================================
 # VISTAS DE ADMINISTRACIÓN
 # ============================================================================
@@ -292,6 +386,7 @@ def register_team(request, session_id):
                 pass
         
         logger.info(f"🎉 [REGISTER_TEAM] Registration successful! Team ID: {team.id}")
+        publish_team_update(team)
         return Response({
             'success': True,
             'team_id': team.id,
@@ -338,11 +433,13 @@ def generate_qr_code(request, session_id):
 
 @api_view(['POST'])
 def generate_quiz_questions(request, session_id):
-    """Genera preguntas para el quiz basado en votación de géneros"""
-    from django.core.cache import cache
-    import logging
-    logger = logging.getLogger(__name__)
-    
+    """
+    Genera preguntas para el quiz basado en votación de géneros
+
+    Generation takes 1-2 minutes of OpenAI calls, so it runs as a background
+    task (run_quiz_generation) and this returns 202 with its task_id right
+    away. Progress arrives on the host stream and at GET /api/tasks/<task_id>.
+    """
     logger.info(f"🎯 [GENERATE_QUESTIONS] Starting generation for session {session_id}")
     
     try:
@@ -351,10 +448,11 @@ def generate_quiz_questions(request, session_id):
             return Response({"error": "Session not found"}, status=404)
         logger.info(f"✅ [GENERATE_QUESTIONS] Session found: {session.session_code}, rounds: {session.total_rounds}, questions/round: {session.questions_per_round}")
         
-        # Initialize progress
-        session.generation_progress = {'progress': 0, 'status': 'starting'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 0% - starting (session: {session_id})")
+        # Already generating (e.g. button pressed twice) - follow that task
+        running = active_generation_task(session)
+        if running is not None:
+            logger.info(f"♻️ [GENERATE_QUESTIONS] Generation already running (task {running.task_id})")
+            return Response({'success': True, 'task_id': running.task_id, 'status': running.status}, status=202)
         
         # Get question type preferences from request body (DRF parses automatically)
         include_mc = request.data.get('include_multiple_choice', True)
@@ -384,157 +482,228 @@ def generate_quiz_questions(request, session_id):
             'hard': hard_count
         }
         
-        # Contar votos por género
-        genre_votes = GenreVote.objects.filter(team__session=session).values('genre_id').annotate(
-            vote_count=Count('genre_id')
-        ).order_by('-vote_count')
-        
-        votes_dict = {v['genre_id']: v['vote_count'] for v in genre_votes}
-        logger.info(f"🗳️ [GENERATE_QUESTIONS] Genre votes collected: {len(votes_dict)} genres voted")
-        
-        # Usar generador para seleccionar géneros
-        generator = PubQuizGenerator()
-        selected_genres = generator.select_genres_by_votes(votes_dict, session.total_rounds)
-        logger.info(f"✅ [GENERATE_QUESTIONS] Selected {len(selected_genres)} genres: {[g['name'] for g in selected_genres]}")
-        
-        session.generation_progress = {'progress': 10, 'status': 'Selecting genres...'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 10% - Selecting genres... (session: {session_id})")
-        
-        # Crear estructura de rondas
-        structure = generator.create_quiz_structure(
-            selected_genres,
-            questions_per_round=session.questions_per_round,
-            include_halftime=True,
-            include_buzzer_round=False
+        # The task carries everything the job needs
+        task = TaskStatus.objects.create(
+            task_id=str(uuid.uuid4()),
+            task_type=GENERATION_TASK_TYPE,
+            status='pending',
+            progress=0,
+            current_step='Starting generation...',
+            metadata={
+                'session_id': session.pk,
+                'question_types': question_types,
+                'difficulty_mix': difficulty_mix
+            }
         )
         
-        session.generation_progress = {'progress': 20, 'status': 'Creating quiz structure...'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 20% - Creating quiz structure... (session: {session_id})")
-        
-        # Crear rondas en DB primero (sin preguntas)
-        total_rounds = len(structure['rounds'])
-        rounds_to_generate = []
+        thread = threading.Thread(target=run_quiz_generation, args=(task.task_id,), daemon=True)
+        thread.start()
         
-        for idx, round_data in enumerate(structure['rounds']):
-            genre = QuizGenre.objects.get(name=round_data['genre']['name'])
+        return Response({'success': True, 'task_id': task.task_id, 'status': 'pending'}, status=202)
+    
+    except Exception as e:
+        logger.error(f"❌ [GENERATE_QUESTIONS] Error: {str(e)}", exc_info=True)
+        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+
+
+def run_quiz_generation(task_id):
+    """
+    Background job behind generate_quiz_questions
+
+    Rounds the question bank can fill are saved immediately; the others are
+    generated in parallel and each one is saved as soon as it arrives, so the
+    host can review round 1 while round 6 is still generating. Questions
+    already asked at the venue in other words are dropped and regenerated
+    (see question_dedup). The session becomes 'ready' once all rounds are
+    in; if generation fails the rounds saved so far are removed again, so
+    it can simply be retried.
+    """
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    
+    task = TaskStatus.objects.get(task_id=task_id)
+    session = PubQuizSession.objects.get(pk=task.metadata['session_id'])
+    question_types = task.metadata['question_types']
+    difficulty_mix = task.metadata['difficulty_mix']
+    saved_rounds = []
+    progress = 0
+    
+    def report(value, status_msg, **extra):
+        nonlocal progress
+        progress = value
+        report_generation_progress(session, task_id, value, status_msg, **extra)
+        logger.info(f"📊 [PROGRESS] {value}% - {status_msg} (session: {session.session_code})")
+    
+    started = time.perf_counter()
+    db_timer = QueryTimer()  # DB time, to tell it apart from OpenAI time
+    try:
+        with connection.execute_wrapper(db_timer):
+            task.status = 'processing'
+            task.save(update_fields=['status'])
+            report(0, 'Selecting genres...')
             
-            quiz_round = QuizRound.objects.create(
-                session=session,
-                round_number=round_data['round_number'],
-                genre=genre,
-                round_name=round_data['round_name'],
-                is_buzzer_round=round_data['is_buzzer_round'],
-                is_halftime_before=round_data['is_halftime_before'],
+            # Contar votos por género
+            genre_votes = GenreVote.objects.filter(team__session=session).values('genre_id').annotate(
+                vote_count=Count('genre_id')
+            ).order_by('-vote_count')
+            
+            votes_dict = {v['genre_id']: v['vote_count'] for v in genre_votes}
+            logger.info(f"🗳️ [GENERATE_QUESTIONS] Genre votes collected: {len(votes_dict)} genres voted")
+            
+            # Usar generador para seleccionar géneros
+            generator = PubQuizGenerator()
+            selected_genres = generator.select_genres_by_votes(votes_dict, session.total_rounds)
+            logger.info(f"✅ [GENERATE_QUESTIONS] Selected {len(selected_genres)} genres: {[g['name'] for g in selected_genres]}")
+            
+            # Crear estructura de rondas
+            structure = generator.create_quiz_structure(
+                selected_genres,
+                questions_per_round=session.questions_per_round,
+                include_halftime=True,
+                include_buzzer_round=False
             )
+            report(10, 'Creating quiz structure...')
             
-            rounds_to_generate.append({
-                'round_number': round_data['round_number'],
-                'genre_name': genre.name,
-                'genre_obj': genre,
-                'questions_per_round': round_data['questions_per_round']
-            })
-        
-        session.generation_progress = {'progress': 30, 'status': 'Generating all questions (this may take 1-2 minutes)...'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 30% - Generating all questions (this may take 1-2 minutes)... (session: {session_id})")
-        logger.info(f"🤖 [GENERATE_QUESTIONS] Starting parallel question generation for {len(rounds_to_generate)} rounds")
-        
-        # Generar todas las preguntas en paralelo usando threading
-        from concurrent.futures import ThreadPoolExecutor, as_completed
-        
-        def generate_round_questions(round_info):
-            """Generate questions for a single round"""
-            return {
-                'round_number': round_info['round_number'],
-                'genre_obj': round_info['genre_obj'],
-                'questions': generator.generate_sample_questions(
-                    round_info['genre_name'],
-                    round_info['questions_per_round'],
-                    question_types=question_types,
-                    difficulty_mix=difficulty_mix
+            # Géneros de todas las rondas en una sola consulta
+            genre_names = {g['name'] for g in selected_genres} | {r['genre']['name'] for r in structure['rounds']}
+            genres_by_name = {g.name: g for g in QuizGenre.objects.filter(name__in=genre_names)}
+            missing = genre_names - genres_by_name.keys()
+            if missing:
+                raise ValueError(f"Unknown genres: {', '.join(sorted(missing))}")
+            session.selected_genres.add(*genres_by_name.values())
+            
+            total_rounds = len(structure['rounds'])
+            total_questions_saved = 0
+            
+            def save_round(round_data, questions):
+                nonlocal total_questions_saved
+                round_number = round_data['round_number']
+                total_questions_saved += save_generated_round(
+                    session, round_data, genres_by_name[round_data['genre']['name']], questions
                 )
-            }
-        
-        # Generate questions in parallel (max 4 concurrent API calls)
-        all_round_questions = []
-        with ThreadPoolExecutor(max_workers=4) as executor:
-            future_to_round = {executor.submit(generate_round_questions, round_info): round_info for round_info in rounds_to_generate}
+                saved_rounds.append(round_number)
+                done = len(saved_rounds)
+                report(20 + int(done / total_rounds * 75), f'Round {round_number} ready ({done}/{total_rounds} rounds)',
+                       round_ready=round_number)
             
-            for idx, future in enumerate(as_completed(future_to_round)):
-                result = future.result()
-                all_round_questions.append(result)
+            # Everything asked at this venue before, to keep near-duplicates out
+            dedup = question_dedup.venue_index(session.venue_name)
+            duplicates_dropped = 0
+            
+            # Rounds the question bank can fill are ready straight away
+            live_rounds = []
+            for round_data in structure['rounds']:
+                questions = None
+                if question_bank.QUESTION_BANK_ENABLED:
+                    questions = question_bank.draw_round(
+                        genres_by_name[round_data['genre']['name']], session.venue_name,
+                        round_data['questions_per_round'], question_types, difficulty_mix, index=dedup
+                    )
+                if questions is None:
+                    live_rounds.append(round_data)
+                else:
+                    save_round(round_data, questions)
+                    question_bank.record_use(session, questions)
+                    for q_data in questions:
+                        dedup.add_question(q_data)
+            bank_rounds = total_rounds - len(live_rounds)
+            if bank_rounds:
+                logger.info(f"🏦 [GENERATE_QUESTIONS] {bank_rounds}/{total_rounds} rounds from the question bank")
+            
+            generation_started = time.perf_counter()
+            if live_rounds:
+                report(progress, f'Generating {len(live_rounds)} rounds (this may take 1-2 minutes)...')
+                logger.info(f"🤖 [GENERATE_QUESTIONS] Starting parallel question generation for {len(live_rounds)} rounds")
                 
-                # Update progress
-                progress = 30 + int(((idx + 1) / total_rounds) * 60)
-                status_msg = f'Generated {idx+1}/{total_rounds} rounds...'
-                session.generation_progress = {'progress': progress, 'status': status_msg}
-                session.save(update_fields=['generation_progress'])
-                logger.info(f"📊 [PROGRESS] {progress}% - {status_msg} (session: {session_id})")
-        
-        # Sort by round number
-        all_round_questions.sort(key=lambda x: x['round_number'])
-        
-        # Save all questions to database
-        session.generation_progress = {'progress': 92, 'status': 'Saving questions to database...'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 92% - Saving questions to database... (session: {session_id})")
-        logger.info(f"💾 [GENERATE_QUESTIONS] Saving questions to database...")
-        
-        total_questions_saved = 0
-        for round_data in all_round_questions:
-            for q_data in round_data['questions']:
-                QuizQuestion.objects.create(
-                    session=session,
-                    genre=round_data['genre_obj'],
-                    round_number=round_data['round_number'],
-                    question_number=q_data['question_number'],
-                    question_text=q_data['question'],
-                    correct_answer=q_data['answer'],
-                    alternative_answers=q_data.get('alternative_answers', []),
-                    difficulty=q_data.get('difficulty', 'medium'),
-                    question_type=q_data.get('question_type', 'written'),
-                    options=q_data.get('options', {}),
-                    correct_option=q_data.get('correct_option', ''),
-                    fun_fact=q_data.get('fun_fact', ''),
-                    hints=q_data.get('hints', ''),
-                )
-                total_questions_saved += 1
-        
-        logger.info(f"✅ [GENERATE_QUESTIONS] Saved {total_questions_saved} questions to database")
-        session.generation_progress = {'progress': 95, 'status': 'Finalizing quiz...'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 95% - Finalizing quiz... (session: {session_id})")
-        
-        # Actualizar estado de sesión
-        session.status = 'ready'
-        session.save()
-        logger.info(f"✅ [GENERATE_QUESTIONS] Session status updated to 'ready'")
-        
-        # Agregar géneros seleccionados a la sesión
-        for genre_data in selected_genres:
-            genre = QuizGenre.objects.get(name=genre_data['name'])
-            session.selected_genres.add(genre)
-        
-        session.generation_progress = {'progress': 100, 'status': 'Complete!'}
-        session.save(update_fields=['generation_progress'])
-        logger.info(f"📊 [PROGRESS] 100% - Complete! (session: {session_id})")
-        logger.info(f"🎉 [GENERATE_QUESTIONS] Quiz generation completed successfully!")
+                # Generate questions in parallel (max 4 concurrent API calls), saving each round as it arrives
+                with ThreadPoolExecutor(max_workers=4) as executor:
+                    def generate(round_data, count):
+                        return executor.submit(
+                            generator.generate_sample_questions,
+                            round_data['genre']['name'],
+                            count,
+                            question_types=question_types,
+                            difficulty_mix=difficulty_mix
+                        )
+                    
+                    # future -> (round, questions kept, near-duplicates dropped, retries)
+                    pending = {generate(round_data, round_data['questions_per_round']): (round_data, [], [], 0)
+                               for round_data in live_rounds}
+                    while pending:
+                        finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                        for future in finished:
+                            round_data, kept, dropped, retries = pending.pop(future)
+                            new, duplicates = dedup.drop_duplicates(future.result())
+                            kept += new
+                            dropped += duplicates
+                            duplicates_dropped += len(duplicates)
+                            missing = round_data['questions_per_round'] - len(kept)
+                            if missing > 0 and retries < question_dedup.DUPLICATE_RETRIES:
+                                # Asked here before (in other words) - ask for replacements
+                                logger.info(f"♻️ [GENERATE_QUESTIONS] Round {round_data['round_number']}: "
+                                            f"{len(duplicates)} near-duplicates, regenerating {missing}")
+                                pending[generate(round_data, missing)] = (round_data, kept, dropped, retries + 1)
+                                continue
+                            # Still short: a repeat is better than a short round
+                            questions = (kept + dropped[:max(missing, 0)])[:round_data['questions_per_round']]
+                            for number, q_data in enumerate(questions, 1):
+                                q_data['question_number'] = number
+                            save_round(round_data, questions)
+            
+            generation_seconds = time.perf_counter() - generation_started
+            logger.info(f"✅ [GENERATE_QUESTIONS] Saved {total_questions_saved} questions to database")
+            
+            if question_bank.QUESTION_BANK_ENABLED:
+                question_bank.top_up({genres_by_name[r['genre']['name']] for r in structure['rounds']}, session.venue_name)
+            
+            # Actualizar estado de sesión
+            previous_status = session.status
+            session.status = 'ready'
+            session.save(update_fields=['status'])
+            publish_session_update(session, previous_status)
+            logger.info(f"✅ [GENERATE_QUESTIONS] Session status updated to 'ready'")
+            
+            # Read-outs rendered before the quiz starts (no-op without ElevenLabs)
+            quiz_audio.start_prerender(session)
+        
+        timing = {
+            'total_seconds': round(time.perf_counter() - started, 2),
+            'openai_seconds': round(generation_seconds, 2),
+            'bank_rounds': bank_rounds,
+            'duplicates_dropped': duplicates_dropped,
+            'db_seconds': round(db_timer.seconds, 3),
+            'db_queries': db_timer.count,
+        }
+        logger.info(f"⏱️ [GENERATE_QUESTIONS] Total {timing['total_seconds']}s | OpenAI {timing['openai_seconds']}s | "
+                    f"DB {timing['db_seconds']}s ({timing['db_queries']} queries)")
         
-        return Response({
+        report(100, 'Complete!')
+        task.status = 'completed'
+        task.progress = 100
+        task.result = {
             'success': True,
             'message': 'Quiz generado exitosamente',
-            'structure': structure,
-            'selected_genres': [g['name'] for g in selected_genres]
-        })
+            'selected_genres': [g['name'] for g in selected_genres],
+            'rounds': total_rounds,
+            'questions': total_questions_saved,
+            'timing': timing
+        }
+        task.completed_at = timezone.now()
+        task.save(update_fields=['status', 'progress', 'result', 'completed_at'])
+        logger.info(f"🎉 [GENERATE_QUESTIONS] Quiz generation completed successfully!")
     
     except Exception as e:
-        logger.error(f"❌ [GENERATE_QUESTIONS] Error: {str(e)}", exc_info=True)
-        if session:
-            session.generation_progress = None
-            session.save(update_fields=['generation_progress'])
-        return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
+        logger.error(f"❌ [GENERATE_QUESTIONS] Task {task_id}: Error: {str(e)}", exc_info=True)
+        if saved_rounds:
+            QuizQuestion.objects.filter(session=session, round_number__in=saved_rounds).delete()
+            QuizRound.objects.filter(session=session, round_number__in=saved_rounds).delete()
+            BankQuestionUse.objects.filter(session=session).delete()
+        task.status = 'failed'
+        task.error = str(e)
+        task.completed_at = timezone.now()
+        task.save(update_fields=['status', 'error', 'completed_at'])
+        report(progress, 'Generation failed', failed=True, error=str(e))
+    finally:
+        connection.close()  # this thread's connection
 
 
 # ============================================================================
@@ -611,6 +780,11 @@ def start_quiz(request, session_id):
     if not session:
         return Response({"error": "Session not found"}, status=404)
     
+    # Players get every question at the start - wait until all rounds are in
+    if active_generation_task(session) is not None:
+        return Response({"error": "Questions are still being generated"}, status=409)
+    
+    previous_status = session.status
     session.status = 'in_progress'
     session.current_round = 1
     session.current_question = 1
@@ -622,6 +796,8 @@ def start_quiz(request, session_id):
         first_round.started_at = timezone.now()
         first_round.save()
     
+    publish_session_update(session, previous_status)
+    
     # Obtener TODAS las preguntas del quiz
     all_questions = QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number')
     
@@ -687,11 +863,12 @@ def get_all_questions(request, session_id):
             'fun_fact': q.fun_fact,
             'round': q.round_number,
             'number': q.question_number,
-            'genre': q.genre.name if q.genre else 'General Knowledge',
+            'genre': q.get_genre_name(),
             'difficulty': q.difficulty,
             'points': q.get_points_value(),
             'type': q.question_type,
-            'options': q.options if q.question_type == 'multiple_choice' else None
+            'options': q.options if q.question_type == 'multiple_choice' else None,
+            'audio': {part: f'/api/tts/{key}' for part, key in q.audio.items()}
         })
     
     return Response({
@@ -701,6 +878,40 @@ def get_all_questions(request, session_id):
     })
 
 
+@api_view(['GET', 'POST'])
+def quiz_audio_manifest(request, session_id):
+    """
+    Clips the host panel will play (round intros, questions, answers, fun facts)
+
+    GET returns the manifest (with which clips are cached already); POST starts
+    pre-rendering the missing ones (202 with the task id).
+    """
+    session = get_session_by_code_or_id(session_id)
+    if not session:
+        return Response({"error": "Session not found"}, status=404)
+    
+    try:
+        if request.method == 'POST':
+            task_id = quiz_audio.start_prerender(session)
+            if not task_id:
+                return Response({'error': 'ElevenLabs API key not configured'}, status=500)
+            return Response({'success': True, 'task_id': task_id}, status=202)
+        
+        voice = request.query_params.get('voice', quiz_audio.HOST_VOICE)
+        clips = quiz_audio.manifest(session, voice)
+        task = quiz_audio.active_task(session)
+        return Response({
+            'success': True,
+            'clips': clips,
+            'ready': sum(1 for clip in clips if clip['ready']),
+            'total': len(clips),
+            'task_id': task.task_id if task else None
+        })
+    except Exception as e:
+        logger.error(f"❌ [QUIZ_AUDIO] Manifest error: {e}")
+        return Response({'error': str(e)}, status=500)
+
+
 @api_view(['POST'])
 def sync_question_to_players(request, session_id):
     """Sync current question to player screens via SSE"""
@@ -716,6 +927,7 @@ def sync_question_to_players(request, session_id):
     session.current_round = round_num
     session.current_question = question_num
     session.save()
+    publish_session_update(session)
     
     logger.info(f"📡 [SYNC] Host updated to Round {round_num}, Q{question_num}")
     
@@ -744,6 +956,7 @@ def start_countdown(request, session_id):
     # Verificar que se guardó
     session.refresh_from_db()
     logger.info(f"⏱️ [START_COUNTDOWN] After refresh_from_db: {session.question_started_at}")
+    publish_session_update(session)
     
     return Response({
         'success': True,
@@ -773,10 +986,13 @@ def reset_quiz(request, session_id):
         team.save()
     
     # Resetear sesión al estado inicial
+    previous_status = session.status
     session.status = 'registration'
     session.current_round = 0
     session.current_question = 0
     session.save()
+    publish_session_update(session, previous_status)
+    publish_all_teams(session)
     
     return Response({'success': True, 'message': 'Quiz reset successfully'})
 
@@ -818,6 +1034,7 @@ def next_question(request, session_id):
         return Response({"error": "Session not found"}, status=404)
     
     logger.info(f"🔄 [NEXT] Current state - Round: {session.current_round}, Question: {session.current_question}, Status: {session.status}")
+    previous_status = session.status
     
     # 🔧 FIX: Si estamos en halftime, el primer "Next" debe pasar a in_progress
     if session.status == 'halftime':
@@ -828,6 +1045,7 @@ def next_question(request, session_id):
         session.save()
         logger.info(f"✅ [HALFTIME] Status changed to 'in_progress', quiz continues")
         logger.info(f"📡 [HALFTIME] Sending SSE notification to update frontend")
+        publish_session_update(session, previous_status)
         return Response({
             'success': True,
             'current_round': session.current_round,
@@ -878,6 +1096,7 @@ def next_question(request, session_id):
             logger.info(f"🎉 [NEXT] Quiz completed!")
     
     session.save()
+    publish_session_update(session, previous_status)
     
     return Response({
         'success': True,
@@ -899,6 +1118,7 @@ def toggle_auto_advance(request, session_id):
         # Starting auto-advance - mark current question start time
         session.question_started_at = timezone.now()
     session.save()
+    publish_session_update(session)
     
     return Response({
         'success': True,
@@ -915,6 +1135,7 @@ def pause_auto_advance(request, session_id):
     
     session.auto_advance_paused = not session.auto_advance_paused
     session.save()
+    publish_session_update(session)
     
     return Response({
         'success': True,
@@ -935,6 +1156,7 @@ def set_auto_advance_time(request, session_id):
     
     session.auto_advance_seconds = seconds
     session.save()
+    publish_session_update(session)
     
     return Response({
         'success': True,
@@ -945,116 +1167,12 @@ def set_auto_advance_time(request, session_id):
 def quiz_stream(request, session_id):
     """
     Server-Sent Events endpoint for real-time quiz updates
-    NEW: Sends ALL questions at once when quiz starts
+    Sends ALL questions at once when quiz starts (see pub_quiz_streams)
+    WSGI path - under ASGI, music_bingo.asgi serves this URL with pub_quiz_streams.asgi_stream
     """
-    def event_generator():
-        """Generator that yields SSE-formatted messages"""
-        session = get_session_by_code_or_id(session_id)
-        if not session:
-            yield f"data: {{\"type\": \"error\", \"message\": \"Session not found\"}}\n\n"
-            return
-        
-        last_status = session.status
-        quiz_started_sent = False  # Track if we've sent the quiz_started message
-        
-        # Keepalive tracking - send data keepalive every 30s to prevent timeout
-        last_keepalive = timezone.now()
-        
-        # Send initial connection message
-        yield f"data: {json.dumps({'type': 'connected', 'session_id': session_id})}\n\n"
-        
-        logger.info(f"📡 [SSE] Player connected to session {session_id}")
-        
-        while True:
-            try:
-                # Refresh session from database
-                session.refresh_from_db()
-                
-                # Check if session ended
-                if session.status == 'completed':
-                    yield f"data: {json.dumps({'type': 'ended', 'message': 'Quiz completed'})}\n\n"
-                    logger.info(f"🏁 [SSE] Quiz completed for session {session_id}")
-                    break
-                
-                # Detect status change
-                status_changed = session.status != last_status
-                
-                # NEW: When quiz starts (status changes to in_progress), send ALL questions
-                if status_changed and session.status == 'in_progress' and not quiz_started_sent:
-                    logger.info(f"🎬 [SSE] Quiz started! Sending all questions to players...")
-                    
-                    # Get ALL questions
-                    all_questions = QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number')
-                    
-                    questions_data = []
-                    for q in all_questions:
-                        questions_data.append({
-                            'id': q.id,
-                            'text': q.question_text,
-                            'round': q.round_number,
-                            'number': q.question_number,
-                            'genre': q.genre.name if q.genre else 'General',
-                            'difficulty': q.difficulty,
-                            'points': q.get_points_value(),
-                            'type': q.question_type,
-                            'options': q.options if q.question_type == 'multiple_choice' else None
-                        })
-                    
-                    # Timing configuration
-                    timing_config = {
-                        'seconds_per_question': 15,
-                        'halftime_duration': 90,
-                        'halftime_after_round': 1
-                    }
-                    
-                    data = {
-                        'type': 'quiz_started',
-                        'all_questions': questions_data,
-                        'timing': timing_config,
-                        'total_rounds': session.total_rounds,
-                        'questions_per_round': session.questions_per_round
-                    }
-                    
-                    yield f"data: {json.dumps(data)}\n\n"
-                    logger.info(f"✅ [SSE] Sent {len(questions_data)} questions to players")
-                    
-                    quiz_started_sent = True
-                    last_status = session.status
-                
-                # Handle other status changes
-                elif status_changed:
-                    if session.status == 'ready' or session.status == 'registration':
-                        yield f"data: {json.dumps({'type': 'waiting', 'message': 'Waiting for quiz to start', 'status': session.status})}\n\n"
-                    else:
-                        yield f"data: {json.dumps({'type': 'status_change', 'status': session.status})}\n\n"
-                    
-                    last_status = session.status
-                
-                # Check if data keepalive is needed (every 30 seconds)
-                current_time = timezone.now()
-                time_since_keepalive = (current_time - last_keepalive).total_seconds()
-                if time_since_keepalive >= 30:
-                    yield f"data: {json.dumps({'type': 'keepalive', 'timestamp': current_time.isoformat()})}\n\n"
-                    last_keepalive = current_time
-                
-                # Send comment-based heartbeat (lightweight, doesn't trigger client events)
-                yield f": heartbeat\n\n"
-                
-                # Wait before checking again (1 second)
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"SSE error for session {session_id}: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-                break
-    
-    response = StreamingHttpResponse(
-        event_generator(),
-        content_type='text/event-stream'
-    )
-    response['Cache-Control'] = 'no-cache'
-    response['X-Accel-Buffering'] = 'no'  # Disable nginx buffering
-    return response
+    session = get_session_by_code_or_id(session_id)
+    resume_from = last_event_id(request.headers.get('Last-Event-ID'), request.GET)
+    return stream_response(PlayerStream(session_id, session, resume_from) if session else None)
 
 
 @csrf_exempt
@@ -1062,164 +1180,9 @@ def host_stream(request, session_id):
     """
     SSE endpoint for host panel - provides stats, leaderboard, and question updates
     """
-    from django.core.cache import cache
-    
-    def event_generator():
-        """Generator for host-specific updates"""
-        session = get_session_by_code_or_id(session_id)
-        if not session:
-            yield f"data: {{\"type\": \"error\", \"message\": \"Session not found\"}}\n\n"
-            return
-        last_update_time = timezone.now()
-        last_status = session.status
-        last_round = session.current_round
-        last_question = session.current_question
-        last_progress = None
-        last_keepalive = timezone.now()  # Track last keepalive message
-        
-        # Send initial connection message
-        yield f"data: {json.dumps({'type': 'connected', 'session_id': session_id})}\n\n"
-        
-        while True:
-            try:
-                # Refresh session to get latest progress
-                session.refresh_from_db()
-                
-                # Check for generation progress
-                progress_data = session.generation_progress
-                if progress_data:
-                    logger.info(f"🔍 [SSE] Found progress data for {session_id}: {progress_data}")
-                    if progress_data != last_progress:
-                        logger.info(f"📤 [SSE] Sending progress update: {progress_data}")
-                        yield f"data: {json.dumps({'type': 'generation_progress', 'progress': progress_data['progress'], 'status': progress_data['status']})}\n\n"
-                        last_progress = progress_data
-                else:
-                    if last_progress is not None:
-                        logger.info(f"🔍 [SSE] No progress data for {session_id}")
-                
-                # Check if session ended
-                if session.status == 'completed':
-                    yield f"data: {json.dumps({'type': 'ended', 'message': 'Session completed'})}\n\n"
-                    break
-                
-                # Detect changes
-                status_changed = session.status != last_status
-                question_changed = (session.current_round != last_round or 
-                                  session.current_question != last_question)
-                
-                # Only send updates when something actually changed OR every 10 seconds for heartbeat
-                current_time = timezone.now()
-                time_diff = (current_time - last_update_time).total_seconds()
-                
-                # Send update if: status changed, question changed, or 10 seconds passed (heartbeat)
-                should_send_update = status_changed or question_changed or time_diff >= 10
-                
-                if should_send_update:
-                    # Get stats
-                    teams = session.teams.all()
-                    total_teams = teams.count()
-                    teams_answered = 0
-                    questions_generated = QuizQuestion.objects.filter(session=session).exists()
-                    
-                    if session.status == 'in_progress':
-                        current_q = QuizQuestion.objects.filter(
-                            session=session,
-                            round_number=session.current_round,
-                            question_number=session.current_question
-                        ).first()
-                        if current_q:
-                            teams_answered = TeamAnswer.objects.filter(question=current_q).count()
-                    
-                    # Get leaderboard
-                    leaderboard = []
-                    for team in teams.order_by('-total_score', 'team_name'):
-                        leaderboard.append({
-                            'team_name': team.team_name,
-                            'total_score': team.total_score,
-                            'table_number': team.table_number
-                        })
-                    
-                    # Get current question details if quiz is active
-                    question_data = None
-                    if session.status in ['in_progress', 'halftime', 'revealing_answer']:
-                        question = QuizQuestion.objects.filter(
-                            session=session,
-                            round_number=session.current_round,
-                            question_number=session.current_question
-                        ).first()
-                        
-                        if question:
-                            question_data = {
-                                'id': question.id,
-                                'text': question.question_text,
-                                'answer': question.correct_answer if session.status == 'revealing_answer' else None,
-                                'fun_fact': question.fun_fact if session.status == 'revealing_answer' else None,
-                                'round': question.round_number,
-                                'number': question.question_number,
-                                'type': question.question_type,
-                                'points': question.get_points_value(),
-                                'difficulty': question.difficulty,
-                                'genre': question.genre.name if question.genre else 'General',
-                                'options': question.options if question.question_type == 'multiple_choice' else None
-                            }
-                    
-                    # Send combined update
-                    data = {
-                        'type': 'host_update',
-                        'stats': {
-                            'total_teams': total_teams,
-                            'teams_answered': teams_answered,
-                            'status': session.status,
-                            'current_round': session.current_round,
-                            'current_question': session.current_question,
-                            'total_rounds': session.total_rounds,
-                            'questions_per_round': session.questions_per_round,
-                            'questions_generated': questions_generated,
-                            'auto_advance_enabled': session.auto_advance_enabled,
-                            'auto_advance_seconds': session.auto_advance_seconds,
-                            'auto_advance_paused': session.auto_advance_paused,
-                            'question_started_at': session.question_started_at.isoformat() if session.question_started_at else None
-                        },
-                        'leaderboard': leaderboard,
-                        'question': question_data,
-                        'timestamp': current_time.isoformat()
-                    }
-                    
-                    yield f"data: {json.dumps(data)}\n\n"
-                    
-                    last_update_time = current_time
-                    last_status = session.status
-                    last_round = session.current_round
-                    last_question = session.current_question
-                
-                # SSE keepalive strategy (best practices):
-                # 1. Comment lines (:) every 15s - prevents timeouts, no client traffic
-                # 2. Data messages every 30s - for monitoring/debugging
-                time_since_keepalive = (current_time - last_keepalive).total_seconds()
-                if time_since_keepalive >= 30:
-                    yield f"data: {json.dumps({'type': 'keepalive', 'timestamp': current_time.isoformat()})}\n\n"
-                    last_keepalive = current_time
-                    logger.debug(f"💓 [SSE] Data keepalive sent for session {session_id}")
-                
-                # Lightweight comment keepalive (every iteration = ~1s)
-                # This prevents proxy/Cloud Run timeouts without generating client events
-                yield f": heartbeat\n\n"
-                
-                # Wait 1 second before next check
-                time.sleep(1)
-                
-            except Exception as e:
-                logger.error(f"Host SSE error for session {session_id}: {e}")
-                yield f"data: {json.dumps({'type': 'error', 'message': str(e)})}\n\n"
-                break
-    
-    response = StreamingHttpResponse(
-        event_generator(),
-        content_type='text/event-stream'
-    )
-    response['Cache-Control'] = 'no-cache'
-    response['X-Accel-Buffering'] = 'no'
-    return response
+    session = get_session_by_code_or_id(session_id)
+    resume_from = last_event_id(request.headers.get('Last-Event-ID'), request.GET)
+    return stream_response(HostStream(session_id, session, resume_from) if session else None)
 
 
 @api_view(['GET'])
@@ -1265,6 +1228,8 @@ def submit_answer(request, question_id):
         ans.answer_text = answer_text
         ans.is_correct = is_correct
         ans.save()
+    
+    publish_answer_count(question)
         
     return Response({
         'success': True,
@@ -1293,6 +1258,7 @@ def record_buzz(request, question_id):
             ans.buzz_timestamp = timezone.now()
             ans.buzz_order = order
             ans.save()
+            publish_answer_count(question)
             
             return Response({
                 'success': True,
@@ -1328,49 +1294,56 @@ def submit_all_answers(request, session_id):
         
         logger.info(f"📥 [SUBMIT_ALL] Receiving {len(answers)} answers from team {team.team_name}")
         
+        # Every question of the session in one query, graded in memory
+        questions = {
+            q.id: q for q in QuizQuestion.objects.filter(session=session).only(
+                'id', 'round_number', 'question_number', 'question_type',
+                'correct_answer', 'correct_option', 'alternative_answers', 'answer_keys'
+            )
+        }
+
         saved_count = 0
+        current_question = None  # the one the host panel counts answers for
+        team_answers = {}  # question id -> TeamAnswer (a repeated question keeps the last answer)
+        now = timezone.now()
         for ans_data in answers:
             question_id = ans_data.get('question_id')
             answer_text = ans_data.get('answer', '')
             is_multiple_choice = ans_data.get('is_multiple_choice', False)
-            
+
             try:
-                question = QuizQuestion.objects.get(id=question_id, session=session)
-                
-                # Check if correct
-                is_correct = False
-                if is_multiple_choice and question.question_type == 'multiple_choice':
-                    is_correct = (answer_text.upper() == question.correct_option.upper())
-                else:
-                    # For written answers, compare against correct answer and alternatives
-                    answer_lower = answer_text.lower().strip()
-                    correct_lower = question.correct_answer.lower().strip()
-                    is_correct = (answer_lower == correct_lower)
-                    
-                    # Check alternatives
-                    if not is_correct and question.alternative_answers:
-                        for alt in question.alternative_answers:
-                            if answer_lower == alt.lower().strip():
-                                is_correct = True
-                                break
-                
-                # Save or update answer
-                team_answer, created = TeamAnswer.objects.update_or_create(
-                    team=team,
-                    question=question,
-                    defaults={
-                        'answer_text': answer_text,
-                        'is_correct': is_correct,
-                        'submitted_at': timezone.now()
-                    }
-                )
-                saved_count += 1
-                
-            except QuizQuestion.DoesNotExist:
+                question = questions.get(int(question_id))
+            except (TypeError, ValueError):
+                question = None
+            if question is None:
                 logger.warning(f"⚠️ [SUBMIT_ALL] Question {question_id} not found")
                 continue
-        
+
+            is_correct, confidence = grade_answer(question, answer_text, is_multiple_choice)
+            team_answers[question.id] = TeamAnswer(
+                team=team,
+                question=question,
+                answer_text=answer_text,
+                is_correct=is_correct,
+                match_confidence=confidence,
+                submitted_at=now
+            )
+            saved_count += 1
+            if (question.round_number, question.question_number) == (session.current_round, session.current_question):
+                current_question = question
+
+        # Save or update all answers in one statement
+        with transaction.atomic():
+            TeamAnswer.objects.bulk_create(
+                team_answers.values(),
+                update_conflicts=True,
+                unique_fields=['team', 'question'],
+                update_fields=['answer_text', 'is_correct', 'match_confidence', 'submitted_at']
+            )
+
         logger.info(f"✅ [SUBMIT_ALL] Saved {saved_count}/{len(answers)} answers for team {team.team_name}")
+        if current_question:
+            publish_answer_count(current_question)
         
         return Response({
             'success': True,
@@ -1383,6 +1356,44 @@ def submit_all_answers(request, session_id):
         return Response({'error': str(e)}, status=500)
 
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+def answers_to_review(request, session_id):
+    """
+    Written answers the fuzzy grading wasn't sure about, for the host to check
+    (accepted near-matches and close misses - fix with award_points)
+    """
+    try:
+        session = get_session_by_code_or_id(session_id)
+        if not session:
+            return Response({'error': 'Session not found'}, status=404)
+
+        answers = TeamAnswer.objects.filter(
+            team__session=session,
+            match_confidence__gte=REVIEW_MIN_CONFIDENCE,
+            match_confidence__lt=REVIEW_CONFIDENCE
+        ).select_related('team', 'question').order_by('question__round_number', 'question__question_number', 'match_confidence')
+
+        return Response({
+            'success': True,
+            'answers': [{
+                'answer_id': a.id,
+                'team_id': a.team_id,
+                'team_name': a.team.team_name,
+                'question_id': a.question_id,
+                'round': a.question.round_number,
+                'number': a.question.question_number,
+                'answer_text': a.answer_text,
+                'correct_answer': a.question.correct_answer,
+                'is_correct': a.is_correct,
+                'confidence': a.match_confidence,
+            } for a in answers]
+        })
+    except Exception as e:
+        logger.error(f"❌ [REVIEW_ANSWERS] Error: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+
 # ============================================================================
 # LEADERBOARD Y ESTADÍSTICAS
 # ============================================================================
@@ -1404,6 +1415,7 @@ def award_points(request, team_id):
         
         team.total_score += points
         team.save()
+        publish_team_update(team)
         
         return Response({
             'success': True,
@@ -1414,71 +1426,6 @@ def award_points(request, team_id):
         return Response({'success': False, 'error': str(e)}, status=status.HTTP_400_BAD_REQUEST)
 
 
-@api_view(['POST'])
-@permission_classes([AllowAny])
-def generate_quiz_tts(request):
-    """Generate TTS audio for quiz questions"""
-    import os
-    import requests
-    
-    ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', '')
-    ELEVENLABS_VOICE_ID = os.getenv('ELEVENLABS_VOICE_ID', '21m00Tcm4TlvDq8ikWAM')
-    
-    if not ELEVENLABS_API_KEY:
-        return Response({'error': 'ElevenLabs API key not configured'}, status=500)
-    
-    try:
-        text = request.data.get('text', '')
-        voice_id = request.data.get('voice_id', ELEVENLABS_VOICE_ID)
-        
-        logger.info(f"🎤 [TTS] Received request for text: {text[:100]}... (voice: {voice_id})")
-        
-        if not text:
-            logger.error("❌ [TTS] No text provided")
-            return Response({'error': 'No text provided'}, status=400)
-        
-        logger.info(f"🎙️ [TTS] Calling ElevenLabs API...")
-        url = f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
-        
-        response = requests.post(
-            url,
-            headers={
-                'xi-api-key': ELEVENLABS_API_KEY,
-                'Content-Type': 'application/json'
-            },
-            json={
-                'text': text,
-                'model_id': 'eleven_turbo_v2_5',
-                'voice_settings': {
-                    'stability': 0.35,
-                    'similarity_boost': 0.85,
-                    'style': 0.5,
-                    'use_speaker_boost': True
-                },
-                'optimize_streaming_latency': 1,
-                'output_format': 'mp3_44100_128'
-            }
-        )
-        
-        logger.info(f"📡 [TTS] ElevenLabs response status: {response.status_code}")
-        
-        if not response.ok:
-            logger.error(f"❌ [TTS] ElevenLabs API error: {response.status_code}")
-            logger.error(f"❌ [TTS] Error details: {response.text}")
-            return Response({
-                'error': f'ElevenLabs API error: {response.status_code}',
-                'details': response.text
-            }, status=response.status_code)
-        
-        logger.info(f"✅ [TTS] ElevenLabs returned {len(response.content)} bytes")
-        return HttpResponse(response.content, content_type='audio/mpeg')
-        
-    except Exception as e:
-        logger.error(f"❌ [TTS] Error generating audio: {str(e)}")
-        logger.error(f"❌ [TTS] Error type: {type(e).__name__}")
-        return Response({'error': str(e)}, status=500)
-
-
 @api_view(['GET', 'POST'])
 def initialize_quiz_genres(request):
     """Endpoint para inicializar los 50 géneros"""
@@ -1499,19 +1446,11 @@ def initialize_quiz_genres(request):
 
 @api_view(['POST'])
 def generate_quiz_tts(request):
-    """Genera audio TTS para preguntas del quiz usando ElevenLabs"""
-    import requests
+    """Genera audio TTS para preguntas del quiz usando ElevenLabs (con caché)"""
+    from .tts_cache import TTSError, audio_response, cache_key, get_cache, tts_params
     
     ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', '')
     
-    # Voice IDs de ElevenLabs
-    VOICE_MAP = {
-        'daniel': 'onwK4e9ZLuTAKqWW03F9',      # Daniel (Male British)
-        'charlotte': '21m00Tcm4TlvDq8ikWAM',   # Charlotte (Female British) 
-        'callum': 'N2lVS1w4EtoT3dr4eOWO',      # Callum (Male British)
-        'alice': 'Xb7hH8MSUJpSbSDYk0k2'        # Alice (Female British)
-    }
-    
     if not ELEVENLABS_API_KEY:
         return Response({'error': 'ElevenLabs API key not configured'}, status=500)
     
@@ -1522,49 +1461,22 @@ def generate_quiz_tts(request):
         if not text:
             return Response({'error': 'No text provided'}, status=400)
         
-        # Obtener voice ID real
-        voice_id = VOICE_MAP.get(voice_id_name, VOICE_MAP['daniel'])
-        
-        url = f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
-        
-        # Use streaming for faster response
-        response = requests.post(
-            url,
-            headers={
-                'xi-api-key': ELEVENLABS_API_KEY,
-                'Content-Type': 'application/json'
-            },
-            json={
-                'text': text,
-                'model_id': 'eleven_turbo_v2_5',
-                'voice_settings': {
-                    'stability': 0.35,
-                    'similarity_boost': 0.85,
-                    'style': 0.5,
-                    'use_speaker_boost': True
-                },
-                'optimize_streaming_latency': 1,
-                'output_format': 'mp3_44100_128'
-            },
-            timeout=45,  # Keep for cold starts
-            stream=True  # Enable streaming
-        )
-        
-        if not response.ok:
-            logger.error(f'ElevenLabs API error: {response.status_code} - {response.text}')
-            return Response({
-                'error': f'ElevenLabs API error: {response.status_code}',
-                'details': response.text
-            }, status=response.status_code)
-        
-        # Stream audio chunks instead of waiting for complete response
-        def audio_stream():
-            for chunk in response.iter_content(chunk_size=4096):
-                if chunk:
-                    yield chunk
-        
-        return StreamingHttpResponse(audio_stream(), content_type='audio/mpeg')
+        cache = get_cache()
+        params = tts_params(text, quiz_audio.voice_id(voice_id_name))
+        cached = cache.get(cache_key(params))
+        if cached is not None:
+            return audio_response(request, cached)
+        
+        # Not said before: stream audio chunks as they arrive (cached once complete)
+        key, chunks, tier = cache.stream(params, ELEVENLABS_API_KEY, timeout=45)  # Keep for cold starts
+        response = StreamingHttpResponse(chunks, content_type='audio/mpeg')
+        response['X-TTS-Cache'] = tier
+        response['X-TTS-Key'] = key
+        return response
         
+    except TTSError as e:
+        logger.error(f'ElevenLabs API error: {e.status} - {e.details}')
+        return Response({'error': str(e), 'details': e.details}, status=e.status)
     except Exception as e:
         logger.error(f'TTS generation error: {e}')
         return Response({'error': str(e)}, status=500)
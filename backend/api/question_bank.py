@@ -0,0 +1,299 @@
+"""
+Pub Quiz Question Bank
+Pre-generated questions per genre x type x difficulty, so a quiz can be
+assembled from the database in milliseconds instead of waiting on OpenAI
+
+The bank is filled offline in bulk (python manage.py fill_question_bank) and
+topped up in the background whenever a quiz leaves a genre low on stock.
+Every question handed to a session is recorded against its venue (normalised
+venue name), and a venue never gets the same bank question twice. Rounds the
+bank can't fill are generated live as before.
+
+Refills ask a question source for new questions:
+    'openai' - PubQuizGenerator's GPT-4o-mini prompt (needs OPENAI_API_KEY)
+    'local'  - LocalQuestionSource, a stand-in with no network access that
+               writes random-word placeholder questions (dev machines, tests)
+"""
+
+import os
+import random
+import secrets
+import logging
+import threading
+from typing import Callable, Dict, Iterable, List, Optional
+
+from django.db import connection
+
+from .pub_quiz_models import BankQuestion, BankQuestionUse, QuizGenre
+from .question_dedup import DuplicateIndex, bank_index, question_signature
+
+logger = logging.getLogger(__name__)
+
+QUESTION_BANK_ENABLED = os.getenv('QUESTION_BANK_ENABLED', 'true').lower() == 'true'
+QUESTION_BANK_SOURCE = os.getenv('QUESTION_BANK_SOURCE', 'openai')
+# A venue with fewer unused questions than this in a genre triggers a top-up
+QUESTION_BANK_LOW_STOCK = int(os.getenv('QUESTION_BANK_LOW_STOCK', '40'))
+# Questions per type added by one top-up
+QUESTION_BANK_REFILL_BATCH = int(os.getenv('QUESTION_BANK_REFILL_BATCH', '20'))
+
+QUESTION_TYPES = ('multiple_choice', 'written')
+DIFFICULTIES = ('easy', 'medium', 'hard')
+
+# (genre_name, count, question_type, difficulty_mix) -> generator-format question dicts
+QuestionSource = Callable[[str, int, str, Optional[Dict[str, int]]], List[Dict]]
+
+
+# ============================================================================
+# Sources
+# ============================================================================
+
+class LocalQuestionSource:
+    """Stand-in for the LLM: placeholder questions made of random words, no network"""
+
+    def __call__(self, genre_name: str, count: int, question_type: str,
+                 difficulty_mix: Optional[Dict[str, int]] = None) -> List[Dict]:
+        questions = []
+        for difficulty in split_difficulty(count, difficulty_mix):
+            # Random words, so placeholders are as different from each other as real questions
+            words = [secrets.token_hex(3) for _ in range(4)]
+            answer = secrets.token_hex(3)
+            question = {
+                'question': f"Practice question {' '.join(words)}?",
+                'answer': answer,
+                'alternative_answers': [],
+                'difficulty': difficulty,
+                'fun_fact': f'Placeholder {genre_name} question from the local question source',
+                'question_type': question_type,
+                'options': {},
+                'correct_option': '',
+            }
+            if question_type == 'multiple_choice':
+                letter = random.choice('ABCD')
+                question['options'] = {
+                    option: (answer if option == letter else secrets.token_hex(3)) for option in 'ABCD'
+                }
+                question['correct_option'] = letter
+            questions.append(question)
+        return questions
+
+
+_local_source = LocalQuestionSource()
+
+
+def _openai_source(genre_name: str, count: int, question_type: str,
+                   difficulty_mix: Optional[Dict[str, int]] = None) -> List[Dict]:
+    from .pub_quiz_generator import PubQuizGenerator
+
+    if not os.getenv('OPENAI_API_KEY'):
+        raise ValueError("OPENAI_API_KEY is not set (use the 'local' source)")
+    # On API errors the generator would fall back to its few sample questions - don't bank those
+    return PubQuizGenerator().generate_questions(genre_name, count, question_type, difficulty_mix, fallback=False)
+
+
+def question_source(name: Optional[str] = None) -> QuestionSource:
+    """Question source by name (default QUESTION_BANK_SOURCE)"""
+    name = name or QUESTION_BANK_SOURCE
+    if name == 'local':
+        return _local_source
+    if name == 'openai':
+        return _openai_source
+    raise ValueError(f"Unknown question source '{name}' (use 'openai' or 'local')")
+
+
+# ============================================================================
+# Helpers
+# ============================================================================
+
+def venue_key(venue_name: str) -> str:
+    return ' '.join((venue_name or '').lower().split())
+
+
+def split_difficulty(count: int, difficulty_mix: Optional[Dict[str, int]] = None) -> List[str]:
+    """Difficulty of each of `count` questions, scaled from the easy/medium/hard mix like the OpenAI prompt"""
+    mix = difficulty_mix or {'easy': 3, 'medium': 4, 'hard': 3}
+    total = sum(mix.values())
+    if total == 0:
+        mix, total = {'easy': 1, 'medium': 1, 'hard': 1}, 3
+    ratio = count / total
+    easy = min(round(mix.get('easy', 0) * ratio), count)
+    medium = min(round(mix.get('medium', 0) * ratio), count - easy)
+    return ['easy'] * easy + ['medium'] * medium + ['hard'] * (count - easy - medium)
+
+
+def split_types(count: int, question_types: Optional[Dict[str, float]] = None) -> Dict[str, int]:
+    """Questions of each type in a round, like PubQuizGenerator.generate_sample_questions"""
+    question_types = question_types or {'multiple_choice': 0.7, 'written': 0.3}
+    num_mc = int(count * question_types.get('multiple_choice', 0.7))
+    return {'multiple_choice': num_mc, 'written': count - num_mc}
+
+
+def to_generated(question: BankQuestion) -> Dict:
+    """Bank question in the format PubQuizGenerator returns"""
+    return {
+        'bank_id': question.id,
+        'question': question.question_text,
+        'answer': question.correct_answer,
+        'alternative_answers': question.alternative_answers,
+        'difficulty': question.difficulty,
+        'question_type': question.question_type,
+        'options': question.options,
+        'correct_option': question.correct_option,
+        'fun_fact': question.fun_fact,
+        'hints': question.hints,
+        'minhash': question.minhash,
+    }
+
+
+# ============================================================================
+# Bank
+# ============================================================================
+
+def add_questions(genre: QuizGenre, questions: Iterable[Dict], source: str = 'openai') -> int:
+    """Store generated questions in the bank, minus near-duplicates of banked ones; returns how many were added"""
+    valid = [
+        q_data for q_data in questions
+        if q_data.get('question') and q_data.get('answer') and q_data.get('question_type', 'written') in QUESTION_TYPES
+    ]
+    new, duplicates = bank_index(genre).drop_duplicates(valid)
+    if duplicates:
+        logger.info(f"🏦 [QUESTION_BANK] {genre.name}: dropped {len(duplicates)} near-duplicate questions")
+
+    rows = []
+    for q_data in new:
+        question_type = q_data.get('question_type', 'written')
+        rows.append(BankQuestion(
+            genre=genre,
+            question_type=question_type,
+            difficulty=q_data.get('difficulty') if q_data.get('difficulty') in DIFFICULTIES else 'medium',
+            question_text=q_data['question'],
+            correct_answer=q_data['answer'][:500],
+            alternative_answers=q_data.get('alternative_answers') or [],
+            options=q_data.get('options') or {},
+            correct_option=q_data.get('correct_option') or '',
+            fun_fact=q_data.get('fun_fact') or '',
+            hints=q_data.get('hints') or '',
+            minhash=question_signature(q_data),
+            source=source,
+        ))
+    BankQuestion.objects.bulk_create(rows)
+    return len(rows)
+
+
+def available(genre: QuizGenre, venue_name: str):
+    """Bank questions of a genre not yet used at this venue"""
+    return BankQuestion.objects.filter(genre=genre).exclude(uses__venue_key=venue_key(venue_name))
+
+
+def stock(genre: QuizGenre, venue_name: str) -> int:
+    return available(genre, venue_name).count()
+
+
+def draw_round(genre: QuizGenre, venue_name: str, count: int,
+               question_types: Optional[Dict[str, float]] = None,
+               difficulty_mix: Optional[Dict[str, int]] = None,
+               index: Optional[DuplicateIndex] = None) -> Optional[List[Dict]]:
+    """
+    A round of `count` unused questions from the bank (generator format, numbered)
+
+    Follows the type split exactly and the difficulty mix as far as stock
+    allows (a missing easy question is replaced by another of the same type).
+    Questions `index` knows in other words (asked at the venue as live
+    questions) are skipped too.
+
+    Returns:
+        The questions, or None if the bank can't fill the round
+    """
+    pool: Dict[str, Dict[str, List[int]]] = {t: {d: [] for d in DIFFICULTIES} for t in QUESTION_TYPES}
+    for question_id, question_type, difficulty in available(genre, venue_name).values_list(
+            'id', 'question_type', 'difficulty'):
+        if question_type in pool and difficulty in DIFFICULTIES:
+            pool[question_type][difficulty].append(question_id)
+
+    questions = []
+    for question_type, type_count in split_types(count, question_types).items():
+        by_difficulty = pool[question_type]
+        for ids in by_difficulty.values():
+            random.shuffle(ids)
+        # Preferred order: the difficulty mix first, then anything of this type
+        ordered = []
+        for difficulty in split_difficulty(type_count, difficulty_mix):
+            if by_difficulty[difficulty]:
+                ordered.append(by_difficulty[difficulty].pop())
+        ordered += [question_id for ids in by_difficulty.values() for question_id in ids]
+
+        taken = []
+        while len(taken) < type_count:
+            batch, ordered = ordered[:type_count - len(taken)], ordered[type_count - len(taken):]
+            if not batch:
+                return None
+            by_id = {question.id: question for question in BankQuestion.objects.filter(id__in=batch)}
+            for question_id in batch:
+                q_data = to_generated(by_id[question_id])
+                if index is None or not index.is_duplicate(q_data):
+                    taken.append(q_data)
+        questions += taken
+
+    random.shuffle(questions)
+    for number, question in enumerate(questions, 1):
+        question['question_number'] = number
+    return questions
+
+
+def record_use(session, questions: Iterable[Dict]):
+    """Mark the bank questions a session got as used at its venue"""
+    key = venue_key(session.venue_name)
+    BankQuestionUse.objects.bulk_create(
+        [BankQuestionUse(question_id=q['bank_id'], venue_key=key, session=session) for q in questions if q.get('bank_id')],
+        ignore_conflicts=True
+    )
+
+
+def refill(genre: QuizGenre, per_type: int = QUESTION_BANK_REFILL_BATCH,
+           source: Optional[str] = None, difficulty_mix: Optional[Dict[str, int]] = None) -> int:
+    """Generate `per_type` new questions of each type for a genre; returns how many were banked"""
+    source_name = source or QUESTION_BANK_SOURCE
+    generate = question_source(source_name)
+    added = 0
+    for question_type in QUESTION_TYPES:
+        added += add_questions(genre, generate(genre.name, per_type, question_type, difficulty_mix), source=source_name)
+    logger.info(f"🏦 [QUESTION_BANK] {genre.name}: +{added} questions ({source_name})")
+    return added
+
+
+# ============================================================================
+# Background top-up
+# ============================================================================
+
+_refilling = set()
+_refilling_lock = threading.Lock()
+
+
+def top_up(genres: Iterable[QuizGenre], venue_name: str, low_stock: int = QUESTION_BANK_LOW_STOCK,
+           source: Optional[str] = None) -> Optional[threading.Thread]:
+    """Refill, on a background thread, the genres this venue is running low on"""
+    if (source or QUESTION_BANK_SOURCE) == 'openai' and not os.getenv('OPENAI_API_KEY'):
+        return None  # nothing to refill from
+    low = [genre for genre in genres if stock(genre, venue_name) < low_stock]
+    with _refilling_lock:
+        low = [genre for genre in low if genre.id not in _refilling]
+        _refilling.update(genre.id for genre in low)
+    if not low:
+        return None
+
+    def run():
+        try:
+            for genre in low:
+                try:
+                    refill(genre, source=source)
+                except Exception as e:
+                    logger.error(f"❌ [QUESTION_BANK] Refill of {genre.name} failed: {e}")
+                finally:
+                    with _refilling_lock:
+                        _refilling.discard(genre.id)
+        finally:
+            connection.close()  # this thread's connection
+
+    logger.info(f"🏦 [QUESTION_BANK] Low stock at '{venue_name}': topping up {[g.name for g in low]}")
+    thread = threading.Thread(target=run, daemon=True)
+    thread.start()
+    return thread
@@ -0,0 +1,173 @@
+"""
+Pub Quiz Question De-duplication
+Near-duplicate detection for generated questions, so a venue's regulars
+don't get the same question twice (in one quiz or weeks apart)
+
+A question (text + answer) is normalised like the answers are (see
+answer_matching) and cut into character shingles; a MinHash signature of
+NUM_PERM values estimates how much two questions' shingles overlap:
+
+    "What is the capital city of France?" / "Paris"
+    "Name the capital of France" / "Paris"              -> ~0.52, duplicate
+    "Which French city has the Eiffel Tower?" / "Paris" -> ~0.08, different
+    "What is the capital city of Germany?" / "Berlin"   -> ~0.22, different
+
+Signatures are computed once, when a question is saved (QuizQuestion.minhash,
+BankQuestion.minhash). A DuplicateIndex buckets them by LSH bands (BANDS x
+ROWS), so checking a new question only compares it with the few stored
+questions that share a band, not with the whole history. Rows are short
+enough that paraphrases just over DUPLICATE_SIMILARITY still share a band.
+"""
+
+import os
+import hashlib
+import operator
+import random
+from collections import defaultdict
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from .answer_matching import normalize_answer
+
+# Estimated shingle overlap from which two questions count as the same question
+DUPLICATE_SIMILARITY = float(os.getenv('QUESTION_DUPLICATE_SIMILARITY', '0.5'))
+# Replacement requests for a round that came back with near-duplicates
+DUPLICATE_RETRIES = 2
+# How far back a venue's questions are checked
+DUPLICATE_HISTORY_DAYS = int(os.getenv('QUESTION_DUPLICATE_HISTORY_DAYS', '365'))
+
+SHINGLE_SIZE = 4
+NUM_PERM = 64
+BANDS, ROWS = 21, 3  # pairs share a band (get compared): at 0.5 ~94% of the time, 0.6 ~99%, 0.7 ~100%
+
+STOPWORDS = {
+    'what', 'which', 'who', 'whom', 'whose', 'when', 'where', 'why', 'how',
+    'is', 'are', 'was', 'were', 'be', 'been', 'did', 'does', 'do', 'has', 'have', 'had',
+    'the', 'a', 'an', 'of', 'in', 'on', 'at', 'to', 'for', 'by', 'with', 'from', 'and', 'or',
+    'this', 'that', 'these', 'those', 'its', 'it', 'name', 'whats', 'whos',
+}
+
+# One 64-bit hash per shingle, XORed with a random mask per "permutation" (cheaper than
+# (a*x + b) mod p and as good for hashes that are already uniform). Fixed seed: stored
+# signatures must stay comparable
+_rng = random.Random(20240501)
+_MASKS = [_rng.getrandbits(64) for _ in range(NUM_PERM)]
+
+
+# ============================================================================
+# Signatures
+# ============================================================================
+
+def _hash(shingle: str) -> int:
+    return int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'little')
+
+
+def question_shingles(question_text: str, answer: str = '') -> List[int]:
+    """Hashed character shingles of a question's content words and its answer"""
+    words = [word for word in normalize_answer(question_text).split() if word not in STOPWORDS]
+    text = ' '.join(words + ['|'] + normalize_answer(answer).split())
+    if len(text) <= SHINGLE_SIZE:
+        return [_hash(text)]
+    return list({_hash(text[i:i + SHINGLE_SIZE]) for i in range(len(text) - SHINGLE_SIZE + 1)})
+
+
+def signature(question_text: str, answer: str = '') -> List[int]:
+    """MinHash signature (NUM_PERM ints) of a question"""
+    shingles = question_shingles(question_text, answer)
+    return [min(x ^ mask for x in shingles) for mask in _MASKS]
+
+
+def similarity(sig_a: List[int], sig_b: List[int]) -> float:
+    """Estimated shingle overlap (Jaccard) of two questions"""
+    return sum(map(operator.eq, sig_a, sig_b)) / NUM_PERM
+
+
+def question_signature(q_data: Dict) -> List[int]:
+    """Signature of a generator-format question, computed once and kept on the dict"""
+    if not q_data.get('minhash'):
+        q_data['minhash'] = signature(q_data.get('question', ''), q_data.get('answer', ''))
+    return q_data['minhash']
+
+
+# ============================================================================
+# Index
+# ============================================================================
+
+class DuplicateIndex:
+    """Signatures of known questions, bucketed by LSH band"""
+
+    def __init__(self, threshold: float = DUPLICATE_SIMILARITY):
+        self.threshold = threshold
+        self.signatures: Dict[object, List[int]] = {}
+        self.bands: List[Dict[Tuple[int, ...], List[object]]] = [defaultdict(list) for _ in range(BANDS)]
+
+    def __len__(self) -> int:
+        return len(self.signatures)
+
+    def add(self, key, sig: List[int]):
+        if len(sig) != NUM_PERM:
+            return  # not computed (yet) - can't be indexed
+        self.signatures[key] = sig
+        for band, bucket in enumerate(self.bands):
+            bucket[tuple(sig[band * ROWS:(band + 1) * ROWS])].append(key)
+
+    def find(self, sig: List[int]) -> Optional[Tuple[object, float]]:
+        """Most similar known question at or above the threshold: (key, similarity), or None"""
+        candidates = set()
+        for band, bucket in enumerate(self.bands):
+            candidates.update(bucket.get(tuple(sig[band * ROWS:(band + 1) * ROWS]), ()))
+        best = None
+        for key in candidates:
+            score = similarity(sig, self.signatures[key])
+            if score >= self.threshold and (best is None or score > best[1]):
+                best = (key, score)
+        return best
+
+    def is_duplicate(self, q_data: Dict) -> bool:
+        return self.find(question_signature(q_data)) is not None
+
+    def add_question(self, q_data: Dict):
+        self.add(('bank', q_data['bank_id']) if q_data.get('bank_id') else ('new', len(self.signatures)),
+                 question_signature(q_data))
+
+    def drop_duplicates(self, questions: Iterable[Dict]) -> Tuple[List[Dict], List[Dict]]:
+        """
+        Split generated questions into new ones (added to the index) and near-duplicates
+
+        Returns:
+            (kept, dropped)
+        """
+        kept, dropped = [], []
+        for q_data in questions:
+            if self.is_duplicate(q_data):
+                dropped.append(q_data)
+            else:
+                self.add_question(q_data)
+                kept.append(q_data)
+        return kept, dropped
+
+
+def venue_index(venue_name: str) -> DuplicateIndex:
+    """Questions asked at a venue (any session, last DUPLICATE_HISTORY_DAYS days)"""
+    from .pub_quiz_models import QuizQuestion
+
+    index = DuplicateIndex()
+    rows = QuizQuestion.objects.filter(
+        session__venue_name__iexact=(venue_name or '').strip(),
+        session__date__gte=timezone.now() - timedelta(days=DUPLICATE_HISTORY_DAYS)
+    ).values_list('id', 'minhash')
+    for question_id, sig in rows:
+        index.add(('question', question_id), sig)
+    return index
+
+
+def bank_index(genre) -> DuplicateIndex:
+    """Questions already in the bank for a genre"""
+    from .pub_quiz_models import BankQuestion
+
+    index = DuplicateIndex()
+    for question_id, sig in BankQuestion.objects.filter(genre=genre).values_list('id', 'minhash'):
+        index.add(('bank', question_id), sig)
+    return index
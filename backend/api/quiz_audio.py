@@ -0,0 +1,193 @@
+"""
+Pub Quiz Audio Pre-rendering
+Synthesises everything the host panel will say before the quiz starts, so no
+question waits on ElevenLabs once the quiz is live
+
+Once generate_quiz_questions has saved the rounds, a background task renders
+every line - round intros, each question, its answer reveal and its fun fact -
+with QUIZ_AUDIO_WORKERS requests in flight at most (ElevenLabs limits
+concurrent requests per account, see tts_cache.render_batch). Clips go into the TTS cache (tts_cache) with
+exactly the text and voice the host panel asks for, and their keys are stored
+on the question (QuizQuestion.audio).
+
+The host panel fetches the manifest (GET /api/pub-quiz/<code>/audio-manifest)
+and preloads the clips that are ready; anything missing is still synthesised
+on demand through /api/pub-quiz/tts, and then comes from the cache too.
+"""
+
+import os
+import time
+import uuid
+import logging
+import threading
+from typing import Callable, Dict, List, Optional
+
+from django.db import connection
+from django.utils import timezone
+
+from . import quiz_events
+from .models import TaskStatus
+from .pub_quiz_models import QuizQuestion
+from .tts_cache import CachedAudio, cache_key, get_cache, render_batch, tts_params
+
+logger = logging.getLogger(__name__)
+
+QUIZ_AUDIO_WORKERS = int(os.getenv('QUIZ_AUDIO_WORKERS', '4'))
+QUIZ_AUDIO_TASK_TYPE = 'quiz_audio'
+
+# Voice IDs de ElevenLabs
+QUIZ_VOICES = {
+    'daniel': 'onwK4e9ZLuTAKqWW03F9',      # Daniel (Male British)
+    'charlotte': '21m00Tcm4TlvDq8ikWAM',   # Charlotte (Female British)
+    'callum': 'N2lVS1w4EtoT3dr4eOWO',      # Callum (Male British)
+    'alice': 'Xb7hH8MSUJpSbSDYk0k2'        # Alice (Female British)
+}
+HOST_VOICE = 'daniel'  # what the host panel reads questions with
+
+# params -> clip (default: the TTS cache, calling ElevenLabs on a miss)
+Renderer = Callable[[Dict], CachedAudio]
+
+
+def voice_id(voice: str) -> str:
+    return QUIZ_VOICES.get(voice, QUIZ_VOICES[HOST_VOICE])
+
+
+# ============================================================================
+# Lines
+# ============================================================================
+
+def question_lines(question: QuizQuestion) -> Dict[str, str]:
+    """What the host panel says for a question, by part (same wording as pub-quiz-host.html)"""
+    lines = {
+        'question': question.question_text,
+        'answer': f'The correct answer is: {question.correct_answer}',
+    }
+    if question.fun_fact:
+        lines['fun_fact'] = question.fun_fact
+    return lines
+
+
+def session_lines(session) -> List[Dict]:
+    """Every line of a session: {text, part, round, question_id}, in the order they're said"""
+    lines = []
+    questions = QuizQuestion.objects.filter(session=session).select_related('genre').order_by(
+        'round_number', 'question_number')
+    for question in questions:
+        if question.question_number == 1:
+            # Two clips, as the host panel says them
+            for text in (f'Round {question.round_number}: {question.get_genre_name()}', 'Here comes the first question.'):
+                lines.append({'text': text, 'part': 'round_intro', 'round': question.round_number,
+                              'question_id': None})
+        for part, text in question_lines(question).items():
+            lines.append({'text': text, 'part': part, 'round': question.round_number,
+                          'question_id': question.id})
+    return lines
+
+
+def manifest(session, voice: str = HOST_VOICE) -> List[Dict]:
+    """The session's lines with their clip key and URL, and whether the clip is cached yet"""
+    cache = get_cache()
+    entries, seen = [], set()
+    for line in session_lines(session):
+        key = cache_key(tts_params(line['text'], voice_id(voice)))
+        if line['question_id'] is None and key in seen:
+            continue  # "Here comes the first question." once per quiz
+        seen.add(key)
+        entries.append({**line, 'voice': voice, 'key': key, 'url': f'/api/tts/{key}',
+                        'ready': cache.contains(key)})
+    return entries
+
+
+# ============================================================================
+# Pre-rendering
+# ============================================================================
+
+def prerender_session(session, render: Optional[Renderer] = None, voice: str = HOST_VOICE,
+                      workers: int = QUIZ_AUDIO_WORKERS,
+                      on_progress: Optional[Callable[[int, int], None]] = None) -> Dict:
+    """
+    Synthesise every line of a session that isn't cached yet and store the
+    clip keys on its questions
+
+    Returns:
+        {'clips', 'rendered', 'cached', 'failed', 'seconds'} (clips: distinct lines)
+    """
+    if render is None:
+        api_key = os.getenv('ELEVENLABS_API_KEY', '')
+        render = lambda params: get_cache().synthesize(params, api_key)
+
+    started = time.perf_counter()
+    entries = manifest(session, voice)
+    keys = {entry['key'] for entry in entries}
+    cached = len({entry['key'] for entry in entries if entry['ready']})
+    failed = render_batch([tts_params(entry['text'], voice_id(voice)) for entry in entries], render,
+                          workers=workers, on_progress=on_progress)
+
+    # Clip keys on the questions (including clips another quiz had already cached)
+    audio_by_question: Dict[int, Dict[str, str]] = {}
+    for entry in entries:
+        if entry['question_id'] and entry['key'] not in failed:
+            audio_by_question.setdefault(entry['question_id'], {})[entry['part']] = entry['key']
+    questions = list(QuizQuestion.objects.filter(id__in=audio_by_question).only('id', 'audio'))
+    for question in questions:
+        question.audio = audio_by_question[question.id]
+    QuizQuestion.objects.bulk_update(questions, ['audio'])
+
+    summary = {
+        'clips': len(keys),
+        'rendered': len(keys) - cached - len(failed),
+        'cached': cached,
+        'failed': len(failed),
+        'seconds': round(time.perf_counter() - started, 2),
+    }
+    logger.info(f"🔊 [QUIZ_AUDIO] Session {session.session_code}: {summary}")
+    return summary
+
+
+def active_task(session) -> Optional[TaskStatus]:
+    return TaskStatus.objects.filter(
+        task_type=QUIZ_AUDIO_TASK_TYPE, metadata__session_id=session.id, status__in=['pending', 'processing']
+    ).order_by('-started_at').first()
+
+
+def start_prerender(session, render: Optional[Renderer] = None) -> Optional[str]:
+    """
+    Pre-render a session's audio on a background thread
+
+    Returns:
+        The task id (GET /api/tasks/<id>), or None if ElevenLabs isn't configured
+    """
+    if render is None and not os.getenv('ELEVENLABS_API_KEY'):
+        return None
+    running = active_task(session)
+    if running:
+        return running.task_id
+
+    task_id = str(uuid.uuid4())
+    TaskStatus.objects.create(task_id=task_id, task_type=QUIZ_AUDIO_TASK_TYPE, status='pending',
+                              metadata={'session_id': session.id})
+
+    def report(ready, total):
+        progress = round(100 * ready / total) if total else 100
+        TaskStatus.objects.filter(task_id=task_id).update(progress=progress, current_step=f'{ready}/{total} clips')
+        quiz_events.publish(session.id, {'type': 'audio_progress', 'progress': progress,
+                                         'ready': ready, 'total': total})
+
+    def run():
+        try:
+            TaskStatus.objects.filter(task_id=task_id).update(status='processing')
+            summary = prerender_session(session, render=render, on_progress=report)
+            TaskStatus.objects.filter(task_id=task_id).update(status='completed', progress=100, result=summary,
+                                                              completed_at=timezone.now())
+            quiz_events.publish(session.id, {'type': 'audio_progress', 'progress': 100, 'done': True,
+                                             'ready': summary['clips'] - summary['failed'],
+                                             'total': summary['clips']})
+        except Exception as e:
+            logger.error(f"❌ [QUIZ_AUDIO] Task {task_id}: {e}", exc_info=True)
+            TaskStatus.objects.filter(task_id=task_id).update(status='failed', error=str(e),
+                                                              completed_at=timezone.now())
+        finally:
+            connection.close()  # this thread's connection
+
+    threading.Thread(target=run, daemon=True).start()
+    return task_id
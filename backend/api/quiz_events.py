@@ -0,0 +1,487 @@
+"""
+Pub Quiz Live Events
+Per-session publish/subscribe behind the player and host SSE streams
+
+Views that change a quiz (start, next question, countdown, answers, generation
+progress...) publish ONE event for the session; every connected stream receives
+it from its own subscription instead of re-reading the session from the
+database every second.
+
+Backends:
+    memory - in-process fan-out (default). Only reaches streams served by the
+             same process, so with several workers (gunicorn --workers, more
+             Cloud Run instances) streams also re-check the session every
+             second (pub_quiz_streams.STREAM_CATCH_UP_SECONDS), as the old
+             polling streams did; Redis drops that to one re-check per heartbeat.
+             Not enough when the streams run in their own process (the uvicorn
+             worker of supervisor.conf): QUIZ_STREAMS_SEPARATE_PROCESS makes both
+             processes refuse to start without a working Redis.
+    redis  - Redis pub/sub (channel "quiz:<session id>"), shared by all workers.
+             Any Redis-protocol server works (Redis, Valkey, KeyDB, a local
+             fakeredis instance in tests).
+
+Streams served by the ASGI process wait with asubscribe() / aget(), so an idle
+connection costs a queue, not a thread.
+
+Every published event gets an id ("<epoch>-<n>", increasing per broker) and
+stays in a bounded log of its session (EVENT_LOG_SIZE events). A reconnecting
+stream hands back the last id its client saw (Last-Event-ID) and replay()
+returns just the events it missed - or None when they are no longer all in the
+log, and the stream sends a fresh snapshot instead.
+
+Configured by QUIZ_EVENTS_BACKEND (memory | redis) and QUIZ_EVENTS_REDIS_URL.
+"""
+
+import os
+import json
+import time
+import queue
+import asyncio
+import logging
+import secrets
+import threading
+from abc import ABC, abstractmethod
+from collections import OrderedDict, deque
+from typing import Dict, List, Optional, Set, Tuple
+
+logger = logging.getLogger(__name__)
+
+QUIZ_EVENTS_BACKEND = os.getenv('QUIZ_EVENTS_BACKEND', 'memory').lower()
+QUIZ_EVENTS_REDIS_URL = os.getenv('QUIZ_EVENTS_REDIS_URL', os.getenv('REDIS_URL', 'redis://localhost:6379/0'))
+# The SSE streams are served by another process than the REST views (which publish)
+QUIZ_STREAMS_SEPARATE_PROCESS = os.getenv('QUIZ_STREAMS_SEPARATE_PROCESS', 'false').lower() == 'true'
+
+# Events waiting for a slow stream; past this the oldest are dropped (each event
+# carries the full state it announces, so the newest one is what matters)
+SUBSCRIBER_QUEUE_SIZE = 64
+
+# Recent events kept per session for reconnecting streams, and how many
+# sessions keep a log in memory (least recently active dropped first)
+EVENT_LOG_SIZE = 256
+EVENT_LOG_SESSIONS = 256
+# Redis keeps a session's log this long after its last event
+EVENT_LOG_TTL_SECONDS = 6 * 60 * 60
+
+
+def event_id(epoch: str, n: int) -> str:
+    return f'{epoch}-{n}'
+
+
+def parse_event_id(value: Optional[str]) -> Optional[Tuple[str, int]]:
+    """(epoch, n) of an event id, or None if it isn't one"""
+    epoch, _, n = (value or '').rpartition('-')
+    if not epoch or not n.isdigit():
+        return None
+    return epoch, int(n)
+
+
+def is_newer(value: Optional[str], than: Optional[str]) -> bool:
+    """Whether event id `value` comes after `than` (ids of another broker always do)"""
+    new, old = parse_event_id(value), parse_event_id(than)
+    if new is None or old is None or new[0] != old[0]:
+        return True
+    return new[1] > old[1]
+
+
+class Subscription(ABC):
+    """Events of one session for one stream"""
+
+    @abstractmethod
+    def get(self, timeout: float) -> Optional[Dict]:
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+
+    @abstractmethod
+    def close(self):
+        pass
+
+
+class AsyncSubscription(ABC):
+    """Events of one session for one stream running on an asyncio loop"""
+
+    @abstractmethod
+    async def aget(self, timeout: float) -> Optional[Dict]:
+        """Next event, or None if nothing arrived within `timeout` seconds"""
+
+    @abstractmethod
+    async def aclose(self):
+        pass
+
+
+# ============================================================================
+# In-process backend
+# ============================================================================
+
+class _QueueSubscription(Subscription):
+    def __init__(self, broker: 'InProcessBroker', session_key: str):
+        self.broker = broker
+        self.session_key = session_key
+        self.queue: queue.Queue = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: Dict):
+        _put_dropping_oldest(self.queue, event)
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        try:
+            return self.queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def close(self):
+        self.broker._unsubscribe(self)
+
+
+class _AsyncQueueSubscription(AsyncSubscription):
+    def __init__(self, broker: 'InProcessBroker', session_key: str):
+        self.broker = broker
+        self.session_key = session_key
+        self.loop = asyncio.get_running_loop()
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+
+    def deliver(self, event: Dict):
+        # Publishers run in WSGI / executor threads: hand over to the stream's loop
+        try:
+            self.loop.call_soon_threadsafe(_put_dropping_oldest, self.queue, event)
+        except RuntimeError:
+            pass  # loop already closed
+
+    async def aget(self, timeout: float) -> Optional[Dict]:
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    async def aclose(self):
+        self.broker._unsubscribe(self)
+
+
+def _put_dropping_oldest(q, event: Dict):
+    """Queue an event; when the stream is behind, its oldest event makes room"""
+    while True:
+        try:
+            q.put_nowait(event)
+            return
+        except (queue.Full, asyncio.QueueFull):
+            try:
+                q.get_nowait()
+            except (queue.Empty, asyncio.QueueEmpty):
+                pass
+
+
+class _EventLog:
+    """Recent events of one session; ids up to `floor` may be missing from it"""
+
+    def __init__(self, floor: int):
+        self.floor = floor
+        self.events: deque = deque(maxlen=EVENT_LOG_SIZE)  # (n, event)
+
+    def append(self, n: int, event: Dict):
+        if len(self.events) == self.events.maxlen:
+            self.floor = self.events[0][0]
+        self.events.append((n, event))
+
+    @property
+    def last(self) -> int:
+        return self.events[-1][0] if self.events else self.floor
+
+
+class InProcessBroker:
+    """Fan-out to the streams of this process"""
+
+    # Events only reach streams of this process
+    shared = False
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers: Dict[str, Set] = {}
+        self._logs: 'OrderedDict[str, _EventLog]' = OrderedDict()
+        # Ids of another process (or of this one before a restart) never match
+        self.epoch = secrets.token_hex(4)
+        self._last_n = 0
+
+    def publish(self, session_key: str, event: Dict) -> int:
+        """Number, log and deliver to every subscriber of the session; returns how many got it"""
+        with self._lock:
+            self._last_n += 1
+            event = {**event, 'id': event_id(self.epoch, self._last_n)}
+            self._log(session_key).append(self._last_n, event)
+            subscribers = list(self._subscribers.get(session_key, ()))
+            # Delivered under the lock so every stream sees the ids in order
+            for sub in subscribers:
+                sub.deliver(event)
+        return len(subscribers)
+
+    def replay(self, session_key: str, last_event_id: Optional[str]) -> Tuple[str, Optional[List[Dict]]]:
+        """
+        Events of a session published after `last_event_id`
+
+        Returns:
+            (id of the session's latest event, missed events) - missed is None
+            if they can't all be replayed (unknown id, or the log moved past it)
+        """
+        with self._lock:
+            log = self._log(session_key)
+            cursor = event_id(self.epoch, log.last)
+            last = parse_event_id(last_event_id)
+            if last is None or last[0] != self.epoch or not log.floor <= last[1] <= log.last:
+                return cursor, None
+            return cursor, [event for n, event in log.events if n > last[1]]
+
+    def _log(self, session_key: str) -> _EventLog:
+        """The session's log (caller holds the lock)"""
+        log = self._logs.get(session_key)
+        if log is None:
+            log = self._logs[session_key] = _EventLog(floor=self._last_n)
+            if len(self._logs) > EVENT_LOG_SESSIONS:
+                self._logs.popitem(last=False)
+        else:
+            self._logs.move_to_end(session_key)
+        return log
+
+    def subscribe(self, session_key: str) -> Subscription:
+        return self._add(_QueueSubscription(self, session_key))
+
+    async def asubscribe(self, session_key: str) -> AsyncSubscription:
+        return self._add(_AsyncQueueSubscription(self, session_key))
+
+    def _add(self, sub):
+        with self._lock:
+            self._subscribers.setdefault(sub.session_key, set()).add(sub)
+        return sub
+
+    def subscriber_count(self, session_key: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(session_key, ()))
+
+    def _unsubscribe(self, sub):
+        with self._lock:
+            subscribers = self._subscribers.get(sub.session_key)
+            if subscribers is not None:
+                subscribers.discard(sub)
+                if not subscribers:
+                    del self._subscribers[sub.session_key]
+
+
+# ============================================================================
+# Redis backend
+# ============================================================================
+
+class _RedisSubscription(Subscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    def get(self, timeout: float) -> Optional[Dict]:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message and message.get('type') == 'message':
+                return RedisBroker.decode(message['data'])
+
+    def close(self):
+        try:
+            self.pubsub.close()
+        except Exception as e:
+            logger.warning(f"⚠️ [QUIZ_EVENTS] Error closing Redis subscription: {e}")
+
+
+class _AsyncRedisSubscription(AsyncSubscription):
+    def __init__(self, pubsub):
+        self.pubsub = pubsub
+
+    async def aget(self, timeout: float) -> Optional[Dict]:
+        deadline = time.monotonic() + timeout
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return None
+            message = await self.pubsub.get_message(ignore_subscribe_messages=True, timeout=remaining)
+            if message and message.get('type') == 'message':
+                return RedisBroker.decode(message['data'])
+
+    async def aclose(self):
+        try:
+            # redis-py < 5 only has close()
+            await (getattr(self.pubsub, 'aclose', None) or self.pubsub.close)()
+        except Exception as e:
+            logger.warning(f"⚠️ [QUIZ_EVENTS] Error closing Redis subscription: {e}")
+
+
+# Number, log and publish in one step, so subscribers see the ids in order.
+# Messages are "<n> <json event>"; the log is a list trimmed to ARGV[2].
+_PUBLISH_SCRIPT = """
+local n = redis.call('INCR', KEYS[1])
+local message = n .. ' ' .. ARGV[1]
+if redis.call('RPUSH', KEYS[2], message) > tonumber(ARGV[2]) then
+    local dropped = redis.call('LPOP', KEYS[2])
+    redis.call('SET', KEYS[3], string.match(dropped, '^%d+'), 'EX', ARGV[3])
+end
+redis.call('EXPIRE', KEYS[2], ARGV[3])
+redis.call('EXPIRE', KEYS[3], ARGV[3])
+return redis.call('PUBLISH', KEYS[4], message)
+"""
+
+
+class RedisBroker:
+    """Fan-out through Redis pub/sub, across all workers"""
+
+    shared = True
+    epoch = 'redis'
+
+    def __init__(self, client, async_client=None):
+        self.client = client
+        self.async_client = async_client
+        self._publish = client.register_script(_PUBLISH_SCRIPT)
+
+    @classmethod
+    def from_url(cls, url: str) -> 'RedisBroker':
+        import redis
+        import redis.asyncio
+        return cls(redis.Redis.from_url(url), redis.asyncio.Redis.from_url(url))
+
+    @staticmethod
+    def channel(session_key: str) -> str:
+        return f'quiz:{session_key}'
+
+    @classmethod
+    def decode(cls, message) -> Dict:
+        if isinstance(message, bytes):
+            message = message.decode()
+        n, _, data = message.partition(' ')
+        return {**json.loads(data), 'id': event_id(cls.epoch, int(n))}
+
+    def publish(self, session_key: str, event: Dict) -> int:
+        keys = ['quiz:event-id', f'quiz:{session_key}:log', f'quiz:{session_key}:floor', self.channel(session_key)]
+        return self._publish(keys=keys, args=[json.dumps(event), EVENT_LOG_SIZE, EVENT_LOG_TTL_SECONDS])
+
+    def replay(self, session_key: str, last_event_id: Optional[str]) -> Tuple[str, Optional[List[Dict]]]:
+        """Same as InProcessBroker.replay, from the session's log in Redis"""
+        pipe = self.client.pipeline()
+        pipe.get('quiz:event-id')
+        pipe.get(f'quiz:{session_key}:floor')
+        pipe.lrange(f'quiz:{session_key}:log', 0, -1)
+        current, floor, messages = pipe.execute()
+        events = [self.decode(message) for message in messages]
+        if floor is None:
+            # Nothing logged yet (or expired): only ids from now on are known
+            floor = int(current or 0)
+            if not events:
+                self.client.set(f'quiz:{session_key}:floor', floor, nx=True, ex=EVENT_LOG_TTL_SECONDS)
+            else:
+                floor = parse_event_id(events[0]['id'])[1] - 1
+        floor = int(floor)
+
+        last_n = parse_event_id(events[-1]['id'])[1] if events else floor
+        cursor = event_id(self.epoch, last_n)
+        last = parse_event_id(last_event_id)
+        if last is None or last[0] != self.epoch or not floor <= last[1] <= last_n:
+            return cursor, None
+        return cursor, [event for event in events if parse_event_id(event['id'])[1] > last[1]]
+
+    def subscribe(self, session_key: str) -> Subscription:
+        pubsub = self.client.pubsub(ignore_subscribe_messages=True)
+        pubsub.subscribe(self.channel(session_key))
+        return _RedisSubscription(pubsub)
+
+    async def asubscribe(self, session_key: str) -> AsyncSubscription:
+        if self.async_client is None:
+            raise RuntimeError('RedisBroker was created without an asyncio client')
+        pubsub = self.async_client.pubsub(ignore_subscribe_messages=True)
+        await pubsub.subscribe(self.channel(session_key))
+        return _AsyncRedisSubscription(pubsub)
+
+    def subscriber_count(self, session_key: str) -> int:
+        counts = self.client.pubsub_numsub(self.channel(session_key))
+        return int(counts[0][1]) if counts else 0
+
+
+# ============================================================================
+# Process-wide broker
+# ============================================================================
+
+_broker = None
+_broker_lock = threading.Lock()
+
+
+def get_broker():
+    """The configured broker (created on first use)"""
+    global _broker
+    with _broker_lock:
+        if _broker is None:
+            if QUIZ_EVENTS_BACKEND == 'redis':
+                try:
+                    _broker = RedisBroker.from_url(QUIZ_EVENTS_REDIS_URL)
+                    logger.info(f"📡 [QUIZ_EVENTS] Using Redis pub/sub at {QUIZ_EVENTS_REDIS_URL}")
+                except ImportError:
+                    logger.warning("⚠️ [QUIZ_EVENTS] redis package not installed, using in-process events")
+            if _broker is None:
+                _broker = InProcessBroker()
+        return _broker
+
+
+def is_shared() -> bool:
+    """Whether published events reach the streams of every process, not just this one"""
+    return getattr(get_broker(), 'shared', False)
+
+
+def require_shared():
+    """
+    Fail at startup unless events reach every process (QUIZ_STREAMS_SEPARATE_PROCESS)
+
+    Raises:
+        RuntimeError: the broker is in-process, or Redis doesn't answer
+    """
+    broker = get_broker()
+    if not is_shared():
+        raise RuntimeError(
+            'QUIZ_STREAMS_SEPARATE_PROCESS is set but quiz events are in-process: '
+            'set QUIZ_EVENTS_BACKEND=redis (and install redis), or serve the streams '
+            'from the process running the views'
+        )
+    try:
+        broker.client.ping()
+    except Exception as e:
+        raise RuntimeError(f'Quiz events Redis at {QUIZ_EVENTS_REDIS_URL} is unreachable: {e}') from e
+    logger.info("📡 [QUIZ_EVENTS] Streams in a separate process: events shared through Redis")
+
+
+def set_broker(broker):
+    """Swap the broker (e.g. a RedisBroker over a local Redis-compatible client)"""
+    global _broker
+    with _broker_lock:
+        _broker = broker
+
+
+def publish(session_id, event: Dict) -> int:
+    """
+    Announce a quiz event to every stream of a session
+
+    Never raises: a broken event bus must not fail the host action that
+    triggered it (streams still re-sync on their heartbeat).
+    """
+    try:
+        return get_broker().publish(str(session_id), event)
+    except Exception as e:
+        logger.error(f"❌ [QUIZ_EVENTS] Publish failed for session {session_id}: {e}")
+        return 0
+
+
+def replay(session_id, last_event_id: Optional[str]) -> Tuple[Optional[str], Optional[List[Dict]]]:
+    """
+    Latest event id of a session and the events a client missed since
+    `last_event_id` (None: send it a snapshot). Call after subscribing.
+    """
+    try:
+        return get_broker().replay(str(session_id), last_event_id)
+    except Exception as e:
+        logger.error(f"❌ [QUIZ_EVENTS] Replay failed for session {session_id}: {e}")
+        return None, None
+
+
+def subscribe(session_id) -> Subscription:
+    return get_broker().subscribe(str(session_id))
+
+
+async def asubscribe(session_id) -> AsyncSubscription:
+    return await get_broker().asubscribe(str(session_id))
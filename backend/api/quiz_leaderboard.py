@@ -0,0 +1,215 @@
+"""
+Pub Quiz Host Board
+Live state of the host panel (stats, leaderboard, current question), kept
+current from published events instead of being re-queried
+
+The views publish only what changed - a team's score, the answer count of a
+question, the session's state - and each host stream applies it to its board
+in memory. A tab gets the whole board once ('host_update') and after that only
+diffs ('host_diff': changed stats, teams whose score or rank moved, the
+question if it changed), each tagged with the next sequence number so the
+panel can tell it missed one and reconnect for a fresh board.
+"""
+
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from django.utils import timezone
+
+from .pub_quiz_models import QuizQuestion, TeamAnswer
+
+# Statuses in which the host panel shows the current question
+QUESTION_STATUSES = ('in_progress', 'halftime', 'revealing_answer')
+
+# What a board keeps of a 'session' event
+SESSION_STATE_KEYS = ('stats', 'question_id', 'question', 'teams_answered')
+
+
+# ============================================================================
+# Events (built once by the view that made the change)
+# ============================================================================
+
+def team_row(team) -> Dict:
+    """Leaderboard row of a QuizTeam (or of a values() dict with the same keys)"""
+    if isinstance(team, dict):
+        return {
+            'team_id': team['id'],
+            'team_name': team['team_name'],
+            'table_number': team['table_number'],
+            'total_score': team['total_score'],
+        }
+    return {
+        'team_id': team.id,
+        'team_name': team.team_name,
+        'table_number': team.table_number,
+        'total_score': team.total_score,
+    }
+
+
+def teams_event(rows: Iterable[Dict], replace: bool = False) -> Dict:
+    """Teams joined or scored; replace=True when `rows` is the session's full team list"""
+    return {'type': 'teams', 'teams': list(rows), 'replace': replace}
+
+
+def session_teams_event(session) -> Dict:
+    rows = session.teams.values('id', 'team_name', 'table_number', 'total_score')
+    return teams_event((team_row(row) for row in rows), replace=True)
+
+
+def answers_event(question) -> Dict:
+    """How many teams have answered a question"""
+    return {
+        'type': 'answers',
+        'question_id': question.id,
+        'teams_answered': TeamAnswer.objects.filter(question=question).count(),
+    }
+
+
+def question_data(question, status: str) -> Dict:
+    revealing = status == 'revealing_answer'
+    return {
+        'id': question.id,
+        'text': question.question_text,
+        'answer': question.correct_answer if revealing else None,
+        'fun_fact': question.fun_fact if revealing else None,
+        'round': question.round_number,
+        'number': question.question_number,
+        'type': question.question_type,
+        'points': question.get_points_value(),
+        'difficulty': question.difficulty,
+        'genre': question.get_genre_name(),
+        'options': question.options if question.question_type == 'multiple_choice' else None
+    }
+
+
+def session_event(session) -> Dict:
+    """Session state for the host panel: status, position, timer and current question"""
+    question = None
+    teams_answered = 0
+    if session.status in QUESTION_STATUSES:
+        question = QuizQuestion.objects.filter(
+            session=session,
+            round_number=session.current_round,
+            question_number=session.current_question
+        ).select_related('genre').first()
+        if question and session.status == 'in_progress':
+            teams_answered = TeamAnswer.objects.filter(question=question).count()
+
+    return {
+        'type': 'session',
+        'stats': {
+            'status': session.status,
+            'current_round': session.current_round,
+            'current_question': session.current_question,
+            'total_rounds': session.total_rounds,
+            'questions_per_round': session.questions_per_round,
+            'questions_generated': QuizQuestion.objects.filter(session=session).exists(),
+            'auto_advance_enabled': session.auto_advance_enabled,
+            'auto_advance_seconds': session.auto_advance_seconds,
+            'auto_advance_paused': session.auto_advance_paused,
+            'question_started_at': session.question_started_at.isoformat() if session.question_started_at else None
+        },
+        'question_id': question.id if question else None,
+        'question': question_data(question, session.status) if question else None,
+        'teams_answered': teams_answered,
+    }
+
+
+# ============================================================================
+# Board
+# ============================================================================
+
+class HostBoard:
+    """What one host tab is showing, kept current in memory"""
+
+    def __init__(self, state: Dict, teams: Dict[int, Dict]):
+        self.state = state  # last 'session' event
+        self.teams = teams  # team_id -> team_row()
+        self.seq = 0
+
+    @classmethod
+    def load(cls, session) -> 'HostBoard':
+        """Board straight from the database (on connect / re-sync)"""
+        state = session_event(session)
+        rows = session_teams_event(session)['teams']
+        return cls({key: state[key] for key in SESSION_STATE_KEYS}, {row['team_id']: row for row in rows})
+
+    @property
+    def status(self) -> str:
+        return self.state['stats']['status']
+
+    def stats(self) -> Dict:
+        return {
+            'total_teams': len(self.teams),
+            'teams_answered': self.state['teams_answered'] if self.status == 'in_progress' else 0,
+            **self.state['stats'],
+        }
+
+    def leaderboard(self) -> List[Dict]:
+        ranked = sorted(self.teams.values(), key=lambda row: (-row['total_score'], row['team_name']))
+        return [{**row, 'rank': rank} for rank, row in enumerate(ranked, 1)]
+
+    def snapshot(self) -> Dict:
+        """Full 'host_update' message"""
+        return {
+            'type': 'host_update',
+            'seq': self.seq,
+            'stats': self.stats(),
+            'leaderboard': self.leaderboard(),
+            'question': self.state['question'],
+            'timestamp': timezone.now().isoformat()
+        }
+
+    def apply(self, event: Dict) -> Optional[Dict]:
+        """
+        Apply a published event
+
+        Returns:
+            'host_diff' message, or None if the panel doesn't change
+        """
+        before = self._view()
+        if event['type'] == 'session':
+            self.state = {key: event[key] for key in SESSION_STATE_KEYS}
+        elif event['type'] == 'teams':
+            if event['replace']:
+                self.teams = {}
+            for row in event['teams']:
+                self.teams[row['team_id']] = row
+        elif event['type'] == 'answers':
+            if event['question_id'] != self.state['question_id']:
+                return None
+            self.state = {**self.state, 'teams_answered': event['teams_answered']}
+        else:
+            return None
+        return self._diff(before)
+
+    def replace(self, other: 'HostBoard') -> Optional[Dict]:
+        """Adopt a freshly loaded board; the diff brings the tab up to date"""
+        before = self._view()
+        self.state, self.teams = other.state, other.teams
+        return self._diff(before)
+
+    def _view(self) -> Tuple[Dict, List[Dict], Optional[Dict]]:
+        return self.stats(), self.leaderboard(), self.state['question']
+
+    def _diff(self, before) -> Optional[Dict]:
+        old_stats, old_board, old_question = before
+        stats, board, question = self._view()
+
+        diff = {}
+        changed_stats = {key: value for key, value in stats.items() if old_stats.get(key) != value}
+        if changed_stats:
+            diff['stats'] = changed_stats
+        old_rows = {row['team_id']: row for row in old_board}
+        changed_rows = [row for row in board if old_rows.get(row['team_id']) != row]
+        if changed_rows:
+            diff['leaderboard'] = changed_rows
+        removed = [team_id for team_id in old_rows if team_id not in self.teams]
+        if removed:
+            diff['removed'] = removed
+        if question != old_question:
+            diff['question'] = question
+        if not diff:
+            return None
+
+        self.seq += 1
+        return {'type': 'host_diff', 'seq': self.seq, **diff, 'timestamp': timezone.now().isoformat()}
@@ -0,0 +1,461 @@
+"""
+TTS Audio Cache
+Content-addressed cache of ElevenLabs audio, so the same line is only ever
+synthesised once
+
+Bingo announcements, quiz intros and question read-outs repeat constantly.
+Every input that changes the audio - text, voice, model, voice settings,
+output format - is hashed into a key; a request for a key already rendered is
+answered from:
+
+    memory  per-process LRU of the most recent clips (TTS_MEMORY_CACHE_MB)
+    disk    data/tts_cache/<ab>/<key>.mp3, evicted oldest-used first once
+            the directory grows past TTS_DISK_CACHE_MB
+
+and only a miss calls the API. Clips are immutable, so they are served with
+the key as ETag and support HTTP Range requests (GET /api/tts/<key>).
+"""
+
+import os
+import json
+import time
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Callable, Dict, Iterable, Iterator, NamedTuple, Optional, Tuple
+
+import requests
+from django.http import HttpResponse
+
+from . import http_client
+
+logger = logging.getLogger(__name__)
+
+TTS_CACHE_DIR = Path(os.getenv('TTS_CACHE_DIR', Path(__file__).resolve().parent.parent / 'data' / 'tts_cache'))
+TTS_MEMORY_CACHE_MB = float(os.getenv('TTS_MEMORY_CACHE_MB', '32'))
+TTS_DISK_CACHE_MB = float(os.getenv('TTS_DISK_CACHE_MB', '500'))
+
+ELEVENLABS_TTS_URL = 'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
+DEFAULT_MODEL_ID = 'eleven_turbo_v2_5'
+DEFAULT_OUTPUT_FORMAT = 'mp3_44100_128'
+DEFAULT_VOICE_SETTINGS = {
+    'stability': 0.35,
+    'similarity_boost': 0.85,
+    'style': 0.5,
+    'use_speaker_boost': True
+}
+
+CONTENT_TYPES = {'mp3': 'audio/mpeg', 'pcm': 'audio/pcm', 'ulaw': 'audio/basic'}
+
+
+class TTSError(Exception):
+    """ElevenLabs refused or failed the request"""
+
+    def __init__(self, status: int, details: str = ''):
+        super().__init__(f'ElevenLabs API error: {status}')
+        self.status = status
+        self.details = details
+
+
+class CachedAudio(NamedTuple):
+    key: str
+    data: bytes
+    tier: str  # 'memory', 'disk' or 'miss' (just synthesised)
+
+
+def tts_params(text: str, voice_id: str, model_id: str = DEFAULT_MODEL_ID,
+               voice_settings: Optional[Dict] = None, output_format: str = DEFAULT_OUTPUT_FORMAT) -> Dict:
+    """Everything that changes the audio, in canonical form"""
+    return {
+        'text': text,
+        'voice_id': voice_id,
+        'model_id': model_id,
+        'voice_settings': voice_settings if voice_settings is not None else DEFAULT_VOICE_SETTINGS,
+        'output_format': output_format,
+    }
+
+
+def cache_key(params: Dict) -> str:
+    """Content address of a clip"""
+    return hashlib.sha256(json.dumps(params, sort_keys=True).encode('utf-8')).hexdigest()
+
+
+def content_type(output_format: str) -> str:
+    return CONTENT_TYPES.get(output_format.split('_')[0], 'application/octet-stream')
+
+
+def request_elevenlabs(params: Dict, api_key: str, stream: bool = False, timeout: int = 45) -> requests.Response:
+    """Call the ElevenLabs TTS endpoint (raises TTSError if it doesn't answer 200)"""
+    response = http_client.post(
+        ELEVENLABS_TTS_URL.format(voice_id=params['voice_id']),
+        headers={
+            'xi-api-key': api_key,
+            'Content-Type': 'application/json'
+        },
+        json={
+            'text': params['text'],
+            'model_id': params['model_id'],
+            'voice_settings': params['voice_settings'],
+            'optimize_streaming_latency': 1,
+            'output_format': params['output_format']
+        },
+        timeout=timeout,
+        stream=stream
+    )
+    if not response.ok:
+        raise TTSError(response.status_code, response.text)
+    return response
+
+
+class TTSCache:
+    """Memory + disk tiers for synthesised clips"""
+
+    def __init__(self, directory: Path = TTS_CACHE_DIR, memory_mb: float = TTS_MEMORY_CACHE_MB,
+                 disk_mb: float = TTS_DISK_CACHE_MB):
+        self.directory = Path(directory)
+        self.memory_limit = int(memory_mb * 1024 * 1024)
+        self.disk_limit = int(disk_mb * 1024 * 1024)
+        self.memory: 'OrderedDict[str, bytes]' = OrderedDict()
+        self.memory_bytes = 0
+        self.disk_bytes: Optional[int] = None  # scanned on first store
+        self.lock = threading.Lock()
+        self.key_locks: Dict[str, threading.Lock] = {}
+
+    # ------------------------------------------------------------------
+    # Tiers
+    # ------------------------------------------------------------------
+
+    def path(self, key: str) -> Path:
+        return self.directory / key[:2] / f'{key}.mp3'
+
+    def get(self, key: str) -> Optional[CachedAudio]:
+        with self.lock:
+            data = self.memory.get(key)
+            if data is not None:
+                self.memory.move_to_end(key)
+                return CachedAudio(key, data, 'memory')
+
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+            os.utime(path)  # recently used - evicted last
+        except OSError:
+            return None
+        self._remember(key, data)
+        return CachedAudio(key, data, 'disk')
+
+    def contains(self, key: str) -> bool:
+        """Whether a clip is cached, without reading it"""
+        with self.lock:
+            if key in self.memory:
+                return True
+        return self.path(key).exists()
+
+    def put(self, key: str, data: bytes):
+        self._remember(key, data)
+        path = self.path(key)
+        try:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = path.with_suffix(f'.{os.getpid()}.{threading.get_ident()}.tmp')
+            tmp.write_bytes(data)
+            os.replace(tmp, path)  # readers never see half a file
+        except OSError as e:
+            logger.warning(f"⚠️ [TTS_CACHE] Could not write {path}: {e}")
+            return
+        with self.lock:
+            if self.disk_bytes is not None:
+                self.disk_bytes += len(data)
+            over = self.disk_bytes is None or self.disk_bytes > self.disk_limit
+        if over:
+            self.evict()
+
+    def _remember(self, key: str, data: bytes):
+        if len(data) > self.memory_limit // 4:
+            return  # one clip shouldn't flush the whole tier
+        with self.lock:
+            if key in self.memory:
+                self.memory.move_to_end(key)
+                return
+            self.memory[key] = data
+            self.memory_bytes += len(data)
+            while self.memory_bytes > self.memory_limit:
+                _, old = self.memory.popitem(last=False)
+                self.memory_bytes -= len(old)
+
+    def evict(self) -> int:
+        """Delete the least recently used clips until the disk tier is under 90% of its limit"""
+        files = []
+        for path in self.directory.glob('*/*.mp3'):
+            try:
+                stat = path.stat()
+            except OSError:
+                continue
+            files.append((stat.st_mtime, stat.st_size, path))
+        total = sum(size for _, size, _ in files)
+        removed = 0
+        if total > self.disk_limit:
+            target = self.disk_limit * 0.9
+            for _, size, path in sorted(files):
+                if total <= target:
+                    break
+                try:
+                    path.unlink()
+                except OSError:
+                    continue
+                total -= size
+                removed += 1
+            logger.info(f"🧹 [TTS_CACHE] Evicted {removed} clips ({total / 1024 / 1024:.1f} MB left)")
+        with self.lock:
+            self.disk_bytes = total
+        return removed
+
+    # ------------------------------------------------------------------
+    # Synthesis
+    # ------------------------------------------------------------------
+
+    def _key_lock(self, key: str) -> threading.Lock:
+        with self.lock:
+            return self.key_locks.setdefault(key, threading.Lock())
+
+    def synthesize(self, params: Dict, api_key: str, timeout: int = 45) -> CachedAudio:
+        """The clip for `params`, from the cache or (once, however many ask at the same time) the API"""
+        key = cache_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            return cached
+
+        key_lock = self._key_lock(key)
+        with key_lock:
+            cached = self.get(key)  # rendered while we waited
+            if cached is not None:
+                return cached
+            data = request_elevenlabs(params, api_key, timeout=timeout).content
+            self.put(key, data)
+        with self.lock:
+            self.key_locks.pop(key, None)
+        logger.info(f"🎙️ [TTS_CACHE] Synthesised {key[:12]} ({len(data)} bytes): {params['text'][:60]}")
+        return CachedAudio(key, data, 'miss')
+
+    def stream(self, params: Dict, api_key: str, timeout: int = 45) -> Tuple[str, Iterator[bytes], str]:
+        """
+        Like synthesize(), but a miss is streamed to the client as it arrives
+        (and cached once complete). A request for a clip that's already being
+        rendered waits for that render instead of paying for another.
+
+        Returns:
+            (key, chunks, tier) - close `chunks` if it isn't read to the end
+        """
+        key = cache_key(params)
+        cached = self.get(key)
+        if cached is not None:
+            return key, iter([cached.data]), cached.tier
+
+        key_lock = self._key_lock(key)
+        if not key_lock.acquire(blocking=False):
+            # In flight (streamed or synthesised): its clip is ours once it's done
+            if not key_lock.acquire(timeout=timeout):
+                raise TTSError(504, 'Timed out waiting for the same clip to render')
+            key_lock.release()
+            cached = self.get(key)
+            if cached is None:  # that render failed or its client left: render it here
+                cached = self.synthesize(params, api_key, timeout=timeout)
+            return key, iter([cached.data]), cached.tier
+
+        try:
+            cached = self.get(key)  # rendered just before we took the lock
+            if cached is not None:
+                self._release(key, key_lock)
+                return key, iter([cached.data]), cached.tier
+            response = request_elevenlabs(params, api_key, stream=True, timeout=timeout)
+        except BaseException:
+            self._release(key, key_lock)
+            raise
+        return key, _StreamedMiss(self, key, response, key_lock), 'miss'
+
+    def _release(self, key: str, key_lock: threading.Lock):
+        with self.lock:
+            self.key_locks.pop(key, None)
+        key_lock.release()
+
+
+class _StreamedMiss:
+    """
+    Chunks of a clip as ElevenLabs sends them; cached once complete. Read to
+    the end or closed (Django closes it when the client disconnects), it always
+    closes the upstream response and lets waiting requests for the clip go.
+    """
+
+    def __init__(self, cache: TTSCache, key: str, response: requests.Response, key_lock: threading.Lock):
+        self.cache = cache
+        self.key = key
+        self.response = response
+        self.key_lock = key_lock
+        self.closed = False
+        self.chunks = self._read()
+
+    def _read(self) -> Iterator[bytes]:
+        received = []
+        for chunk in self.response.iter_content(chunk_size=4096):
+            if chunk:
+                received.append(chunk)
+                yield chunk
+        self.cache.put(self.key, b''.join(received))
+
+    def __iter__(self):
+        return self
+
+    def __next__(self) -> bytes:
+        try:
+            return next(self.chunks)
+        except BaseException:  # StopIteration included
+            self.close()
+            raise
+
+    def close(self):
+        if self.closed:
+            return
+        self.closed = True
+        try:
+            self.chunks.close()
+            self.response.close()
+        finally:
+            self.cache._release(self.key, self.key_lock)
+
+
+_cache: Optional[TTSCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_cache() -> TTSCache:
+    global _cache
+    with _cache_lock:
+        if _cache is None:
+            _cache = TTSCache()
+        return _cache
+
+
+# ============================================================================
+# Batches
+# ============================================================================
+
+class RateLimiter:
+    """At most `rate` calls per second on average, in bursts of up to `burst`"""
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = rate
+        self.burst = burst
+        self.tokens = float(burst)
+        self.last = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            self.tokens = min(self.burst, self.tokens + (now - self.last) * self.rate)
+            self.last = now
+            self.tokens -= 1  # reserve a slot, possibly in the future
+            wait = -self.tokens / self.rate if self.tokens < 0 else 0
+        if wait:
+            time.sleep(wait)
+
+
+def render_batch(params_list: Iterable[Dict], render: Callable[[Dict], CachedAudio], workers: int = 4,
+                 limiter: Optional[RateLimiter] = None,
+                 on_progress: Optional[Callable[[int, int], None]] = None) -> Dict[str, Exception]:
+    """
+    Render clips with at most `workers` in flight (and `limiter` starts per
+    second), skipping any already cached; `render` is typically
+    get_cache().synthesize with an API key
+
+    Returns:
+        Cache key -> error, for the clips that failed
+    """
+    cache = get_cache()
+    unique = {cache_key(params): params for params in params_list}
+    todo = {key: params for key, params in unique.items() if not cache.contains(key)}
+    done, total, failed = len(unique) - len(todo), len(unique), {}
+    if on_progress:
+        on_progress(done, total)
+
+    def run(params):
+        if limiter:
+            limiter.acquire()
+        return render(params)
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = {pool.submit(run, params): key for key, params in todo.items()}
+        for future in as_completed(futures):
+            key = futures[future]
+            try:
+                future.result()
+                done += 1
+            except Exception as e:
+                failed[key] = e
+                logger.warning(f"⚠️ [TTS_CACHE] Could not render '{todo[key]['text'][:60]}': {e}")
+            if on_progress:
+                on_progress(done, total)
+    return failed
+
+
+# ============================================================================
+# HTTP
+# ============================================================================
+
+def _etag_matches(header: str, etag: str) -> bool:
+    tags = [tag.strip() for tag in header.split(',')]
+    return '*' in tags or any(tag.removeprefix('W/') == etag for tag in tags)
+
+
+def _byte_range(header: str, size: int) -> Optional[Tuple[int, int]]:
+    """(start, end) of a single 'bytes=' range; None to send everything; (-1, -1) if unsatisfiable"""
+    unit, _, ranges = header.partition('=')
+    if unit.strip() != 'bytes' or ',' in ranges:
+        return None  # multiple ranges: the whole clip is a valid answer
+    start, _, end = ranges.strip().partition('-')
+    try:
+        if start == '':
+            length = int(end)
+            if length <= 0:
+                return -1, -1
+            return max(size - length, 0), size - 1
+        start = int(start)
+        end = min(int(end), size - 1) if end else size - 1
+    except ValueError:
+        return None
+    if start >= size or start > end:
+        return -1, -1
+    return start, end
+
+
+def audio_response(request, audio: CachedAudio, output_format: str = DEFAULT_OUTPUT_FORMAT) -> HttpResponse:
+    """Serve a clip with its key as ETag, honouring If-None-Match and Range"""
+    etag = f'"{audio.key}"'
+    headers = {
+        'ETag': etag,
+        'Cache-Control': 'public, max-age=31536000, immutable',
+        'Accept-Ranges': 'bytes',
+        'X-TTS-Cache': audio.tier,
+        'X-TTS-Key': audio.key,
+    }
+
+    if _etag_matches(request.headers.get('If-None-Match', ''), etag):
+        response = HttpResponse(status=304)
+    else:
+        size = len(audio.data)
+        byte_range = _byte_range(request.headers.get('Range', ''), size) if request.headers.get('Range') else None
+        if byte_range == (-1, -1):
+            response = HttpResponse(status=416)
+            response['Content-Range'] = f'bytes */{size}'
+        elif byte_range is not None:
+            start, end = byte_range
+            response = HttpResponse(audio.data[start:end + 1], status=206, content_type=content_type(output_format))
+            response['Content-Range'] = f'bytes {start}-{end}/{size}'
+        else:
+            response = HttpResponse(audio.data, content_type=content_type(output_format))
+
+    for name, value in headers.items():
+        response[name] = value
+    return response
@@ -23,6 +23,7 @@ except Exception as e:
 
 urlpatterns = [
     path('health', views.health_check, name='health'),
+    path('upstream-stats', views.upstream_stats, name='upstream-stats'),
     path('pool', views.get_pool, name='pool'),
     path('config', views.get_config, name='config'),
     path('announcements', views.get_announcements, name='announcements'),
@@ -31,6 +32,7 @@ urlpatterns = [
     path('generate-tts', views.generate_tts, name='generate-tts'),
     path('generate-tts-preview', views.generate_tts_preview, name='generate-tts-preview'),
     path('tts', views.generate_tts, name='tts'),  # Alias for frontend compatibility
+    path('tts/<str:key>', views.get_tts_audio, name='tts-audio'),
     path('upload-logo', views.upload_logo, name='upload-logo'),
     path('tasks/<str:task_id>', views.get_task_status, name='task-status'),
     # Jingle endpoints
@@ -61,6 +63,7 @@ urlpatterns = [
     path('pub-quiz/<str:session_id>/register-team', pub_quiz_views.register_team, name='pub-quiz-register-team'),
     path('pub-quiz/<str:session_id>/generate-questions', pub_quiz_views.generate_quiz_questions, name='pub-quiz-generate'),
     path('pub-quiz/<str:session_id>/all-questions', pub_quiz_views.get_all_questions, name='pub-quiz-all-questions'),
+    path('pub-quiz/<str:session_id>/audio-manifest', pub_quiz_views.quiz_audio_manifest, name='pub-quiz-audio-manifest'),
     path('pub-quiz/<str:session_id>/sync-question', pub_quiz_views.sync_question_to_players, name='pub-quiz-sync'),
     path('pub-quiz/<str:session_id>/host-data', pub_quiz_views.quiz_host_data, name='pub-quiz-host-data'),
     path('pub-quiz/<str:session_id>/start', pub_quiz_views.start_quiz, name='pub-quiz-start'),
@@ -77,6 +80,7 @@ urlpatterns = [
     path('pub-quiz/question/<int:question_id>/submit', pub_quiz_views.submit_answer, name='pub-quiz-submit'),
     path('pub-quiz/question/<int:question_id>/buzz', pub_quiz_views.record_buzz, name='pub-quiz-buzz'),
     path('pub-quiz/<str:session_id>/submit-answers', pub_quiz_views.submit_all_answers, name='pub-quiz-submit-all'),  # NEW: Batch submit
+    path('pub-quiz/<str:session_id>/answers-to-review', pub_quiz_views.answers_to_review, name='pub-quiz-answers-to-review'),
     # Removed polling endpoints - replaced by SSE:
     # path('pub-quiz/<str:session_id>/leaderboard', ...)
     # path('pub-quiz/<str:session_id>/stats', ...)
@@ -90,6 +94,11 @@ urlpatterns = [
     path('bingo/sessions', views.bingo_sessions, name='bingo-sessions'),  # POST: Create, GET: List
     path('bingo/session/<str:session_id>', views.bingo_session_detail, name='bingo-session-detail'),  # GET/PUT/DELETE
     path('bingo/session/<str:session_id>/status', views.update_bingo_session_status, name='update-bingo-session-status'),  # PATCH
+    path('bingo/session/<str:session_id>/song-set', views.bingo_session_song_set, name='bingo-session-song-set'),  # GET: songs on the printed cards
+    path('bingo/session/<str:session_id>/announcement-audio', views.bingo_announcement_audio, name='bingo-announcement-audio'),  # GET: manifest, POST: pre-render
+    path('bingo/session/<str:session_id>/call', views.call_bingo_song, name='bingo-call-song'),  # POST: record called song, returns claim stats
+    path('bingo/session/<str:session_id>/claim-stats', views.bingo_claim_stats, name='bingo-claim-stats'),  # GET
+    path('bingo/session/<str:session_id>/verify-claim', views.verify_bingo_claim, name='bingo-verify-claim'),  # POST
     
     # ============================================================
     # KARAOKE ENDPOINTS
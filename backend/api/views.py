@@ -4,13 +4,14 @@ Migrated from Flask to Django
 """
 
 import os
+import re
 import json
 import logging
 import threading
 import uuid
 import time
-import subprocess
 import io
+import shutil
 from pathlib import Path
 from datetime import datetime
 
@@ -22,12 +23,12 @@ from django.utils import timezone
 from rest_framework.decorators import api_view
 from rest_framework.response import Response
 from rest_framework import status
-import requests
 from google.cloud import storage
 from datetime import timedelta
 
 # Import TaskStatus model
 from .models import TaskStatus
+from . import http_client
 
 logger = logging.getLogger(__name__)
 
@@ -63,6 +64,7 @@ def upload_to_gcs(local_file_path, destination_blob_name):
 ELEVENLABS_API_KEY = os.getenv('ELEVENLABS_API_KEY', '')
 ELEVENLABS_VOICE_ID = os.getenv('ELEVENLABS_VOICE_ID', '21m00Tcm4TlvDq8ikWAM')
 VENUE_NAME = os.getenv('VENUE_NAME', 'this venue')
+CARD_RENDER_ENGINE = os.getenv('CARD_RENDER_ENGINE', 'canvas')
 
 # Paths - Fix for Docker container structure
 # Docker WORKDIR is /app, files are copied as: COPY backend/ . COPY data/ ./data/
@@ -76,6 +78,11 @@ def health_check(request):
     logger.info("Health check endpoint called")
     return Response({'status': 'healthy', 'message': 'Music Bingo API (Django)'})
 
+@api_view(['GET'])
+def upstream_stats(request):
+    """Latency histograms and circuit state of the outbound APIs (this worker process)"""
+    return Response({'pid': os.getpid(), 'upstreams': http_client.stats()})
+
 @api_view(['GET'])
 def get_pool(request):
     try:
@@ -100,23 +107,147 @@ def generate_cards_async(request):
         data = request.data
         venue_name = data.get('venue_name', 'Music Bingo')
         num_players = data.get('num_players', 25)
+        num_cards = data.get('num_cards', 50)
         pub_logo = data.get('pub_logo')
         social_media = data.get('social_media')
         include_qr = data.get('include_qr', False)
         game_number = data.get('game_number', 1)
-        game_date = data.get('game_date')
+        # Resolve "today" now so it is part of the cache key
+        game_date = data.get('game_date') or datetime.now().strftime("%A, %B %d, %Y")
+        seed = data.get('seed')
+        # Host targets for how many songs until each pattern is won
+        game_length = data.get('game_length')
+        # Bingo session the printed cards belong to (gets the card manifest)
+        session_id = data.get('session_id')
         
         # Get prizes
         prize_4corners = data.get('prize_4corners', '')
         prize_first_line = data.get('prize_first_line', '')
         prize_full_house = data.get('prize_full_house', '')
         
-        logger.info(f"Starting async card generation: {num_players} cards for '{venue_name}'")
+        # PDF engine: 'platypus' (flowables) or 'canvas' (direct drawing, much faster)
+        render_engine = data.get('render_engine') or CARD_RENDER_ENGINE
+        if render_engine not in ('platypus', 'canvas'):
+            return Response({'error': f"Unknown render_engine '{render_engine}'"}, status=400)
+        if seed is not None:
+            try:
+                seed = int(seed)
+            except (TypeError, ValueError):
+                return Response({'error': 'seed must be an integer'}, status=400)
+        try:
+            num_cards = int(num_cards)
+        except (TypeError, ValueError):
+            return Response({'error': 'num_cards must be an integer'}, status=400)
+        from card_distribution import MAX_CARDS
+        if not 1 <= num_cards <= MAX_CARDS:
+            return Response({'error': f'num_cards must be between 1 and {MAX_CARDS}'}, status=400)
+        if game_length is not None:
+            from card_distribution import parse_game_length
+            try:
+                game_length = {pattern: list(bounds) for pattern, bounds in parse_game_length(game_length).items()}
+            except ValueError as e:
+                return Response({'error': str(e)}, status=400)
+        
+        logger.info(f"Starting async card generation: {num_cards} cards ({num_players} players) for '{venue_name}'")
         logger.info(f"  pub_logo: {pub_logo[:100] if pub_logo else 'None'}...")  # Truncate for readability
         logger.info(f"  pub_logo type: {type(pub_logo)}, length: {len(pub_logo) if pub_logo else 0}")
         logger.info(f"  social_media: {social_media}, include_qr: {include_qr}")
         logger.info(f"  prizes: {prize_4corners}, {prize_first_line}, {prize_full_house}")
         
+        options = {
+            'venue_name': venue_name,
+            'num_players': int(num_players),
+            'num_cards': num_cards,
+            'game_number': int(game_number),
+            'game_date': game_date,
+            'social_media': social_media,
+            'include_qr': bool(include_qr),
+            'prize_4corners': prize_4corners,
+            'prize_first_line': prize_first_line,
+            'prize_full_house': prize_full_house,
+            'render_engine': render_engine,
+            'game_length': game_length
+        }
+        
+        if pub_logo:
+            logger.info(f"pub_logo received: {pub_logo[:100]}...")
+            # Convert relative URL to absolute path
+            if pub_logo.startswith('/data/'):
+                options['pub_logo'] = str(BASE_DIR / pub_logo[1:])  # Remove leading /
+                logger.info(f"✅ Using pub logo PATH: {options['pub_logo']}")
+            elif pub_logo.startswith('http'):
+                options['pub_logo'] = pub_logo
+                logger.info(f"✅ Using pub logo URL: {pub_logo}")
+            elif pub_logo.startswith('data:'):
+                # Handle data URI (base64 encoded image)
+                options['pub_logo'] = pub_logo
+                logger.info(f"✅ Using pub logo DATA URI (base64)")
+            else:
+                logger.warning(f"⚠️ Unknown pub_logo format, skipping. Starts with: {pub_logo[:20]}")
+        else:
+            logger.info(f"ℹ️ No pub_logo provided")
+        
+        # Same inputs -> same seed -> same cards -> same cache key
+        from . import card_cache
+        inputs = card_cache.card_set_inputs(
+            options, card_cache.logo_digest(pub_logo, BASE_DIR, own_host=request.get_host())
+        )
+        if seed is None:
+            seed = card_cache.default_seed(inputs)
+        options['seed'] = seed
+        cache_key = card_cache.cache_key(inputs, seed)
+        
+        if card_cache.CARD_CACHE_ENABLED:
+            try:
+                entry = card_cache.lookup(cache_key)
+                if entry is not None:
+                    logger.info(f"♻️ Card cache hit {cache_key[:12]} (task {entry.task_id}, "
+                                f"{entry.hit_count + 1} hits)")
+                    if session_id and entry.manifest:
+                        attach_card_manifest(session_id, entry.seed, entry.manifest)
+                    task = TaskStatus.objects.create(
+                        task_id=str(uuid.uuid4()),
+                        task_type='card_generation',
+                        status='completed',
+                        progress=100,
+                        completed_at=timezone.now(),
+                        result={
+                            'success': True,
+                            'download_url': entry.download_url,
+                            'num_cards': entry.num_cards,
+                            'generation_time': entry.generation_time,
+                            'file_size_mb': entry.file_size_mb,
+                            'seed': entry.seed,
+                            'game_length': (entry.manifest or {}).get('game_length'),
+                            'cached': True
+                        },
+                        metadata={
+                            'venue_name': venue_name,
+                            'num_players': num_players,
+                            'num_cards': num_cards,
+                            'game_number': game_number,
+                            'render_engine': render_engine,
+                            'seed': seed,
+                            'cache_key': cache_key
+                        }
+                    )
+                    return Response({'task_id': task.task_id, 'status': 'completed', 'result': task.result})
+                
+                # Identical request already running (e.g. page reloaded) - follow that task.
+                # Only for the same bingo session: the task attaches its manifest to that one
+                running = TaskStatus.objects.filter(
+                    task_type='card_generation',
+                    status__in=['pending', 'processing'],
+                    metadata__cache_key=cache_key,
+                    metadata__session_id=session_id
+                ).first()
+                if running is not None:
+                    logger.info(f"♻️ Identical card set already generating (task {running.task_id})")
+                    return Response({'task_id': running.task_id, 'status': running.status}, status=202)
+            except Exception as e:
+                # The cache is only an optimisation - never fail generation because of it
+                logger.warning(f"⚠️ Card cache lookup failed: {e}")
+        
         task_id = str(uuid.uuid4())
         
         # Create task in database
@@ -128,7 +259,12 @@ def generate_cards_async(request):
             metadata={
                 'venue_name': venue_name,
                 'num_players': num_players,
-                'game_number': game_number
+                'num_cards': num_cards,
+                'game_number': game_number,
+                'render_engine': render_engine,
+                'seed': seed,
+                'cache_key': cache_key,
+                'session_id': session_id
             }
         )
         
@@ -138,144 +274,81 @@ def generate_cards_async(request):
                 task.status = 'processing'
                 task.save(update_fields=['status'])
                 
-                script_path = BASE_DIR / 'generate_cards.py'
-                cmd = [
-                    'python3', str(script_path),
-                    '--venue_name', venue_name,
-                    '--num_players', str(num_players),
-                    '--game_number', str(game_number)
-                ]
-                
-                if game_date:
-                    cmd.extend(['--game_date', game_date])
-                
-                if pub_logo:
-                    logger.info(f"Task {task_id}: pub_logo received: {pub_logo[:100]}...")
-                    # Convert relative URL to absolute path
-                    if pub_logo.startswith('/data/'):
-                        logo_path = str(BASE_DIR / pub_logo[1:])  # Remove leading /
-                        cmd.extend(['--pub_logo', logo_path])
-                        logger.info(f"Task {task_id}: ✅ Using pub logo PATH: {logo_path}")
-                    elif pub_logo.startswith('http'):
-                        cmd.extend(['--pub_logo', pub_logo])
-                        logger.info(f"Task {task_id}: ✅ Using pub logo URL: {pub_logo}")
-                    elif pub_logo.startswith('data:'):
-                        # Handle data URI (base64 encoded image)
-                        cmd.extend(['--pub_logo', pub_logo])
-                        logger.info(f"Task {task_id}: ✅ Using pub logo DATA URI (base64)")
-                    else:
-                        logger.warning(f"Task {task_id}: ⚠️ Unknown pub_logo format, skipping. Starts with: {pub_logo[:20]}")
-                else:
-                    logger.info(f"Task {task_id}: ℹ️ No pub_logo provided")
-                
-                if social_media:
-                    cmd.extend(['--social_media', social_media])
-                    logger.info(f"Task {task_id}: Adding social media QR: {social_media}")
-                
                 if include_qr:
-                    cmd.extend(['--include_qr', 'true'])
-                    logger.info(f"Task {task_id}: QR code enabled")
+                    logger.info(f"Task {task_id}: QR code enabled ({social_media})")
                 
-                # Add prizes if provided
-                if prize_4corners:
-                    cmd.extend(['--prize_4corners', prize_4corners])
-                if prize_first_line:
-                    cmd.extend(['--prize_first_line', prize_first_line])
-                if prize_full_house:
-                    cmd.extend(['--prize_full_house', prize_full_house])
+                last_progress = {'value': -1}
                 
-                logger.info(f"Task {task_id}: Running command: {' '.join(cmd)}")
+                def on_progress(event):
+                    # Runs on the service listener thread - single UPDATE, no model instance
+                    if event['progress'] == last_progress['value']:
+                        return
+                    last_progress['value'] = event['progress']
+                    TaskStatus.objects.filter(task_id=task_id).update(
+                        progress=event['progress'],
+                        current_step=event['stage']
+                    )
+                    logger.info(f"Task {task_id}: Progress {event['progress']}% "
+                                f"({event['stage']}, {event['memory_mb']} MB)")
                 
-                # Run with real-time output capture for progress tracking
-                process = subprocess.Popen(
-                    cmd,
-                    cwd=str(BASE_DIR),
-                    stdout=subprocess.PIPE,
-                    stderr=subprocess.PIPE,
-                    text=True,
-                    bufsize=1
-                )
+                def on_queued():
+                    TaskStatus.objects.filter(task_id=task_id).update(current_step='queued')
                 
-                stdout_lines = []
-                stderr_lines = []
-                
-                # Read output line by line for progress tracking
-                while True:
-                    output = process.stdout.readline()
-                    if output == '' and process.poll() is not None:
-                        break
-                    if output:
-                        line = output.strip()
-                        stdout_lines.append(line)
-                        logger.info(f"Task {task_id}: {line}")
-                        
-                        # Parse structured progress from output (PROGRESS: XX)
-                        if line.startswith('PROGRESS:'):
-                            try:
-                                progress_str = line.split('PROGRESS:')[1].strip()
-                                progress_val = int(float(progress_str))
-                                task.progress = progress_val
-                                task.save(update_fields=['progress'])
-                                logger.info(f"Task {task_id}: Progress updated to {progress_val}%")
-                            except Exception as e:
-                                logger.warning(f"Task {task_id}: Failed to parse progress: {e}")
-                        # Also parse emoji format for backwards compatibility
-                        elif '📊 Progress:' in line:
-                            try:
-                                progress_str = line.split('Progress:')[1].split('%')[0].strip()
-                                task.progress = int(float(progress_str))
-                                task.save(update_fields=['progress'])
-                            except:
-                                pass
-                
-                # Get any remaining stderr
-                stderr_output = process.stderr.read()
-                if stderr_output:
-                    stderr_lines.append(stderr_output)
-                
-                return_code = process.poll()
-                
-                # Create result object similar to subprocess.run
-                class Result:
-                    def __init__(self, returncode, stdout, stderr):
-                        self.returncode = returncode
-                        self.stdout = stdout
-                        self.stderr = stderr
-                
-                result = Result(return_code, '\n'.join(stdout_lines), '\n'.join(stderr_lines))
-                
-                if result.returncode != 0:
-                    logger.error(f"Task {task_id}: Failed with error: {result.stderr}")
-                    task.status = 'failed'
-                    task.error = result.stderr
-                    task.completed_at = timezone.now()
-                    task.save(update_fields=['status', 'error', 'completed_at'])
-                    return
+                # Run in the pre-warmed worker pool (no new interpreter per job).
+                # Each task writes to its own data/cards/<task_id>/ directory.
+                from .card_service import get_card_service
+                result = get_card_service().generate(
+                    task_id, options, progress_callback=on_progress, on_queued=on_queued
+                )
                 
                 # Upload PDF to GCS
-                pdf_path = DATA_DIR / 'cards' / 'music_bingo_cards.pdf'
+                pdf_path = Path(result['output_file'])
+                fallback_url = f'/data/cards/{task_id}/{pdf_path.name}'
+                file_size_mb = None
                 if pdf_path.exists():
+                    file_size_mb = round(pdf_path.stat().st_size / 1024 / 1024, 2)
                     try:
                         # Use task_id in blob name for uniqueness
                         blob_name = f"cards/{task_id}/music_bingo_cards.pdf"
                         download_url = upload_to_gcs(str(pdf_path), blob_name)
                         logger.info(f"Task {task_id}: PDF uploaded to GCS, signed URL generated")
+                        # Uploaded - local copy no longer needed
+                        if pdf_path.parent.name == task_id:
+                            shutil.rmtree(pdf_path.parent, ignore_errors=True)
                     except Exception as upload_error:
+                        # Keep the local file; stale job dirs are swept after CARD_OUTPUT_TTL_HOURS
                         logger.error(f"Task {task_id}: GCS upload failed: {upload_error}")
-                        download_url = '/data/cards/music_bingo_cards.pdf'  # Fallback
+                        download_url = fallback_url  # Fallback
                 else:
                     logger.warning(f"Task {task_id}: PDF not found at {pdf_path}")
-                    download_url = '/data/cards/music_bingo_cards.pdf'  # Fallback
+                    download_url = fallback_url  # Fallback
                 
                 logger.info(f"Task {task_id}: Completed successfully")
                 task.status = 'completed'
                 task.progress = 100
                 task.result = {
                     'success': True,
-                    'download_url': download_url
+                    'download_url': download_url,
+                    'num_cards': result['num_cards'],
+                    'generation_time': result['generation_time'],
+                    'file_size_mb': file_size_mb,
+                    'seed': result['seed'],
+                    'game_length': result['game_length']
                 }
                 task.completed_at = timezone.now()
                 task.save(update_fields=['status', 'progress', 'result', 'completed_at'])
+                
+                if session_id:
+                    attach_card_manifest(session_id, result['seed'], result['manifest'])
+                
+                if card_cache.CARD_CACHE_ENABLED:
+                    try:
+                        # Local fallback files are swept, so remember where they live
+                        local_path = str(pdf_path) if download_url == fallback_url else ''
+                        card_cache.store(cache_key, seed, task_id, task.result, local_path=local_path,
+                                         manifest=result['manifest'])
+                    except Exception as e:
+                        logger.warning(f"Task {task_id}: could not cache card set: {e}")
             except Exception as e:
                 logger.error(f"Task {task_id}: Exception: {str(e)}")
                 task.status = 'failed'
@@ -290,6 +363,20 @@ def generate_cards_async(request):
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
+def attach_card_manifest(session_id, seed, manifest):
+    """Record on the bingo session which songs are on its printed cards"""
+    from .models import BingoSession
+    
+    updated = BingoSession.objects.filter(session_id=session_id).update(
+        card_seed=seed,
+        card_manifest=manifest
+    )
+    if updated:
+        logger.info(f"🃏 Session {session_id}: card manifest saved ({len(manifest['cards'])} cards, seed {seed})")
+    else:
+        logger.warning(f"⚠️ Session {session_id} not found, card manifest not saved")
+
+
 @api_view(['GET'])
 def get_task_status(request, task_id):
     try:
@@ -322,7 +409,9 @@ def get_task_status(request, task_id):
 
 @api_view(['POST'])
 def generate_tts(request):
-    """Proxy for ElevenLabs TTS"""
+    """Proxy for ElevenLabs TTS (answered from the TTS cache when the line was said before)"""
+    from .tts_cache import TTSError, audio_response, get_cache, tts_params
+
     if not ELEVENLABS_API_KEY:
         return Response({'error': 'ElevenLabs API key not configured'}, status=500)
     
@@ -333,42 +422,19 @@ def generate_tts(request):
         if not text:
             return Response({'error': 'No text provided'}, status=400)
         
-        url = f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
-        
-        response = requests.post(
-            url,
-            headers={
-                'xi-api-key': ELEVENLABS_API_KEY,
-                'Content-Type': 'application/json'
-            },
-            json={
-                'text': text,
-                'model_id': 'eleven_turbo_v2_5',
-                'voice_settings': {
-                    'stability': 0.35,
-                    'similarity_boost': 0.85,
-                    'style': 0.5,
-                    'use_speaker_boost': True
-                },
-                'optimize_streaming_latency': 1,
-                'output_format': 'mp3_44100_128'
-            }
-        )
-        
-        if not response.ok:
-            return Response({
-                'error': f'ElevenLabs API error: {response.status_code}',
-                'details': response.text
-            }, status=response.status_code)
-        
-        return HttpResponse(response.content, content_type='audio/mpeg')
+        audio = get_cache().synthesize(tts_params(text, voice_id), ELEVENLABS_API_KEY)
+        return audio_response(request, audio)
         
+    except TTSError as e:
+        return Response({'error': str(e), 'details': e.details}, status=e.status)
     except Exception as e:
         return Response({'error': str(e)}, status=500)
 
 @api_view(['POST'])
 def generate_tts_preview(request):
     """Generate TTS preview with custom voice settings"""
+    from .tts_cache import TTSError, audio_response, get_cache, tts_params
+
     if not ELEVENLABS_API_KEY:
         return Response({'error': 'ElevenLabs API key not configured'}, status=500)
     
@@ -390,36 +456,28 @@ def generate_tts_preview(request):
         
         logger.info(f"Generating TTS preview: voice={voice_id}, settings={settings_payload}")
         
-        url = f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
-        
-        response = requests.post(
-            url,
-            headers={
-                'xi-api-key': ELEVENLABS_API_KEY,
-                'Content-Type': 'application/json'
-            },
-            json={
-                'text': text,
-                'model_id': 'eleven_multilingual_v2',
-                'voice_settings': settings_payload,
-                'optimize_streaming_latency': 1,
-                'output_format': 'mp3_44100_128'
-            },
-            timeout=30
-        )
-        
-        if not response.ok:
-            return Response({
-                'error': f'ElevenLabs API error: {response.status_code}',
-                'details': response.text
-            }, status=response.status_code)
-        
-        return HttpResponse(response.content, content_type='audio/mpeg')
+        params = tts_params(text, voice_id, model_id='eleven_multilingual_v2', voice_settings=settings_payload)
+        audio = get_cache().synthesize(params, ELEVENLABS_API_KEY, timeout=30)
+        return audio_response(request, audio)
         
+    except TTSError as e:
+        return Response({'error': str(e), 'details': e.details}, status=e.status)
     except Exception as e:
         logger.error(f"Error generating TTS preview: {e}", exc_info=True)
         return Response({'error': str(e)}, status=500)
 
+@api_view(['GET'])
+def get_tts_audio(request, key):
+    """A clip from the TTS cache by key (X-TTS-Key of the response that synthesised it)"""
+    from .tts_cache import audio_response, get_cache
+
+    if not re.fullmatch(r'[0-9a-f]{64}', key):
+        return Response({'error': 'Invalid key'}, status=400)
+    audio = get_cache().get(key)
+    if audio is None:
+        return Response({'error': 'Audio not found'}, status=404)
+    return audio_response(request, audio)
+
 @api_view(['GET'])
 def get_announcements(request):
     """Get announcements with venue name"""
@@ -526,7 +584,7 @@ def generate_jingle(request):
     Returns: {task_id: "uuid"}
     """
     try:
-        from .audio_mixer import mix_tts_with_music
+        from . import jingle_pipeline
         
         data = request.data
         text = data.get('text', '').strip()
@@ -534,7 +592,7 @@ def generate_jingle(request):
         music_prompt = data.get('music_prompt', 'upbeat energetic pub background music')
         
         # No text truncation - let TTS handle the full text
-        # Duration will be calculated dynamically after TTS generation
+        # Music length is estimated from the text, then fitted to the real TTS length when mixing
         
         logger.info(f"Generating jingle for text: '{text[:50]}...'")
         
@@ -584,81 +642,15 @@ def generate_jingle(request):
                 task.status = 'processing'
                 task.save(update_fields=['status'])
                 
-                # Step 1: Generate TTS
-                logger.info(f"Task {task_id}: Generating TTS...")
-                task.progress = 20
-                task.current_step = 'generating_voice'
-                task.save(update_fields=['progress', 'current_step'])
-                
-                tts_url = f'https://api.elevenlabs.io/v1/text-to-speech/{voice_id}'
-                tts_payload = {
-                    'text': text,
-                    'model_id': 'eleven_multilingual_v2',
-                    'voice_settings': voice_settings_payload
-                }
-                tts_headers = {
-                    'xi-api-key': ELEVENLABS_API_KEY,
-                    'Content-Type': 'application/json'
-                }
-                
-                tts_response = requests.post(tts_url, json=tts_payload, headers=tts_headers, timeout=30)
+                # Steps 1-3: voice and music in parallel, then the mix
+                def report(progress, step):
+                    task.progress = progress
+                    task.current_step = step
+                    task.save(update_fields=['progress', 'current_step'])
                 
-                if tts_response.status_code != 200:
-                    raise Exception(f'TTS API error: {tts_response.status_code} - {tts_response.text}')
-                
-                tts_bytes = tts_response.content
-                logger.info(f"Task {task_id}: TTS generated ({len(tts_bytes)} bytes)")
-                
-                # Calculate actual TTS duration to generate matching music
-                from pydub import AudioSegment
-                tts_audio = AudioSegment.from_mp3(io.BytesIO(tts_bytes))
-                tts_duration_seconds = len(tts_audio) / 1000  # Convert ms to seconds
-                logger.info(f"Task {task_id}: TTS duration: {tts_duration_seconds:.2f}s")
-                
-                # Generate music with TTS duration + 2 seconds for intro/outro
-                music_duration = min(max(int(tts_duration_seconds) + 2, 5), 30)  # Between 5-30 seconds
-                logger.info(f"Task {task_id}: Music target duration: {music_duration}s")
-                
-                # Step 2: Generate Music
-                logger.info(f"Task {task_id}: Generating music...")
-                task.progress = 50
-                task.current_step = 'generating_music'
-                task.save(update_fields=['progress', 'current_step'])
-                
-                # ElevenLabs Music Generation API
-                music_url = 'https://api.elevenlabs.io/v1/sound-generation'
-                music_payload = {
-                    'text': music_prompt,
-                    'duration_seconds': music_duration
-                }
-                music_headers = {
-                    'xi-api-key': ELEVENLABS_API_KEY,
-                    'Content-Type': 'application/json'
-                }
-                
-                music_response = requests.post(music_url, json=music_payload, headers=music_headers, timeout=60)
-                
-                if music_response.status_code != 200:
-                    logger.warning(f"Music API error: {music_response.status_code}, using fallback")
-                    # Fallback: use silent background or default music
-                    # For now, we'll create a simple tone as placeholder
-                    from pydub.generators import Sine
-                    music_audio = Sine(440).to_audio_segment(duration=music_duration * 1000).apply_gain(-20)
-                    music_io = io.BytesIO()
-                    music_audio.export(music_io, format='mp3')
-                    music_bytes = music_io.getvalue()
-                else:
-                    music_bytes = music_response.content
-                
-                logger.info(f"Task {task_id}: Music generated ({len(music_bytes)} bytes)")
-                
-                # Step 3: Mix audio
-                logger.info(f"Task {task_id}: Mixing audio...")
-                task.progress = 75
-                task.current_step = 'mixing'
-                task.save(update_fields=['progress', 'current_step'])
-                
-                mixed_audio = mix_tts_with_music(tts_bytes, music_bytes)
+                jingle = jingle_pipeline.render_jingle(text, voice_id, voice_settings_payload, music_prompt,
+                                                       on_step=report)
+                mixed_audio = jingle['audio']
                 
                 # Step 4: Save file
                 logger.info(f"Task {task_id}: Saving file...")
@@ -691,7 +683,10 @@ def generate_jingle(request):
                     'audio_url': f'/api/jingles/{filename}',
                     'filename': filename,
                     'duration_seconds': actual_duration,
-                    'size_bytes': len(mixed_audio)
+                    'size_bytes': len(mixed_audio),
+                    'speech_seconds': jingle['speech_seconds'],
+                    'music_seconds': jingle['music_seconds'],
+                    'timings': jingle['timings']
                 }
                 task.completed_at = timezone.now()
                 task.save(update_fields=['status', 'progress', 'current_step', 'result', 'completed_at'])
@@ -820,7 +815,7 @@ def generate_music_preview(request):
             'Content-Type': 'application/json'
         }
         
-        response = requests.post(url, json=payload, headers=headers, timeout=30)
+        response = http_client.post(url, json=payload, headers=headers, timeout=30)
         
         if response.status_code != 200:
             logger.error(f"Music API error: {response.status_code} - {response.text}")
@@ -1758,6 +1753,8 @@ def bingo_session_detail(request, session_id):
             'prizes': session.prizes,
             'songs_played': session.songs_played,
             'current_song_index': session.current_song_index,
+            'card_seed': session.card_seed,
+            'has_cards': bool(session.card_manifest),
             'status': session.status,
             'created_at': session.created_at.isoformat(),
             'started_at': session.started_at.isoformat() if session.started_at else None,
@@ -1782,6 +1779,11 @@ def bingo_session_detail(request, session_id):
             
             session.save()
             
+            if data.get('status') == 'active':
+                # Whatever the game hasn't preloaded yet (no-op without ElevenLabs)
+                from . import bingo_audio
+                bingo_audio.start_prerender(session)
+            
             return Response({
                 'success': True,
                 'message': 'Session updated successfully'
@@ -1803,6 +1805,212 @@ def bingo_session_detail(request, session_id):
             return Response({'error': str(e)}, status=500)
 
 
+@api_view(['GET'])
+def bingo_session_song_set(request, session_id):
+    """
+    Songs printed on the session's cards, in the order the game should call them
+    
+    The game plays from this set instead of shuffling its own copy of the
+    pool, so every called song is on at least one card.
+    """
+    from .models import BingoSession
+    from .bingo_claims import load_pool, pool_matches
+    
+    try:
+        session = BingoSession.objects.get(session_id=session_id)
+    except BingoSession.DoesNotExist:
+        return Response({'error': 'Session not found'}, status=404)
+    
+    manifest = session.card_manifest
+    if not manifest:
+        return Response({'error': 'No cards generated for this session yet'}, status=404)
+    
+    try:
+        pool_data = load_pool(DATA_DIR / 'pool.json')
+        pool = pool_data.get('songs', [])
+        
+        if not pool_matches(manifest, pool_data):
+            logger.warning(f"⚠️ Session {session_id}: song pool changed since the cards were printed")
+            return Response({'error': 'Song pool changed since the cards were generated, please regenerate them'},
+                            status=409)
+        
+        return Response({
+            'session_id': session_id,
+            'seed': session.card_seed,
+            'num_cards': len(manifest['cards']),
+            'game_length': manifest.get('game_length'),
+            'songs': [pool[idx] for idx in manifest['songs']]
+        })
+    except Exception as e:
+        logger.error(f"Error loading song set for session {session_id}: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+
+@api_view(['GET', 'POST'])
+def bingo_announcement_audio(request, session_id):
+    """
+    Announcements of a game, pre-rendered so calls play instantly (and offline)
+    
+    POST (from game.js when it loads): {voice_id, lines, song_ids} - the lines
+    the game can say on its own and the songs it will call; starts rendering
+    them plus the custom and AI announcements (202 with the task id).
+    GET: the manifest - every line with its clip URL and whether it's ready.
+    """
+    from .models import BingoSession
+    from . import bingo_audio
+    
+    try:
+        session = BingoSession.objects.get(session_id=session_id)
+    except BingoSession.DoesNotExist:
+        return Response({'error': 'Session not found'}, status=404)
+    
+    try:
+        if request.method == 'POST':
+            lines = request.data.get('lines', [])
+            song_ids = request.data.get('song_ids', [])
+            if not isinstance(lines, list) or not isinstance(song_ids, list):
+                return Response({'error': 'lines and song_ids must be lists'}, status=400)
+            
+            task_id = bingo_audio.start_prerender(
+                session,
+                voice_id=request.data.get('voice_id'),
+                script_lines=lines,
+                song_ids=song_ids
+            )
+            if not task_id:
+                return Response({'error': 'ElevenLabs API key not configured'}, status=500)
+            return Response({'success': True, 'task_id': task_id}, status=202)
+        
+        clips, task = bingo_audio.manifest(session)
+        return Response({
+            'session_id': session_id,
+            'clips': clips,
+            'ready': sum(1 for clip in clips if clip['ready']),
+            'total': len(clips),
+            'task_id': task.task_id if task else None,
+            'task_status': task.status if task else None
+        })
+    except Exception as e:
+        logger.error(f"Error preparing announcement audio for session {session_id}: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+
+def _claim_stats(session):
+    """Claim stats for a session, or None if it has no printed cards"""
+    from .bingo_claims import board_for_session
+    
+    board = board_for_session(session, DATA_DIR / 'pool.json')
+    return board.stats() if board else None
+
+
+@api_view(['POST'])
+def call_bingo_song(request, session_id):
+    """
+    Record a called song and return the claim stats for the host
+    
+    POST {song_id} -> {called, claim_stats: {patterns: {pattern: {winners, one_away}}}}
+    """
+    from django.db import transaction
+    from .models import BingoSession
+    
+    song_id = request.data.get('song_id')
+    if not song_id:
+        return Response({'error': 'song_id is required'}, status=400)
+    
+    try:
+        with transaction.atomic():
+            try:
+                session = BingoSession.objects.select_for_update().get(session_id=session_id)
+            except BingoSession.DoesNotExist:
+                return Response({'error': 'Session not found'}, status=404)
+            
+            songs_played = list(session.songs_played or [])
+            if str(song_id) not in map(str, songs_played):
+                songs_played.append(str(song_id))
+            session.songs_played = songs_played
+            session.current_song_index = len(songs_played)
+            session.save(update_fields=['songs_played', 'current_song_index'])
+        
+        return Response({
+            'success': True,
+            'called': len(songs_played),
+            'claim_stats': _claim_stats(session)
+        })
+    except Exception as e:
+        logger.error(f"Error recording called song for session {session_id}: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+
+@api_view(['GET'])
+def bingo_claim_stats(request, session_id):
+    """Winners and "one away" counts per pattern across all printed cards"""
+    from .models import BingoSession
+    
+    try:
+        session = BingoSession.objects.get(session_id=session_id)
+    except BingoSession.DoesNotExist:
+        return Response({'error': 'Session not found'}, status=404)
+    
+    try:
+        stats = _claim_stats(session)
+        if stats is None:
+            return Response({'error': 'No cards generated for this session yet'}, status=404)
+        return Response(stats)
+    except Exception as e:
+        logger.error(f"Error computing claim stats for session {session_id}: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+
+@api_view(['POST'])
+def verify_bingo_claim(request, session_id):
+    """
+    Verify a winner's claim against the printed card and the songs called so far
+    
+    POST {card_number, pattern: four_corners | first_line | full_house}
+    """
+    from .models import BingoSession
+    from .bingo_claims import board_for_session, load_pool_songs, prize_for, PATTERNS
+    
+    try:
+        session = BingoSession.objects.get(session_id=session_id)
+    except BingoSession.DoesNotExist:
+        return Response({'error': 'Session not found'}, status=404)
+    
+    pattern = request.data.get('pattern', 'full_house')
+    if pattern not in PATTERNS:
+        return Response({'error': f'Invalid pattern. Must be one of: {list(PATTERNS)}'}, status=400)
+    try:
+        card_number = int(request.data.get('card_number'))
+    except (TypeError, ValueError):
+        return Response({'error': 'card_number must be an integer'}, status=400)
+    
+    try:
+        board = board_for_session(session, DATA_DIR / 'pool.json')
+        if board is None:
+            return Response({'error': 'No cards generated for this session yet'}, status=404)
+        
+        try:
+            result = board.verify(card_number, pattern)
+        except ValueError as e:
+            return Response({'error': str(e)}, status=400)
+        
+        # Songs the host can read out for a bogus claim
+        pool = load_pool_songs(DATA_DIR / 'pool.json')
+        result['missing_songs'] = [
+            {'title': pool[idx]['title'], 'artist': pool[idx]['artist']}
+            for idx in (board.cell_song(card_number, cell) for cell in result['missing_cells'])
+        ]
+        result['prize'] = prize_for(session.prizes, pattern)
+        result['called'] = len(board.played)
+        
+        logger.info(f"🏆 Session {session_id}: claim card #{card_number} {pattern} -> "
+                    f"{'VALID' if result['valid'] else 'not valid'}")
+        return Response(result)
+    except Exception as e:
+        logger.error(f"Error verifying claim for session {session_id}: {e}", exc_info=True)
+        return Response({'error': str(e)}, status=500)
+
+
 @api_view(['PATCH'])
 def update_bingo_session_status(request, session_id):
     """Update bingo session status (pending -> active -> completed)"""
@@ -1825,6 +2033,11 @@ def update_bingo_session_status(request, session_id):
         
         logger.info(f"Updated bingo session {session_id} status to: {new_status}")
         
+        if new_status == 'active':
+            # Whatever the game hasn't preloaded yet (no-op without ElevenLabs)
+            from . import bingo_audio
+            bingo_audio.start_prerender(session)
+        
         return Response({
             'success': True,
             'status': new_status,
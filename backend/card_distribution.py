@@ -0,0 +1,280 @@
+"""
+Card Distribution Optimizer
+Chooses how many songs to call and how to lay them out on the cards so a game
+lasts a predictable number of songs
+
+How long a bingo game runs depends on the call-set size (more songs = each card
+needs longer to fill) and on the layout. Instead of a fixed "3 songs per player"
+rule, candidate layouts are played out with random call orders (Monte Carlo) and
+the one whose expected "4 corners", "first line" and "full house" times fall
+inside the host's target song counts is kept. The simulated distribution is
+returned so the host knows how long the night will be.
+"""
+
+import os
+import random
+from itertools import chain
+from operator import itemgetter
+from typing import Dict, List, Optional, Tuple
+
+GRID_SIZE = 5
+SONGS_PER_CARD = 24  # 25 cells - 1 FREE
+FREE_CELL = 12
+
+# Most cards one job prints (large-venue mode: pages are streamed, memory stays flat)
+MAX_CARDS = 5000
+
+MIN_CALL_SET = 30
+MAX_CALL_SET = 150
+
+# Song counts (min, max) at which the first winner of each pattern should appear
+# (at ~30s a song, a full house by song 70 keeps the game inside ~35 minutes)
+DEFAULT_GAME_LENGTH = {
+    'four_corners': (10, 30),
+    'first_line': (8, 25),
+    'full_house': (45, 70),
+}
+GAME_PATTERNS = tuple(DEFAULT_GAME_LENGTH)
+
+SIMULATION_TRIALS = int(os.getenv('CARD_SIMULATION_TRIALS', '120'))
+SIMULATION_MIN_TRIALS = 4
+SIMULATION_CARD_GAMES = 20000  # cards in play x trials per candidate, for big events
+LAYOUT_CANDIDATES = 3
+
+
+def _slot(cell: int) -> int:
+    """Grid cell (row * 5 + col) -> position in a card's 24-song list"""
+    return cell if cell < FREE_CELL else cell - 1
+
+
+def _pattern_slots() -> Dict[str, List[Tuple[int, ...]]]:
+    """
+    Card-list positions each pattern needs called (the FREE cell is always marked)
+
+    All entries of a pattern have the same length: lines through FREE have only
+    4 songs and repeat one of them, which doesn't change when the line is done.
+    """
+    rows = [[r * GRID_SIZE + c for c in range(GRID_SIZE)] for r in range(GRID_SIZE)]
+    cols = [[r * GRID_SIZE + c for r in range(GRID_SIZE)] for c in range(GRID_SIZE)]
+    diagonals = [[i * GRID_SIZE + i for i in range(GRID_SIZE)],
+                 [i * GRID_SIZE + GRID_SIZE - 1 - i for i in range(GRID_SIZE)]]
+
+    def slots(cells):
+        positions = [_slot(cell) for cell in cells if cell != FREE_CELL]
+        return tuple(positions + positions[:1] * (len(cells) - len(positions)))
+
+    return {
+        'four_corners': [slots([0, 4, 20, 24])],
+        'first_line': [slots(line) for line in rows + cols + diagonals],
+        'full_house': [tuple(range(SONGS_PER_CARD))],
+    }
+
+
+PATTERN_SLOTS = _pattern_slots()
+
+
+def parse_game_length(value: Optional[Dict]) -> Dict[str, Tuple[int, int]]:
+    """
+    Validate host targets, e.g. {'full_house': [40, 55]} (missing patterns use the defaults)
+
+    Raises:
+        ValueError: unknown pattern or invalid range
+    """
+    if value is not None and not isinstance(value, dict):
+        raise ValueError("game_length must be an object like {'full_house': [45, 70]}")
+    targets = dict(DEFAULT_GAME_LENGTH)
+    for pattern, bounds in (value or {}).items():
+        if pattern not in DEFAULT_GAME_LENGTH:
+            raise ValueError(f"Unknown pattern '{pattern}', expected one of {list(GAME_PATTERNS)}")
+        try:
+            low, high = (int(b) for b in bounds)
+        except (TypeError, ValueError):
+            raise ValueError(f"game_length['{pattern}'] must be [min_songs, max_songs]")
+        if not 1 <= low <= high:
+            raise ValueError(f"game_length['{pattern}'] must satisfy 1 <= min <= max")
+        targets[pattern] = (low, high)
+    return targets
+
+
+def balanced_layout(num_songs: int, num_cards: int, rng: random.Random,
+                    songs_per_card: int = SONGS_PER_CARD) -> List[List[int]]:
+    """
+    Cards as lists of call-set indices
+
+    Every song is printed on as many cards as every other (+-1) and never twice
+    on the same card, so no song is a "dud" and no card is luckier than the rest.
+    Cards are dealt from a shuffled deck of the call set, reshuffled each round.
+    """
+    deck: List[int] = []
+    cards = []
+    for _ in range(num_cards):
+        card = deck[-songs_per_card:]
+        del deck[-songs_per_card:]
+        if len(card) < songs_per_card:
+            # New round: songs already on this card go to the bottom of the deck
+            on_card = set(card)
+            deck = list(range(num_songs))
+            rng.shuffle(deck)
+            deck.sort(key=lambda idx: idx not in on_card)
+            need = songs_per_card - len(card)
+            card += deck[-need:]
+            del deck[-need:]
+            rng.shuffle(card)
+        cards.append(card)
+    return cards
+
+
+def trials_for(cards_in_play: int) -> int:
+    """
+    Games to simulate per candidate
+
+    The first winner among many cards varies little from game to game, so big
+    events need fewer trials - this caps the work per candidate.
+    """
+    return max(SIMULATION_MIN_TRIALS, min(SIMULATION_TRIALS, SIMULATION_CARD_GAMES // cards_in_play))
+
+
+def simulate(cards: List[List[int]], num_songs: int, cards_in_play: int,
+             trials: int, rng: random.Random) -> Dict[str, List[int]]:
+    """
+    Play `trials` random games
+
+    Each trial shuffles the call order and deals `cards_in_play` of the printed
+    cards. A line (or corners, or the whole card) is complete at the call number
+    of its latest song, and the game's time for a pattern is the earliest of
+    those over all dealt cards. The songs of every line of every card are laid
+    out flat, so a trial is one itemgetter over the call numbers plus a
+    max-per-line / min-overall pass - no Python loop over cards.
+
+    Returns:
+        {pattern: sorted list of songs called until the first winner}
+    """
+    cards_in_play = min(cards_in_play, len(cards))
+    widths = {pattern: len(slot_sets[0]) for pattern, slot_sets in PATTERN_SLOTS.items()}
+    # Per pattern and card: the card's songs line after line
+    line_songs = {
+        pattern: [tuple(card[slot] for slots in slot_sets for slot in slots) for card in cards]
+        for pattern, slot_sets in PATTERN_SLOTS.items()
+    }
+
+    def deal(card_indices):
+        return {pattern: itemgetter(*chain.from_iterable(songs[idx] for idx in card_indices))
+                for pattern, songs in line_songs.items()}
+
+    everyone = deal(range(len(cards))) if cards_in_play == len(cards) else None
+    call_order = list(range(num_songs))
+    times = {pattern: [] for pattern in PATTERN_SLOTS}
+    for _ in range(trials):
+        rng.shuffle(call_order)
+        called_at = [0] * num_songs
+        for position, idx in enumerate(call_order, 1):
+            called_at[idx] = position
+        dealt = everyone or deal(rng.sample(range(len(cards)), cards_in_play))
+        for pattern, values in times.items():
+            called = iter(dealt[pattern](called_at))
+            values.append(min(map(max, zip(*[called] * widths[pattern]))))
+    return {pattern: sorted(values) for pattern, values in times.items()}
+
+
+def score(times: Dict[str, List[int]], targets: Dict[str, Tuple[int, int]]) -> Tuple[float, float]:
+    """
+    How well simulated games fit the targets (lower is better)
+
+    Returns:
+        (songs by which the mean times miss the ranges - 0 when all inside,
+         distance of the means from the middle of the ranges)
+    """
+    miss = 0.0
+    off_centre = 0.0
+    for pattern, (low, high) in targets.items():
+        mean = sum(times[pattern]) / len(times[pattern])
+        miss += max(0.0, low - mean) + max(0.0, mean - high)
+        off_centre += abs(mean - (low + high) / 2)
+    return round(miss, 2), round(off_centre, 2)
+
+
+def summarize(times: Dict[str, List[int]], targets: Dict[str, Tuple[int, int]]) -> Dict:
+    """Mean and percentiles of songs until the first winner, per pattern"""
+    summary = {}
+    for pattern, values in times.items():
+        def pct(p):
+            return values[min(len(values) - 1, int(p * len(values)))]
+        summary[pattern] = {
+            'target': list(targets[pattern]),
+            'mean': round(sum(values) / len(values), 1),
+            'p10': pct(0.1),
+            'p50': pct(0.5),
+            'p90': pct(0.9),
+        }
+    return summary
+
+
+def optimize_distribution(pool_size: int, num_cards: int, num_players: int,
+                          rng: random.Random, game_length: Optional[Dict] = None,
+                          trials: Optional[int] = None) -> Dict:
+    """
+    Pick the call-set size and card layout closest to the target game length
+
+    Args:
+        pool_size: Songs available to choose from
+        num_cards: Cards printed
+        num_players: Cards actually in play (one per player)
+        rng: Seeded generator (same seed = same layout and report)
+        game_length: Host targets, see parse_game_length
+        trials: Games simulated per candidate (default: trials_for(cards in play))
+
+    Returns:
+        {'num_songs', 'cards' (lists of call-set indices), 'report'}
+    """
+    targets = parse_game_length(game_length)
+    if pool_size < SONGS_PER_CARD:
+        raise ValueError(f"Need at least {SONGS_PER_CARD} songs in the pool, have {pool_size}")
+    cards_in_play = max(1, min(num_players, num_cards))
+    trials = trials or trials_for(cards_in_play)
+    max_songs = min(MAX_CALL_SET, pool_size)
+    min_songs = min(MIN_CALL_SET, max_songs)
+
+    # Same call orders for every candidate, so sizes are compared on equal terms
+    sim_seed = rng.randrange(2**32)
+    evaluated = {}
+
+    def evaluate(num_songs):
+        if num_songs not in evaluated:
+            cards = balanced_layout(num_songs, num_cards, random.Random(sim_seed + num_songs))
+            times = simulate(cards, num_songs, cards_in_play, trials, random.Random(sim_seed))
+            evaluated[num_songs] = score(times, targets)
+        return evaluated[num_songs]
+
+    # Coarse scan, then refine around the best size. Game times only grow with
+    # the call set, so once the fit gets worse past the best size, stop
+    step = 10
+    best = min_songs
+    for num_songs in range(min_songs, max_songs + 1, step):
+        if evaluate(num_songs) < evaluate(best):
+            best = num_songs
+        elif num_songs > best:
+            break
+    for num_songs in range(max(min_songs, best - step + 4), min(max_songs, best + step - 4) + 1, 2):
+        evaluate(num_songs)
+    best = min(evaluated, key=lambda n: (evaluated[n], n))
+
+    # Several layouts of that size: keep the closest fit, then the most predictable
+    candidates = []
+    for _ in range(LAYOUT_CANDIDATES):
+        cards = balanced_layout(best, num_cards, rng)
+        times = simulate(cards, best, cards_in_play, trials, random.Random(sim_seed))
+        spread = times['full_house'][int(0.9 * trials)] - times['full_house'][int(0.1 * trials)]
+        candidates.append((score(times, targets), spread, cards, times))
+    fit, _, cards, times = min(candidates, key=lambda c: (c[0], c[1]))
+
+    return {
+        'num_songs': best,
+        'cards': cards,
+        'report': {
+            'num_songs': best,
+            'cards_in_play': cards_in_play,
+            'trials': trials,
+            'within_target': fit[0] == 0,
+            'patterns': summarize(times, targets),
+        },
+    }
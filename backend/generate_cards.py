@@ -17,11 +17,9 @@ import os
 import sys
 import argparse
 from pathlib import Path
-from typing import List, Dict, Set, Optional
-import requests
+from typing import List, Dict, Set, Optional, Callable, NamedTuple, Iterable
 from io import BytesIO
 import multiprocessing as mp
-from concurrent.futures import ProcessPoolExecutor
 import tempfile
 import psutil
 
@@ -33,15 +31,17 @@ from reportlab.platypus import SimpleDocTemplate, Table, TableStyle, Paragraph,
 from reportlab.lib.styles import getSampleStyleSheet, ParagraphStyle
 from reportlab.lib.enums import TA_CENTER, TA_LEFT
 from reportlab.pdfgen import canvas
+from reportlab.pdfbase import pdfdoc
+from reportlab.pdfbase.pdfmetrics import stringWidth
 
 # QR Code generation
 import qrcode
 
-# PDF Merging
-try:
-    from pypdf import PdfWriter, PdfReader
-except ImportError:
-    from PyPDF2 import PdfWriter, PdfReader
+# Call-set size / card layout for a target game length
+from card_distribution import MAX_CARDS, optimize_distribution
+
+# Pooled outbound HTTP (logo downloads)
+from api import http_client
 
 # Configuration
 SCRIPT_DIR = Path(__file__).parent
@@ -51,8 +51,10 @@ INPUT_POOL = PROJECT_ROOT / "data" / "pool.json"
 OUTPUT_DIR = PROJECT_ROOT / "data" / "cards"
 OUTPUT_FILE = OUTPUT_DIR / "music_bingo_cards.pdf"
 NUM_CARDS = 50  # Back to 50 with Professional XS resources
+PLATYPUS_MAX_CARDS = 200  # the platypus story holds every card until the build ends
 GRID_SIZE = 5  # 5x5 bingo
 SONGS_PER_CARD = 24  # 25 cells - 1 FREE
+RENDER_ENGINES = ('platypus', 'canvas')  # see CanvasCardRenderer
 
 # Perfect DJ Branding - Check multiple possible locations (PDF version)
 PERFECT_DJ_LOGO_PATHS = [
@@ -65,58 +67,41 @@ PERFECT_DJ_LOGO_PATHS = [
 WEBSITE_URL = "www.perfectdj.co.uk"
 
 
-def calculate_optimal_songs(num_players: int) -> int:
-    """Calculate optimal number of songs based on players"""
-    base_songs = int(num_players * 3)
-    base_songs = max(base_songs, 30)
-    base_songs = min(base_songs, 150)
-    return base_songs
+def load_pool_data() -> Dict:
+    """Load pool.json ({'generated_at', 'total_songs', 'songs'})"""
+    with open(INPUT_POOL, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+
+def load_pool() -> List[Dict]:
+    """Load song pool from JSON"""
+    return load_pool_data().get('songs', [])
 
 
-def distribute_songs_unique(all_songs: List[Dict], num_cards: int, songs_per_card: int) -> List[List[Dict]]:
+def build_card_manifest(pool_data: Dict, selected_songs: List[Dict],
+                        all_card_songs: List[List[Dict]], seed: int) -> Dict:
     """
-    Distribute songs uniquely across all cards - NO REPEATS in a session
-    Each song appears on AT MOST ONE card to avoid duplicates during gameplay
+    Compact record of which songs went on which card
     
-    Args:
-        all_songs: Full pool of available songs
-        num_cards: Number of bingo cards to generate
-        songs_per_card: Songs per card (24 for 5x5 grid with FREE space)
+    Songs are stored as indices into pool.json's song list, so 50 cards take
+    ~1200 small ints. 'pool_version' (the pool's generated_at) tells whether
+    the indices still match the pool on disk.
     
     Returns:
-        List of card song lists, each with unique songs
+        {'version', 'seed', 'pool_version', 'pool_size',
+         'songs': [call set], 'cards': [[24 indices] for card #1, #2, ...]}
     """
-    total_songs_needed = num_cards * songs_per_card
-    
-    # Shuffle all songs
-    shuffled = all_songs.copy()
-    random.shuffle(shuffled)
-    
-    # If we don't have enough unique songs, we need to use some songs multiple times
-    # but we'll minimize repetition by cycling through the pool
-    if len(shuffled) < total_songs_needed:
-        print(f"⚠️  Warning: Need {total_songs_needed} songs but only have {len(shuffled)}")
-        print(f"   Some songs will appear on multiple cards")
-        # Repeat the pool enough times to have enough songs
-        times_to_repeat = (total_songs_needed // len(shuffled)) + 1
-        shuffled = (shuffled * times_to_repeat)[:total_songs_needed]
-        random.shuffle(shuffled)
-    
-    # Distribute songs into cards
-    card_songs = []
-    for i in range(num_cards):
-        start_idx = i * songs_per_card
-        end_idx = start_idx + songs_per_card
-        card_songs.append(shuffled[start_idx:end_idx])
-    
-    return card_songs
-
-
-def load_pool() -> List[Dict]:
-    """Load song pool from JSON"""
-    with open(INPUT_POOL, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    return data.get('songs', [])
+    pool = pool_data.get('songs', [])
+    # Selected songs are the pool's own dicts, so identity maps them back
+    index_of = {id(song): idx for idx, song in enumerate(pool)}
+    return {
+        'version': 1,
+        'seed': seed,
+        'pool_version': pool_data.get('generated_at'),
+        'pool_size': len(pool),
+        'songs': [index_of[id(song)] for song in selected_songs],
+        'cards': [[index_of[id(song)] for song in card] for card in all_card_songs],
+    }
 
 
 def format_song_title(song: Dict, max_length: int = 45) -> str:
@@ -200,7 +185,7 @@ def download_logo(url: str) -> Optional[BytesIO]:
     
     # Download from URL
     try:
-        response = requests.get(url, timeout=10)
+        response = http_client.get(url, timeout=10)
         if response.status_code == 200:
             return BytesIO(response.content)
     except Exception as e:
@@ -209,63 +194,157 @@ def download_logo(url: str) -> Optional[BytesIO]:
     return None
 
 
-def get_logo_with_aspect_ratio(logo_buffer: BytesIO, max_width: float = 40, max_height: float = 20) -> Optional[Image]:
-    """Create ReportLab Image with preserved aspect ratio"""
-    try:
+# Print resolution image assets are resampled to (never upscaled)
+IMAGE_DPI = 300
+
+# Box sizes (mm) the card layout draws each asset at
+PUB_LOGO_BOX = (35, 18)
+PERFECT_DJ_LOGO_BOX = (20, 20)
+QR_BOX = (18, 18)
+
+
+def flatten_to_rgb(pil_img):
+    """Convert any PIL image to RGB, compositing transparency onto white"""
+    from PIL import Image as PILImage
+    
+    if pil_img.mode in ('RGBA', 'LA', 'P'):
+        background = PILImage.new('RGB', pil_img.size, (255, 255, 255))
+        if pil_img.mode == 'P':
+            pil_img = pil_img.convert('RGBA')
+        if 'A' in pil_img.mode:
+            background.paste(pil_img, mask=pil_img.split()[-1])
+        else:
+            background.paste(pil_img)
+        return background
+    if pil_img.mode != 'RGB':
+        return pil_img.convert('RGB')
+    return pil_img
+
+
+class RegisteredImage(NamedTuple):
+    """An image asset prepared once per job"""
+    name: str
+    path: str       # encoded file, drawn by path so PDFs embed it once
+    width: float    # draw size in points
+    height: float
+
+
+class ImageRegistry:
+    """
+    Per-job image assets (pub logo, Perfect DJ logo, QR code)
+    
+    Each asset is decoded, flattened to RGB, resampled to IMAGE_DPI at its
+    print size and encoded exactly once. Both render engines draw the encoded
+    file by path, so the PDF holds a single image XObject per asset.
+    """
+    
+    def __init__(self, dpi: int = IMAGE_DPI):
+        self.dpi = dpi
+        self.images: Dict[str, RegisteredImage] = {}
+        self._dir = None
+    
+    def register(self, name: str, source, box_mm: tuple, keep_aspect: bool = True,
+                 fmt: str = 'JPEG', resample: bool = True) -> Optional[RegisteredImage]:
+        """
+        Prepare an image
+        
+        Args:
+            name: Registry key ('pub_logo', 'perfect_dj', 'qr')
+            source: File path, bytes or file-like object
+            box_mm: (max_width, max_height) in mm it is drawn at
+            keep_aspect: Fit inside the box (True) or fill it exactly (False)
+            fmt: 'JPEG' for photos/logos, 'PNG' for sharp graphics such as QR codes
+            resample: Downscale to the print resolution (off for QR codes, whose
+                      modules must stay pixel-aligned)
+        
+        Returns:
+            RegisteredImage, or None if the image could not be loaded
+        """
         from PIL import Image as PILImage
         
-        # Open image to get dimensions
-        pil_img = PILImage.open(logo_buffer)
-        orig_width, orig_height = pil_img.size
+        try:
+            if isinstance(source, (bytes, bytearray)):
+                source = BytesIO(source)
+            elif isinstance(source, Path):
+                source = str(source)
+            pil_img = flatten_to_rgb(PILImage.open(source))
+        except Exception as e:
+            print(f"⚠️ Could not load image '{name}': {e}")
+            return None
         
-        # Convert to RGB if necessary (removes transparency issues)
-        if pil_img.mode in ('RGBA', 'LA', 'P'):
-            # Create white background
-            background = PILImage.new('RGB', pil_img.size, (255, 255, 255))
-            if pil_img.mode == 'P':
-                pil_img = pil_img.convert('RGBA')
-            if 'A' in pil_img.mode:
-                background.paste(pil_img, mask=pil_img.split()[-1])
+        max_width, max_height = box_mm
+        orig_width, orig_height = pil_img.size
+        if keep_aspect:
+            aspect = orig_width / orig_height
+            if aspect > (max_width / max_height):
+                width, height = max_width * mm, (max_width / aspect) * mm
             else:
-                background.paste(pil_img)
-            pil_img = background
-        elif pil_img.mode != 'RGB':
-            pil_img = pil_img.convert('RGB')
-        
-        # Calculate aspect ratio
-        aspect = orig_width / orig_height
-        
-        # Calculate new dimensions maintaining aspect ratio
-        if aspect > (max_width / max_height):
-            # Width is the limiting factor
-            new_width = max_width * mm
-            new_height = (max_width / aspect) * mm
+                width, height = (max_height * aspect) * mm, max_height * mm
         else:
-            # Height is the limiting factor
-            new_height = max_height * mm
-            new_width = (max_height * aspect) * mm
+            width, height = max_width * mm, max_height * mm
         
-        # Save to new buffer as RGB JPEG (much faster)
-        output_buffer = BytesIO()
-        pil_img.save(output_buffer, format='JPEG', quality=95)
-        output_buffer.seek(0)
+        if resample:
+            target = (max(1, round(width / 72 * self.dpi)), max(1, round(height / 72 * self.dpi)))
+            if target[0] < orig_width and target[1] < orig_height:
+                pil_img = pil_img.resize(target, PILImage.LANCZOS)
         
-        # Create ReportLab Image with correct dimensions
-        rl_image = Image(output_buffer, width=new_width, height=new_height)
-        rl_image.hAlign = 'CENTER'
+        if self._dir is None:
+            self._dir = tempfile.mkdtemp(prefix='bingo_images_')
+        path = os.path.join(self._dir, f"{name}.{'jpg' if fmt == 'JPEG' else 'png'}")
+        if fmt == 'JPEG':
+            pil_img.save(path, format='JPEG', quality=90, optimize=True)
+        else:
+            pil_img.save(path, format='PNG', optimize=True)
         
-        return rl_image
-    except Exception as e:
-        print(f"Error processing logo aspect ratio: {e}")
-        return None
+        image = RegisteredImage(name, path, width, height)
+        self.images[name] = image
+        return image
+    
+    def get(self, name: str) -> Optional[RegisteredImage]:
+        return self.images.get(name)
+    
+    def cleanup(self):
+        """Delete the encoded files"""
+        if self._dir:
+            import shutil
+            shutil.rmtree(self._dir, ignore_errors=True)
+            self._dir = None
+        self.images = {}
 
 
-def create_bingo_card(songs: List[Dict], card_num: int, venue_name: str, 
-                     pub_logo_path: str = None, social_media_url: str = None, 
-                     include_qr: bool = False, game_number: int = 1, game_date: str = None,
-                     qr_buffer: BytesIO = None, 
+def build_image_registry(pub_logo: str = None, social_media: str = None,
+                         include_qr: bool = False) -> ImageRegistry:
+    """Load, resize and encode every image a card set needs, once"""
+    images = ImageRegistry()
+    
+    for logo_path in PERFECT_DJ_LOGO_PATHS:
+        if logo_path.exists():
+            images.register('perfect_dj', logo_path, PERFECT_DJ_LOGO_BOX, keep_aspect=False, fmt='PNG')
+            break
+    
+    if pub_logo:
+        logo_buffer = download_logo(pub_logo)
+        if logo_buffer:
+            images.register('pub_logo', logo_buffer, PUB_LOGO_BOX)
+    
+    if include_qr and social_media:
+        qr_buffer = generate_qr_code(social_media)
+        if qr_buffer:
+            images.register('qr', qr_buffer, QR_BOX, keep_aspect=False, fmt='PNG', resample=False)
+    
+    return images
+
+
+def create_bingo_card(songs: List[Dict], card_num: int, venue_name: str, images: ImageRegistry,
+                     social_media_url: str = None, include_qr: bool = False,
+                     game_number: int = 1, game_date: str = None,
                      prize_4corners: str = '', prize_first_line: str = '', prize_full_house: str = '') -> List:
-    """Create a single bingo card with ReportLab elements"""
+    """
+    Create a single bingo card with ReportLab elements
+    
+    Logos and the QR code come from the job's ImageRegistry (decoded, resized
+    and encoded once, see build_image_registry).
+    """
     elements = []
     
     # Styles
@@ -303,70 +382,16 @@ def create_bingo_card(songs: List[Dict], card_num: int, venue_name: str,
     )
     
     # --- HEADER SECTION WITH LOGOS ---
-    # Always try to load Perfect DJ logo first
     perfect_dj_logo = None
-    try:
-        for logo_path in PERFECT_DJ_LOGO_PATHS:
-            if logo_path.exists():
-                perfect_dj_logo = Image(str(logo_path), width=20*mm, height=20*mm)
-                print(f"✅ Loaded Perfect DJ logo from: {logo_path}")
-                break
-    except Exception as e:
-        print(f"⚠️ Warning: Could not load Perfect DJ logo: {e}")
-    
-    # Load pub logo if provided
     pub_logo = None
-    if pub_logo_path:
-        try:
-            from PIL import Image as PILImage
-            import base64
-            import io
-            
-            # Handle data URI (base64 encoded images)
-            if pub_logo_path.startswith('data:'):
-                print(f"🔍 Detected data URI for pub logo")
-                # Extract base64 data from data URI
-                # Format: data:image/png;base64,iVBORw0KG...
-                header, encoded = pub_logo_path.split(',', 1)
-                image_data = base64.b64decode(encoded)
-                pil_img = PILImage.open(io.BytesIO(image_data))
-                print(f"✅ Decoded base64 pub logo: {pil_img.format} {pil_img.size}")
-            else:
-                # Handle file path or URL
-                pil_img = PILImage.open(pub_logo_path)
-                print(f"✅ Opened pub logo from path: {pub_logo_path}")
-            
-            # Get original dimensions
-            orig_width, orig_height = pil_img.size
-            aspect = orig_width / orig_height
-            
-            # Logo size
-            max_width = 35  # Logo width
-            max_height = 18  # Logo height
-            
-            if aspect > (max_width / max_height):
-                new_width = max_width * mm
-                new_height = (max_width / aspect) * mm
-            else:
-                new_height = max_height * mm
-                new_width = (max_height * aspect) * mm
-            
-            # For data URIs, create temporary BytesIO object for ReportLab
-            if pub_logo_path.startswith('data:'):
-                # ReportLab Image can accept a PIL Image or file path
-                # We need to convert PIL Image to something ReportLab can use
-                img_buffer = io.BytesIO()
-                pil_img.save(img_buffer, format='PNG')
-                img_buffer.seek(0)
-                pub_logo = Image(img_buffer, width=new_width, height=new_height)
-            else:
-                pub_logo = Image(pub_logo_path, width=new_width, height=new_height)
-            
-            print(f"✅ Successfully loaded pub logo with dimensions: {new_width/mm:.1f}mm x {new_height/mm:.1f}mm")
-        except Exception as e:
-            print(f"⚠️ Error loading pub logo: {e}")
-            import traceback
-            traceback.print_exc()
+    dj_image = images.get('perfect_dj')
+    if dj_image:
+        perfect_dj_logo = Image(dj_image.path, width=dj_image.width, height=dj_image.height)
+    pub_image = images.get('pub_logo')
+    if pub_image:
+        pub_logo = Image(pub_image.path, width=pub_image.width, height=pub_image.height)
+    qr_image = images.get('qr')
+    qr_buffer = qr_image.path if qr_image else None
     
     # Create header table based on available logos
     if pub_logo and perfect_dj_logo:
@@ -603,17 +628,439 @@ def create_bingo_card(songs: List[Dict], card_num: int, venue_name: str,
     return elements
 
 
-def generate_batch_pdf(batch_data):
-    """Generate a PDF batch with 10 cards - runs in parallel"""
-    batch_num, cards_data, venue_name, pub_logo_path, social_media, include_qr, game_number, game_date, qr_buffer_data, prize_4corners, prize_first_line, prize_full_house = batch_data
+# ============================================================================
+# CANVAS RENDERER - draws the same layout straight onto a pdfgen canvas
+# ============================================================================
+
+# Frame geometry used by the platypus document (A4, margins + default 6pt frame padding)
+PAGE_WIDTH, PAGE_HEIGHT = A4
+FRAME_PADDING = 6
+FRAME_TOP = PAGE_HEIGHT - 8*mm - FRAME_PADDING
+CENTER_X = PAGE_WIDTH / 2
+CARD_GAP = 5*mm  # Spacer between the two cards on a page
+
+# Grid geometry (matches create_bingo_card's Table)
+GRID_COL_WIDTH = 32*mm
+GRID_ROW_HEIGHT = 12*mm
+GRID_PADDING = 5
+GRID_LINE_WIDTH = 1.5
+
+_text_width_cache: Dict[tuple, float] = {}
+
+
+def text_width(text: str, font_name: str, font_size: float) -> float:
+    """Cached pdfmetrics.stringWidth (song words repeat across cards)"""
+    key = (text, font_name, font_size)
+    width = _text_width_cache.get(key)
+    if width is None:
+        width = stringWidth(text, font_name, font_size)
+        _text_width_cache[key] = width
+    return width
+
+
+def wrap_text(text: str, font_name: str, font_size: float, max_width: float) -> List[str]:
+    """Greedy word wrap, splitting words that are wider than a whole line (like Paragraph)"""
+    lines = []
+    current = ''
+    space = text_width(' ', font_name, font_size)
+    current_width = 0.0
+    for word in text.split():
+        word_width = text_width(word, font_name, font_size)
+        if word_width > max_width:
+            # Long word: flush and break it by characters
+            if current:
+                lines.append(current)
+                current, current_width = '', 0.0
+            chunk = ''
+            for ch in word:
+                if chunk and text_width(chunk + ch, font_name, font_size) > max_width:
+                    lines.append(chunk)
+                    chunk = ''
+                chunk += ch
+            current, current_width = chunk, text_width(chunk, font_name, font_size)
+        elif not current:
+            current, current_width = word, word_width
+        elif current_width + space + word_width <= max_width:
+            current += ' ' + word
+            current_width += space + word_width
+        else:
+            lines.append(current)
+            current, current_width = word, word_width
+    if current:
+        lines.append(current)
+    return lines or ['']
+
+
+class StreamingPDFDocument(pdfdoc.PDFDocument):
+    """
+    PDFDocument that writes every finished page to the output straight away
+    
+    ReportLab keeps all pages in memory until save(), so memory grows with the
+    card count. Here each page and its content stream are written as soon as
+    the canvas finishes the page and only their file offsets are kept; the
+    shared objects (fonts, card form, images, page tree) are written at save().
+    Encryption is not supported.
+    """
+    
+    def __init__(self, output, **kwargs):
+        super().__init__(**kwargs)
+        if hasattr(output, 'write'):
+            self._out, self._owns_output = output, False
+        else:
+            self._out, self._owns_output = open(output, 'wb'), True
+        self._offset = 0
+        self._write(pdfdoc.PDFFile(self._pdfVersion).format(self))  # header
+    
+    def _write(self, data) -> int:
+        """Append to the output, returning the offset it was written at"""
+        data = pdfdoc.pdfdocEnc(data)
+        offset = self._offset
+        self._out.write(data)
+        self._offset += len(data)
+        return offset
+    
+    def _write_object(self, name: str):
+        data = pdfdoc.PDFIndirectObject(name, self.idToObject[name]).format(self)
+        self.idToOffset[name] = self._write(data)
+        self.idToObject[name] = None  # only the offset is needed from now on
+    
+    def addPage(self, page):
+        name = self.thisPageName()
+        super().addPage(page)
+        # Formatting the page registers its content stream - write both, keep refs
+        self._write_object(name)
+        self._write_object(self.Reference(page.Contents).name)
+        self.Pages.pages[-1] = pdfdoc.PDFObjectReference(name)
+    
+    def format(self):
+        """Write the objects not streamed yet, then the xref table and trailer"""
+        self.encrypt.prepare(self)
+        catalog = self.Reference(self.Catalog)
+        info = self.Reference(self.info)
+        ids = []
+        counter = 1
+        # Objects can still be registered while others are formatted
+        while counter in self.numberToId:
+            name = self.numberToId[counter]
+            if name not in self.idToOffset:
+                self._write_object(name)
+            ids.append(name)
+            counter += 1
+        xref = pdfdoc.PDFCrossReferenceTable()
+        xref.addsection(0, ids)
+        xref_offset = self._write(xref.format(self))
+        trailer = pdfdoc.PDFTrailer(startxref=xref_offset, Size=len(ids) + 1,
+                                    Root=catalog, Info=info, ID=self.ID())
+        self._write(trailer.format(self))
+        return b''
+    
+    def SaveToFile(self, filename, canvas):
+        self.GetPDFData(canvas)  # writes the rest of the document
+        if self._owns_output:
+            self._out.close()
+        else:
+            self._out.flush()
+
+
+class StreamingCanvas(canvas.Canvas):
+    """Canvas whose pages go to the output as they are finished (see StreamingPDFDocument)"""
+    
+    def __init__(self, output, **kwargs):
+        super().__init__(output, **kwargs)
+        # Nothing has been drawn yet, so the document can still be swapped
+        self._doc = StreamingPDFDocument(
+            output, compression=self._doc.compression, invariant=self._doc.invariant,
+            pdfVersion=self._doc._pdfVersion
+        )
+
+
+class CanvasCardRenderer:
+    """
+    Draws bingo cards directly with reportlab.pdfgen.canvas
+    
+    Same layout as create_bingo_card, but everything that is identical on every
+    card (logos, header, grid lines, prizes, footer) is drawn once into a form
+    XObject; per card only the form reference, songs and card number are written.
+    """
+    
+    STATIC_FORM = 'cardStatic'
+    
+    def __init__(self, venue_name: str, images: Optional[ImageRegistry] = None,
+                 social_media_url: str = None, include_qr: bool = False,
+                 game_number: int = 1, game_date: str = None,
+                 prize_4corners: str = '', prize_first_line: str = '', prize_full_house: str = ''):
+        if not game_date:
+            from datetime import datetime
+            game_date = datetime.now().strftime("%A, %B %d, %Y")
+        
+        self.venue_name = venue_name
+        self.social_media_url = social_media_url
+        self.date_text = game_date
+        self.game_text = f" • Game #{game_number}"
+        
+        # --- Images (prepared once per job, drawn by path) ---
+        images = images or ImageRegistry()
+        self.dj_logo = images.get('perfect_dj')
+        self.pub_logo = images.get('pub_logo')
+        self.qr_image = images.get('qr') if (social_media_url and include_qr) else None
+        
+        # --- Header: title paragraph is 18pt/22pt leading, venue line inside it ---
+        venue_size = 8 if (self.pub_logo or self.dj_logo) else 10
+        self.title_lines = [('MUSIC BINGO', 'Helvetica-Bold', 18)]
+        for line in wrap_text(venue_name, 'Helvetica-Bold', venue_size, 110*mm - 12):
+            self.title_lines.append((line, 'Helvetica-Bold', venue_size))
+        title_height = len(self.title_lines) * 22
+        header_content = max(title_height,
+                             self.dj_logo.height if self.dj_logo else 0,
+                             self.pub_logo.height if self.pub_logo else 0)
+        self.header_height = header_content + 6  # default table padding 3pt top/bottom
+        
+        # --- Prizes row (Table 23/20/18/20/19/20mm, 1pt side padding) ---
+        prize_cells = [
+            ("All 4 Corners:", True), (prize_4corners or "__________", False),
+            ("First Line:", True), (prize_first_line or "__________", False),
+            ("Full House:", True), (prize_full_house or "__________", False),
+        ]
+        col_widths = [23*mm, 20*mm, 18*mm, 20*mm, 19*mm, 20*mm]
+        self.prize_cells = []
+        x = CENTER_X - sum(col_widths) / 2
+        for (text, bold), width in zip(prize_cells, col_widths):
+            font = 'Helvetica-Bold' if bold else 'Helvetica'
+            self.prize_cells.append((x + 1, font, wrap_text(text, font, 7, width - 2)))
+            x += width
+        self.prizes_height = max(len(lines) for _, _, lines in self.prize_cells) * 9 + 1
+        
+        # --- QR footer (Table 22/118mm, default 6pt/3pt padding) ---
+        self.social_lines = []
+        if self.qr_image:
+            text_width_avail = 118*mm - 12 - 3*mm
+            for line in wrap_text("Join Our Social Media To Play & Claim Your Prize!", 'Helvetica-Bold', 8, text_width_avail):
+                self.social_lines.append((line, 'Helvetica-Bold'))
+            for line in wrap_text(social_media_url, 'Helvetica', 8, text_width_avail):
+                self.social_lines.append((line, 'Helvetica'))
+            self.qr_footer_height = max(18*mm, len(self.social_lines) * 9) + 6
+        else:
+            self.qr_footer_height = 0
+        
+        # --- Vertical offsets from the top of a card (same spacers as the story) ---
+        y = 0
+        self.header_top = y
+        y += self.header_height + 1*mm
+        self.date_top = y
+        y += 12 + 2*mm + 1*mm  # Normal leading, spaceAfter, spacer
+        self.grid_top = y
+        y += GRID_ROW_HEIGHT * GRID_SIZE + 1*mm
+        self.prizes_header_top = y
+        y += 11 + 0.5*mm
+        self.prizes_top = y
+        y += self.prizes_height + 0.3*mm
+        self.qr_footer_top = y
+        y += self.qr_footer_height + 0.2*mm
+        self.card_number_top = y
+        y += 12 + 0.1*mm
+        self.footer_top = y
+        y += 12
+        self.card_height = y
+        
+        # Song cells: cached wrapped lines per distinct song text
+        self._cell_text_width = GRID_COL_WIDTH - 2 * GRID_PADDING
+        self._cell_lines: Dict[str, List[str]] = {}
+    
+    def _song_lines(self, song: Dict) -> List[str]:
+        song_text = format_song_title(song, max_length=40)
+        lines = self._cell_lines.get(song_text)
+        if lines is None:
+            lines = wrap_text(song_text, 'Helvetica', 8, self._cell_text_width)
+            self._cell_lines[song_text] = lines
+        return lines
+    
+    def _draw_static(self, c: canvas.Canvas, top: float):
+        """Draw everything that is the same on every card, top edge at y=top"""
+        # --- Header ---
+        row_bottom = top - self.header_height
+        avail = self.header_height - 6
+        if self.pub_logo:
+            logo = self.pub_logo
+            c.drawImage(logo.path, 10*mm + 6, row_bottom + 3 + (avail - logo.height) / 2,
+                        logo.width, logo.height)
+        if self.dj_logo:
+            logo = self.dj_logo
+            c.drawImage(logo.path, PAGE_WIDTH - 10*mm - 6 - logo.width, row_bottom + 3 + (avail - logo.height) / 2,
+                        logo.width, logo.height)
+        title_top = row_bottom + 3 + (avail + len(self.title_lines) * 22) / 2
+        baseline = title_top - 18
+        for text, font, size in self.title_lines:
+            c.setFont(font, size)
+            c.drawCentredString(CENTER_X, baseline, text)
+            baseline -= 22
+        
+        # --- Date and game number ---
+        baseline = top - self.date_top - 7
+        date_width = text_width(self.date_text, 'Helvetica-Bold', 7)
+        game_width = text_width(self.game_text, 'Helvetica', 7)
+        x = CENTER_X - (date_width + game_width) / 2
+        c.setFillColor(colors.HexColor('#4a5568'))
+        c.setFont('Helvetica-Bold', 7)
+        c.drawString(x, baseline, self.date_text)
+        c.setFont('Helvetica', 7)
+        c.drawString(x + date_width, baseline, self.game_text)
+        c.setFillColor(colors.black)
+        
+        # --- Bingo grid: FREE cell and lines ---
+        grid_top = top - self.grid_top
+        grid_left = CENTER_X - GRID_COL_WIDTH * GRID_SIZE / 2
+        
+        c.setFillColor(colors.lightgrey)
+        c.rect(grid_left + 2 * GRID_COL_WIDTH, grid_top - 3 * GRID_ROW_HEIGHT,
+               GRID_COL_WIDTH, GRID_ROW_HEIGHT, stroke=0, fill=1)
+        c.setFillColor(colors.black)
+        self._draw_cell(c, grid_top, grid_left, 2, 2, ['FREE'], 'Helvetica-Bold', 14, 12)
+        
+        c.setLineWidth(GRID_LINE_WIDTH)
+        c.grid([grid_left + i * GRID_COL_WIDTH for i in range(GRID_SIZE + 1)],
+               [grid_top - i * GRID_ROW_HEIGHT for i in range(GRID_SIZE + 1)])
+        
+        # --- Prizes ---
+        c.setFont('Helvetica-Bold', 9)
+        c.drawCentredString(CENTER_X, top - self.prizes_header_top - 9, "PRIZES TONIGHT")
+        prizes_bottom = top - self.prizes_top - self.prizes_height
+        for x, font, lines in self.prize_cells:
+            para_top = prizes_bottom + 0.5 + (self.prizes_height - 1 + len(lines) * 9) / 2
+            c.setFont(font, 7)
+            baseline = para_top - 7
+            for line in lines:
+                c.drawString(x, baseline, line)
+                baseline -= 9
+        
+        # --- QR footer ---
+        if self.qr_image:
+            row_bottom = top - self.qr_footer_top - self.qr_footer_height
+            avail = self.qr_footer_height - 6
+            table_left = CENTER_X - 70*mm
+            qr = self.qr_image
+            c.drawImage(qr.path, table_left + 6 + (22*mm - 12 - qr.width) / 2,
+                        row_bottom + 3 + (avail - qr.height) / 2, qr.width, qr.height)
+            baseline = row_bottom + 3 + (avail + len(self.social_lines) * 9) / 2 - 8
+            for line, font in self.social_lines:
+                c.setFont(font, 8)
+                c.drawString(table_left + 22*mm + 6 + 3*mm, baseline, line)
+                baseline -= 9
+        
+        # --- Perfect DJ footer ---
+        c.setFillColor(colors.gray)
+        c.setFont('Helvetica', 5)
+        c.drawCentredString(CENTER_X, top - self.footer_top - 5, f"Powered by Perfect DJ - {WEBSITE_URL}")
+        c.setFillColor(colors.black)
+    
+    def _draw_cell(self, c: canvas.Canvas, grid_top: float, grid_left: float, row: int, col: int,
+                   lines: List[str], font: str, size: float, leading: float):
+        """Draw centred lines in a grid cell (VALIGN MIDDLE inside the padding)"""
+        cell_bottom = grid_top - (row + 1) * GRID_ROW_HEIGHT
+        cell_center = grid_left + (col + 0.5) * GRID_COL_WIDTH
+        para_height = len(lines) * leading
+        para_top = cell_bottom + GRID_PADDING + (GRID_ROW_HEIGHT - 2 * GRID_PADDING + para_height) / 2
+        c.setFont(font, size)
+        baseline = para_top - size
+        for line in lines:
+            c.drawCentredString(cell_center, baseline, line)
+            baseline -= leading
+    
+    def draw_card(self, c: canvas.Canvas, songs: List[Dict], card_num: int, top: float):
+        """Draw one card whose top edge is at y=top"""
+        c.saveState()
+        c.translate(0, top)
+        c.doForm(self.STATIC_FORM)
+        c.restoreState()
+        
+        grid_top = top - self.grid_top
+        grid_left = CENTER_X - GRID_COL_WIDTH * GRID_SIZE / 2
+        song_index = 0
+        for row in range(GRID_SIZE):
+            for col in range(GRID_SIZE):
+                if row == 2 and col == 2:
+                    continue
+                self._draw_cell(c, grid_top, grid_left, row, col,
+                                self._song_lines(songs[song_index]), 'Helvetica', 8, 9)
+                song_index += 1
+        
+        c.setFont('Helvetica-Bold', 7)
+        c.drawCentredString(CENTER_X, top - self.card_number_top - 7, f"Card #{card_num}")
+    
+    def render(self, output, cards_data: Iterable[tuple],
+               on_page: Optional[Callable[[int], None]] = None) -> int:
+        """
+        Render cards two per page, in page order, into one document
+        
+        Pages are compressed and written to `output` as they are finished, so
+        memory stays flat however many cards there are.
+        
+        Args:
+            output: File path or binary file object
+            cards_data: Iterable of (card_num, songs) tuples (may be a generator)
+            on_page: Called with the number of pages finished so far
+        
+        Returns:
+            Number of pages written
+        """
+        c = StreamingCanvas(output, pagesize=A4, pageCompression=1)
+        
+        # Static card body, defined once and referenced by every card
+        c.beginForm(self.STATIC_FORM, lowerx=0, lowery=-self.card_height - 10,
+                    upperx=PAGE_WIDTH, uppery=10)
+        self._draw_static(c, 0)
+        c.endForm()
+        
+        pages = 0
+        for idx, (card_num, card_songs) in enumerate(cards_data):
+            if idx % 2 == 0:
+                top = FRAME_TOP
+                if idx:
+                    c.showPage()
+                    if on_page:
+                        on_page(pages)
+                pages += 1
+            else:
+                top = FRAME_TOP - self.card_height - CARD_GAP
+            self.draw_card(c, card_songs, card_num, top)
+        c.showPage()
+        if on_page:
+            on_page(pages)
+        c.save()
+        return pages
+
+
+def render_cards_pdf(output, cards_data: Iterable[tuple], venue_name: str,
+                     images: Optional[ImageRegistry] = None, social_media: str = None,
+                     include_qr: bool = False, game_number: int = 1, game_date: str = None,
+                     prize_4corners: str = '', prize_first_line: str = '', prize_full_house: str = '',
+                     render_engine: str = 'canvas',
+                     on_page: Optional[Callable[[int], None]] = None) -> int:
+    """
+    Render every card into ONE PDF, in page order (2 cards per page)
     
-    # Create temp file for this batch
-    temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.pdf', prefix=f'batch_{batch_num}_')
-    temp_path = temp_file.name
-    temp_file.close()
+    Single pass: no per-batch temp files and no pypdf merge, so shared images
+    (pub logo, QR, Perfect DJ logo) are embedded once for the whole document.
     
+    Args:
+        output: File path or binary file object the PDF is written to
+        cards_data: Iterable of (card_num, songs) tuples (the canvas engine
+                    streams them; platypus needs them all up front)
+        images: Assets from build_image_registry()
+        on_page: Called with the number of pages finished so far
+    
+    Returns:
+        Number of pages written
+    """
+    if render_engine == 'canvas':
+        renderer = CanvasCardRenderer(
+            venue_name, images, social_media, include_qr, game_number, game_date,
+            prize_4corners, prize_first_line, prize_full_house
+        )
+        return renderer.render(output, cards_data, on_page=on_page)
+    
+    cards_data = list(cards_data)
     doc = SimpleDocTemplate(
-        temp_path,
+        output,
         pagesize=A4,
         leftMargin=10*mm,
         rightMargin=10*mm,
@@ -621,11 +1068,6 @@ def generate_batch_pdf(batch_data):
         bottomMargin=5*mm,  # Optimized from 8mm
     )
     
-    # Reconstruct QR buffer if data provided
-    qr_buffer_cache = None
-    if qr_buffer_data:
-        qr_buffer_cache = BytesIO(qr_buffer_data)
-    
     story = []
     for idx, (card_num, card_songs) in enumerate(cards_data):
         # Songs are already assigned uniquely - NO random.sample needed!
@@ -635,38 +1077,145 @@ def generate_batch_pdf(batch_data):
             card_songs,
             card_num,
             venue_name,
-            pub_logo_path,
-            social_media,
-            include_qr,
-            game_number,
-            game_date,
-            qr_buffer_cache,
-            prize_4corners,
-            prize_first_line,
-            prize_full_house
+            social_media_url=social_media,
+            include_qr=include_qr,
+            game_number=game_number,
+            game_date=game_date,
+            prize_4corners=prize_4corners,
+            prize_first_line=prize_first_line,
+            prize_full_house=prize_full_house,
+            images=images or ImageRegistry()
         )
         
         story.extend(card_elements)
         
-        # Add page break after every 2 cards (except for the last card in batch)
-        if (idx + 1) % 2 == 0 and idx < len(cards_range) - 1:
+        # Add page break after every 2 cards (except for the last card)
+        if (idx + 1) % 2 == 0 and idx < len(cards_data) - 1:
             story.append(PageBreak())
         # Add spacer between cards on same page
-        elif idx < len(cards_range) - 1:
+        elif idx < len(cards_data) - 1:
             story.append(Spacer(1, 5*mm))
     
-    doc.build(story)
-    return temp_path
+    def page_started(canv, doc):
+        # Called as each page begins, so the previous one is done
+        if on_page and doc.page > 1:
+            on_page(doc.page - 1)
+    
+    doc.build(story, onFirstPage=page_started, onLaterPages=page_started)
+    if on_page:
+        on_page(doc.page)
+    return doc.page
+
+
+def process_memory_mb(process: Optional[psutil.Process] = None) -> float:
+    """RSS of this process plus any child processes, in MB"""
+    process = process or psutil.Process()
+    rss = process.memory_info().rss
+    try:
+        for child in process.children(recursive=True):
+            rss += child.memory_info().rss
+    except psutil.Error:
+        pass
+    return rss / 1024 / 1024
+
+
+def job_output_file(job_id: str) -> Path:
+    """Per-job output path (data/cards/<job_id>/music_bingo_cards.pdf)"""
+    return OUTPUT_DIR / job_id / OUTPUT_FILE.name
+
+
+def cleanup_stale_outputs(max_age_hours: float = 24) -> int:
+    """
+    Remove per-job output directories older than max_age_hours
+    
+    Successful jobs delete their own directory after upload; this catches the
+    ones kept as local fallbacks (GCS upload failed) or left by crashed jobs.
+    
+    Returns:
+        Number of directories removed
+    """
+    import shutil
+    import time
+    
+    if not OUTPUT_DIR.exists():
+        return 0
+    
+    cutoff = time.time() - max_age_hours * 3600
+    removed = 0
+    for entry in OUTPUT_DIR.iterdir():
+        try:
+            if entry.is_dir() and entry.stat().st_mtime < cutoff:
+                shutil.rmtree(entry, ignore_errors=True)
+                removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+def report_progress(progress_callback: Optional[Callable[[Dict], None]], progress: float,
+                    stage: str, process: Optional[psutil.Process] = None):
+    """
+    Report generation progress.
+    
+    Always prints the structured "PROGRESS: XX" line (CLI / log parsing) and,
+    when a callback is given, also hands it a dict event:
+    {'progress': int, 'stage': str, 'memory_mb': float}
+    """
+    print(f"PROGRESS: {progress:.0f}")
+    if progress_callback is None:
+        return
+    process = process or psutil.Process()
+    try:
+        progress_callback({
+            'progress': int(round(progress)),
+            'stage': stage,
+            'memory_mb': round(process_memory_mb(process), 1),
+        })
+    except Exception as e:
+        # Progress reporting must never break generation
+        print(f"⚠️  Progress callback failed: {e}")
 
 
 def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
                   pub_logo: str = None, social_media: str = None, include_qr: bool = False,
                   game_number: int = 1, game_date: str = None,
-                  prize_4corners: str = '', prize_first_line: str = '', prize_full_house: str = ''):
-    """Generate all bingo cards"""
+                  prize_4corners: str = '', prize_first_line: str = '', prize_full_house: str = '',
+                  progress_callback: Optional[Callable[[Dict], None]] = None,
+                  output_file: Optional[str] = None,
+                  render_engine: str = 'canvas',
+                  seed: Optional[int] = None,
+                  game_length: Optional[Dict] = None,
+                  num_cards: Optional[int] = None):
+    """
+    Generate all bingo cards
+    
+    Args:
+        progress_callback: Optional callable receiving progress dict events
+                           (see report_progress)
+        output_file: Where to write the PDF (default OUTPUT_FILE). Concurrent
+                     jobs must each use their own path (see job_output_file)
+        render_engine: 'platypus' (flowables) or 'canvas' (CanvasCardRenderer)
+        seed: Card-set seed. The same seed and settings always produce the same
+              cards (default: a random seed, returned in the result)
+        game_length: Target song counts for the first winner of each pattern,
+                     e.g. {'full_house': [45, 70]} (see card_distribution)
+        num_cards: Cards to print (default NUM_CARDS, up to MAX_CARDS with the
+                   canvas engine)
+    """
+    if render_engine not in RENDER_ENGINES:
+        raise ValueError(f"Unknown render engine '{render_engine}', expected one of {RENDER_ENGINES}")
+    num_cards = num_cards or NUM_CARDS
+    if not 1 <= num_cards <= MAX_CARDS:
+        raise ValueError(f"num_cards must be between 1 and {MAX_CARDS}")
+    if render_engine == 'platypus' and num_cards > PLATYPUS_MAX_CARDS:
+        raise ValueError(f"The platypus engine supports up to {PLATYPUS_MAX_CARDS} cards, use 'canvas'")
     import time
     start_time = time.time()
     
+    if seed is None:
+        seed = random.randrange(2**32)
+    rng = random.Random(seed)
+    
     # Memory monitoring
     process = psutil.Process()
     mem_start = process.memory_info()
@@ -676,245 +1225,122 @@ def generate_cards(venue_name: str = "Music Bingo", num_players: int = 25,
     print(f"{'='*60}")
     print(f"Venue: {venue_name}")
     print(f"Players: {num_players}")
+    print(f"Cards: {num_cards}")
     print(f"Pub Logo: {pub_logo if pub_logo else 'None'}")
     print(f"Social Media: {social_media if social_media else 'None'}")
     print(f"Include QR: {include_qr}")
+    print(f"Render engine: {render_engine}")
+    print(f"Seed: {seed}")
     print(f"📊 Memory at start: {mem_start.rss / 1024 / 1024:.1f} MB")
     print(f"{'='*60}\n")
     
     # Load songs
     step_start = time.time()
-    all_songs = load_pool()
+    pool_data = load_pool_data()
+    all_songs = pool_data.get('songs', [])
     mem_after_load = process.memory_info()
     print(f"✓ Loaded {len(all_songs)} songs from pool ({time.time()-step_start:.2f}s) - Memory: {mem_after_load.rss / 1024 / 1024:.1f} MB")
     
-    # Calculate optimal songs
+    # Size the call set and lay out the cards for the target game length
     step_start = time.time()
-    optimal_songs = calculate_optimal_songs(num_players)
-    print(f"✓ Using {optimal_songs} songs for {num_players} players ({time.time()-step_start:.3f}s)")
+    plan = optimize_distribution(len(all_songs), num_cards, num_players, rng, game_length)
+    game_report = plan['report']
+    print(f"✓ Using {plan['num_songs']} songs for {num_players} players ({time.time()-step_start:.2f}s)")
+    for pattern, stats in game_report['patterns'].items():
+        print(f"   {pattern}: ~{stats['mean']} songs (p10 {stats['p10']}, p90 {stats['p90']}, target {stats['target']})")
     
     # Shuffle and select songs
     step_start = time.time()
-    selected_songs = random.sample(all_songs, min(optimal_songs, len(all_songs)))
+    selected_songs = rng.sample(all_songs, plan['num_songs'])
     print(f"✓ Selected {len(selected_songs)} songs ({time.time()-step_start:.3f}s)")
     
     # Create output directory
-    OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
+    output_path = Path(output_file) if output_file else OUTPUT_FILE
+    output_path.parent.mkdir(parents=True, exist_ok=True)
     
-    # Load pub logo once (if provided) and save as temp file
-    pub_logo_path = None
-    if pub_logo:
-        step_start = time.time()
-        logo_buffer = download_logo(pub_logo)
-        if logo_buffer:
-            try:
-                from PIL import Image as PILImage
-                import tempfile
-                
-                # Convert to RGB
-                pil_img = PILImage.open(logo_buffer)
-                if pil_img.mode in ('RGBA', 'LA', 'P'):
-                    background = PILImage.new('RGB', pil_img.size, (255, 255, 255))
-                    if pil_img.mode == 'P':
-                        pil_img = pil_img.convert('RGBA')
-                    if 'A' in pil_img.mode:
-                        background.paste(pil_img, mask=pil_img.split()[-1])
-                    else:
-                        background.paste(pil_img)
-                    pil_img = background
-                elif pil_img.mode != 'RGB':
-                    pil_img = pil_img.convert('RGB')
-                
-                # Save as temporary JPEG
-                temp_logo = tempfile.NamedTemporaryFile(delete=False, suffix='.jpg')
-                pil_img.save(temp_logo.name, format='JPEG', quality=95)
-                pub_logo_path = temp_logo.name
-                temp_logo.close()
-                
-                mem_after_logo = process.memory_info()
-                print(f"✓ Loaded pub logo ({time.time()-step_start:.2f}s) - Memory: {mem_after_logo.rss / 1024 / 1024:.1f} MB")
-            except Exception as e:
-                print(f"Error processing logo: {e}")
-    
-    # Generate QR code once (if needed) to avoid regenerating 50 times
-    qr_buffer_cache = None
-    qr_buffer_data = None
-    if include_qr and social_media:
-        step_start = time.time()
-        qr_buffer_cache = generate_qr_code(social_media)
-        if qr_buffer_cache:
-            qr_buffer_data = qr_buffer_cache.getvalue()  # Get bytes for serialization
-            mem_after_qr = process.memory_info()
-            print(f"✓ Generated QR code ({time.time()-step_start:.2f}s) - Memory: {mem_after_qr.rss / 1024 / 1024:.1f} MB")
-    
-    # *** DISTRIBUTE SONGS UNIQUELY ACROSS ALL CARDS ***
-    # Each song appears on AT MOST ONE card to prevent duplicates during gameplay
+    # Decode/resize/encode every image once for the whole job (logos, QR)
     step_start = time.time()
-    print(f"\n🎵 Distributing songs uniquely across {NUM_CARDS} cards...")
-    all_card_songs = distribute_songs_unique(selected_songs, NUM_CARDS, SONGS_PER_CARD)
-    print(f"✓ Songs distributed uniquely ({time.time()-step_start:.2f}s)")
+    images = build_image_registry(pub_logo, social_media, include_qr)
+    mem_after_images = process.memory_info()
+    print(f"✓ Prepared {len(images.images)} image(s) at {images.dpi} DPI ({time.time()-step_start:.2f}s) - Memory: {mem_after_images.rss / 1024 / 1024:.1f} MB")
+    
+    # Songs on the cards follow the simulated layout: each song on the same
+    # number of cards (+-1), never twice on one card
+    all_card_songs = [[selected_songs[idx] for idx in card] for card in plan['cards']]
+    print(f"\n🎵 Songs distributed across {num_cards} cards")
     print(f"   Each card has {SONGS_PER_CARD} unique songs")
     print(f"   Total unique songs used: {len(set(song['id'] for card in all_card_songs for song in card))}")
     
-    # Check if parallel processing is beneficial
-    # MEMORY-OPTIMIZED: Limit workers to avoid OOM on App Platform
-    num_cpus = mp.cpu_count()
-    use_parallel = True  # Always use parallel - it's faster
-    
-    if use_parallel:
-        # **PARALLEL GENERATION** - MEMORY-OPTIMIZED for cloud deployment
-        print(f"\n📄 Generating PDF cards in parallel (MEMORY-OPTIMIZED)...")
-        print(f"PROGRESS: 0")  # Structured progress for backend parsing
-        parallel_start = time.time()
-        
-        batch_size = 10  # 10 cards per batch
-        # MEMORY OPTIMIZATION: Limit to 2 workers to avoid OOM (exit code 128)
-        # App Platform has memory limits - using all cores causes out-of-memory crashes
-        num_workers = min(2, num_cpus)  # Maximum 2 workers to stay within memory limits
-        print(f"   Using {num_workers} parallel workers (CPUs: {num_cpus}) - MEMORY-SAFE MODE")
-        
-        # Prepare batch data with pre-assigned songs
-        batches = []
-        for i in range(0, NUM_CARDS, batch_size):
-            batch_cards = []
-            for card_idx in range(i, min(i + batch_size, NUM_CARDS)):
-                card_num = card_idx + 1
-                card_songs = all_card_songs[card_idx]
-                batch_cards.append((card_num, card_songs))
-            
-            batches.append((
-                i // batch_size,
-                batch_cards,  # Now includes (card_num, songs) tuples
-                venue_name,
-                pub_logo_path,
-                social_media,
-                include_qr,
-                game_number,
-                game_date,
-                qr_buffer_data,
-                prize_4corners,
-                prize_first_line,
-                prize_full_house
-            ))
-        
-        # Generate PDFs in parallel with progress tracking
-        with ProcessPoolExecutor(max_workers=num_workers) as executor:
-            temp_pdfs = []
-            futures = [executor.submit(generate_batch_pdf, batch) for batch in batches]
-            
-            for i, future in enumerate(futures):
-                try:
-                    result = future.result(timeout=60)
-                    temp_pdfs.append(result)
-                    progress = (i + 1) / len(futures) * 90  # Reserve 10% for merging
-                    mem_info = process.memory_info()
-                    print(f"PROGRESS: {progress:.0f}")  # Structured progress
-                    print(f"  📊 Progress: {progress:.0f}% ({i+1}/{len(futures)} batches) - Memory: {mem_info.rss / 1024 / 1024:.1f} MB")
-                except Exception as e:
-                    print(f"  ❌ Batch {i} failed: {e}")
-                    raise
-        
-        print(f"  ✓ All batches generated ({time.time()-parallel_start:.2f}s)")
-        mem_info = process.memory_info()
-        print(f"  📈 Final memory: {mem_info.rss / 1024 / 1024:.1f} MB")
-        
-        # Merge all PDFs
-        print(f"\n📝 Merging PDF batches...")
-        print(f"PROGRESS: 90")  # Structured progress for merging stage
-        merge_start = time.time()
-        
-        merger = PdfWriter()
-        for pdf_path in temp_pdfs:
-            reader = PdfReader(pdf_path)
-            for page in reader.pages:
-                merger.add_page(page)
-        
-        with open(str(OUTPUT_FILE), 'wb') as output_file:
-            merger.write(output_file)
-        
-        print(f"PROGRESS: 100")  # Completed
-        print(f"   ✓ PDF merged ({time.time()-merge_start:.2f}s)")
-        
-        # Cleanup temp files
-        for pdf_path in temp_pdfs:
-            try:
-                os.unlink(pdf_path)
-            except:
-                pass
-    else:
-        # **SEQUENTIAL GENERATION** - Single core optimization
-        print(f"\n📄 Generating PDF cards (single-core mode)...")
-        print(f"   CPUs: {num_cpus} - Using sequential generation")
-        
-        doc = SimpleDocTemplate(
-            str(OUTPUT_FILE),
-            pagesize=A4,
-            leftMargin=10*mm,  # Same as batch mode
-            rightMargin=10*mm,
-            topMargin=8*mm,
-            bottomMargin=8*mm,
+    # **SINGLE-PASS GENERATION** - every card rendered into one document in
+    # page order and written once: no batch temp files, no re-parse/merge
+    print(f"\n📄 Generating PDF cards (single pass, {render_engine})...")
+    report_progress(progress_callback, 0, 'rendering', process)
+    render_start = time.time()
+    
+    # Generator: cards are only materialised as their page is drawn
+    cards_data = ((card_idx + 1, card_songs) for card_idx, card_songs in enumerate(all_card_songs))
+    total_pages = (num_cards + 1) // 2
+    peak_memory_mb = process_memory_mb(process)
+    last_reported = {'progress': 0}
+    
+    def page_done(pages):
+        nonlocal peak_memory_mb
+        progress = pages / total_pages * 95  # last 5% is writing the file
+        # Report every ~10% (not every page)
+        if progress - last_reported['progress'] < 10 and pages < total_pages:
+            return
+        last_reported['progress'] = progress
+        report_progress(progress_callback, progress, 'rendering', process)
+        memory_mb = process_memory_mb(process)
+        peak_memory_mb = max(peak_memory_mb, memory_mb)
+        print(f"  📊 Progress: {progress:.0f}% ({pages}/{total_pages} pages) - Memory: {memory_mb:.1f} MB")
+    
+    # Write next to the target and rename, so a failed job never leaves a half PDF
+    part_path = output_path.with_name(output_path.name + '.part')
+    try:
+        num_pages = render_cards_pdf(
+            str(part_path), cards_data, venue_name, images, social_media, include_qr,
+            game_number, game_date, prize_4corners, prize_first_line,
+            prize_full_house, render_engine=render_engine, on_page=page_done
         )
-        
-        story = []
-        cards_start = time.time()
-        
-        for i in range(NUM_CARDS):
-            # Use pre-assigned unique songs instead of random.sample
-            card_songs = all_card_songs[i]
-            
-            card_elements = create_bingo_card(
-                card_songs,
-                i + 1,
-                venue_name,
-                pub_logo_path,
-                social_media,
-                include_qr,
-                game_number,
-                game_date,
-                qr_buffer_cache
-            )
-            
-            story.extend(card_elements)
-            
-            if (i + 1) % 2 == 0 and i < NUM_CARDS - 1:
-                story.append(PageBreak())
-            elif i < NUM_CARDS - 1:
-                story.append(Spacer(1, 5*mm))
-            
-            if (i + 1) % 10 == 0:
-                print(f"  ✓ Generated {i + 1}/{NUM_CARDS} cards ({time.time()-cards_start:.2f}s)")
-        
-        print(f"\n📝 Building PDF document...")
-        build_start = time.time()
-        doc.build(story)
-        print(f"   ✓ PDF built ({time.time()-build_start:.2f}s)")
+        os.replace(part_path, output_path)
+    finally:
+        if part_path.exists():
+            part_path.unlink()
+        images.cleanup()
+    peak_memory_mb = max(peak_memory_mb, process_memory_mb(process))
     
-    # Cleanup temp logo file
-    if pub_logo_path:
-        try:
-            import os
-            os.unlink(pub_logo_path)
-        except:
-            pass
+    report_progress(progress_callback, 100, 'done', process)
+    print(f"  ✓ {num_pages} pages rendered and written ({time.time()-render_start:.2f}s)")
+    print(f"  📈 Final memory: {process.memory_info().rss / 1024 / 1024:.1f} MB")
     
     total_time = time.time() - start_time
     
     print(f"\n{'='*60}")
     print(f"✅ SUCCESS!")
     print(f"{'='*60}")
-    print(f"Generated: {OUTPUT_FILE}")
-    print(f"Cards: {NUM_CARDS}")
-    print(f"Pages: {(NUM_CARDS + 1) // 2} (2 cards per page)")
+    print(f"Generated: {output_path}")
+    print(f"Cards: {num_cards}")
+    print(f"Pages: {total_pages} (2 cards per page)")
     print(f"Songs per card: {SONGS_PER_CARD}")
     print(f"Total songs available: {len(selected_songs)}")
+    print(f"Expected full house after ~{game_report['patterns']['full_house']['mean']} songs")
     print(f"⏱️  TOTAL TIME: {total_time:.2f}s")
     print(f"{'='*60}\n")
     
     return {
-        'num_cards': NUM_CARDS,
-        'num_pages': (NUM_CARDS + 1) // 2,  # 2 cards per page
+        'num_cards': num_cards,
+        'num_pages': num_pages,  # 2 cards per page
         'songs_per_card': SONGS_PER_CARD,
-        'total_songs': len(selected_songs)
+        'total_songs': len(selected_songs),
+        'output_file': str(output_path),
+        'seed': seed,
+        'manifest': {**build_card_manifest(pool_data, selected_songs, all_card_songs, seed),
+                     'game_length': game_report},
+        'game_length': game_report,
+        'generation_time': round(total_time, 2),
+        'start_memory_mb': round(mem_start.rss / 1024 / 1024, 1),
+        'peak_memory_mb': round(peak_memory_mb, 1)
     }
 
 
@@ -938,6 +1364,7 @@ if __name__ == '__main__':
     parser = argparse.ArgumentParser(description='Generate Music Bingo cards with branding')
     parser.add_argument('--venue_name', default='Music Bingo', help='Name of the venue')
     parser.add_argument('--num_players', type=int, default=25, help='Number of players')
+    parser.add_argument('--num_cards', type=int, default=NUM_CARDS, help=f'Cards to print (up to {MAX_CARDS})')
     parser.add_argument('--pub_logo', default=None, help='URL or path to pub logo image')
     parser.add_argument('--social_media', default=None, help='Social media URL to encode in QR code')
     parser.add_argument('--include_qr', type=lambda x: x.lower() == 'true', default=False, 
@@ -947,6 +1374,12 @@ if __name__ == '__main__':
     parser.add_argument('--prize_4corners', default='', help='Prize for All 4 Corners')
     parser.add_argument('--prize_first_line', default='', help='Prize for First Line')
     parser.add_argument('--prize_full_house', default='', help='Prize for Full House')
+    parser.add_argument('--output_file', default=None, help=f'Output PDF path (default: {OUTPUT_FILE})')
+    parser.add_argument('--engine', choices=RENDER_ENGINES, default='canvas',
+                       help='PDF render engine (canvas is much faster, same layout)')
+    parser.add_argument('--seed', type=int, default=None, help='Card-set seed (same seed = same cards)')
+    parser.add_argument('--game_length', type=json.loads, default=None,
+                       help='Target songs until the first winner, e.g. \'{"full_house": [45, 70]}\'')
     
     args = parser.parse_args()
     
@@ -960,5 +1393,10 @@ if __name__ == '__main__':
         game_date=args.game_date,
         prize_4corners=args.prize_4corners,
         prize_first_line=args.prize_first_line,
-        prize_full_house=args.prize_full_house
+        prize_full_house=args.prize_full_house,
+        output_file=args.output_file,
+        render_engine=args.engine,
+        seed=args.seed,
+        game_length=args.game_length,
+        num_cards=args.num_cards
     )
@@ -3,6 +3,17 @@ ASGI config for music_bingo project.
 
 It exposes the ASGI callable as a module-level variable named ``application``.
 
+The pub quiz SSE streams (/api/pub-quiz/<id>/stream and /host-stream) are
+served by api.pub_quiz_streams.asgi_stream: idle streams just await their
+events, so one uvicorn worker holds hundreds of them. Everything else goes
+through Django as usual.
+
+    uvicorn music_bingo.asgi:application --host 127.0.0.1 --port 5002
+
+When only the streams are served here (QUIZ_STREAMS_SEPARATE_PROCESS=true)
+the REST views publish from gunicorn, so events must go through Redis:
+startup fails without it.
+
 For more information on this file, see
 https://docs.djangoproject.com/en/4.2/howto/deployment/asgi/
 """
@@ -13,4 +24,17 @@ from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "music_bingo.settings")
 
-application = get_asgi_application()
+django_application = get_asgi_application()
+
+from api import quiz_events  # noqa: E402 (needs Django set up)
+from api.pub_quiz_streams import STREAM_PATH, asgi_stream  # noqa: E402
+
+if quiz_events.QUIZ_STREAMS_SEPARATE_PROCESS:
+    quiz_events.require_shared()
+
+
+async def application(scope, receive, send):
+    if scope["type"] == "http" and STREAM_PATH.match(scope["path"]):
+        await asgi_stream(scope, receive, send)
+    else:
+        await django_application(scope, receive, send)
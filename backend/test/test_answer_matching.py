@@ -0,0 +1,71 @@
+"""
+Test script for written-answer matching
+Near-misses a host would accept are accepted (with a confidence), wrong
+answers are not, and grading a whole night's answers stays cheap
+"""
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.answer_matching import build_answer_keys, match_answer, normalize_answer
+
+
+def test_normalize():
+    assert normalize_answer('The Beatles!') == 'beatles'
+    assert normalize_answer('Beyoncé') == 'beyonce'
+    assert normalize_answer("Guns N' Roses") == 'guns n roses'
+    assert normalize_answer('Simon & Garfunkel') == 'simon and garfunkel'
+    assert normalize_answer('Twenty-One Pilots') == '21 pilots'
+    assert normalize_answer('one hundred and five') == '105'
+    assert normalize_answer('1,000') == '1000'
+    assert normalize_answer('Vitamin A') == 'vitamin a'
+    print("✅ case, accents, punctuation, leading articles and number words normalised")
+
+
+def test_match():
+    keys = build_answer_keys('The Rolling Stones', ['Rolling Stones', 'Stones'])
+    assert keys == ['rolling stones', 'stones']
+
+    cases = [
+        # answer, correct answer, accepted, needs review
+        ('rolling stones', 'The Rolling Stones', True, False),
+        ('Rollin Stones', 'The Rolling Stones', True, False),
+        ('beatels', 'The Beatles', True, True),
+        ('Lennon', 'John Lennon', True, True),
+        # Right answer in a sentence: the host decides
+        ('it was the beatles', 'The Beatles', False, True),
+        ("I think it's the Beatles", 'The Beatles', False, True),
+        ('1967', '1966', False, False),
+        ('Vitamin B', 'Vitamin A', False, False),
+        ('Madonna', 'Madness', False, False),
+        # One letter off a short word is another word, not a typo: the host decides
+        ('Iran', 'Iraq', False, True),
+        ('Austria', 'Australia', False, True),
+        ('Niger', 'Nigeria', False, True),
+        ('Mars', 'Mary', False, True),
+        ('', 'Queen', False, False),
+    ]
+    for answer, correct, accepted, review in cases:
+        match = match_answer(answer, build_answer_keys(correct))
+        assert (match.is_correct, match.needs_review) == (accepted, review), (answer, correct, match)
+    print(f"✅ {len(cases)} written answers graded with confidence")
+
+
+def test_grading_speed():
+    keys = [build_answer_keys(f'Answer number {n}', [f'Alternative {n}']) for n in range(60)]
+    answers = ['answr number {}', 'alternativ {}', 'something else entirely {}'] * 800
+    start = time.time()
+    for i, answer in enumerate(answers):
+        match_answer(answer.format(i % 60), keys[i % 60])
+    elapsed = time.time() - start
+    assert elapsed < 5, elapsed
+    print(f"✅ graded {len(answers)} answers in {elapsed * 1000:.0f}ms")
+
+
+if __name__ == '__main__':
+    test_normalize()
+    test_match()
+    test_grading_speed()
@@ -0,0 +1,160 @@
+"""
+Load test for the async (ASGI) pub quiz streams
+Opens 500 player streams on one process / one event loop, starts the quiz
+through the REST API and checks every stream gets the questions - without a
+thread per connection.
+
+    python test/test_async_streams.py
+        in-process, against music_bingo.asgi:application
+    python test/test_async_streams.py --url http://127.0.0.1:5002 --session ABC123 [--streams 500]
+        against a running uvicorn worker (start the quiz from the host panel)
+"""
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from asgiref.sync import sync_to_async
+from django.test import Client
+
+from api import quiz_events
+from api.pub_quiz_models import PubQuizSession, QuizQuestion
+from music_bingo.asgi import application
+
+NUM_STREAMS = 500
+
+
+class ASGIStream:
+    """One SSE client talking straight to the ASGI application"""
+
+    def __init__(self, path):
+        self.path = path
+        self.messages = []
+        self.disconnect = asyncio.Event()
+        self.task = asyncio.create_task(self.run())
+
+    async def run(self):
+        scope = {
+            'type': 'http', 'asgi': {'version': '3.0'}, 'http_version': '1.1',
+            'method': 'GET', 'scheme': 'http', 'path': self.path, 'raw_path': self.path.encode(),
+            'query_string': b'', 'root_path': '', 'headers': [(b'host', b'testserver')],
+            'client': ('127.0.0.1', 50000), 'server': ('testserver', 80),
+        }
+        sent_request = False
+
+        async def receive():
+            nonlocal sent_request
+            if not sent_request:
+                sent_request = True
+                return {'type': 'http.request', 'body': b'', 'more_body': False}
+            await self.disconnect.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            if message['type'] == 'http.response.body' and message.get('body'):
+                self.messages.append(message['body'].decode())
+
+        await application(scope, receive, send)
+
+    def has(self, message_type):
+        return any(f'"type": "{message_type}"' in m for m in self.messages)
+
+
+async def wait_for(condition, timeout):
+    deadline = time.time() + timeout
+    while not condition():
+        if time.time() > deadline:
+            return False
+        await asyncio.sleep(0.05)
+    return True
+
+
+def test_500_streams_one_process():
+    session = PubQuizSession.objects.create(venue_name='Load Test', total_rounds=1, questions_per_round=2, status='ready')
+    for number in (1, 2):
+        QuizQuestion.objects.create(session=session, round_number=1, question_number=number,
+                                    question_text=f'Question {number}', correct_answer='A')
+
+    def start_quiz():
+        return Client().post(f'/api/pub-quiz/{session.session_code}/start').status_code
+
+    async def main():
+        threads_before = threading.active_count()
+        streams = [ASGIStream(f'/api/pub-quiz/{session.session_code}/stream') for _ in range(NUM_STREAMS)]
+        streams.append(ASGIStream(f'/api/pub-quiz/{session.session_code}/host-stream'))
+
+        start = time.time()
+        assert await wait_for(lambda: all(s.has('connected') for s in streams), 60), 'streams did not connect'
+        assert await wait_for(lambda: quiz_events.get_broker().subscriber_count(str(session.id)) >= NUM_STREAMS + 1, 10)
+        connect_time = time.time() - start
+        threads_open = threading.active_count()
+
+        start = time.time()
+        assert await sync_to_async(start_quiz)() == 200
+        assert await wait_for(lambda: all(s.has('quiz_started') for s in streams[:NUM_STREAMS]), 30)
+        fan_out_time = time.time() - start
+        assert streams[-1].has('host_update')
+
+        for stream in streams:
+            stream.disconnect.set()
+        await asyncio.wait_for(asyncio.gather(*(s.task for s in streams)), 30)
+        assert quiz_events.get_broker().subscriber_count(str(session.id)) == 0
+
+        # Idle streams cost no threads (only the loop's shared DB thread pool)
+        assert threads_open - threads_before < 40, (threads_before, threads_open)
+        print(f"✅ {NUM_STREAMS} player streams + 1 host stream on one event loop "
+              f"(threads {threads_before} -> {threads_open}): connected in {connect_time:.1f}s, "
+              f"quiz_started reached all of them {fan_out_time * 1000:.0f}ms after /start")
+
+    try:
+        asyncio.run(main())
+    finally:
+        session.delete()
+
+
+async def load_server(url, session_code, num_streams):
+    """Hold `num_streams` player streams open against a running ASGI server"""
+    import httpx
+
+    received = {'connected': 0, 'quiz_started': 0, 'status_change': 0}
+
+    async def player(client):
+        async with client.stream('GET', f'{url}/api/pub-quiz/{session_code}/stream') as response:
+            async for line in response.aiter_lines():
+                if line.startswith('data: '):
+                    message_type = json.loads(line[6:]).get('type')
+                    if message_type in received:
+                        received[message_type] += 1
+
+    limits = httpx.Limits(max_connections=num_streams + 10)
+    async with httpx.AsyncClient(timeout=None, limits=limits) as client:
+        tasks = [asyncio.create_task(player(client)) for _ in range(num_streams)]
+        try:
+            while True:
+                await asyncio.sleep(2)
+                print(f"📡 {received}")
+        finally:
+            for task in tasks:
+                task.cancel()
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser()
+    parser.add_argument('--url')
+    parser.add_argument('--session')
+    parser.add_argument('--streams', type=int, default=NUM_STREAMS)
+    args = parser.parse_args()
+    if args.url:
+        asyncio.run(load_server(args.url.rstrip('/'), args.session, args.streams))
+    else:
+        test_500_streams_one_process()
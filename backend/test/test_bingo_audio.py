@@ -0,0 +1,119 @@
+"""
+Test script for pre-rendering bingo announcements
+Every line a game can say (scripts, custom announcements, the AI trivia of
+its songs) is rendered through a rate-limited worker pool and listed in the
+game's manifest
+"""
+import os
+import sys
+import time
+import uuid
+import tempfile
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.test import Client
+
+from api import bingo_audio, tts_cache
+from api.models import BingoSession, TaskStatus
+from api.tts_cache import CachedAudio, RateLimiter, TTSCache, cache_key
+
+SCRIPT = ['Welcome to Music Bingo at The Crown!', 'Next song', 'Here we go', 'Mark your cards', 'Next song']
+
+
+class FakeVoice:
+    """Stands in for ElevenLabs: stores a clip in the cache, recording when each request started"""
+
+    def __init__(self):
+        self.started = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, params):
+        with self.lock:
+            self.started.append(time.perf_counter())
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.05)
+        key = cache_key(params)
+        tts_cache.get_cache().put(key, params['text'].encode())
+        with self.lock:
+            self.in_flight -= 1
+        return CachedAudio(key, params['text'].encode(), 'miss')
+
+
+def test_rate_limiter():
+    limiter = RateLimiter(rate=50)
+    start = time.perf_counter()
+    for _ in range(6):
+        limiter.acquire()
+    elapsed = time.perf_counter() - start
+    assert 0.09 <= elapsed < 0.5, elapsed  # first one free, then one every 20ms
+    print(f"✅ 6 calls at 50/s took {elapsed * 1000:.0f}ms")
+
+
+def test_game_lines():
+    session = BingoSession(session_id='lines', venue_name='The Crown')
+    lines = bingo_audio.game_lines(
+        session, SCRIPT, song_ids=[101, '102', '103'],
+        announcements={'custom_announcements': ['Welcome to Music Bingo at [VENUE_NAME]!', 'Happy hour is on!']},
+        ai_announcements={'101': {'trivia': 'A 1980s classic.', 'simple': 'Go!'}, '102': {'trivia': 'Number one for weeks.'}}
+    )
+    texts = [line['text'] for line in lines]
+    # Repeats dropped ("Next song", and the custom welcome the game posted too); song 103 has no AI line
+    assert texts == ['Welcome to Music Bingo at The Crown!', 'Next song', 'Here we go', 'Mark your cards',
+                     'Happy hour is on!', 'A 1980s classic.', 'Number one for weeks.'], texts
+    assert lines[-1]['kind'] == 'song' and lines[-1]['song_id'] == '102'
+    print(f"✅ {len(lines)} distinct lines for the game")
+
+
+def test_prerender_and_manifest():
+    previous = tts_cache._cache
+    session = BingoSession.objects.create(session_id=str(uuid.uuid4()), venue_name='Audio Test')
+    task_id = None
+    with tempfile.TemporaryDirectory() as directory:
+        tts_cache._cache = TTSCache(directory, memory_mb=1, disk_mb=10)
+        try:
+            voice = FakeVoice()
+            task_id = bingo_audio.start_prerender(session, voice_id='voice-a', script_lines=SCRIPT, song_ids=[],
+                                                  render=voice, rate=40)
+            deadline = time.time() + 10
+            while TaskStatus.objects.get(task_id=task_id).status not in ('completed', 'failed'):
+                assert time.time() < deadline, 'pre-rendering did not finish'
+                time.sleep(0.05)
+            task = TaskStatus.objects.get(task_id=task_id)
+            assert task.status == 'completed', task.error
+
+            # Rate limited: requests started at least 1/40s apart, and never more than the pool size at once
+            gaps = [b - a for a, b in zip(voice.started, voice.started[1:])]
+            assert all(gap >= 0.02 for gap in gaps), gaps
+            assert voice.max_in_flight <= bingo_audio.BINGO_AUDIO_WORKERS
+
+            data = Client().get(f'/api/bingo/session/{session.session_id}/announcement-audio').json()
+            scripted = [clip for clip in data['clips'] if clip['kind'] == 'script']
+            assert [clip['text'] for clip in scripted] == ['Welcome to Music Bingo at The Crown!', 'Next song',
+                                                           'Here we go', 'Mark your cards']
+            assert all(clip['ready'] and clip['voice_id'] == 'voice-a' for clip in scripted)
+            assert data['task_id'] == task_id and data['task_status'] == 'completed'
+
+            # The game starting doesn't render it all again
+            assert bingo_audio.start_prerender(session, render=voice) == task_id
+            print(f"✅ {task.result['rendered']} announcements pre-rendered in {task.result['seconds']}s")
+        finally:
+            tts_cache._cache = previous
+            session.delete()
+            if task_id:
+                TaskStatus.objects.filter(metadata__session_id=session.session_id).delete()
+
+
+if __name__ == '__main__':
+    test_rate_limiter()
+    test_game_lines()
+    test_prerender_and_manifest()
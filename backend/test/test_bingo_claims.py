@@ -0,0 +1,109 @@
+"""
+Test script for bingo claim verification
+Builds a claim board from a synthetic card manifest and checks the
+"4 corners", "first line" and "full house" patterns
+"""
+import os
+import sys
+import json
+import time
+import tempfile
+from pathlib import Path
+from types import SimpleNamespace
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.bingo_claims import ClaimBoard, board_for_session, card_cells
+
+
+POOL_IDS = [f'song-{i}' for i in range(100)]
+
+
+def make_board(cards):
+    manifest = {'version': 1, 'seed': 1, 'pool_size': len(POOL_IDS), 'songs': list(range(100)), 'cards': cards}
+    return ClaimBoard(manifest, POOL_IDS)
+
+
+def ids_at(card, cells):
+    grid = card_cells(card)
+    return [POOL_IDS[grid[cell]] for cell in cells if grid[cell] is not None]
+
+
+def test_patterns():
+    card = list(range(24))
+    other = list(range(50, 74))
+    board = make_board([card, other])
+
+    board.sync(ids_at(card, [0, 4, 20]))
+    assert not board.verify(1, 'four_corners')['valid']
+    assert board.verify(1, 'four_corners')['missing_cells'] == [24]
+    assert board.stats()['patterns']['four_corners']['one_away'] == 1
+
+    board.sync(ids_at(card, [0, 4, 20, 24]))
+    assert board.verify(1, 'four_corners')['valid']
+    assert not board.verify(2, 'four_corners')['valid']
+
+    # Middle row goes through the FREE cell - 4 songs complete it
+    board.sync(ids_at(card, [0, 4, 20, 24, 10, 11, 13, 14]))
+    result = board.verify(1, 'first_line')
+    assert result['valid'] and result['winning_cells'] == [10, 11, 12, 13, 14]
+    assert board.stats()['patterns']['first_line']['winners'] == [1]
+    assert not board.verify(1, 'full_house')['valid']
+
+    board.sync([POOL_IDS[idx] for idx in card])
+    assert board.verify(1, 'full_house')['valid']
+    assert board.stats()['patterns']['full_house']['winners'] == [1]
+
+    # A reset game (history no longer a prefix) starts from scratch
+    board.sync([])
+    assert board.stats()['patterns']['four_corners']['winners'] == []
+
+    for bad in [(3, 'full_house'), (1, 'blackout')]:
+        try:
+            board.verify(*bad)
+        except ValueError:
+            continue
+        raise AssertionError(f'{bad} should be rejected')
+    print("✅ claim patterns verified")
+
+
+def test_stats_scale():
+    cards = [[(i * 7 + j * 3) % 100 for j in range(24)] for i in range(5000)]
+    board = make_board(cards)
+
+    start = time.time()
+    for n in range(1, 41):
+        board.sync(POOL_IDS[:n])
+        stats = board.stats()
+    elapsed = (time.time() - start) / 40
+
+    assert stats['called'] == 40 and stats['num_cards'] == 5000
+    print(f"✅ 5000 cards: {elapsed * 1000:.1f}ms per called song (sync + stats)")
+
+
+def test_regenerated_pool_is_refused():
+    with tempfile.TemporaryDirectory() as directory:
+        pool_path = Path(directory) / 'pool.json'
+        songs = [{'id': song_id} for song_id in POOL_IDS]
+        pool_path.write_text(json.dumps({'generated_at': '2026-01-01T20:00:00', 'songs': songs}))
+        manifest = {'version': 1, 'seed': 7, 'pool_version': '2026-01-01T20:00:00', 'pool_size': len(POOL_IDS),
+                    'songs': list(range(100)), 'cards': [list(range(24))]}
+        session = SimpleNamespace(session_id='pool-check', card_seed=7, card_manifest=manifest, songs_played=[])
+        assert board_for_session(session, pool_path).num_cards == 1
+
+        # Same size, different songs: the cards no longer match it
+        pool_path.write_text(json.dumps({'generated_at': '2026-01-02T20:00:00', 'songs': songs[::-1]}))
+        os.utime(pool_path, (time.time() + 10, time.time() + 10))
+        try:
+            board_for_session(session, pool_path)
+            assert False, 'expected the regenerated pool to be refused'
+        except ValueError as e:
+            assert 'pool changed' in str(e)
+    print("✅ claims refused against a regenerated pool of the same size")
+
+
+if __name__ == '__main__':
+    test_patterns()
+    test_stats_scale()
+    test_regenerated_pool_is_refused()
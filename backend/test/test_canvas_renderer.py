@@ -0,0 +1,147 @@
+"""
+Test script for the direct-canvas card renderer
+Renders the same cards with both engines and compares text placement
+"""
+import os
+import sys
+import time
+import random
+import tempfile
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_cards
+from pypdf import PdfReader
+from pypdf.generic import ContentStream
+
+
+def render(engine, output_file):
+    random.seed(42)
+    start = time.time()
+    with redirect_stdout(StringIO()):
+        generate_cards.generate_cards(
+            venue_name='The Crown & Anchor', num_players=25,
+            social_media='https://facebook.com/thecrown', include_qr=True,
+            game_number=2, game_date='Friday, May 1, 2026',
+            prize_4corners='£20', prize_first_line='Drinks', prize_full_house='£100 bar tab',
+            output_file=output_file, render_engine=engine
+        )
+    print(f"   {engine}: {time.time() - start:.2f}s")
+
+
+def text_positions(pdf_path):
+    """Absolute position of every text run on the first page"""
+    positions = {}
+
+    def visitor(text, cm, tm, font_dict, font_size):
+        if text.strip():
+            x = tm[4] * cm[0] + tm[5] * cm[2] + cm[4]
+            y = tm[4] * cm[1] + tm[5] * cm[3] + cm[5]
+            positions.setdefault(text.strip(), (x, y))
+
+    reader = PdfReader(pdf_path)
+    reader.pages[0].extract_text(visitor_text=visitor)
+    return positions, len(reader.pages)
+
+
+def form_texts(pdf_path):
+    """Strings drawn inside the form XObjects used on the first page"""
+    texts = set()
+    reader = PdfReader(pdf_path)
+    for ref in reader.pages[0]['/Resources']['/XObject'].values():
+        form = ref.get_object()
+        if form['/Subtype'] == '/Form':
+            for operands, operator in ContentStream(form, reader).operations:
+                if operator == b'Tj':
+                    texts.add(str(operands[0]).strip())
+    return texts
+
+
+def test_canvas_matches_platypus_layout():
+    with tempfile.TemporaryDirectory() as tmp:
+        platypus_pdf = os.path.join(tmp, 'platypus.pdf')
+        canvas_pdf = os.path.join(tmp, 'canvas.pdf')
+        render('platypus', platypus_pdf)
+        render('canvas', canvas_pdf)
+
+        expected, expected_pages = text_positions(platypus_pdf)
+        actual, actual_pages = text_positions(canvas_pdf)
+        static_texts = form_texts(canvas_pdf)
+
+    assert actual_pages == expected_pages == 25
+
+    # The canvas engine draws the static card body (header, FREE, prizes, QR
+    # footer) once as a form XObject. pypdf reports text inside a form in form
+    # space, so all of those runs are shifted by one common offset.
+    assert 'MUSIC BINGO' in static_texts and 'FREE' in static_texts
+    form_dy = actual['MUSIC BINGO'][1] - expected['MUSIC BINGO'][1]
+
+    # Songs, venue, prizes, QR text: same strings on the same baselines (±0.5pt).
+    # pypdf doesn't always apply Td offsets of centred platypus paragraphs, so x
+    # is only counted, not required for every run.
+    checked = same_x = 0
+    for text, (x, y) in expected.items():
+        # Platypus writes the bold date and "• Game #N" as one text object;
+        # the prizes header is re-centred because the canvas engine drops the
+        # trophy emoji (Helvetica has no glyph for it)
+        if text not in actual or 'Game #' in text or 'PRIZES TONIGHT' in text:
+            continue
+        ax, ay = actual[text]
+        if (ax, ay) == (0, 0):
+            continue  # pypdf sometimes loses the text matrix of a run
+        if text in static_texts:
+            ay -= form_dy
+        assert abs(ay - y) < 0.5, f"{text!r}: y {y:.1f} vs {ay:.1f}"
+        checked += 1
+        same_x += abs(ax - x) < 0.5
+    print(f"✅ {checked} text runs on the same baseline, {same_x} at the same x")
+    assert checked > 40
+    assert same_x > 0.9 * checked
+
+
+def test_canvas_shares_static_form_and_images():
+    """Every page draws the same form, and each image is embedded once"""
+    with tempfile.TemporaryDirectory() as tmp:
+        canvas_pdf = os.path.join(tmp, 'canvas.pdf')
+        render('canvas', canvas_pdf)
+        reader = PdfReader(canvas_pdf)
+
+        form_ids = set()
+        for page in reader.pages:
+            form_ids |= {ref.idnum for ref in page['/Resources']['/XObject'].values()}
+        assert len(form_ids) == 1
+
+        images = reader.get_object(form_ids.pop())['/Resources']['/XObject']
+        # Perfect DJ logo + QR code (no pub logo in this job)
+        assert len(images) == 2
+    print(f"✅ {len(reader.pages)} pages share one static form with {len(images)} images")
+
+
+def test_canvas_streams_pages():
+    """Finished pages reach the file while rendering, not all at save()"""
+    pool = generate_cards.load_pool()
+    rng = random.Random(1)
+    cards = ((num, rng.sample(pool, 24)) for num in range(1, 401))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'cards.pdf')
+        sizes = []
+        pages = generate_cards.render_cards_pdf(
+            output_file, cards, 'The Crown', on_page=lambda n: sizes.append(os.path.getsize(output_file))
+        )
+        reader = PdfReader(output_file)
+        assert pages == len(reader.pages) == 200
+        assert 'Card #400' in reader.pages[-1].extract_text()
+
+    # The file grows page by page (size before the last page is most of the file)
+    assert sizes == sorted(sizes) and sizes[-2] > 0.8 * sizes[-1]
+    print(f"✅ {pages} pages streamed, {sizes[-1] / 1024:.0f} KB written before save()")
+
+
+if __name__ == '__main__':
+    test_canvas_matches_platypus_layout()
+    test_canvas_shares_static_form_and_images()
+    test_canvas_streams_pages()
@@ -0,0 +1,100 @@
+"""
+Test script for the card-set cache key and seeded card generation
+Same inputs must give the same key, exactly the same cards and a manifest
+that matches what was printed
+"""
+import os
+import sys
+import base64
+import tempfile
+from io import StringIO
+from contextlib import redirect_stdout
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import generate_cards
+from api import card_cache
+from pypdf import PdfReader
+
+
+OPTIONS = {
+    'venue_name': 'The Crown', 'num_players': 25, 'game_number': 1,
+    'game_date': 'Friday, May 1, 2026', 'social_media': '', 'include_qr': False,
+    'prize_4corners': '£20', 'prize_first_line': '', 'prize_full_house': '',
+    'render_engine': 'canvas'
+}
+
+
+def test_cache_key_is_content_addressed():
+    logo = 'data:image/png;base64,' + base64.b64encode(b'logo-bytes').decode()
+    other_logo = 'data:image/png;base64,' + base64.b64encode(b'other-logo').decode()
+
+    inputs = card_cache.card_set_inputs(OPTIONS, card_cache.logo_digest(logo))
+    seed = card_cache.default_seed(inputs)
+
+    # Reload of the setup page: same request, same seed, same key
+    again = card_cache.card_set_inputs(dict(OPTIONS), card_cache.logo_digest(logo))
+    assert card_cache.default_seed(again) == seed
+    assert card_cache.cache_key(again, seed) == card_cache.cache_key(inputs, seed)
+
+    # Anything printed on the cards changes the key
+    changed = [
+        card_cache.card_set_inputs(OPTIONS, card_cache.logo_digest(other_logo)),
+        card_cache.card_set_inputs({**OPTIONS, 'game_number': 2}, card_cache.logo_digest(logo)),
+        card_cache.card_set_inputs({**OPTIONS, 'prize_full_house': '£100'}, card_cache.logo_digest(logo)),
+    ]
+    keys = {card_cache.cache_key(inputs, seed)}
+    keys |= {card_cache.cache_key(c, card_cache.default_seed(c)) for c in changed}
+    keys.add(card_cache.cache_key(inputs, seed + 1))
+    assert len(keys) == 5
+    print(f"✅ cache key {card_cache.cache_key(inputs, seed)[:12]}... (seed {seed})")
+
+
+def first_page_text(seed, tmp):
+    output_file = os.path.join(tmp, f'cards_{seed}.pdf')
+    with redirect_stdout(StringIO()):
+        result = generate_cards.generate_cards(output_file=output_file, seed=seed, **{
+            k: v for k, v in OPTIONS.items() if k != 'render_engine'
+        })
+    assert result['seed'] == seed
+    return PdfReader(output_file).pages[0].extract_text()
+
+
+def test_same_seed_same_cards():
+    with tempfile.TemporaryDirectory() as tmp:
+        first = first_page_text(1234, tmp)
+        assert first_page_text(1234, tmp) == first
+        assert first_page_text(4321, tmp) != first
+    print("✅ same seed -> same cards")
+
+
+def test_manifest_matches_printed_cards():
+    with tempfile.TemporaryDirectory() as tmp:
+        output_file = os.path.join(tmp, 'cards.pdf')
+        with redirect_stdout(StringIO()):
+            result = generate_cards.generate_cards(output_file=output_file, seed=99, num_players=25)
+        page_text = PdfReader(output_file).pages[0].extract_text()
+
+    manifest = result['manifest']
+    pool = generate_cards.load_pool()
+    assert manifest['seed'] == 99 and manifest['pool_size'] == len(pool)
+    assert len(manifest['cards']) == result['num_cards']
+    assert all(len(card) == 24 for card in manifest['cards'])
+
+    # Every song on a card is in the call set
+    call_set = set(manifest['songs'])
+    assert all(idx in call_set for card in manifest['cards'] for idx in card)
+
+    # Card #1 on the PDF shows the manifest's songs (long titles wrap, so
+    # compare the first word of each cell)
+    for idx in manifest['cards'][0]:
+        cell_text = generate_cards.format_song_title(pool[idx], max_length=40)
+        assert cell_text.split()[0] in page_text
+    print(f"✅ manifest: {len(manifest['cards'])} cards, {len(call_set)} songs in the call set")
+
+
+if __name__ == '__main__':
+    test_cache_key_is_content_addressed()
+    test_same_seed_same_cards()
+    test_manifest_matches_printed_cards()
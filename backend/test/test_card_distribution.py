@@ -0,0 +1,54 @@
+"""
+Test script for the card distribution optimizer
+Layouts must be balanced and the chosen call set must give games of the
+requested length
+"""
+import os
+import sys
+import random
+from collections import Counter
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import card_distribution
+
+
+def test_balanced_layout():
+    cards = card_distribution.balanced_layout(62, 50, random.Random(1))
+    assert all(len(card) == 24 and len(set(card)) == 24 for card in cards)
+
+    usage = Counter(idx for card in cards for idx in card)
+    assert len(usage) == 62 and max(usage.values()) - min(usage.values()) <= 1
+    print(f"✅ balanced layout: every song on {min(usage.values())}-{max(usage.values())} cards")
+
+
+def test_optimizer_meets_targets():
+    short = {'four_corners': [5, 18], 'full_house': [25, 40]}
+    plans = {}
+    for name, targets in [('default', None), ('short', short)]:
+        plan = card_distribution.optimize_distribution(300, 50, 25, random.Random(7), targets)
+        report = plan['report']
+        assert report['within_target'], report
+        for stats in report['patterns'].values():
+            assert stats['target'][0] <= stats['mean'] <= stats['target'][1]
+        assert len(plan['cards']) == 50
+        plans[name] = plan
+        print(f"✅ {name}: {plan['num_songs']} songs, full house ~{report['patterns']['full_house']['mean']}")
+
+    # Shorter game -> fewer songs; same seed -> same plan
+    assert plans['short']['num_songs'] < plans['default']['num_songs']
+    again = card_distribution.optimize_distribution(300, 50, 25, random.Random(7), short)
+    assert again['cards'] == plans['short']['cards']
+
+    for bad in [{'blackout': [1, 2]}, {'full_house': [50, 40]}, {'full_house': 'soon'}, [1, 2]]:
+        try:
+            card_distribution.parse_game_length(bad)
+        except ValueError:
+            continue
+        raise AssertionError(f'{bad} should be rejected')
+
+
+if __name__ == '__main__':
+    test_balanced_layout()
+    test_optimizer_meets_targets()
@@ -0,0 +1,67 @@
+"""
+Test script for the card generation service
+Runs several card jobs at once and checks each one gets its own PDF
+"""
+import os
+import sys
+import time
+import shutil
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api.card_service import CardGenerationService
+
+
+def test_concurrent_jobs_are_isolated():
+    """Three venues at once: three different output files, nothing overwritten"""
+    service = CardGenerationService(max_workers=2, max_concurrent_jobs=2)
+    venues = ['The Crown', 'Red Lion', 'Cross Keys']
+    job_ids = [str(uuid.uuid4()) for _ in venues]
+    events = {job_id: [] for job_id in job_ids}
+    queued = []
+
+    def run(job_id, venue):
+        return service.generate(
+            job_id,
+            {'venue_name': venue, 'num_players': 25},
+            progress_callback=events[job_id].append,
+            on_queued=lambda: queued.append(job_id)
+        )
+
+    start = time.time()
+    try:
+        with ThreadPoolExecutor(max_workers=len(venues)) as pool:
+            results = list(pool.map(run, job_ids, venues))
+    finally:
+        service.shutdown()
+    print(f"✅ {len(venues)} jobs in {time.time() - start:.2f}s ({len(queued)} queued)")
+
+    try:
+        paths = [Path(r['output_file']) for r in results]
+        assert len(set(paths)) == len(venues)
+        for job_id, path in zip(job_ids, paths):
+            assert path.parent.name == job_id
+            assert path.exists() and path.stat().st_size > 0
+            print(f"   📄 {path} ({path.stat().st_size / 1024:.0f} KB)")
+
+        # Max 2 concurrent jobs -> the third one had to wait
+        assert len(queued) >= 1
+
+        for job_id in job_ids:
+            assert events[job_id], f"no progress events for {job_id}"
+            assert events[job_id][-1]['progress'] == 100
+            assert {'progress', 'stage', 'memory_mb'} <= set(events[job_id][-1])
+
+        for r in results:
+            assert r['peak_memory_mb'] >= r['start_memory_mb'] > 0
+    finally:
+        for r in results:
+            shutil.rmtree(Path(r['output_file']).parent, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    test_concurrent_jobs_are_isolated()
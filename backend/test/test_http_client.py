@@ -0,0 +1,214 @@
+"""
+Test script for the pooled outbound HTTP client
+Against local stub servers: connections are reused, failures are retried,
+a failing upstream trips the circuit, in-flight requests per host are
+capped and every call lands in the latency histogram
+"""
+import os
+import sys
+import time
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+
+from api.http_client import CircuitOpenError, HTTPClient
+
+
+class StubServer:
+    """A local upstream: answers each request with the next scripted (status, delay), then 200s (status 0: hang up)"""
+
+    def __init__(self, script=()):
+        self.script = list(script)
+        self.hits = 0
+        self.ports = set()
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'  # keep-alive
+
+            def log_message(self, *args):
+                pass
+
+            def do_GET(self):
+                self.handle_request()
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                self.handle_request()
+
+            def handle_request(self):
+                with stub.lock:
+                    stub.hits += 1
+                    stub.ports.add(self.client_address[1])
+                    stub.in_flight += 1
+                    stub.max_in_flight = max(stub.max_in_flight, stub.in_flight)
+                    status, delay = stub.script.pop(0) if stub.script else (200, 0)
+                time.sleep(delay)
+                if status == 0:
+                    self.close_connection = True
+                    with stub.lock:
+                        stub.in_flight -= 1
+                    return
+                body = b'{"ok": true}'
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                if status == 429:
+                    self.send_header('Retry-After', '0')
+                self.end_headers()
+                self.wfile.write(body)
+                with stub.lock:
+                    stub.in_flight -= 1
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_connections_are_reused():
+    stub = StubServer()
+    client = HTTPClient()
+    try:
+        for _ in range(20):
+            assert client.get(f'{stub.url}/songs').json() == {'ok': True}
+        assert stub.hits == 20 and len(stub.ports) == 1, stub.ports
+        stats = client.stats()[stub.url.split('//')[1]]
+        assert stats['count'] == 20 and stats['errors'] == 0 and stats['circuit'] == 'closed'
+        print(f"✅ 20 requests over {len(stub.ports)} connection, p50 <= {stats['p50_ms']}ms")
+    finally:
+        stub.close()
+
+
+def test_retries_with_backoff():
+    stub = StubServer([(503, 0), (429, 0)])
+    client = HTTPClient(backoff=0.01)
+    try:
+        response = client.post(f'{stub.url}/tts', json={'text': 'Eyes down'})
+        assert response.status_code == 200 and stub.hits == 3
+
+        # Out of retries: the last response is returned, the caller decides
+        stub.script = [(503, 0)] * 3
+        assert client.get(f'{stub.url}/songs', retries=1).status_code == 503 and stub.hits == 5
+
+        # Client errors aren't retried
+        stub.script = [(404, 0)]
+        assert client.get(f'{stub.url}/missing').status_code == 404 and stub.hits == 6
+        print("✅ 503 / 429 retried, 404 returned at once")
+    finally:
+        stub.close()
+
+
+def test_read_timeout_only_retried_when_idempotent():
+    stub = StubServer([(200, 0.3), (200, 0.3)])
+    client = HTTPClient(backoff=0.01, retries=1)
+    try:
+        try:
+            client.post(f'{stub.url}/tts', json={}, timeout=(1, 0.1))
+            assert False, 'expected a timeout'
+        except requests.exceptions.ReadTimeout:
+            pass
+        assert stub.hits == 1  # a POST that timed out may have been processed
+
+        stub.script = [(200, 0.3)]
+        assert client.get(f'{stub.url}/songs', timeout=(1, 0.2)).status_code == 200
+        assert stub.hits == 3
+        print("✅ timed-out GET retried, timed-out POST not")
+    finally:
+        stub.close()
+
+
+def test_connection_errors_only_retried_when_safe():
+    stub = StubServer([(0, 0), (0, 0)])
+    client = HTTPClient(backoff=0.01, retries=1)
+    try:
+        # Hung up after the body was sent: the TTS may be billed, don't send it again
+        try:
+            client.post(f'{stub.url}/tts', json={'text': 'Eyes down'})
+            assert False, 'expected a connection error'
+        except requests.exceptions.ConnectionError:
+            pass
+        assert stub.hits == 1
+
+        stub.script = [(0, 0)]
+        assert client.get(f'{stub.url}/songs').status_code == 200 and stub.hits == 3
+    finally:
+        stub.close()
+
+    # Nothing listening: the POST never left, so it is retried
+    client = HTTPClient(backoff=0.01, retries=1)
+    try:
+        client.post(f'{stub.url}/tts', json={})
+        assert False, 'expected a connection error'
+    except requests.exceptions.ConnectionError:
+        pass
+    assert client.stats()[stub.url.split('//')[1]]['errors'] == 2
+    print("✅ POST retried when refused, not when the connection dropped after sending")
+
+
+def test_circuit_breaker():
+    stub = StubServer([(500, 0)] * 3)
+    client = HTTPClient(retries=0, failure_threshold=3, reset_seconds=0.2)
+    try:
+        for _ in range(3):
+            assert client.get(f'{stub.url}/songs').status_code == 500
+        try:
+            client.get(f'{stub.url}/songs')
+            assert False, 'expected the circuit to be open'
+        except CircuitOpenError:
+            pass
+        assert stub.hits == 3  # failed fast, upstream not called
+
+        time.sleep(0.25)  # half-open: one trial request, which succeeds
+        assert client.get(f'{stub.url}/songs').status_code == 200
+        assert client.stats()[stub.url.split('//')[1]]['circuit'] == 'closed'
+
+        # A trial request that dies of something unexpected doesn't keep the circuit shut
+        stub.script = [(500, 0)] * 3
+        for _ in range(3):
+            client.get(f'{stub.url}/songs')
+        time.sleep(0.25)
+        try:
+            client.get(f'{stub.url}/songs', hooks={'response': lambda response, **kwargs: 1 / 0})
+            assert False, 'expected the hook to fail'
+        except ZeroDivisionError:
+            pass
+        assert client.get(f'{stub.url}/songs').status_code == 200
+        print("✅ circuit opened after 3 failures and closed after a good trial request")
+    finally:
+        stub.close()
+
+
+def test_per_host_concurrency_limit():
+    stub = StubServer([(200, 0.05)] * 12)
+    client = HTTPClient(host_concurrency=3)
+    try:
+        threads = [threading.Thread(target=client.get, args=(f'{stub.url}/songs',)) for _ in range(12)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert stub.hits == 12 and stub.max_in_flight <= 3, stub.max_in_flight
+        print(f"✅ 12 concurrent calls, at most {stub.max_in_flight} in flight upstream")
+    finally:
+        stub.close()
+
+
+if __name__ == '__main__':
+    test_connections_are_reused()
+    test_retries_with_backoff()
+    test_read_timeout_only_retried_when_idempotent()
+    test_connection_errors_only_retried_when_safe()
+    test_circuit_breaker()
+    test_per_host_concurrency_limit()
@@ -0,0 +1,108 @@
+"""
+Test script for the jingle generation pipeline
+Music is requested for a length estimated from the text while the voice is
+synthesised, and the mix fits the music to the voice's real length
+"""
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from pydub import AudioSegment
+from pydub.generators import Sine
+
+from api import jingle_pipeline
+from api.audio_mixer import fit_to_length
+
+TEXT = 'Happy Hour! Two for one cocktails between five and seven this Wednesday, only at The Crown!'
+
+
+def test_estimate_and_learnt_rate():
+    voice = 'test-voice-rate'
+    words = jingle_pipeline.count_words(TEXT)
+    assert words == 16, words
+    assert abs(jingle_pipeline.estimate_speech_seconds(TEXT, voice) - words / 150 * 60) < 0.01
+    assert jingle_pipeline.jingle_seconds(1.2) == 5 and jingle_pipeline.jingle_seconds(6.4) == 8
+    assert jingle_pipeline.jingle_seconds(120) == 30
+
+    # This voice reads at 240 wpm: each jingle pulls the estimate towards it
+    for _ in range(10):
+        jingle_pipeline.record_speech(voice, TEXT, words / 240 * 60)
+    assert 230 < jingle_pipeline.words_per_minute(voice) < 240
+    print(f"✅ {words} words: {jingle_pipeline.estimate_speech_seconds(TEXT, voice):.1f}s "
+          f"at the learnt {jingle_pipeline.words_per_minute(voice):.0f} wpm")
+
+
+def test_fit_music_to_length():
+    music = Sine(220).to_audio_segment(duration=3000)
+    assert len(fit_to_length(music, 1200)) == 1200  # trimmed
+    assert len(fit_to_length(music, 8000)) == 8000  # looped
+    assert len(fit_to_length(music[:0], 500)) == 500  # silence rather than nothing
+    # Clips no longer than the crossfade still loop
+    assert len(fit_to_length(AudioSegment.silent(duration=200), 1000)) == 1000
+    assert len(fit_to_length(AudioSegment.silent(duration=1), 50)) == 50
+    print("✅ music trimmed and looped to the jingle length")
+
+
+def test_voice_and_music_run_concurrently():
+    events = {}
+
+    def tts(text, voice_id, settings):
+        events['tts_start'] = time.perf_counter()
+        time.sleep(0.3)
+        return b'voice'
+
+    def music(prompt, seconds):
+        events['music_start'] = time.perf_counter()
+        events['music_seconds'] = seconds
+        time.sleep(0.4)
+        return b'music'
+
+    def mix(tts_bytes, music_bytes, target_ms):
+        events['target_ms'] = target_ms
+        return tts_bytes + music_bytes
+
+    steps = []
+    started = time.perf_counter()
+    jingle = jingle_pipeline.render_jingle(TEXT, 'test-voice-pipeline', {}, 'upbeat pub guitar',
+                                           on_step=lambda progress, step: steps.append(step),
+                                           tts=tts, music=music, mix=mix, measure=lambda audio: 9.6)
+    elapsed = time.perf_counter() - started
+
+    # Both started together; the jingle took about as long as the slower of the two, not the sum
+    assert abs(events['tts_start'] - events['music_start']) < 0.1
+    assert elapsed < 0.6, elapsed
+    assert jingle['audio'] == b'voicemusic'
+    # Music requested for the estimate (16 words at 150 wpm = 6.4s + 2), mixed to the real 9.6s + 2
+    assert events['music_seconds'] == jingle['music_seconds'] == 8
+    assert events['target_ms'] == 11000 and jingle['jingle_seconds'] == 11
+    assert steps == ['generating_voice', 'generating_music', 'mixing'], steps
+    print(f"✅ voice 0.3s + music 0.4s done in {elapsed:.2f}s")
+
+
+def test_voice_failure_does_not_wait_for_music():
+    def tts(text, voice_id, settings):
+        raise Exception('TTS API error: 401 - unauthorized')
+
+    def music(prompt, seconds):
+        time.sleep(1)
+        return b'music'
+
+    started = time.perf_counter()
+    try:
+        jingle_pipeline.render_jingle(TEXT, 'test-voice-failure', {}, 'upbeat', tts=tts, music=music,
+                                      mix=lambda *args, **kwargs: b'', measure=lambda audio: 1)
+        assert False, 'expected the TTS error'
+    except Exception as e:
+        assert '401' in str(e)
+    assert time.perf_counter() - started < 0.5
+    print("✅ a failed voice fails the jingle at once")
+
+
+if __name__ == '__main__':
+    test_estimate_and_learnt_rate()
+    test_fit_music_to_length()
+    test_voice_and_music_run_concurrently()
+    test_voice_failure_does_not_wait_for_music()
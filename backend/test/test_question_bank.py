@@ -0,0 +1,125 @@
+"""
+Test script for the pub quiz question bank
+Rounds are drawn from pre-generated questions (no OpenAI call), venues never
+get the same bank question twice, and low stock is topped up in the background
+"""
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.core.management import call_command
+from django.test import Client
+
+from api import question_bank
+from api.models import TaskStatus
+from api.pub_quiz_generator import PubQuizGenerator, initialize_genres_in_db
+from api.pub_quiz_models import BankQuestion, GenreVote, PubQuizSession, QuizGenre, QuizQuestion, QuizTeam
+
+MC_ONLY = {'multiple_choice': 1.0, 'written': 0.0}
+
+
+def test_draw_round_without_repeats():
+    genre = QuizGenre.objects.get_or_create(name='Bank Test Genre')[0]
+    session = PubQuizSession.objects.create(venue_name='The  Red Lion', total_rounds=1, questions_per_round=10)
+    try:
+        assert question_bank.refill(genre, per_type=15, source='local') == 30
+        assert question_bank.stock(genre, 'the red lion') == 30
+
+        start = time.perf_counter()
+        questions = question_bank.draw_round(genre, 'The Red Lion', 10, difficulty_mix={'easy': 3, 'medium': 4, 'hard': 3})
+        draw_ms = (time.perf_counter() - start) * 1000
+        assert [q['question_number'] for q in questions] == list(range(1, 11))
+        assert sum(q['question_type'] == 'multiple_choice' for q in questions) == 7
+        assert sorted(q['difficulty'] for q in questions if q['question_type'] == 'written') == ['easy', 'hard', 'medium']
+        question_bank.record_use(session, questions)
+
+        # Same venue (however it's spelled) gets fresh questions; another venue can have them all
+        assert question_bank.stock(genre, 'THE RED LION') == 20
+        assert question_bank.stock(genre, 'The Crown') == 30
+        again = question_bank.draw_round(genre, 'the red lion', 10)
+        assert not {q['bank_id'] for q in again} & {q['bank_id'] for q in questions}
+        question_bank.record_use(session, again)
+
+        # 5 multiple choice left at this venue - a round of 10 MC goes to OpenAI instead
+        assert question_bank.draw_round(genre, 'The Red Lion', 10, MC_ONLY) is None
+        print(f"✅ round of 10 drawn from the bank in {draw_ms:.1f}ms, no repeats at the same venue")
+    finally:
+        session.delete()
+        genre.delete()
+
+
+def test_top_up_low_stock():
+    genre = QuizGenre.objects.get_or_create(name='Bank Top-up Genre')[0]
+    try:
+        question_bank.refill(genre, per_type=5, source='local')
+        thread = question_bank.top_up([genre], 'The Crown', low_stock=20, source='local')
+        thread.join(10)
+        assert question_bank.stock(genre, 'The Crown') == 10 + 2 * question_bank.QUESTION_BANK_REFILL_BATCH
+        # Enough stock now - nothing to do
+        assert question_bank.top_up([genre], 'The Crown', low_stock=20, source='local') is None
+        print("✅ low stock topped up in the background")
+    finally:
+        genre.delete()
+
+
+def test_sample_questions_not_banked():
+    api_key = os.environ.pop('OPENAI_API_KEY', None)
+    try:
+        # Without OpenAI a quiz still gets the generator's sample questions, the bank doesn't
+        generator = PubQuizGenerator()
+        assert generator.generate_questions('General Knowledge', 3, 'multiple_choice')
+        assert generator.generate_questions('General Knowledge', 3, 'multiple_choice', fallback=False) == []
+        print("✅ sample questions kept out of the bank")
+    finally:
+        if api_key is not None:
+            os.environ['OPENAI_API_KEY'] = api_key
+
+
+def test_quiz_assembled_from_bank():
+    initialize_genres_in_db()
+    genre = QuizGenre.objects.get(name='General Knowledge')
+    already_banked = set(BankQuestion.objects.filter(genre=genre).values_list('id', flat=True))
+    # 1 round always gets General Knowledge (see select_genres_by_votes)
+    session = PubQuizSession.objects.create(venue_name='Bank Assembly Test', total_rounds=1, questions_per_round=10)
+    team = QuizTeam.objects.create(session=session, team_name='Bankers', table_number=1)
+    GenreVote.objects.create(team=team, genre=genre)
+    task_id = None
+    try:
+        call_command('fill_question_bank', '--genre', 'General Knowledge', '--source', 'local',
+                     '--target', len(already_banked) + 60, stdout=open(os.devnull, 'w'))
+
+        response = Client().post(f'/api/pub-quiz/{session.session_code}/generate-questions', {},
+                                 content_type='application/json')
+        assert response.status_code == 202, response.content
+        task_id = response.json()['task_id']
+        deadline = time.time() + 30
+        while TaskStatus.objects.get(task_id=task_id).status not in ('completed', 'failed'):
+            assert time.time() < deadline, 'generation did not finish'
+            time.sleep(0.05)
+
+        task = TaskStatus.objects.get(task_id=task_id)
+        assert task.status == 'completed', task.error
+        assert task.result['timing']['bank_rounds'] == 1 and task.result['questions'] == 10
+        texts = set(QuizQuestion.objects.filter(session=session).values_list('question_text', flat=True))
+        assert texts <= set(BankQuestion.objects.filter(genre=genre).values_list('question_text', flat=True))
+        assert question_bank.stock(genre, 'Bank Assembly Test') == question_bank.stock(genre, 'elsewhere') - 10
+        print(f"✅ quiz assembled from the bank in {task.result['timing']['total_seconds'] * 1000:.0f}ms")
+    finally:
+        session.delete()
+        BankQuestion.objects.filter(genre=genre).exclude(id__in=already_banked).delete()
+        if task_id:
+            TaskStatus.objects.filter(task_id=task_id).delete()
+
+
+if __name__ == '__main__':
+    test_draw_round_without_repeats()
+    test_top_up_low_stock()
+    test_sample_questions_not_banked()
+    test_quiz_assembled_from_bank()
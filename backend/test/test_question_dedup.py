@@ -0,0 +1,158 @@
+"""
+Test script for near-duplicate question detection
+Questions already asked at a venue - in other words - are caught in well
+under a millisecond and kept out of new quizzes and the question bank
+"""
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.test import Client
+
+from api import question_bank, question_dedup
+from api.models import TaskStatus
+from api.pub_quiz_generator import initialize_genres_in_db
+from api.pub_quiz_models import GenreVote, PubQuizSession, QuizGenre, QuizQuestion, QuizTeam
+from api.question_dedup import DuplicateIndex, signature, similarity
+
+CAPITAL = signature('What is the capital city of France?', 'Paris')
+
+
+def test_similarity():
+    assert similarity(CAPITAL, signature('Name the capital of France.', 'Paris')) >= question_dedup.DUPLICATE_SIMILARITY
+    assert similarity(CAPITAL, signature('What is the CAPITAL city of france', 'paris')) == 1.0
+    for text, answer in [('Which French city has the Eiffel Tower?', 'Paris'),
+                         ('What is the capital city of Germany?', 'Berlin'),
+                         ('Which band released Abbey Road in 1969?', 'The Beatles')]:
+        assert similarity(CAPITAL, signature(text, answer)) < question_dedup.DUPLICATE_SIMILARITY, text
+    print("✅ paraphrases match, different questions about the same thing don't")
+
+
+PARAPHRASES = [
+    (('What is the capital city of France?', 'Paris'), ('Name the capital of France', 'Paris')),
+    (('Which band released Abbey Road in 1969?', 'The Beatles'),
+     ('Abbey Road was released in 1969 by which band?', 'The Beatles')),
+    (('Who painted the Mona Lisa?', 'Leonardo da Vinci'), ('The Mona Lisa was painted by whom?', 'Leonardo da Vinci')),
+    (('What is the largest planet in our solar system?', 'Jupiter'),
+     ('Name the biggest planet in the solar system', 'Jupiter')),
+    (('How many strings does a standard guitar have?', '6'), ('A standard guitar has how many strings?', 'Six')),
+    (('Which element has the chemical symbol O?', 'Oxygen'),
+     ('The chemical symbol O stands for which element?', 'Oxygen')),
+    (('Who wrote the novel 1984?', 'George Orwell'), ('The novel 1984 was written by which author?', 'George Orwell')),
+    (('Which country hosted the 2016 Summer Olympics?', 'Brazil'),
+     ('The 2016 Summer Olympics were held in which country?', 'Brazil')),
+]
+
+
+def test_index_catches_paraphrases_at_threshold():
+    index = DuplicateIndex()
+    for n, (original, _) in enumerate(PARAPHRASES):
+        index.add(n, signature(*original))
+
+    scores = []
+    for n, (original, paraphrase) in enumerate(PARAPHRASES):
+        score = similarity(signature(*original), signature(*paraphrase))
+        assert score >= question_dedup.DUPLICATE_SIMILARITY, (paraphrase, score)
+        # LSH must make it a candidate, not just score it high enough
+        assert index.find(signature(*paraphrase)) == (n, score), paraphrase
+        scores.append(score)
+    assert min(scores) == question_dedup.DUPLICATE_SIMILARITY
+    print(f"✅ {len(PARAPHRASES)} paraphrases found by the index, down to similarity {min(scores):.2f}")
+
+
+def test_index_lookup_time():
+    index = DuplicateIndex()
+    source = question_bank.question_source('local')
+    history = source('General Knowledge', 5000, 'written')
+    for q_data in history:
+        index.add_question(q_data)
+    index.add_question({'question': 'What is the capital city of France?', 'answer': 'Paris'})
+
+    new = source('General Knowledge', 200, 'written')
+    kept, dropped = index.drop_duplicates(new + [{'question': "What's the capital of France?", 'answer': 'Paris'}])
+    assert len(kept) == 200 and dropped[0]['answer'] == 'Paris'
+
+    # Best of 3 rounds (signatures included), so a busy machine doesn't fail the check
+    per_question_ms = float('inf')
+    for _ in range(3):
+        batch = [{'question': q['question'], 'answer': q['answer']} for q in new]
+        start = time.perf_counter()
+        for q_data in batch:
+            index.is_duplicate(q_data)
+        per_question_ms = min(per_question_ms, (time.perf_counter() - start) * 1000 / len(batch))
+    assert per_question_ms < 2, per_question_ms
+    print(f"✅ checked against {len(index) - 200} questions in {per_question_ms:.2f}ms per question (signature included)")
+
+
+def test_bank_skips_duplicates():
+    genre = QuizGenre.objects.get_or_create(name='Dedup Test Genre')[0]
+    try:
+        question_bank.refill(genre, per_type=11, source='local')
+        assert question_bank.add_questions(genre, [
+            {'question': 'What is the capital city of France?', 'answer': 'Paris', 'question_type': 'multiple_choice'},
+            {'question': 'Name the capital of France', 'answer': 'Paris', 'question_type': 'multiple_choice'},
+        ], source='local') == 1
+
+        # Asked at this venue as a live question - the bank copy is skipped
+        venue = DuplicateIndex()
+        venue.add('asked', signature("What's the capital of France?", 'Paris'))
+        mc_only = {'multiple_choice': 1.0, 'written': 0.0}
+        questions = question_bank.draw_round(genre, 'The Crown', 11, mc_only, index=venue)
+        assert len(questions) == 11 and all(q['answer'] != 'Paris' for q in questions)
+        assert question_bank.draw_round(genre, 'The Crown', 12, mc_only, index=venue) is None
+        assert len(question_bank.draw_round(genre, 'The Crown', 12, mc_only)) == 12
+        print("✅ bank keeps one copy of a question and skips what a venue was already asked")
+    finally:
+        genre.delete()
+
+
+def test_generation_replaces_venue_repeats():
+    initialize_genres_in_db()
+    genre = QuizGenre.objects.get(name='General Knowledge')
+    past = PubQuizSession.objects.create(venue_name='Dedup Arms', total_rounds=1, questions_per_round=1)
+    QuizQuestion.objects.create(session=past, genre=genre, round_number=1, question_number=1,
+                                question_text="What's the capital city of France?", correct_answer='Paris')
+    # 1 round always gets General Knowledge (see select_genres_by_votes)
+    session = PubQuizSession.objects.create(venue_name='dedup arms', total_rounds=1, questions_per_round=6)
+    team = QuizTeam.objects.create(session=session, team_name='Regulars', table_number=1)
+    GenreVote.objects.create(team=team, genre=genre)
+    task_id = None
+    try:
+        response = Client().post(f'/api/pub-quiz/{session.session_code}/generate-questions',
+                                 {'include_written': False}, content_type='application/json')
+        assert response.status_code == 202, response.content
+        task_id = response.json()['task_id']
+        deadline = time.time() + 30
+        while TaskStatus.objects.get(task_id=task_id).status not in ('completed', 'failed'):
+            assert time.time() < deadline, 'generation did not finish'
+            time.sleep(0.05)
+
+        task = TaskStatus.objects.get(task_id=task_id)
+        assert task.status == 'completed', task.error
+        # Without an OpenAI key the generator repeats its few samples: the repeats are
+        # dropped and regenerated, and the round is still filled in the end
+        assert task.result['timing']['duplicates_dropped'] > 0
+        assert QuizQuestion.objects.filter(session=session).count() == 6
+        assert all(len(q) == question_dedup.NUM_PERM for q in
+                   QuizQuestion.objects.filter(session=session).values_list('minhash', flat=True))
+        print(f"✅ {task.result['timing']['duplicates_dropped']} near-duplicates dropped during generation")
+    finally:
+        past.delete()
+        session.delete()
+        if task_id:
+            TaskStatus.objects.filter(task_id=task_id).delete()
+
+
+if __name__ == '__main__':
+    test_similarity()
+    test_index_catches_paraphrases_at_threshold()
+    test_index_lookup_time()
+    test_bank_skips_duplicates()
+    test_generation_replaces_venue_repeats()
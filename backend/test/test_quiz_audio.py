@@ -0,0 +1,147 @@
+"""
+Test script for pre-rendering quiz audio
+Every round intro, question, answer reveal and fun fact is synthesised by a
+bounded worker pool before the quiz starts, and the host panel's manifest
+lists them as ready
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.test import Client
+
+from api import quiz_audio, tts_cache
+from api.models import TaskStatus
+from api.quiz_leaderboard import question_data
+from api.pub_quiz_models import PubQuizSession, QuizGenre, QuizQuestion
+from api.tts_cache import CachedAudio, TTSCache, cache_key
+
+
+class FakeVoice:
+    """Stands in for ElevenLabs: stores a clip in the cache after a short delay, counting requests"""
+
+    def __init__(self):
+        self.calls = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.lock = threading.Lock()
+
+    def __call__(self, params):
+        with self.lock:
+            self.calls += 1
+            self.in_flight += 1
+            self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        time.sleep(0.02)
+        key = cache_key(params)
+        tts_cache.get_cache().put(key, params['text'].encode())
+        with self.lock:
+            self.in_flight -= 1
+        return CachedAudio(key, params['text'].encode(), 'miss')
+
+
+def make_session():
+    genre = QuizGenre.objects.get_or_create(name='Audio Test Genre')[0]
+    session = PubQuizSession.objects.create(venue_name='Audio Test', total_rounds=2, questions_per_round=3)
+    for round_number in (1, 2):
+        for number in (1, 2, 3):
+            QuizQuestion.objects.create(
+                session=session, genre=genre, round_number=round_number, question_number=number,
+                question_text=f'Round {round_number} question {number}?', correct_answer=f'Answer {round_number}.{number}',
+                fun_fact='A fun fact' if number == 2 else '', question_type='written')
+    return session, genre
+
+
+def with_temp_cache(test):
+    def run():
+        previous = tts_cache._cache
+        with tempfile.TemporaryDirectory() as directory:
+            tts_cache._cache = TTSCache(directory, memory_mb=1, disk_mb=10)
+            try:
+                test()
+            finally:
+                tts_cache._cache = previous
+    run.__name__ = test.__name__
+    return run
+
+
+@with_temp_cache
+def test_prerender_session():
+    session, genre = make_session()
+    try:
+        voice = FakeVoice()
+        summary = quiz_audio.prerender_session(session, render=voice, workers=3)
+
+        # 2 x (round intro) + 1 shared "Here comes the first question." + 6 x (question, answer)
+        # + 1 fun fact (said twice, rendered once)
+        assert summary['clips'] == 2 + 1 + 12 + 1, summary
+        assert summary['rendered'] == voice.calls == 16
+        assert voice.max_in_flight <= 3, voice.max_in_flight
+
+        question = QuizQuestion.objects.get(session=session, round_number=1, question_number=2)
+        assert set(question.audio) == {'question', 'answer', 'fun_fact'}
+        assert tts_cache.get_cache().get(question.audio['answer']).data == b'The correct answer is: Answer 1.2'
+
+        clips = quiz_audio.manifest(session)
+        assert all(clip['ready'] for clip in clips)
+        assert clips[0]['text'] == 'Round 1: Audio Test Genre'
+
+        # Everything's cached now: a second run renders nothing
+        again = quiz_audio.prerender_session(session, render=voice, workers=3)
+        assert again['rendered'] == 0 and voice.calls == 16
+
+        # The intro names the genre the host panel gets for the question, also without one
+        first = QuizQuestion.objects.get(session=session, round_number=1, question_number=1)
+        first.genre = None
+        first.save(update_fields=['genre'])
+        assert quiz_audio.session_lines(session)[0]['text'] == f"Round 1: {question_data(first, 'in_progress')['genre']}"
+        print(f"✅ {summary['clips']} clips pre-rendered in {summary['seconds']}s, "
+              f"at most {voice.max_in_flight} requests in flight")
+    finally:
+        session.delete()
+        genre.delete()
+
+
+@with_temp_cache
+def test_manifest_endpoint_and_task():
+    session, genre = make_session()
+    client = Client()
+    task_id = None
+    try:
+        data = client.get(f'/api/pub-quiz/{session.session_code}/audio-manifest').json()
+        assert data['ready'] == 0 and data['total'] == 17
+
+        task_id = quiz_audio.start_prerender(session, render=FakeVoice())
+        deadline = time.time() + 10
+        while TaskStatus.objects.get(task_id=task_id).status not in ('completed', 'failed'):
+            assert time.time() < deadline, 'pre-rendering did not finish'
+            time.sleep(0.05)
+        assert TaskStatus.objects.get(task_id=task_id).status == 'completed'
+
+        data = client.get(f'/api/pub-quiz/{session.session_code}/audio-manifest').json()
+        assert data['ready'] == data['total'] == 17
+        clip = data['clips'][3]
+        audio = client.get(clip['url'])
+        assert audio.status_code == 200 and audio.content == clip['text'].encode()
+
+        questions = client.get(f'/api/pub-quiz/{session.session_code}/all-questions').json()['questions']
+        assert questions[0]['audio']['question'].startswith('/api/tts/')
+        print(f"✅ manifest lists {data['total']} ready clips, served from the cache")
+    finally:
+        session.delete()
+        genre.delete()
+        if task_id:
+            TaskStatus.objects.filter(task_id=task_id).delete()
+
+
+if __name__ == '__main__':
+    test_prerender_session()
+    test_manifest_endpoint_and_task()
@@ -0,0 +1,108 @@
+"""
+Test script for the pub quiz event broker
+One published event must reach every stream of its session (and only those)
+without the streams polling anything
+"""
+import os
+import sys
+import time
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from api import quiz_events
+from api.quiz_events import InProcessBroker
+
+
+def test_fan_out():
+    broker = InProcessBroker()
+    players = [broker.subscribe('7') for _ in range(200)]
+    other = broker.subscribe('8')
+
+    assert broker.publish('7', {'type': 'status', 'status': 'in_progress'}) == 200
+    assert all(sub.get(timeout=0.1)['status'] == 'in_progress' for sub in players)
+    assert other.get(timeout=0.01) is None
+
+    for sub in players:
+        sub.close()
+    assert broker.subscriber_count('7') == 0 and broker.publish('7', {'type': 'status'}) == 0
+    print("✅ one publish reached 200 streams of the session, none of another")
+
+
+def test_slow_subscriber_keeps_newest():
+    broker = InProcessBroker()
+    sub = broker.subscribe('1')
+    for n in range(quiz_events.SUBSCRIBER_QUEUE_SIZE + 10):
+        broker.publish('1', {'type': 'host_update', 'n': n})
+
+    received = []
+    while (event := sub.get(timeout=0.01)) is not None:
+        received.append(event['n'])
+    assert len(received) == quiz_events.SUBSCRIBER_QUEUE_SIZE
+    assert received[-1] == quiz_events.SUBSCRIBER_QUEUE_SIZE + 9
+    print(f"✅ slow stream kept the newest {len(received)} events")
+
+
+def test_waiting_stream_wakes_up():
+    broker = InProcessBroker()
+    sub = broker.subscribe('3')
+    got = {}
+
+    def stream():
+        start = time.time()
+        got['event'] = sub.get(timeout=5)
+        got['latency'] = time.time() - start
+
+    thread = threading.Thread(target=stream)
+    thread.start()
+    time.sleep(0.2)
+    broker.publish('3', {'type': 'status', 'status': 'halftime'})
+    thread.join()
+
+    assert got['event']['status'] == 'halftime' and got['latency'] < 1
+    print(f"✅ blocked stream woke up {got['latency'] * 1000:.0f}ms after waiting started")
+
+
+def test_replay_missed_events():
+    broker = InProcessBroker()
+    cursor, missed = broker.replay('5', None)
+    assert missed is None  # new client: snapshot
+
+    for n in range(5):
+        broker.publish('5', {'type': 'answers', 'n': n})
+        broker.publish('6', {'type': 'answers', 'n': n})
+    cursor, missed = broker.replay('5', cursor)
+    assert [event['n'] for event in missed] == [0, 1, 2, 3, 4]
+    assert broker.replay('5', missed[2]['id'])[1] == missed[3:]
+    assert broker.replay('5', cursor) == (cursor, [])
+
+    # Another process's ids, or a gap the log no longer covers: snapshot
+    assert broker.replay('5', InProcessBroker().replay('5', None)[0])[1] is None
+    for n in range(quiz_events.EVENT_LOG_SIZE):
+        broker.publish('5', {'type': 'answers', 'n': n})
+    assert len(broker.replay('5', cursor)[1]) == quiz_events.EVENT_LOG_SIZE
+    broker.publish('5', {'type': 'answers'})
+    assert broker.replay('5', cursor)[1] is None
+    print("✅ reconnect replays exactly the missed events, or asks for a snapshot")
+
+
+def test_separate_stream_process_requires_redis():
+    previous = quiz_events._broker
+    quiz_events.set_broker(InProcessBroker())
+    try:
+        quiz_events.require_shared()
+        assert False, 'expected in-process events to be refused'
+    except RuntimeError as e:
+        assert 'QUIZ_EVENTS_BACKEND=redis' in str(e)
+    finally:
+        quiz_events.set_broker(previous)
+    print("✅ streams in another process refuse in-process events")
+
+
+if __name__ == '__main__':
+    test_fan_out()
+    test_slow_subscriber_keeps_newest()
+    test_waiting_stream_wakes_up()
+    test_replay_missed_events()
+    test_separate_stream_process_requires_redis()
@@ -0,0 +1,117 @@
+"""
+Test script for the Redis pub quiz event broker
+Same guarantees as the in-process broker - fan-out to the session's streams,
+ids in order, replay of missed events - across workers sharing one Redis
+(here a fakeredis server; needs `pip install "fakeredis[lua]"` for the publish script)
+"""
+import os
+import sys
+import asyncio
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import fakeredis
+
+from api import quiz_events
+from api.quiz_events import RedisBroker
+
+
+def make_workers(count=2):
+    """Brokers of `count` workers, each with its own connection to the same Redis"""
+    server = fakeredis.FakeServer()
+    return [RedisBroker(fakeredis.FakeRedis(server=server), fakeredis.FakeAsyncRedis(server=server))
+            for _ in range(count)]
+
+
+def test_publish_reaches_every_worker():
+    web, stream = make_workers()
+    players = [stream.subscribe('7') for _ in range(20)]
+    other = stream.subscribe('8')
+    assert web.subscriber_count('7') == 20
+
+    assert web.publish('7', {'type': 'status', 'status': 'in_progress'}) == 20
+    events = [sub.get(timeout=1) for sub in players]
+    assert all(event['status'] == 'in_progress' for event in events)
+    assert len({event['id'] for event in events}) == 1
+    assert other.get(timeout=0.05) is None
+
+    for sub in players:
+        sub.close()
+    other.close()
+    assert web.subscriber_count('7') == 0
+    print("✅ an event published by one worker reached 20 streams of another")
+
+
+def test_ids_increase_across_workers():
+    first, second = make_workers()
+    sub = first.subscribe('1')
+    threads = [threading.Thread(target=broker.publish, args=('1', {'type': 'answers', 'n': n}))
+               for n in range(10) for broker in (first, second)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    ids = [sub.get(timeout=1)['id'] for _ in range(20)]
+    assert all(quiz_events.is_newer(b, a) for a, b in zip(ids, ids[1:])), ids
+    sub.close()
+    print("✅ 20 concurrent publishes from 2 workers delivered with increasing ids")
+
+
+def test_replay_missed_events():
+    web, stream = make_workers()
+    cursor, missed = stream.replay('5', None)
+    assert missed is None  # new client: snapshot
+
+    for n in range(5):
+        web.publish('5', {'type': 'answers', 'n': n})
+        web.publish('6', {'type': 'answers', 'n': n})
+    cursor, missed = stream.replay('5', cursor)
+    assert [event['n'] for event in missed] == [0, 1, 2, 3, 4]
+    assert stream.replay('5', missed[2]['id'])[1] == missed[3:]
+    assert stream.replay('5', cursor) == (cursor, [])
+
+    # An in-process broker's ids, or a gap the trimmed log no longer covers: snapshot
+    assert stream.replay('5', quiz_events.InProcessBroker().replay('5', None)[0])[1] is None
+    for n in range(quiz_events.EVENT_LOG_SIZE):
+        web.publish('5', {'type': 'answers', 'n': n})
+    assert len(stream.replay('5', cursor)[1]) == quiz_events.EVENT_LOG_SIZE
+    web.publish('5', {'type': 'answers'})
+    assert stream.replay('5', cursor)[1] is None
+    print("✅ reconnect replays exactly the missed events from Redis, or asks for a snapshot")
+
+
+def test_async_subscription():
+    web, stream = make_workers()
+
+    async def run():
+        sub = await stream.asubscribe('9')
+        assert await sub.aget(timeout=0.05) is None
+        await asyncio.get_running_loop().run_in_executor(None, web.publish, '9', {'type': 'status', 'status': 'ended'})
+        event = await sub.aget(timeout=1)
+        await sub.aclose()
+        return event
+
+    event = asyncio.run(run())
+    assert event['status'] == 'ended' and quiz_events.parse_event_id(event['id'])[0] == 'redis'
+    print("✅ asyncio stream woke up on an event published by a WSGI worker")
+
+
+def test_separate_stream_process_accepts_redis():
+    previous = quiz_events._broker
+    quiz_events.set_broker(make_workers(1)[0])
+    try:
+        quiz_events.require_shared()
+    finally:
+        quiz_events.set_broker(previous)
+    print("✅ streams in another process start with Redis events")
+
+
+if __name__ == '__main__':
+    test_publish_reaches_every_worker()
+    test_ids_increase_across_workers()
+    test_replay_missed_events()
+    test_async_subscription()
+    test_separate_stream_process_accepts_redis()
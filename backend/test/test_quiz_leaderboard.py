@@ -0,0 +1,98 @@
+"""
+Test script for the host board
+Score changes and answers must reach the host panel as small, numbered diffs
+that rebuild the same board a full reload would give
+"""
+import os
+import sys
+import json
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from api.quiz_leaderboard import HostBoard, teams_event
+
+
+def make_board(num_teams=30):
+    state = {
+        'stats': {'status': 'in_progress', 'current_round': 1, 'current_question': 3,
+                  'total_rounds': 6, 'questions_per_round': 10},
+        'question_id': 103,
+        'question': {'id': 103, 'text': 'Who sang Wonderwall?'},
+        'teams_answered': 0,
+    }
+    teams = {
+        team_id: {'team_id': team_id, 'team_name': f'Team {team_id:02d}', 'table_number': team_id,
+                  'total_score': 100 - team_id}
+        for team_id in range(1, num_teams + 1)
+    }
+    return HostBoard(state, teams)
+
+
+def apply_diff(snapshot, diff):
+    """What the host panel does with a host_diff (pub-quiz-host.html applyHostDiff)"""
+    assert diff['seq'] == snapshot['seq'] + 1
+    snapshot['seq'] = diff['seq']
+    snapshot['stats'].update(diff.get('stats', {}))
+    rows = {row['team_id']: row for row in snapshot['leaderboard']}
+    for team_id in diff.get('removed', []):
+        del rows[team_id]
+    for row in diff.get('leaderboard', []):
+        rows[row['team_id']] = row
+    snapshot['leaderboard'] = sorted(rows.values(), key=lambda row: row['rank'])
+    if 'question' in diff:
+        snapshot['question'] = diff['question']
+
+
+def test_diffs_rebuild_the_board():
+    board = make_board()
+    tab = board.snapshot()
+
+    # Team 10 jumps from 10th to 1st: only the teams whose rank moved are sent
+    team = dict(board.teams[10], total_score=200)
+    diff = board.apply(teams_event([team]))
+    assert [row['team_id'] for row in diff['leaderboard']] == [10, 1, 2, 3, 4, 5, 6, 7, 8, 9]
+    assert 'stats' not in diff and 'question' not in diff
+    apply_diff(tab, diff)
+
+    diff = board.apply({'type': 'answers', 'question_id': 103, 'teams_answered': 1})
+    assert diff == {'type': 'host_diff', 'seq': 2, 'stats': {'teams_answered': 1}, 'timestamp': diff['timestamp']}
+    apply_diff(tab, diff)
+
+    # Answers to another question and repeated scores change nothing
+    assert board.apply({'type': 'answers', 'question_id': 999, 'teams_answered': 5}) is None
+    assert board.apply(teams_event([team])) is None
+
+    new_team = {'team_id': 31, 'team_name': 'Late Arrivals', 'table_number': 31, 'total_score': 0}
+    apply_diff(tab, board.apply(teams_event([new_team])))
+
+    full = board.snapshot()
+    assert tab['leaderboard'] == full['leaderboard'] and tab['stats'] == full['stats']
+    assert full['stats']['total_teams'] == 31 and full['seq'] == 3
+
+    full_bytes = len(json.dumps(full))
+    diff_bytes = len(json.dumps(board.apply({'type': 'answers', 'question_id': 103, 'teams_answered': 2})))
+    print(f"✅ diffs rebuild the board; answered-count diff {diff_bytes} bytes vs full update {full_bytes} bytes")
+
+
+def test_reload_diff():
+    board = make_board()
+    board.snapshot()
+    fresh = make_board()
+    fresh.teams[30] = dict(fresh.teams[30], total_score=0)  # unchanged rank
+    fresh.state = dict(fresh.state, stats=dict(fresh.state['stats'], status='completed'))
+
+    diff = board.replace(fresh)
+    assert diff['stats'] == {'status': 'completed'}
+    assert [row['team_id'] for row in diff['leaderboard']] == [30]
+    assert board.replace(make_board()) is not None and board.seq == 2
+    print("✅ re-sync from the database sends only what differs")
+
+
+if __name__ == '__main__':
+    test_diffs_rebuild_the_board()
+    test_reload_diff()
@@ -0,0 +1,113 @@
+"""
+Test script for generating and saving a quiz
+Generation runs as a background task: the request returns 202 right away and
+each round is written (one transaction, a fixed number of queries) as soon as
+it's generated
+"""
+import os
+import sys
+import time
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.db import connection
+from django.test import Client
+
+from api import quiz_events
+from api.models import TaskStatus
+from api.pub_quiz_generator import initialize_genres_in_db
+from api.pub_quiz_models import GenreVote, PubQuizSession, QuizGenre, QuizQuestion, QuizRound, QuizTeam
+from api.pub_quiz_views import save_generated_round
+
+
+def make_round(genre, round_number, questions_per_round):
+    round_data = {'round_number': round_number, 'genre': {'name': genre.name},
+                  'round_name': f'Round {round_number}: {genre.name}',
+                  'is_buzzer_round': False, 'is_halftime_before': round_number == 4}
+    questions = [
+        {'question_number': q, 'question': f'{genre.name} question {q}?', 'answer': f'The Answer {q}',
+         'alternative_answers': [f'Answer number {q}'], 'question_type': 'written'}
+        for q in range(1, questions_per_round + 1)
+    ]
+    return round_data, questions
+
+
+def test_save_generated_round():
+    genre = QuizGenre.objects.get_or_create(name='Save Test Genre')[0]
+    session = PubQuizSession.objects.create(venue_name='Save Test', total_rounds=6, questions_per_round=10)
+    try:
+        round_data, questions = make_round(genre, 2, 10)
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            saved = save_generated_round(session, round_data, genre, questions)
+
+        assert saved == 10 and QuizQuestion.objects.filter(session=session, round_number=2).count() == 10
+        assert QuizRound.objects.get(session=session).round_number == 2
+        # Answer keys are filled even though bulk_create skips save()
+        question = QuizQuestion.objects.get(session=session, round_number=2, question_number=3)
+        assert question.answer_keys == ['answer 3', 'answer number 3']
+        assert len(queries) < 6, len(queries)
+        print(f"✅ 1 round / 10 questions saved with {len(queries)} queries")
+    finally:
+        session.delete()
+        genre.delete()
+
+
+def test_generation_runs_in_background():
+    initialize_genres_in_db()
+    session = PubQuizSession.objects.create(venue_name='Generate Test', total_rounds=3, questions_per_round=4)
+    team = QuizTeam.objects.create(session=session, team_name='Generators', table_number=1)
+    GenreVote.objects.create(team=team, genre=QuizGenre.objects.get(name='General Knowledge'))
+    subscription = quiz_events.subscribe(session.id)
+    client = Client()
+    task_id = None
+    try:
+        start = time.time()
+        response = client.post(f'/api/pub-quiz/{session.session_code}/generate-questions',
+                               {'include_multiple_choice': True, 'include_written': True},
+                               content_type='application/json')
+        response_time = time.time() - start
+        assert response.status_code == 202, response.content
+        task_id = response.json()['task_id']
+
+        # Pressing the button again follows the running task
+        again = client.post(f'/api/pub-quiz/{session.session_code}/generate-questions', {},
+                            content_type='application/json')
+        assert again.status_code == 202 and again.json()['task_id'] == task_id
+
+        deadline = time.time() + 60
+        while TaskStatus.objects.get(task_id=task_id).status not in ('completed', 'failed'):
+            assert time.time() < deadline, 'generation did not finish'
+            time.sleep(0.1)
+
+        task = client.get(f'/api/tasks/{task_id}').json()
+        assert task['status'] == 'completed', task
+        assert task['result']['rounds'] == 3 and task['result']['questions'] == 12
+        session.refresh_from_db()
+        assert session.status == 'ready'
+        assert QuizRound.objects.filter(session=session).count() == 3
+        assert QuizQuestion.objects.filter(session=session).count() == 12
+
+        # The host panel heard about every round as it was saved
+        ready = []
+        while (event := subscription.get(0)) is not None:
+            if event['type'] == 'generation_progress' and event.get('round_ready'):
+                ready.append(event['round_ready'])
+        assert sorted(ready) == [1, 2, 3], ready
+        print(f"✅ generation request answered in {response_time * 1000:.0f}ms; "
+              f"rounds saved as they finished: {ready}")
+    finally:
+        subscription.close()
+        session.delete()
+        if task_id:
+            TaskStatus.objects.filter(task_id=task_id).delete()
+
+
+if __name__ == '__main__':
+    test_save_generated_round()
+    test_generation_runs_in_background()
@@ -0,0 +1,99 @@
+"""
+Test script for resuming player streams
+A phone that reconnects with Last-Event-ID gets only what it missed; one that
+connects (or reconnects without an id) after the start still gets the questions
+"""
+import os
+import sys
+import time
+import threading
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+import json
+from django.test import Client
+
+from api.pub_quiz_models import PubQuizSession, QuizQuestion
+from api import quiz_events
+from api.pub_quiz_streams import STREAM_CATCH_UP_SECONDS, publish_session_update
+
+
+def read_messages(session, count, **headers):
+    """First `count` SSE messages of a player stream: [(id, data), ...]"""
+    response = Client().get(f'/api/pub-quiz/{session.session_code}/stream', **headers)
+    content = iter(response.streaming_content)
+    messages = []
+    try:
+        while len(messages) < count:
+            chunk = next(content)
+            chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+            fields = dict(line.split(': ', 1) for line in chunk.strip().split('\n') if ': ' in line)
+            if 'data' in fields:
+                messages.append((fields.get('id'), json.loads(fields['data'])))
+    finally:
+        response.close()
+    return messages
+
+
+def test_resume_after_drop():
+    session = PubQuizSession.objects.create(venue_name='Resume Test', total_rounds=1, questions_per_round=2, status='ready')
+    for number in (1, 2):
+        QuizQuestion.objects.create(session=session, round_number=1, question_number=number,
+                                    question_text=f'Question {number}', correct_answer='A')
+    try:
+        assert Client().post(f'/api/pub-quiz/{session.session_code}/start').status_code == 200
+
+        # Joining after the start: questions straight away
+        messages = read_messages(session, 2)
+        assert [data['type'] for _, data in messages] == ['connected', 'quiz_started']
+        assert len(messages[1][1]['all_questions']) == 2
+        last_id = messages[0][0]
+        assert last_id
+
+        # Dropped while the host paused: only the change comes back
+        previous_status = session.status
+        session.status = 'halftime'
+        session.save(update_fields=['status'])
+        publish_session_update(session, previous_status)
+        messages = read_messages(session, 2, HTTP_LAST_EVENT_ID=last_id)
+        assert [data['type'] for _, data in messages] == ['connected', 'status_change']
+        assert messages[1][1]['status'] == 'halftime' and messages[1][0] != last_id
+
+        # Unknown id (server restarted, other worker): snapshot again
+        messages = read_messages(session, 3, QUERY_STRING='last_event_id=0123abcd-7')
+        assert [data['type'] for _, data in messages] == ['connected', 'quiz_started', 'status_change']
+        print("✅ reconnecting players get what they missed, or a snapshot with the questions")
+    finally:
+        session.delete()
+
+
+def test_change_on_another_worker():
+    session = PubQuizSession.objects.create(venue_name='Other Worker Test', total_rounds=1, questions_per_round=1, status='ready')
+    QuizQuestion.objects.create(session=session, round_number=1, question_number=1, question_text='Question 1', correct_answer='A')
+    assert not quiz_events.is_shared()
+
+    def start_elsewhere():
+        # Another worker's in-process events never reach this one: only the database changes
+        time.sleep(0.2)
+        PubQuizSession.objects.filter(id=session.id).update(status='in_progress')
+
+    try:
+        threading.Thread(target=start_elsewhere).start()
+        start = time.time()
+        messages = read_messages(session, 3)
+        elapsed = time.time() - start
+        assert [data['type'] for _, data in messages] == ['connected', 'waiting', 'quiz_started']
+        assert elapsed < 0.2 + STREAM_CATCH_UP_SECONDS + 0.5, elapsed
+        print(f"✅ quiz started on another worker reached the stream in {elapsed:.1f}s")
+    finally:
+        session.delete()
+
+
+if __name__ == '__main__':
+    test_resume_after_drop()
+    test_change_on_another_worker()
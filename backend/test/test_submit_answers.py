@@ -0,0 +1,118 @@
+"""
+Test script for submit_all_answers
+Checks the batched grading/saving and benchmarks the final-whistle spike:
+40 teams sending 60 answers each at the same moment
+"""
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.db import connection, connections
+from django.test import Client
+
+from api.pub_quiz_models import PubQuizSession, QuizQuestion, QuizTeam, TeamAnswer
+
+NUM_TEAMS = 40
+ROUNDS, QUESTIONS_PER_ROUND = 6, 10
+
+
+def make_quiz(num_teams):
+    session = PubQuizSession.objects.create(venue_name='Submit Test', total_rounds=ROUNDS,
+                                            questions_per_round=QUESTIONS_PER_ROUND, status='in_progress')
+    questions = QuizQuestion.objects.bulk_create([
+        QuizQuestion(session=session, round_number=r, question_number=n, question_text=f'Q{r}.{n}',
+                     correct_answer=f'Answer {r}.{n}', alternative_answers=[f'Alt {r}.{n}'],
+                     question_type='multiple_choice' if n % 2 else 'written', correct_option='B')
+        for r in range(1, ROUNDS + 1) for n in range(1, QUESTIONS_PER_ROUND + 1)
+    ])
+    questions = list(QuizQuestion.objects.filter(session=session).order_by('round_number', 'question_number'))
+    teams = [QuizTeam.objects.create(session=session, team_name=f'Team {i}', table_number=i)
+             for i in range(1, num_teams + 1)]
+    return session, questions, teams
+
+
+def answers_for(questions):
+    """Half right: 'B' / the answer's alternative on even indexes, wrong otherwise"""
+    answers = []
+    for i, q in enumerate(questions):
+        multiple_choice = q.question_type == 'multiple_choice'
+        right = 'b' if multiple_choice else f' alt {q.round_number}.{q.question_number} '
+        answers.append({'question_id': q.id, 'answer': right if i % 2 == 0 else 'nope',
+                        'is_multiple_choice': multiple_choice})
+    return answers
+
+
+def submit(session, team, answers):
+    return Client().post(f'/api/pub-quiz/{session.session_code}/submit-answers',
+                         {'team_id': team.id, 'answers': answers}, content_type='application/json')
+
+
+def test_submit_grades_and_updates():
+    session, questions, teams = make_quiz(1)
+    try:
+        team = teams[0]
+        answers = answers_for(questions) + [{'question_id': 999999, 'answer': 'x'}]
+        queries = []
+        with connection.execute_wrapper(lambda execute, sql, *args: queries.append(sql) or execute(sql, *args)):
+            response = submit(session, team, answers)
+        assert response.status_code == 200 and response.json()['saved_count'] == len(questions)
+        assert TeamAnswer.objects.filter(team=team, is_correct=True).count() == len(questions) // 2
+        assert len(queries) < 15, len(queries)  # not 2-3 per answer
+
+        # Re-submitting updates in place (one row per question)
+        response = submit(session, team, [{'question_id': questions[0].id, 'answer': 'C', 'is_multiple_choice': True}])
+        assert response.json()['saved_count'] == 1
+        answer = TeamAnswer.objects.get(team=team, question=questions[0])
+        assert answer.is_correct is False and answer.answer_text == 'C'
+        assert TeamAnswer.objects.filter(team=team).count() == len(questions)
+
+        # A typo is accepted, and listed for the host to double-check
+        written = questions[1]
+        submit(session, team, [{'question_id': written.id, 'answer': f'Ansr {written.round_number}.{written.question_number}'}])
+        answer = TeamAnswer.objects.get(team=team, question=written)
+        assert answer.is_correct and 0.5 <= answer.match_confidence < 0.9
+        review = Client().get(f'/api/pub-quiz/{session.session_code}/answers-to-review').json()['answers']
+        assert [a['question_id'] for a in review] == [written.id]
+        print(f"✅ {len(questions)} answers graded and saved with {len(queries)} queries")
+    finally:
+        session.delete()
+
+
+def test_final_whistle_benchmark():
+    session, questions, teams = make_quiz(NUM_TEAMS)
+    answers = answers_for(questions)
+
+    def team_submits(team):
+        try:
+            start = time.time()
+            response = submit(session, team, answers)
+            return response.status_code, time.time() - start
+        finally:
+            connections.close_all()
+
+    try:
+        start = time.time()
+        with ThreadPoolExecutor(max_workers=NUM_TEAMS) as pool:
+            results = list(pool.map(team_submits, teams))
+        total = time.time() - start
+
+        assert all(code == 200 for code, _ in results), results
+        assert TeamAnswer.objects.filter(team__session=session).count() == NUM_TEAMS * len(questions)
+        slowest = max(elapsed for _, elapsed in results)
+        print(f"✅ {NUM_TEAMS} teams x {len(answers)} answers at once: all saved in {total:.2f}s "
+              f"(slowest team {slowest * 1000:.0f}ms)")
+    finally:
+        session.delete()
+
+
+if __name__ == '__main__':
+    test_submit_grades_and_updates()
+    test_final_whistle_benchmark()
@@ -0,0 +1,203 @@
+"""
+Test script for the TTS audio cache
+A line that was synthesised before comes back from memory or disk without
+calling ElevenLabs, is served with ETag / Range support, and the disk tier
+stays under its size limit
+"""
+import os
+import sys
+import time
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+# Add backend directory to path
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'music_bingo.settings')
+
+import django
+django.setup()
+
+from django.test import Client
+
+from api import tts_cache, views
+from api.tts_cache import TTSCache, cache_key, tts_params
+
+AUDIO = bytes(range(256)) * 40  # 10 KB of "mp3"
+
+
+def test_key_covers_every_setting():
+    params = tts_params('Number 7, lucky seven!', 'voice-a')
+    assert cache_key(params) == cache_key(tts_params('Number 7, lucky seven!', 'voice-a'))
+    assert cache_key(params) != cache_key(tts_params('Number 7, lucky seven!', 'voice-b'))
+    assert cache_key(params) != cache_key(tts_params('Number 7, lucky seven!', 'voice-a', model_id='other'))
+    assert cache_key(params) != cache_key(tts_params('Number 7, lucky seven!', 'voice-a', output_format='mp3_22050_32'))
+    assert cache_key(params) != cache_key(tts_params('Number 7, lucky seven!', 'voice-a',
+                                                     voice_settings={'stability': 0.9}))
+    print("✅ cache key changes with text, voice, model, settings and format")
+
+
+def test_memory_and_disk_tiers():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory, memory_mb=1, disk_mb=10)
+        key = cache_key(tts_params('Eyes down!', 'voice-a'))
+        assert cache.get(key) is None
+        cache.put(key, AUDIO)
+        assert cache.get(key).tier == 'memory'
+
+        # Another worker (or a restart) only has the disk tier
+        fresh = TTSCache(directory, memory_mb=1, disk_mb=10)
+        hit = fresh.get(key)
+        assert hit.tier == 'disk' and hit.data == AUDIO
+        assert fresh.get(key).tier == 'memory'
+
+        # Hits never reach the API: a bogus key would fail if it were called
+        start = time.perf_counter()
+        audio = fresh.synthesize(tts_params('Eyes down!', 'voice-a'), api_key='not-a-key')
+        elapsed = (time.perf_counter() - start) * 1000
+        assert audio.data == AUDIO and elapsed < 50
+        print(f"✅ memory and disk tiers; cached synthesize took {elapsed:.2f}ms")
+
+
+def test_memory_tier_is_bounded():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory, memory_mb=0.1, disk_mb=10)  # ~100 KB
+        keys = [cache_key(tts_params(f'Line {i}', 'voice-a')) for i in range(20)]
+        for key in keys:
+            cache.put(key, AUDIO)
+        assert cache.memory_bytes <= cache.memory_limit
+        assert keys[-1] in cache.memory and keys[0] not in cache.memory
+        assert cache.get(keys[0]).tier == 'disk'  # still on disk
+        print(f"✅ memory tier holds {len(cache.memory)} of 20 clips")
+
+
+def test_disk_eviction_drops_least_recently_used():
+    with tempfile.TemporaryDirectory() as directory:
+        cache = TTSCache(directory, memory_mb=1, disk_mb=0.05)  # ~51 KB: five clips
+        keys = [cache_key(tts_params(f'Line {i}', 'voice-a')) for i in range(5)]
+        for age, key in enumerate(keys):
+            cache.put(key, AUDIO)
+            os.utime(cache.path(key), (1000 + age, 1000 + age))
+        cache.memory.clear()
+        cache.get(keys[0])  # recently used again
+
+        cache.put(cache_key(tts_params('Line 5', 'voice-a')), AUDIO)
+        on_disk = {path.stem for path in cache.directory.glob('*/*.mp3')}
+        assert keys[0] in on_disk and keys[1] not in on_disk
+        assert cache.disk_bytes <= cache.disk_limit
+        print(f"✅ disk tier evicted down to {len(on_disk)} clips")
+
+
+def test_range_and_etag():
+    previous_cache, previous_key = tts_cache._cache, views.ELEVENLABS_API_KEY
+    with tempfile.TemporaryDirectory() as directory:
+        tts_cache._cache = TTSCache(directory, memory_mb=1, disk_mb=10)
+        views.ELEVENLABS_API_KEY = 'not-a-key'  # must not be used
+        try:
+            params = tts_params('Two little ducks, 22!', views.ELEVENLABS_VOICE_ID)
+            key = cache_key(params)
+            tts_cache._cache.put(key, AUDIO)
+            client = Client()
+
+            response = client.post('/api/tts', {'text': 'Two little ducks, 22!'}, content_type='application/json')
+            assert response.status_code == 200 and response.content == AUDIO
+            assert response['X-TTS-Cache'] == 'memory' and response['X-TTS-Key'] == key
+            assert response['ETag'] == f'"{key}"' and response['Accept-Ranges'] == 'bytes'
+
+            response = client.get(f'/api/tts/{key}', HTTP_RANGE='bytes=100-199')
+            assert response.status_code == 206 and response.content == AUDIO[100:200]
+            assert response['Content-Range'] == f'bytes 100-199/{len(AUDIO)}'
+
+            response = client.get(f'/api/tts/{key}', HTTP_RANGE='bytes=-50')
+            assert response.status_code == 206 and response.content == AUDIO[-50:]
+
+            response = client.get(f'/api/tts/{key}', HTTP_RANGE=f'bytes={len(AUDIO)}-')
+            assert response.status_code == 416
+
+            response = client.get(f'/api/tts/{key}', HTTP_IF_NONE_MATCH=f'"{key}"')
+            assert response.status_code == 304 and not response.content
+
+            assert client.get(f'/api/tts/{"0" * 64}').status_code == 404
+            print("✅ cached clip served with ETag, 304, 206 and 416")
+        finally:
+            tts_cache._cache, views.ELEVENLABS_API_KEY = previous_cache, previous_key
+
+
+class FakeElevenLabs:
+    """A local TTS endpoint answering AUDIO after `delay`, counting requests"""
+
+    def __init__(self, delay=0.2):
+        self.requests = 0
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get('Content-Length', 0)))
+                stub.requests += 1
+                time.sleep(delay)
+                self.send_response(200)
+                self.send_header('Content-Type', 'audio/mpeg')
+                self.send_header('Content-Length', str(len(AUDIO)))
+                self.end_headers()
+                self.wfile.write(AUDIO)
+
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/v1/text-to-speech/{{voice_id}}'
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+def test_stream_renders_a_line_once():
+    upstream = FakeElevenLabs()
+    previous_url = tts_cache.ELEVENLABS_TTS_URL
+    tts_cache.ELEVENLABS_TTS_URL = upstream.url
+    try:
+        with tempfile.TemporaryDirectory() as directory:
+            cache = TTSCache(directory, memory_mb=1, disk_mb=10)
+            params = tts_params('Clickety click, 66!', 'voice-a')
+            results = []
+
+            def listen():
+                key, chunks, tier = cache.stream(params, api_key='test')
+                results.append((b''.join(chunks), tier))
+
+            threads = [threading.Thread(target=listen) for _ in range(5)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            assert upstream.requests == 1, upstream.requests
+            assert all(data == AUDIO for data, _ in results)
+            assert sorted(tier for _, tier in results).count('miss') == 1
+            assert not cache.key_locks
+
+            # A client that hangs up mid-clip: upstream closed, nothing cached, the key free again
+            params = tts_params('Legs eleven!', 'voice-a')
+            key, chunks, tier = cache.stream(params, api_key='test')
+            next(chunks)
+            chunks.close()
+            assert chunks.response.raw.closed and cache.get(key) is None and not cache.key_locks
+            assert b''.join(cache.stream(params, api_key='test')[1]) == AUDIO
+            assert upstream.requests == 3
+            print("✅ 5 concurrent streams of one line cost 1 ElevenLabs request; a hang-up frees the line")
+    finally:
+        tts_cache.ELEVENLABS_TTS_URL = previous_url
+        upstream.close()
+
+
+if __name__ == '__main__':
+    test_key_covers_every_setting()
+    test_memory_and_disk_tiers()
+    test_memory_tier_is_bounded()
+    test_disk_eviction_drops_least_recently_used()
+    test_range_and_etag()
+    test_stream_renders_a_line_once()
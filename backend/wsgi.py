@@ -24,3 +24,20 @@ try:
     logger.info(f"✅ WSGI: Preloaded {len(resolver.url_patterns)} URL patterns successfully")
 except Exception as e:
     logger.error(f"❌ Error preloading URLs in WSGI: {e}")
+
+# 📡 Pub quiz streams served by another process (supervisor.conf): the events
+# the views publish here must reach it, so refuse to start without Redis
+from api import quiz_events  # noqa: E402
+if quiz_events.QUIZ_STREAMS_SEPARATE_PROCESS:
+    quiz_events.require_shared()
+
+# 🏭 Card generation pool: gunicorn --preload imports this module in the master,
+# so the pool must be started in each worker after the fork, never here.
+# Every launcher passes --preload (Dockerfile, Procfile, supervisor.conf):
+# without it no fork follows this import and the pool starts cold on the first job.
+if os.getenv('CARD_POOL_PREWARM', 'true').lower() == 'true':
+    def _prewarm_card_pool():
+        from api.card_service import prewarm_in_background
+        prewarm_in_background()
+
+    os.register_at_fork(after_in_child=_prewarm_card_pool)
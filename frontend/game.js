@@ -39,9 +39,14 @@ let gameState = {
     announcementsAI: null,   // AI-generated announcements (optional)
     venueName: localStorage.getItem('venueName') || 'this venue', // Venue name from localStorage
     welcomeAnnounced: false, // Track if welcome was announced
-    halfwayAnnounced: false  // Track if halfway announcement was made
+    halfwayAnnounced: false, // Track if halfway announcement was made
+    songSetSeed: null,       // Seed of the printed cards when playing their song set
+    announcedWinners: {}     // Patterns already announced as claimable
 };
 
+// "voiceId|text" -> blob URL of an announcement pre-rendered on the server (see prepareAnnouncementAudio)
+const preloadedAnnouncements = {};
+
 /**
  * Reset game state to initial values (for new sessions)
  */
@@ -56,6 +61,8 @@ function resetGameState() {
     gameState.announcementsAI = null;
     gameState.welcomeAnnounced = false;
     gameState.halfwayAnnounced = false;
+    gameState.songSetSeed = null;
+    gameState.announcedWinners = {};
     // Note: Keep venueName and sessionId as they're set by the session loader
     console.log('✅ Game state reset complete');
 }
@@ -803,6 +810,9 @@ async function initializeGame() {
         // Load AI announcements (optional)
         await loadAIAnnouncements();
 
+        // Pre-render this game's announcements on the server and preload them (in the background)
+        prepareAnnouncementAudio();
+
         // Start background music
         startBackgroundMusic();
 
@@ -975,6 +985,12 @@ async function loadSongPool() {
     // Take only the optimal number of songs for this game
     gameState.remaining = shuffled.slice(0, optimalSongs);
 
+    // Cards already printed for this session: call exactly their songs
+    const songSet = await loadSessionSongSet();
+    if (songSet) {
+        useSongSet(songSet);
+    }
+
     // Try to restore saved game state ONLY if songs were already called
     const savedState = localStorage.getItem('gameState');
     if (savedState) {
@@ -1052,6 +1068,92 @@ async function loadAIAnnouncements() {
     }
 }
 
+/**
+ * Have the server pre-render every announcement this game can make, then
+ * download each clip as soon as it's ready (so calls play instantly, and
+ * keep playing if the pub's connection drops)
+ */
+async function prepareAnnouncementAudio() {
+    if (!gameState.sessionId) return;
+
+    const voiceId = localStorage.getItem('voiceId') || 'JBFqnCBsd6RMkjVDRZzb';
+    const url = `${CONFIG.API_URL}/api/bingo/session/${gameState.sessionId}/announcement-audio`;
+
+    try {
+        const response = await fetch(url, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({
+                voice_id: voiceId,
+                lines: scriptedLines(),
+                song_ids: gameState.remaining.map(song => String(song.id))
+            })
+        });
+        if (!response.ok) {
+            console.log('ℹ Announcements not pre-rendered, using live TTS');
+            return;
+        }
+
+        while (true) {
+            const manifest = await (await fetch(url)).json();
+            const pending = manifest.clips.filter(clip =>
+                clip.ready && !preloadedAnnouncements[`${clip.voice_id}|${clip.text}`]);
+
+            // A few downloads at a time
+            const download = async () => {
+                while (pending.length > 0) {
+                    const clip = pending.shift();
+                    const audio = await fetch(`${CONFIG.API_URL}${clip.url}`);
+                    if (audio.ok) {
+                        preloadedAnnouncements[`${clip.voice_id}|${clip.text}`] = URL.createObjectURL(await audio.blob());
+                    }
+                }
+            };
+            await Promise.all([download(), download(), download()]);
+
+            const preloaded = Object.keys(preloadedAnnouncements).length;
+            console.log(`📦 Preloaded ${preloaded}/${manifest.total} announcements`);
+            if (manifest.ready === manifest.total || !['pending', 'processing'].includes(manifest.task_status)) {
+                break;
+            }
+            await new Promise(resolve => setTimeout(resolve, 3000));
+        }
+    } catch (error) {
+        console.warn('⚠️ Could not preload announcements:', error);
+    }
+}
+
+/**
+ * Load the songs printed on this session's cards (null if none were generated)
+ */
+async function loadSessionSongSet() {
+    if (!gameState.sessionId) return null;
+
+    try {
+        const response = await fetch(`${CONFIG.API_URL}/api/bingo/session/${gameState.sessionId}/song-set`);
+        if (!response.ok) {
+            if (response.status === 409) {
+                console.warn('⚠️ Song pool changed since the cards were printed - regenerate the cards');
+            }
+            return null;
+        }
+        return await response.json();
+    } catch (error) {
+        console.warn('⚠️ Could not load session song set:', error);
+        return null;
+    }
+}
+
+/**
+ * Play from the printed cards' song set instead of a random shuffle
+ */
+function useSongSet(songSet) {
+    gameState.pool = songSet.songs;
+    gameState.remaining = [...songSet.songs];
+    gameState.songSetSeed = songSet.seed;
+    console.log(`🃏 Playing the ${songSet.songs.length} songs printed on ${songSet.num_cards} cards (seed ${songSet.seed})`);
+}
+
 /**
  * Utility: Shuffle array in place (Fisher-Yates)
  */
@@ -1211,6 +1313,9 @@ async function playNextTrack() {
     // Save game state to localStorage
     saveGameState();
 
+    // Record the call on the server (claim stats come back) - don't hold up the audio
+    reportCalledSong(track);
+
     // Update session status to 'active' on first song
     if (gameState.called.length === 1) {
         await updateSessionStatus('active');
@@ -1273,33 +1378,45 @@ async function playNextTrack() {
 }
 
 /**
- * Generate welcome announcement text
+ * Welcome announcement scripts
  */
-function generateWelcomeText() {
-    const welcomeScripts = [
+function welcomeScripts() {
+    return [
         `Ladies and gentlemen, welcome to Music Bingo at ${gameState.venueName}! Tonight, we're dropping beats instead of balls. Grab your cards, your markers, and get ready to mark off those songs as we play short clips. No titles or artists will be announced—just listen closely, sing along if you know it, and shout 'Bingo!' when you get a line, all 4 corners, or full house. We've got great prizes up for grabs, so let's kick things off with some classic tunes!`,
 
         `Hello everyone and welcome to the ultimate Music Bingo night at ${gameState.venueName}! Get those dabbers ready because we're about to play hits from across the decades. I'll spin the tracks, you identify them on your card—without any hints on the name or who sings it. First to a full line, all 4 corners, or full house wins! Are you ready to test your music knowledge? Let's get this party started!`,
 
         `Good evening, music lovers! It's time for Music Bingo extravaganza at ${gameState.venueName}. Rules are simple: We play a snippet, you spot the song on your card and mark it off. No song titles or artists given—just pure ear power. Shout 'Bingo!' when you get a line, all 4 corners, or full house. Prizes for the quickest bingos, so stay sharp. Here comes the first track—good luck!`
     ];
+}
 
-    return welcomeScripts[Math.floor(Math.random() * welcomeScripts.length)];
+/**
+ * Generate welcome announcement text
+ */
+function generateWelcomeText() {
+    const scripts = welcomeScripts();
+    return scripts[Math.floor(Math.random() * scripts.length)];
 }
 
 /**
- * Generate halfway announcement text
+ * Halfway announcement scripts
  */
-function generateHalfwayText() {
-    const halfwayScripts = [
+function halfwayScripts() {
+    return [
         `Alright, everyone—we're halfway through this round! How's everyone doing? A few close calls out there? Keep those ears open because the hits are just getting better. Remember, no peeking at your phones for lyrics! Next track coming up—let's see who gets closer to that bingo!`,
 
         `We're at the halfway mark, folks! Time for a quick breather. Anyone got a line yet? Shout out if you're one away! We've got some absolute bangers left, so don't give up now. Grab a drink, stretch those vocal cords for singing along, and let's dive back in!`,
 
         `Halfway there, music bingo fans! You're all doing amazing—I've heard some epic sing-alongs already. Prizes are waiting for those full cards, so stay focused. If you're stuck on a song, maybe the next one will jog your memory. Here we go with more tunes!`
     ];
+}
 
-    return halfwayScripts[Math.floor(Math.random() * halfwayScripts.length)];
+/**
+ * Generate halfway announcement text
+ */
+function generateHalfwayText() {
+    const scripts = halfwayScripts();
+    return scripts[Math.floor(Math.random() * scripts.length)];
 }
 
 /**
@@ -1429,79 +1546,83 @@ function generateAnnouncementText(track) {
 
     // Fallback to template system if AI not available
     const randomType = Math.random();
+    const pick = lines => lines[Math.floor(Math.random() * lines.length)];
 
     // Type A: Era/Decade Context (33%)
     if (randomType < 0.33) {
         const year = parseInt(track.release_year);
-        let decade = '';
-        let description = '';
-
-        if (year >= 2020) {
-            decade = '2020s';
-            description = 'Get ready for this fresh hit from the 2020s';
-        } else if (year >= 2010) {
-            decade = '2010s';
-            description = 'Get ready for this modern classic from the 2010s';
-        } else if (year >= 2000) {
-            decade = '2000s';
-            description = 'Here\'s a chart-topper from the early 2000s';
-        } else if (year >= 1990) {
-            decade = '1990s';
-            description = 'Listen up for this gem from the grunge and pop explosion of the 1990s';
-        } else if (year >= 1980) {
-            decade = '1980s';
-            const options = [
-                'Let\'s go straight to the 1980s for this one',
-                'Here\'s an iconic banger from the hair metal 1980s',
-                'Coming up: A massive hit from the 1980s'
-            ];
-            description = options[Math.floor(Math.random() * options.length)];
-        } else if (year >= 1970) {
-            decade = '1970s';
-            description = 'Next track: Straight out of the disco-fueled 1970s';
-        } else if (year >= 1960) {
-            decade = '1960s';
-            description = 'Coming up: A massive hit from the swinging 1960s';
-        } else {
-            description = 'Here\'s a classic for you';
-        }
-
-        return description;
+        const era = DECADE_ANNOUNCEMENTS.find(entry => year >= entry.from) ||
+            DECADE_ANNOUNCEMENTS[DECADE_ANNOUNCEMENTS.length - 1];
+        return pick(era.lines);
     }
 
     // Type B: Fun Facts/Trivia (33%)
     else if (randomType < 0.66) {
-        const funFacts = [
-            'This one topped the charts for weeks',
-            'This artist has won multiple awards',
-            'This track became an instant classic',
-            'This song was a massive hit worldwide',
-            'You\'ll definitely recognize this one',
-            'This artist is a true legend',
-            'This track dominated the airwaves',
-            'This one\'s a crowd favorite',
-            'This song defined a generation',
-            'This artist needs no introduction'
-        ];
-        return funFacts[Math.floor(Math.random() * funFacts.length)];
+        return pick(FUN_FACT_ANNOUNCEMENTS);
     }
 
     // Type C: Generic Simple (33%)
     else {
-        const simpleAnnouncements = [
-            'Next song',
-            'Here we go',
-            'Coming up',
-            'Let\'s keep it going',
-            'Another one coming your way',
-            'Ready for this one',
-            'Listen closely',
-            'Mark your cards',
-            'Here\'s another',
-            'Let\'s continue'
-        ];
-        return simpleAnnouncements[Math.floor(Math.random() * simpleAnnouncements.length)];
-    }
+        return pick(SIMPLE_ANNOUNCEMENTS);
+    }
+}
+
+// Template announcements (when a track has no AI announcement), newest decade first
+const DECADE_ANNOUNCEMENTS = [
+    { from: 2020, lines: ['Get ready for this fresh hit from the 2020s'] },
+    { from: 2010, lines: ['Get ready for this modern classic from the 2010s'] },
+    { from: 2000, lines: ['Here\'s a chart-topper from the early 2000s'] },
+    { from: 1990, lines: ['Listen up for this gem from the grunge and pop explosion of the 1990s'] },
+    {
+        from: 1980, lines: [
+            'Let\'s go straight to the 1980s for this one',
+            'Here\'s an iconic banger from the hair metal 1980s',
+            'Coming up: A massive hit from the 1980s'
+        ]
+    },
+    { from: 1970, lines: ['Next track: Straight out of the disco-fueled 1970s'] },
+    { from: 1960, lines: ['Coming up: A massive hit from the swinging 1960s'] },
+    { from: -Infinity, lines: ['Here\'s a classic for you'] }
+];
+
+const FUN_FACT_ANNOUNCEMENTS = [
+    'This one topped the charts for weeks',
+    'This artist has won multiple awards',
+    'This track became an instant classic',
+    'This song was a massive hit worldwide',
+    'You\'ll definitely recognize this one',
+    'This artist is a true legend',
+    'This track dominated the airwaves',
+    'This one\'s a crowd favorite',
+    'This song defined a generation',
+    'This artist needs no introduction'
+];
+
+const SIMPLE_ANNOUNCEMENTS = [
+    'Next song',
+    'Here we go',
+    'Coming up',
+    'Let\'s keep it going',
+    'Another one coming your way',
+    'Ready for this one',
+    'Listen closely',
+    'Mark your cards',
+    'Here\'s another',
+    'Let\'s continue'
+];
+
+/**
+ * Every line the game can say without the server's help (pre-rendered with the AI and custom ones)
+ */
+function scriptedLines() {
+    return [
+        ...welcomeScripts(),
+        ...halfwayScripts(),
+        ...DECADE_ANNOUNCEMENTS.flatMap(entry => entry.lines),
+        ...FUN_FACT_ANNOUNCEMENTS,
+        ...SIMPLE_ANNOUNCEMENTS,
+        ...(gameState.announcementsData?.custom_announcements || [])
+    ];
 }
 
 /**
@@ -1566,6 +1687,12 @@ async function generateElevenLabsTTS(text) {
     // Get selected voice from localStorage (British voice)
     const voiceId = localStorage.getItem('voiceId') || 'JBFqnCBsd6RMkjVDRZzb'; // Default: George (Male British)
 
+    // Pre-rendered before the game - plays even if the connection has dropped
+    const preloaded = preloadedAnnouncements[`${voiceId}|${text}`];
+    if (preloaded) {
+        return preloaded;
+    }
+
     const response = await fetch(`${CONFIG.API_URL}/api/tts`, {
         method: 'POST',
         headers: {
@@ -1751,10 +1878,24 @@ function resetGame() {
     gameState.isPlaying = false;
     gameState.welcomeAnnounced = false;
     gameState.halfwayAnnounced = false;
+    gameState.announcedWinners = {};
 
     // Clear saved game state
     clearGameState();
 
+    // Clear the called songs on the server too, so claims are checked from scratch
+    if (gameState.sessionId) {
+        fetch(`${CONFIG.API_URL}/api/bingo/session/${gameState.sessionId}`, {
+            method: 'PUT',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ songs_played: [], current_song_index: 0 })
+        }).catch(error => console.warn('⚠️ Could not reset session songs:', error));
+    }
+    const oneAwayStat = document.getElementById('oneAwayStat');
+    if (oneAwayStat) {
+        oneAwayStat.style.display = 'none';
+    }
+
     // Reset UI
     document.getElementById('currentTrack').style.display = 'none';
     document.getElementById('calledList').innerHTML = `
@@ -2094,6 +2235,26 @@ function estimateGameDuration(numSongs, secondsPerSong = 30) {
     return Math.floor((numSongs * secondsPerSong) / 60);
 }
 
+/**
+ * Summarise the server's simulated game length ({num_songs, patterns: {p: {mean, p10, p90}}})
+ */
+function describeGameLength(report) {
+    if (!report || !report.patterns) {
+        return '';
+    }
+    const names = { four_corners: '4 Corners', first_line: 'First Line', full_house: 'Full House' };
+    const lines = Object.entries(names)
+        .filter(([pattern]) => report.patterns[pattern])
+        .map(([pattern, name]) => {
+            const stats = report.patterns[pattern];
+            return `${name}: ~${Math.round(stats.mean)} songs (${stats.p10}-${stats.p90})`;
+        });
+    const fullHouse = report.patterns.full_house;
+    const minutes = fullHouse ? estimateGameDuration(Math.round(fullHouse.mean)) : null;
+    return `Songs in the game: ${report.num_songs}\n${lines.join('\n')}` +
+        (minutes ? `\nEstimated duration: ~${minutes} minutes` : '');
+}
+
 // Update estimation display when player count changes
 function updateSongEstimation() {
     const numPlayers = parseInt(document.getElementById('numPlayers').value) || 25;
@@ -2111,8 +2272,9 @@ document.addEventListener('DOMContentLoaded', function () {
         numPlayersInput.addEventListener('input', async function () {
             updateSongEstimation();
 
-            // Reload song pool with new player count (only if game hasn't started)
-            if (gameState.called.length === 0 && gameState.pool.length > 0) {
+            // Reload song pool with new player count (only if game hasn't started
+            // and isn't playing the song set of already printed cards)
+            if (gameState.called.length === 0 && gameState.pool.length > 0 && gameState.songSetSeed === null) {
                 const numPlayers = parseInt(numPlayersInput.value) || 25;
                 const optimalSongs = calculateOptimalSongs(numPlayers);
 
@@ -2133,12 +2295,18 @@ document.addEventListener('DOMContentLoaded', function () {
 async function generateCards() {
     const venueName = document.getElementById('venueName').value.trim();
     const numPlayers = parseInt(document.getElementById('numPlayers').value) || 25;
+    const numCards = parseInt(document.getElementById('numCards')?.value) || 50;
 
     if (!venueName) {
         alert('Please enter a venue name first!');
         return;
     }
 
+    if (numCards < 1 || numCards > 5000) {
+        alert('Cards must be between 1 and 5000');
+        return;
+    }
+
     // Calculate optimal songs
     const optimalSongs = calculateOptimalSongs(numPlayers);
     const estimatedMinutes = estimateGameDuration(optimalSongs);
@@ -2189,13 +2357,15 @@ async function generateCards() {
             body: JSON.stringify({
                 venue_name: venueName,
                 num_players: numPlayers,
+                num_cards: numCards,
                 optimal_songs: optimalSongs,
                 pub_logo: pubLogo,
                 social_media: socialMedia,
                 include_qr: includeQR,
                 prize_4corners: prize4Corners,
                 prize_first_line: prizeFirstLine,
-                prize_full_house: prizeFullHouse
+                prize_full_house: prizeFullHouse,
+                session_id: gameState.sessionId || null
             })
         });
 
@@ -2241,11 +2411,22 @@ async function generateCards() {
                     // Success!
                     console.log('✅ Generation completed:', status.result);
 
+                    // Play the songs that are on these cards (only before the first call)
+                    if (gameState.called.length === 0) {
+                        const songSet = await loadSessionSongSet();
+                        if (songSet) {
+                            useSongSet(songSet);
+                            updateStats();
+                        }
+                    }
+
                     btn.textContent = originalText;
                     btn.disabled = false;
 
-                    // Show success message
-                    alert(`✅ Cards generated successfully!\n\nVenue: ${venueName}\nPlayers: ${numPlayers}\nOptimal songs: ${optimalSongs}\nEstimated duration: ${estimatedMinutes} minutes\n\nCards: ${status.result.num_cards}\nFile size: ${status.result.file_size_mb}MB\nGeneration time: ${status.result.generation_time}s\n\nDownloading now...`);
+                    // Show success message (with the simulated game length when available)
+                    const gameLength = describeGameLength(status.result.game_length);
+                    const songsLine = gameLength || `Optimal songs: ${optimalSongs}\nEstimated duration: ${estimatedMinutes} minutes`;
+                    alert(`✅ Cards generated successfully!\n\nVenue: ${venueName}\nPlayers: ${numPlayers}\n${songsLine}\n\nCards: ${status.result.num_cards}\nFile size: ${status.result.file_size_mb}MB\nGeneration time: ${status.result.generation_time}s\n\nDownloading now...`);
 
                     // Download the PDF automatically
                     const timestamp = new Date().getTime();
@@ -2643,6 +2824,105 @@ if (typeof window !== 'undefined') {
     });
 }
 
+// ============================================================================
+// CLAIM VERIFICATION
+// ============================================================================
+
+const CLAIM_PATTERNS = {
+    four_corners: '4 Corners',
+    first_line: 'First Line',
+    full_house: 'Full House'
+};
+
+/**
+ * Tell the server a song was called and show how close the cards are
+ */
+async function reportCalledSong(track) {
+    if (!gameState.sessionId) return;
+
+    try {
+        const response = await fetch(`${CONFIG.API_URL}/api/bingo/session/${gameState.sessionId}/call`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ song_id: track.id })
+        });
+        if (!response.ok) {
+            console.warn(`⚠️ Failed to record called song: ${response.status}`);
+            return;
+        }
+        const data = await response.json();
+        if (data.claim_stats) {
+            updateClaimStats(data.claim_stats);
+        }
+    } catch (error) {
+        console.warn('⚠️ Could not record called song:', error);
+    }
+}
+
+/**
+ * Show "N cards one away" for the next prize still up for grabs
+ */
+function updateClaimStats(stats) {
+    const patterns = stats.patterns;
+    // First prize nobody can claim yet is the one the room is playing for
+    const current = Object.keys(CLAIM_PATTERNS).find(p => patterns[p].winners.length === 0) || 'full_house';
+
+    const statEl = document.getElementById('oneAwayStat');
+    if (statEl) {
+        statEl.style.display = '';
+        document.getElementById('oneAwayCount').textContent = patterns[current].one_away;
+        document.getElementById('oneAwayLabel').textContent = `One Away (${CLAIM_PATTERNS[current]})`;
+    }
+
+    for (const [pattern, label] of Object.entries(CLAIM_PATTERNS)) {
+        const winners = patterns[pattern].winners;
+        if (winners.length > 0 && !gameState.announcedWinners[pattern]) {
+            gameState.announcedWinners[pattern] = true;
+            showGameNotification(`🏆 ${label} is on! Card${winners.length > 1 ? 's' : ''} #${winners.slice(0, 5).join(', #')}`, 'success');
+        }
+    }
+    console.log('🎯 Claim stats:', stats);
+}
+
+/**
+ * Ask for a card number and prize, then verify the claim on the server
+ */
+async function checkClaim() {
+    if (!gameState.sessionId) {
+        alert('Claims can only be checked for a saved session.');
+        return;
+    }
+
+    const cardNumber = prompt('Card number on the claimed card:');
+    if (!cardNumber) return;
+    const choice = prompt('Which prize?\n1 = 4 Corners\n2 = First Line\n3 = Full House', '1');
+    const pattern = Object.keys(CLAIM_PATTERNS)[parseInt(choice) - 1];
+    if (!pattern) return;
+
+    try {
+        const response = await fetch(`${CONFIG.API_URL}/api/bingo/session/${gameState.sessionId}/verify-claim`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ card_number: parseInt(cardNumber), pattern })
+        });
+        const result = await response.json();
+        if (!response.ok) {
+            alert(`❌ ${result.error}`);
+            return;
+        }
+
+        if (result.valid) {
+            alert(`✅ VALID ${CLAIM_PATTERNS[pattern]}!\n\nCard #${result.card_number}${result.prize ? `\nPrize: ${result.prize}` : ''}`);
+        } else {
+            const missing = result.missing_songs.map(s => `• ${s.artist} - ${s.title}`).join('\n');
+            alert(`❌ Not a ${CLAIM_PATTERNS[pattern]} yet on card #${result.card_number}.\n\nStill needed (${result.missing_songs.length}):\n${missing}`);
+        }
+    } catch (error) {
+        console.error('❌ Error verifying claim:', error);
+        alert('Could not verify the claim. Please check the card by hand.');
+    }
+}
+
 /**
  * Update bingo session status (pending -> active -> completed)
  */